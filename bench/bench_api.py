@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 信号 API 基准
+In-process ASGI request cost: cold build vs cached 200 vs ETag 304
+
+【测量内容】
+├── cold: 数据版本变化后首个请求（解析 + 序列化 + 哈希）
+├── 200:  载荷已缓存，完整响应体
+├── 304:  If-None-Match 命中，无响应体
+└── 每种情况 JSON / CSV 各测一次；直接调用 ASGI 应用，不含网络与 uvicorn 开销
+
+使用方法：
+    python bench/bench_api.py [--requests 20000]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import core  # noqa: E402
+import signal_api  # noqa: E402
+
+KEY = core.load_valid_keys()[0]
+
+
+async def request(path: str, headers: dict) -> dict:
+    scope = {
+        'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'', 'client': ('127.0.0.1', 0),
+        'headers': [(k.encode(), v.encode()) for k, v in headers.items()],
+    }
+    out = {}
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            out['status'] = message['status']
+            out['headers'] = {k.decode(): v.decode() for k, v in message['headers']}
+        else:
+            out['body'] = message['body']
+
+    await signal_api.app(scope, receive, send)
+    return out
+
+
+async def run(n: int):
+    auth = {'authorization': f'Bearer {KEY}'}
+    await request('/api/v1/signals', auth)   # 预热：Key 校验、信号解析
+
+    print(f"{'path':<24}{'cold_ms':>9}{'200_us':>9}{'304_us':>9}{'bytes':>8}")
+    for path in ('/api/v1/signals.json', '/api/v1/signals.csv'):
+        signal_api._store.version = None   # 模拟数据版本变化
+        t0 = time.perf_counter()
+        first = await request(path, auth)
+        cold = (time.perf_counter() - t0) * 1000
+        assert first['status'] == 200, first
+
+        t0 = time.perf_counter()
+        for _ in range(n):
+            await request(path, auth)
+        full = (time.perf_counter() - t0) / n * 1e6
+
+        cond = dict(auth, **{'if-none-match': first['headers']['etag']})
+        t0 = time.perf_counter()
+        for _ in range(n):
+            r = await request(path, cond)
+        cached = (time.perf_counter() - t0) / n * 1e6
+        assert r['status'] == 304, r
+
+        print(f"{path:<24}{cold:>9.2f}{full:>9.1f}{cached:>9.1f}{len(first['body']):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EigenFlow signal API benchmark')
+    parser.add_argument('--requests', type=int, default=20000)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.requests))
+    core.flush_usage_log()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 因子增量更新基准
+Incremental one-day update vs full recompute, with drift check
+
+【测量内容】
+├── 合成日线全量导入后，只保留前 T − D 日作为矩阵
+├── 逐日执行 verify（与追加后全量重算对比）+ update（写盘）
+├── 每日耗时：增量 vs 全量
+└── D 日累计后原始因子最大误差（Welford / 滑动求和的误差累积）
+
+使用方法：
+    python bench/bench_incremental.py [--symbols 1000] [--days 750] [--updates 30]
+"""
+
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import factor_pipeline as fp  # noqa: E402
+import factor_incremental as fi  # noqa: E402
+from bench_factors import write_synthetic_bars  # noqa: E402
+
+
+def write_day_csv(path: str, panel: dict, t: int):
+    """矩阵第 t 行 → 当日截面 CSV（停牌股票不输出）"""
+    d = str(int(panel['dates'][t]))
+    df = pd.DataFrame({'symbol': panel['symbols'], 'date': f"{d[:4]}-{d[4:6]}-{d[6:]}"})
+    for field in fp.PANEL_FIELDS:
+        df[field] = panel[field][t]
+    df[~np.isnan(panel['close'][t])].to_csv(path, index=False)
+
+
+def _factors_and_score(panel: dict):
+    factors = fp.standardize_factors(fp.compute_raw_factors(panel))
+    return factors, fp.score_factors(factors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EigenFlow incremental factor benchmark')
+    parser.add_argument('--symbols', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=750)
+    parser.add_argument('--updates', type=int, default=30)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='ef_incr_')
+    try:
+        src_dir = os.path.join(tmp, 'bars')
+        panel_dir = os.path.join(tmp, 'panel')
+        out = os.path.join(tmp, 'trade_list.csv')
+        write_synthetic_bars(src_dir, args.symbols, args.days)
+
+        full = fp.ingest_directory(src_dir)
+        start = len(full['dates']) - args.updates
+        head = {'dates': full['dates'][:start], 'symbols': full['symbols']}
+        head.update({field: full[field][:start] for field in fp.PANEL_FIELDS})
+        fp.save_panel(head, panel_dir)
+        fp.build_trade_list(head, *_factors_and_score(head)).to_csv(out)
+
+        worst = {name: 0.0 for name in fp.FACTOR_COLUMNS}
+        ok = same = True
+        incr_ms, full_ms = [], []
+        for t in range(start, len(full['dates'])):
+            day_csv = os.path.join(tmp, 'day.csv')
+            write_day_csv(day_csv, full, t)
+            report = fi.verify_day(day_csv, panel_dir=panel_dir)
+            ok &= report['ok']
+            same &= report['same_top']
+            for name, diff in report['max_abs_diff'].items():
+                worst[name] = max(worst[name], diff)
+            incr_ms.append(report['incremental_s'] * 1000)
+            full_ms.append(report['full_s'] * 1000)
+            fi.update_day(day_csv, out=out, panel_dir=panel_dir)
+
+        # 交易清单（含回填的 y_OTO）与全量流水线一致
+        expected = fp.run_pipeline(None, out=None, panel_dir=panel_dir)['trade_list']
+        actual = pd.read_csv(out, index_col=0, dtype={'symbol': str})
+        tail = lambda df: df.tail(args.updates * fp.PIPELINE_CONFIG['top_n']).reset_index(drop=True)  # noqa: E731
+        y_ok = np.allclose(tail(actual)['y_OTO'], tail(expected)['y_OTO'], equal_nan=True, atol=1e-9)
+
+        T, N = full['close'].shape
+        print(f"矩阵 {T} 日 × {N} 只，增量更新 {args.updates} 日")
+        print(f"增量  中位 {np.median(incr_ms):8.1f} ms")
+        print(f"全量  中位 {np.median(full_ms):8.1f} ms")
+        for name, diff in worst.items():
+            print(f"  {name:<12}{diff:>12.3e}")
+        print(f"原始因子一致: {bool(ok)}  入选一致: {bool(same)}  y_OTO 回填一致: {bool(y_ok)}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
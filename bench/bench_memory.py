@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 信号数据内存基准
+Memory of the shared signal frame and history index, raw vs compact dtypes
+
+【测量内容】（合成历史，每日 10 行）
+├── frame_mb:    信号表（原始 read_csv vs 紧凑列类型）
+├── history_mb:  历史按日索引（由对应信号表构建）
+└── copy_kb:     旧版每次渲染行情页复制的 Top10（head(10).copy()；现为共享帧切片，不复制）
+
+使用方法：
+    python bench/bench_memory.py [交易日数，逗号分隔，默认 250,2500,10000]
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import pandas as pd  # noqa: E402
+
+import perf  # noqa: E402
+from core import read_signal_frame  # noqa: E402
+from run_bench import write_signal_csv  # noqa: E402
+from signal_history import build_history_index  # noqa: E402
+
+
+def mb(obj) -> float:
+    return perf.sizeof(obj) / 2 ** 20
+
+
+def main():
+    days = [int(x) for x in sys.argv[1].split(',')] if len(sys.argv) > 1 else [250, 2500, 10000]
+    tmp = tempfile.mkdtemp(prefix='ef_mem_')
+    try:
+        print(f"{'days':>7}{'raw_frame_mb':>14}{'compact_mb':>12}{'raw_hist_mb':>13}"
+              f"{'compact_hist_mb':>17}{'copy_kb':>10}")
+        for n in days:
+            path = os.path.join(tmp, f"signals_{n}.csv")
+            write_signal_csv(path, n)
+
+            raw = pd.read_csv(path)
+            compact = read_signal_frame(path)
+            copy_kb = perf.sizeof(raw.head(10).copy()) / 1024
+
+            print(f"{n:>7}{mb(raw):>14.3f}{mb(compact):>12.3f}{mb(build_history_index(raw)):>13.3f}"
+                  f"{mb(build_history_index(compact)):>17.3f}{copy_kb:>10.1f}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
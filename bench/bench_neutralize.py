@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 因子中性化基准
+Timing and correctness of batched size/industry neutralization
+
+【测量内容】
+├── 合成矩阵（bench_parallel.synthetic_panel）+ 随机行业分类
+├── cold: 首次中性化（含全部日期设计矩阵构建）；warm: 设计矩阵缓存命中
+├── design: 单独计时设计矩阵构建 / 缓存命中（warm 主要耗时在逐因子残差）
+├── mcap_changed: 同日期同掩码、市值变化后不得命中旧设计矩阵
+├── check: 抽样日期与逐日 np.linalg.lstsq（哑变量 + log 市值）残差对比
+└── size_corr: 得分与 log 市值的日均截面相关（中性化前 / 后）
+
+使用方法：
+    python bench/bench_neutralize.py [--symbols 5000] [--days 1000] [--industries 31]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import numpy as np  # noqa: E402
+
+import factor_pipeline as fp  # noqa: E402
+import factor_neutralize as fn  # noqa: E402
+from bench_parallel import synthetic_panel  # noqa: E402
+
+
+def check_against_lstsq(factors: dict, neutral: dict, panel: dict, codes: np.ndarray, n_dates: int = 5) -> float:
+    """抽样日期逐日 lstsq，返回最大绝对误差"""
+    size = fn.size_exposure(panel['mcap'])
+    T = size.shape[0]
+    worst = 0.0
+    for t in np.linspace(fp.PIPELINE_CONFIG['window'] + 1, T - 3, n_dates).astype(int):
+        mask = np.isfinite(size[t])
+        for name in fn.NEUTRALIZE_CONFIG['factors']:
+            mask &= np.isfinite(factors[name][t])
+        dummies = np.eye(codes.max() + 1)[codes[mask]]
+        X = np.column_stack([dummies, size[t, mask]])
+        for name in fn.NEUTRALIZE_CONFIG['factors']:
+            y = factors[name][t, mask]
+            beta = np.linalg.lstsq(X, y, rcond=None)[0]
+            worst = max(worst, float(np.max(np.abs((y - X @ beta) - neutral[name][t, mask]))))
+    return worst
+
+
+def size_corr(score: np.ndarray, size: np.ndarray) -> float:
+    """得分与 log 市值的逐日截面相关系数均值"""
+    valid = np.isfinite(score) & np.isfinite(size)
+    n = valid.sum(axis=1)
+    a = np.where(valid, score, 0.0)
+    b = np.where(valid, size, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        a = np.where(valid, a - a.sum(axis=1, keepdims=True) / n[:, None], 0.0)
+        b = np.where(valid, b - b.sum(axis=1, keepdims=True) / n[:, None], 0.0)
+        corr = (a * b).sum(axis=1) / np.sqrt((a * a).sum(axis=1) * (b * b).sum(axis=1))
+    return float(np.nanmean(corr[n > 2]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EigenFlow neutralization benchmark')
+    parser.add_argument('--symbols', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=1000)
+    parser.add_argument('--industries', type=int, default=31)
+    args = parser.parse_args()
+
+    panel = synthetic_panel(args.symbols, args.days)
+    codes = np.random.default_rng(1).integers(0, args.industries, args.symbols).astype(np.int32)
+    industry = (codes, [f"行业{g:02d}" for g in range(args.industries)])
+    factors = fp.standardize_factors(fp.compute_raw_factors(panel))
+
+    cache = fn.DesignCache(codes, args.industries)
+    t0 = time.perf_counter()
+    neutral = fn.neutralize_factors(factors, panel['dates'], panel['mcap'], industry, cache=cache)
+    cold = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    fn.neutralize_factors(factors, panel['dates'], panel['mcap'], industry, cache=cache)
+    warm = time.perf_counter() - t0
+    built, hit = cache.misses, cache.hits
+
+    size = fn.size_exposure(panel['mcap'])
+    mask = np.isfinite(size)
+    design_cache = fn.DesignCache(codes, args.industries)
+    t0 = time.perf_counter()
+    design_cache.get(panel['dates'], mask, size[:, :, None])
+    design_cold = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    design_cache.get(panel['dates'], mask, size[:, :, None])
+    design_warm = time.perf_counter() - t0
+
+    shifted = panel['mcap'] * np.random.default_rng(2).uniform(0.5, 2.0, panel['mcap'].shape)
+    reused = fn.neutralize_factors(factors, panel['dates'], shifted, industry, cache=cache)
+    fresh = fn.neutralize_factors(factors, panel['dates'], shifted, industry,
+                                  cache=fn.DesignCache(codes, args.industries))
+    stale = max(float(np.nanmax(np.abs(reused[name] - fresh[name]))) for name in fn.NEUTRALIZE_CONFIG['factors'])
+
+    print(f"矩阵 {args.days} 日 × {args.symbols} 只，{args.industries} 个行业，"
+          f"{len(fn.NEUTRALIZE_CONFIG['factors'])} 个因子")
+    print(f"  cold      {cold * 1000:>10.1f} ms  （构建 {built} 个交易日设计矩阵）")
+    print(f"  warm      {warm * 1000:>10.1f} ms  （缓存命中 {hit}）")
+    print(f"  design    {design_cold * 1000:>10.1f} ms → {design_warm * 1000:.1f} ms（构建 → 命中）")
+    print(f"  mcap_changed max |Δ| vs 新缓存 = {stale:.2e}")
+    print(f"  size_corr {size_corr(fp.score_factors(factors), size):>+10.3f} → "
+          f"{size_corr(fp.score_factors(neutral), size):+.3f}")
+    err = check_against_lstsq(factors, neutral, panel, codes)
+    print(f"  check     max |Δ| vs lstsq = {err:.2e}")
+    if err > 1e-8 or stale > 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
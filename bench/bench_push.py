@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 新信号推送基准
+SSE fan-out latency from one broadcaster to many in-process subscribers
+
+【测量内容】
+├── 建连：N 个 /api/v1/stream 订阅（直接调用 ASGI 应用，不含网络）的耗时与首条消息补发
+├── 扇出：在临时信号文件末尾追加一个交易日 → 监视协程发现版本变化 → 全部订阅者收到新信号日的耗时
+│   （从发布时刻起计，不含 push_poll 轮询间隔）
+└── 断开：全部订阅者断开后订阅计数归零
+
+使用方法：
+    python bench/bench_push.py [--subscribers 5000]
+"""
+
+import os
+import sys
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import core  # noqa: E402
+import signal_api  # noqa: E402
+import trading_calendar  # noqa: E402
+
+KEY = core.load_valid_keys()[0]
+
+
+async def subscribe(i: int, frames: list, stop: asyncio.Event, delivered: dict, marker: bytes):
+    scope = {
+        'type': 'http', 'method': 'GET', 'path': '/api/v1/stream', 'query_string': b'',
+        'headers': [(b'authorization', f'Bearer {KEY}'.encode())], 'client': ('127.0.0.1', i),
+    }
+
+    async def receive():
+        await stop.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.body':
+            frames[i] += 1
+            if marker in message['body']:
+                delivered[i] = time.perf_counter()
+
+    await signal_api.app(scope, receive, send)
+
+
+def append_day(path: str, new_date: str) -> str:
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    last = lines[-1].split(',')[1]
+    with open(path, 'a', encoding='utf-8') as f:
+        for line in lines[1:]:
+            if line.split(',')[1] == last:
+                f.write(line.replace(last, new_date) + '\n')
+    return last
+
+
+async def run(n: int, path: str):
+    signal_api.API_CONFIG['push_poll'] = 0.05
+    stop, frames, delivered = asyncio.Event(), [0] * n, {}
+    # 交易日历当前应展示的信号日（更晚的日期会被 pick_signal_date 暂缓，不会推送）
+    new_date = trading_calendar.signal_session()['signal_date'].isoformat()
+
+    t0 = time.perf_counter()
+    tasks = [asyncio.ensure_future(subscribe(i, frames, stop, delivered, new_date.encode())) for i in range(n)]
+    broadcaster = signal_api.get_broadcaster()
+    while broadcaster.subscribers < n or min(frames) < 2:
+        await asyncio.sleep(0.01)
+    print(f"{n} 个订阅建连并收到当前信号：{(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    seq = broadcaster.seq
+    append_day(path, new_date)
+    while broadcaster.seq == seq:
+        await asyncio.sleep(0.001)
+    published = time.perf_counter()
+    while len(delivered) < n:
+        await asyncio.sleep(0.001)
+    latest = max(delivered.values()) - published
+    print(f"新信号日 {new_date} 扇出到 {len(delivered)} 个订阅：{latest * 1000:.1f} ms"
+          f"（每连接 {latest / n * 1e6:.1f} µs）")
+
+    stop.set()
+    await asyncio.gather(*tasks)
+    print(f"断开后订阅数 {broadcaster.subscribers}")
+    broadcaster.watcher.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EigenFlow SSE push benchmark')
+    parser.add_argument('--subscribers', type=int, default=5000)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmp, 'trade_list_top10.csv')
+        shutil.copy(core.SIGNAL_FILE, path)
+        core.SIGNAL_FILE = path
+        asyncio.run(run(args.subscribers, path))
+        core.flush_usage_log()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
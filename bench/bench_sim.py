@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 组合模拟基准
+Timing and sanity checks of the A-share portfolio simulator
+
+【测量内容】
+├── 合成矩阵（bench_parallel.synthetic_panel），注入约 1% 一字涨停 / 跌停开盘与连续停牌
+├── top10: 由因子流水线生成的每日前 10 交易清单
+├── universe: 全部 (日期, 股票) 作为候选（全市场规模）
+└── check: 关闭费用与涨跌停后，T+2 正常卖出的逐笔毛收益应与 y_OTO 一致
+
+使用方法：
+    python bench/bench_sim.py [--symbols 5000] [--days 1000]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import factor_pipeline as fp  # noqa: E402
+import portfolio_sim as ps  # noqa: E402
+from bench_parallel import synthetic_panel  # noqa: E402
+
+
+def inject_limits(panel: dict, rate: float = 0.01, seed: int = 1) -> dict:
+    """按前收盘 ±10%/20%/30% 设置一字开盘，并加入连续 3 日停牌"""
+    rng = np.random.default_rng(seed)
+    close = np.asarray(panel['close'], dtype=np.float64)
+    T, N = close.shape
+    bands = ps.limit_bands(panel['symbols'], panel['dates'])
+    prev = np.vstack([np.full((1, N), np.nan), close[:-1]])
+
+    up = rng.random((T, N)) < rate / 2
+    down = rng.random((T, N)) < rate / 2
+    open_ = np.asarray(panel['open'], dtype=np.float64).copy()
+    open_[up] = ps.round_price(prev * (1 + bands))[up]
+    open_[down] = ps.round_price(prev * (1 - bands))[down]
+
+    halt = rng.random((T, N)) < rate / 3
+    for k in (1, 2):
+        halt[k:] |= halt[:-k]
+    out = dict(panel)
+    out['open'] = np.where(halt, np.nan, open_).astype(np.float32)
+    out['close'] = np.where(halt, np.nan, close).astype(np.float32)
+    out['volume'] = np.where(halt, np.nan, panel['volume']).astype(np.float32)
+    return out
+
+
+def universe_signals(panel: dict) -> pd.DataFrame:
+    T, N = panel['close'].shape
+    rows, cols = np.nonzero(np.isfinite(panel['close']))
+    dates = pd.Index(panel['dates'].astype(str))
+    dates = dates.str[:4] + '-' + dates.str[4:6] + '-' + dates.str[6:]
+    return pd.DataFrame({'date': dates[rows], 'symbol': np.asarray(panel['symbols'])[cols]})
+
+
+def timed(signals, prices):
+    t0 = time.perf_counter()
+    state = ps.tradability(prices)
+    trades = ps.simulate_trades(signals, prices, state)
+    daily = ps.portfolio(trades, top_n=max(ps.SIM_CONFIG['top_n'], 1))
+    return trades, daily, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EigenFlow portfolio simulator benchmark')
+    parser.add_argument('--symbols', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=1000)
+    args = parser.parse_args()
+
+    panel = inject_limits(synthetic_panel(args.symbols, args.days))
+    raw = fp.compute_raw_factors(panel)
+    factors = fp.standardize_factors(raw)
+    top10 = fp.build_trade_list(panel, factors, fp.score_factors(factors))
+    prices = ps._prices_from_panel(panel)
+
+    trades, daily, seconds = timed(top10, prices)
+    print(f"top10     {len(top10):>9} 条  {seconds * 1000:>8.1f} ms")
+    ps.print_summary(ps.summarize(trades, daily))
+
+    universe = universe_signals(panel)
+    _, _, seconds = timed(universe, prices)
+    print(f"universe  {len(universe):>9} 条  {seconds * 1000:>8.1f} ms")
+
+    # 关闭费用与涨跌停：T+2 卖出的毛收益应等于 y_OTO
+    clean = synthetic_panel(min(args.symbols, 500), min(args.days, 200))
+    saved_cfg, saved_bands = dict(ps.SIM_CONFIG), dict(ps.LIMIT_BANDS)
+    try:
+        ps.SIM_CONFIG.update(commission=0.0, min_commission=0.0, transfer_fee=0.0)
+        ps.LIMIT_BANDS.update({b: 10.0 for b in ps.LIMIT_BANDS})
+        f = fp.standardize_factors(fp.compute_raw_factors(clean))
+        tl = fp.build_trade_list(clean, f, fp.score_factors(f))
+        tr = ps.simulate_trades(tl, ps._prices_from_panel(clean))
+        done = (tr['status'] == 'filled') & (tr['hold_days'] == 1)
+        err = float(np.nanmax(np.abs(tr.loc[done, 'gross'] - tr.loc[done, 'y_OTO'])))
+        print(f"check: 无摩擦时 {int(done.sum())} 笔 T+2 卖出毛收益 vs y_OTO max |Δ| = {err:.2e}")
+    finally:
+        ps.SIM_CONFIG.update(saved_cfg)
+        ps.LIMIT_BANDS.update(saved_bands)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 信号页快照基准
+Sessions per second with and without the signal page snapshot
+
+【测量内容】
+├── 每种模式在独立子进程中运行（EF_SIGNAL_SNAPSHOT=1 / 0）
+├── sessions_per_s: 新建会话 → 已验证 Key → 渲染信号页，连续 N 次
+└── body_ms:        仅页面主体生成耗时（快照读取 vs 解析 CSV + 拼接 HTML）
+
+使用方法：
+    python bench/bench_snapshot.py [会话数，默认 50]
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_FILE = os.path.join(APP_DIR, 'app_update.py')
+
+_CHILD = r'''
+import sys, time, json
+sys.path.insert(0, sys.argv[3])
+from streamlit.testing.v1 import AppTest
+
+n, app_file = int(sys.argv[1]), sys.argv[2]
+
+def session():
+    at = AppTest.from_file(app_file, default_timeout=60)
+    at.query_params['tab'] = 'signal'
+    at.session_state['verified_key'] = 'EF-26Q1-A9F4KZ2M'
+    at.session_state['verified_key_mask'] = 'EF-26Q1-****KZ2M'
+    at.run()
+    return len(at.exception)
+
+errors = session()  # 预热：模块导入、快照生成
+t0 = time.perf_counter()
+for _ in range(n):
+    errors += session()
+elapsed = time.perf_counter() - t0
+
+import snapshot
+from core import load_signal_day
+date = load_signal_day()[0]
+body = (lambda: snapshot.get_snapshot(date)) if snapshot.SNAPSHOT_ENABLED else \
+       (lambda: snapshot.build_signal_page_html(load_signal_day(date)[1]))
+body()
+t1 = time.perf_counter()
+for _ in range(200):
+    body()
+body_ms = (time.perf_counter() - t1) / 200 * 1000
+
+print(json.dumps({
+    'snapshot': snapshot.SNAPSHOT_ENABLED,
+    'sessions': n,
+    'sessions_per_s': round(n / elapsed, 2),
+    'body_ms': round(body_ms, 4),
+    'errors': errors,
+}))
+'''
+
+
+def run_mode(enabled: bool, n: int) -> dict:
+    env = dict(os.environ, EF_SIGNAL_SNAPSHOT='1' if enabled else '0')
+    out = subprocess.run(
+        [sys.executable, '-c', _CHILD, str(n), APP_FILE, APP_DIR],
+        cwd=APP_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    without = run_mode(False, n)
+    with_snapshot = run_mode(True, n)
+
+    print(f"{'mode':<12}{'sessions/s':>12}{'body_ms':>12}")
+    for label, r in (('no-snapshot', without), ('snapshot', with_snapshot)):
+        print(f"{label:<12}{r['sessions_per_s']:>12}{r['body_ms']:>12}")
+    print(f"speedup: sessions ×{with_snapshot['sessions_per_s'] / without['sessions_per_s']:.2f}, "
+          f"body ×{without['body_ms'] / max(with_snapshot['body_ms'], 1e-6):.0f}")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 冷启动 / 导入耗时基准
+Cold-start and per-rerun benchmark
+
+【测量内容】
+├── 每个 tab 在独立子进程中运行（模块缓存为空，模拟 Streamlit Cloud 冷启动）
+├── cold_ms:  首次运行（含 import + 函数定义 + 渲染）
+├── rerun_ms: 同一会话第二次运行（模块已缓存）
+└── 支持页不得导入 pandas
+
+使用方法：
+    python bench/bench_startup.py            # 输出结果，超出预算则退出码 1
+    python bench/bench_startup.py --json     # 输出 JSON
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_FILE = os.path.join(APP_DIR, 'app_update.py')
+
+# 【预算配置】超过即视为回归（毫秒，含 streamlit 自身导入）
+STARTUP_BUDGET_MS = {
+    'support': {'cold_ms': 2500, 'rerun_ms': 150},
+    'signal': {'cold_ms': 4000, 'rerun_ms': 300},
+    'chart': {'cold_ms': 4000, 'rerun_ms': 300},
+}
+
+# 子进程脚本：单个 tab 的冷启动测量
+_CHILD = r'''
+import sys, time, json
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+t_import = time.perf_counter() - t0
+
+tab, app_file = sys.argv[1], sys.argv[2]
+at = AppTest.from_file(app_file, default_timeout=60)
+at.query_params['tab'] = tab
+if tab != 'support':
+    at.session_state['verified_key'] = 'EF-26Q1-A9F4KZ2M'
+    at.session_state['verified_key_mask'] = 'EF-26Q1-****KZ2M'
+
+t1 = time.perf_counter()
+at.run()
+t_cold = time.perf_counter() - t1
+
+t2 = time.perf_counter()
+at.run()
+t_rerun = time.perf_counter() - t2
+
+print(json.dumps({
+    'tab': tab,
+    'streamlit_import_ms': round(t_import * 1000, 1),
+    'cold_ms': round((t_import + t_cold) * 1000, 1),
+    'rerun_ms': round(t_rerun * 1000, 1),
+    'pandas_imported': 'pandas' in sys.modules,
+    'errors': len(at.exception),
+}))
+'''
+
+
+def measure_tab(tab: str) -> dict:
+    """在干净的子进程中测量单个 tab"""
+    out = subprocess.run(
+        [sys.executable, '-c', _CHILD, tab, APP_FILE],
+        cwd=APP_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def check_budget(result: dict) -> list:
+    """返回超出预算的项"""
+    problems = []
+    budget = STARTUP_BUDGET_MS.get(result['tab'], {})
+    for metric, limit in budget.items():
+        if result[metric] > limit:
+            problems.append(f"{result['tab']}.{metric} = {result[metric]}ms > {limit}ms")
+    if result['tab'] == 'support' and result['pandas_imported']:
+        problems.append("support 页导入了 pandas")
+    return problems
+
+
+def main(argv) -> int:
+    results = [measure_tab(tab) for tab in STARTUP_BUDGET_MS]
+    problems = [p for r in results for p in check_budget(r)]
+
+    if '--json' in argv:
+        print(json.dumps({'results': results, 'problems': problems}, ensure_ascii=False, indent=2))
+    else:
+        print(f"{'tab':<10}{'import':>10}{'cold':>10}{'rerun':>10}  pandas")
+        for r in results:
+            print(f"{r['tab']:<10}{r['streamlit_import_ms']:>10}{r['cold_ms']:>10}{r['rerun_ms']:>10}  {r['pandas_imported']}")
+        for r in results:
+            if r['errors']:
+                print(f"⚠️ {r['tab']} 页运行异常 ×{r['errors']}，耗时仅供参考")
+        for p in problems:
+            print(f"❌ {p}")
+
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 状态存储基准
+Consistency and throughput of the state backends across two replicas
+
+【测量内容】（每个后端两个独立实例，模拟负载均衡后的两个副本）
+├── consistent:     副本 A 激活 Key，副本 B 读到相同 first_seen；
+│                   A / B 各写一半设备日志，任一副本统计到全部设备
+├── activate_ms:    首次激活（原子 insert-if-absent）
+├── get_ms:         读取单个 Key 状态
+├── append_eps:     批量写入使用日志（条/秒，每批 LOG_BATCH_SIZE 条）
+└── count_ms:       窗口内不同设备数
+
+redis 后端默认使用进程内 RESP 替身（bench/resp_standin.py），
+也可用 --redis-url 指向真实 Redis。
+
+使用方法：
+    python bench/bench_state.py [--events 20000] [--redis-url redis://127.0.0.1:6379/15]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import state_backend  # noqa: E402
+from core import LOG_BATCH_SIZE, mask_key  # noqa: E402
+from resp_standin import RespStandin  # noqa: E402
+
+BENCH_KEY = 'EF-26Q1-BENCH001'
+N_DEVICES = 6
+
+
+def make_events(n: int, key_mask: str) -> list:
+    now = datetime.now()
+    return [{
+        'timestamp': (now - timedelta(seconds=n - i)).isoformat(),
+        'key_mask': key_mask if i % 10 == 0 else f"EF-26Q1-****{i % 997:04d}",
+        'status': 'access',
+        'ip_hash': 'unknown',
+        'ua_hash': 'unknown',
+        'device_id': f"device-{i // 10 % N_DEVICES}",
+        'page': 'signal',
+    } for i in range(n)]
+
+
+def timeit(fn, repeat: int = 200) -> float:
+    """平均耗时（毫秒）"""
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def bench_backend(make, n_events: int) -> dict:
+    a, b = make(), make()
+    key_mask = mask_key(BENCH_KEY)
+    since = datetime.now() - timedelta(hours=24)
+    try:
+        today = datetime.now().strftime('%Y-%m-%d')
+        state_a = a.activate_key(BENCH_KEY, {'first_seen': today, 'activated_at': 'replica-a'})
+        state_b = b.activate_key(BENCH_KEY, {'first_seen': '1999-01-01', 'activated_at': 'replica-b'})
+
+        events = make_events(n_events, key_mask)
+        t0 = time.perf_counter()
+        for i in range(0, n_events, LOG_BATCH_SIZE):
+            (a if (i // LOG_BATCH_SIZE) % 2 == 0 else b).append_usage(events[i:i + LOG_BATCH_SIZE])
+        append_s = time.perf_counter() - t0
+
+        consistent = (state_a == state_b == b.get_key_state(BENCH_KEY)
+                      and a.count_recent_devices(key_mask, since) == N_DEVICES
+                      and b.count_recent_devices(key_mask, since) == N_DEVICES)
+
+        n = [0]
+
+        def activate():
+            n[0] += 1
+            a.activate_key(f"EF-26Q1-X{n[0]:07d}", {'first_seen': today})
+
+        return {
+            'consistent': consistent,
+            'activate_ms': round(timeit(activate), 3),
+            'get_ms': round(timeit(lambda: b.get_key_state(BENCH_KEY)), 3),
+            'append_eps': round(n_events / append_s),
+            'count_ms': round(timeit(lambda: b.count_recent_devices(key_mask, since), repeat=20), 3),
+        }
+    finally:
+        a.close()
+        b.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EigenFlow state backend benchmark')
+    parser.add_argument('--events', type=int, default=20_000)
+    parser.add_argument('--redis-url', help='真实 Redis 地址（默认启动进程内替身）')
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='ef_state_')
+    standin = None
+    try:
+        if args.redis_url:
+            redis_url = args.redis_url
+        else:
+            standin = RespStandin().start()
+            redis_url = standin.url
+        state_backend.RedisPool(redis_url).execute('FLUSHDB')
+
+        backends = {
+            'file': lambda: state_backend.FileBackend(os.path.join(tmp, 'key_state.json'),
+                                                      os.path.join(tmp, 'usage_log.jsonl')),
+            'sqlite': lambda: state_backend.SQLiteBackend(os.path.join(tmp, 'state.db')),
+            'redis': lambda: state_backend.RedisBackend(redis_url),
+        }
+
+        print(f"{'backend':<10}{'consistent':>12}{'activate_ms':>13}{'get_ms':>10}{'append_eps':>12}{'count_ms':>10}")
+        for name, make in backends.items():
+            r = bench_backend(make, args.events)
+            print(f"{name:<10}{str(r['consistent']):>12}{r['activate_ms']:>13}{r['get_ms']:>10}"
+                  f"{r['append_eps']:>12}{r['count_ms']:>10}")
+    finally:
+        if standin is not None:
+            standin.shutdown()
+            standin.server_close()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 多策略数据集缓存基准
+Lazy per-strategy loading and the memory-bounded LRU shared across sessions
+
+【测量内容】
+├── 冷加载：首次访问某个策略（解析 CSV + 列映射 + 合并股票名称）的耗时
+├── 命中：数据集已在 LRU 中时 load_frame 的耗时（仅 stat 文件版本 + 字典查找）
+├── 淘汰：S 个策略、每个 R 行，缓存上限约为 K 个数据集；按热度（少数策略占多数访问）
+│   随机访问 M 次，统计命中率、淘汰次数与峰值占用（不超过上限）
+└── 对照：不设上限时全部载入的占用
+
+    临时目录中的合成策略（含一个需要列映射的 scoped 策略），注册表指向临时文件
+
+使用方法：
+    python bench/bench_strategies.py [--strategies 12] [--rows 20000] [--resident 4] [--accesses 500]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import strategy_registry  # noqa: E402
+
+
+def make_strategies(tmp: str, n: int, rows: int) -> list:
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('2025-01-01', periods=max(rows // 50, 1)).strftime('%Y-%m-%d')
+    specs = []
+    for i in range(n):
+        df = pd.DataFrame({
+            'date': np.repeat(dates, 50)[:rows],
+            'symbol': [f'{c:06d}' for c in rng.integers(1, 700000, rows)],
+            'score': rng.normal(size=rows),
+            'rank': np.tile(np.arange(1, 51), len(dates))[:rows].astype(float),
+            'y_OTO': rng.normal(0, 0.02, rows),
+        })
+        spec = {'id': f's{i:02d}', 'name': f'策略 {i}', 'path': os.path.join(tmp, f's{i:02d}.csv'), 'top_n': 50}
+        if i == 0:
+            df = df.rename(columns={'symbol': 'code', 'date': 'trade_date'})
+            spec.update(entitlement='scoped', columns={'code': 'symbol', 'trade_date': 'date'})
+        df.to_csv(spec['path'])
+        specs.append(spec)
+    with open(os.path.join(tmp, 'strategies.json'), 'w', encoding='utf-8') as f:
+        json.dump({'default': 's01', 'strategies': specs}, f)
+    return [s['id'] for s in specs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EigenFlow strategy dataset cache benchmark')
+    parser.add_argument('--strategies', type=int, default=12)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--resident', type=int, default=4, help='缓存上限约可容纳的数据集个数')
+    parser.add_argument('--accesses', type=int, default=500)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    try:
+        ids = make_strategies(tmp, args.strategies, args.rows)
+        strategy_registry.STRATEGY_FILE = os.path.join(tmp, 'strategies.json')
+        strategies = [strategy_registry.get_strategy(i) for i in ids]
+        strategies[1].read()   # 预热：pandas 导入、证券主数据
+
+        unbounded = strategy_registry.DatasetCache(2 ** 62)
+        cold = []
+        for strategy in strategies:
+            t0 = time.perf_counter()
+            unbounded.get(strategy)
+            cold.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        for _ in range(1000):
+            unbounded.get(strategies[1])
+        hit_us = (time.perf_counter() - t0) / 1000 * 1e6
+        per_set = unbounded.nbytes / len(strategies)
+
+        cache = strategy_registry.DatasetCache(int(per_set * args.resident))
+        random.seed(0)
+        weights = [1 / (i + 1) for i in range(len(strategies))]   # 少数策略占多数访问
+        loads = peak = 0
+        t0 = time.perf_counter()
+        for strategy in random.choices(strategies, weights, k=args.accesses):
+            before = cache.evictions, len(cache)
+            cache.get(strategy)
+            loads += (cache.evictions, len(cache)) != before
+            peak = max(peak, cache.nbytes)
+        elapsed = time.perf_counter() - t0
+
+        print(f"{len(strategies)} 个策略 × {args.rows} 行：冷加载 {sum(cold) / len(cold) * 1000:.1f} ms/个  "
+              f"命中 {hit_us:.1f} µs")
+        print(f"不设上限：全部载入 {unbounded.nbytes / 2 ** 20:.1f} MB")
+        print(f"上限 {cache.max_bytes / 2 ** 20:.1f} MB（约 {args.resident} 个）：{args.accesses} 次访问 "
+              f"{elapsed * 1000:.0f} ms，载入 {loads} 次（命中率 {1 - loads / args.accesses:.1%}），"
+              f"淘汰 {cache.evictions} 次，峰值 {peak / 2 ** 20:.1f} MB")
+        assert peak <= cache.max_bytes
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
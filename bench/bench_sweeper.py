@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+EigenFlow Key 生命周期批处理基准
+Vectorized expiry sweep vs per-key evaluation, compaction and validator fast path
+
+【测量内容】
+├── 评估：N 个 Key 状态一次向量化（key_sweeper.evaluate_keys）vs 逐个调用
+│   core.key_days_used + key_expiry_date（验证器的惰性路径）
+├── 压缩：完整 sweep（写生命周期集合 + 删除到期状态 + 清理旧日志）耗时与 key_state.json 大小变化
+└── 验证：到期 Key 的 validate_access_key 延迟——生命周期集合命中（哈希查找）vs 读状态存储判断
+
+    临时目录中的文件存储；约一半 Key 已到期，交易日 / 自然日模式各测一次
+
+使用方法：
+    python bench/bench_sweeper.py [--keys 100000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import shutil
+from datetime import date, datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import core  # noqa: E402
+import key_sweeper  # noqa: E402
+
+
+def make_states(n: int, today: date) -> dict:
+    random.seed(0)
+    return {f"EF-BNCH-{i:08d}": {'first_seen': (today - timedelta(days=random.randint(0, 60))).isoformat(),
+                                 'activated_at': datetime.now().isoformat()} for i in range(n)}
+
+
+def time_validate(key: str, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = core.validate_access_key(key)
+    assert result.get('expired'), result
+    return (time.perf_counter() - t0) / repeat * 1e6
+
+
+def run(n: int, unit: str, tmp: str):
+    core.KEY_VALIDITY_UNIT = unit
+    core.KEY_STATE_FILE = os.path.join(tmp, f'key_state_{unit}.json')
+    core.USAGE_LOG_FILE = os.path.join(tmp, f'usage_log_{unit}.jsonl')
+    core.KEY_LIFECYCLE_FILE = os.path.join(tmp, f'key_lifecycle_{unit}.json')
+    core.reset_state_backend()
+
+    today = key_sweeper.key_today()
+    states = make_states(n, today)
+    backend = core.get_state_backend()
+    backend.save_key_state(states)
+    before = os.path.getsize(core.KEY_STATE_FILE)
+
+    key_sweeper.evaluate_keys(dict(list(states.items())[:10]), today)   # 预热：pandas 导入、交易日历
+    t0 = time.perf_counter()
+    evaluation = key_sweeper.evaluate_keys(states, today)
+    vectorized = time.perf_counter() - t0
+
+    now = datetime.combine(today, datetime.min.time())
+    sample = list(states.items())[:min(n, 5000)]
+    t0 = time.perf_counter()
+    for _, state in sample:
+        core.key_days_used(state['first_seen'], now)
+        core.key_expiry_date(state['first_seen'])
+    per_key = (time.perf_counter() - t0) / len(sample) * n
+
+    expired_key = next(k for k, e in zip(evaluation['keys'], evaluation['expired']) if e)
+    core.load_valid_keys = lambda: [expired_key]
+    slow = time_validate(expired_key, 20)
+
+    t0 = time.perf_counter()
+    result = key_sweeper.sweep(backend=backend)
+    swept = time.perf_counter() - t0
+    fast = time_validate(expired_key, 20000)
+    after = os.path.getsize(core.KEY_STATE_FILE)
+
+    print(f"[{unit}] {n} 个 Key，到期 {result['expired']}，{result['renewal_days']} 日内待续期 {len(result['renewals'])}")
+    print(f"  评估：向量化 {vectorized * 1000:.1f} ms  逐个 {per_key * 1000:.0f} ms（{per_key / vectorized:.0f}x）")
+    print(f"  sweep：{swept * 1000:.0f} ms，key_state.json {before / 1024:.0f} KB → {after / 1024:.0f} KB")
+    print(f"  到期 Key 验证：读状态存储 {slow:.0f} µs → 集合命中 {fast:.1f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EigenFlow key sweeper benchmark')
+    parser.add_argument('--keys', type=int, default=100000)
+    args = parser.parse_args()
+
+    load_valid_keys = core.load_valid_keys
+    tmp = tempfile.mkdtemp()
+    try:
+        for unit in ('calendar', 'trading'):
+            core.load_valid_keys = load_valid_keys
+            run(args.keys, unit, tmp)
+    finally:
+        core.reset_state_backend()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 使用日志列式存储基准
+Raw JSONL scans vs columnar partitions for the usage-log queries
+
+【测量内容】
+├── 压缩：D 天 × N 条/天的 usage_log.jsonl → data/usage/*.npz 的耗时与体积
+├── 查询（区间 = 全部 D 天，分区已在进程内缓存 / 冷读各测一次）：
+│   ├── accesses_by_key     某 Key 每日各状态次数
+│   ├── devices_per_key     每日每个 Key 的设备数
+│   └── blocked_by_ip       按 ip_hash 汇总 blocked
+│   对照：逐行解析原始 JSONL 后用 pandas 计算同样的结果（压缩前的唯一方式）
+└── 风控：check_share_anomaly 的设备计数（24 小时窗口）原始日志扫描 vs 分区 + 当日日志
+
+    临时目录中的文件存储；结果与对照逐项比对
+
+使用方法：
+    python bench/bench_usage.py [--days 30] [--per-day 20000]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from datetime import date, datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import core  # noqa: E402
+import usage_store  # noqa: E402
+
+KEY_MASK = 'EF-BNCH-****0007'
+
+
+def make_log(path: str, days: int, per_day: int):
+    random.seed(0)
+    now = datetime.now()
+    with open(path, 'w', encoding='utf-8') as f:
+        for d in range(days - 1, -1, -1):
+            start = datetime.combine(now.date() - timedelta(days=d), datetime.min.time())
+            span = (now - start).total_seconds() if d == 0 else 86400
+            stamps = sorted(start + timedelta(seconds=random.random() * span) for _ in range(per_day))
+            for ts in stamps:
+                f.write(json.dumps({
+                    'timestamp': ts.isoformat(), 'key_mask': f'EF-BNCH-****{random.randint(0, 2000):04d}',
+                    'status': random.choices(('access', 'warning', 'blocked'), (90, 5, 5))[0],
+                    'ip_hash': f'{random.randint(0, 5000):016x}', 'ua_hash': f'{random.randint(0, 50):016x}',
+                    'device_id': f'dev-{random.randint(0, 8000)}', 'page': random.choice(('signals', 'chart', 'api')),
+                }) + '\n')
+
+
+def raw_queries(path: str, start: date, end: date) -> tuple:
+    import pandas as pd
+
+    with open(path, 'r', encoding='utf-8') as f:
+        df = pd.DataFrame([json.loads(line) for line in f])
+    df['date'] = df['timestamp'].str[:10]
+    df = df[(df['date'] >= start.isoformat()) & (df['date'] <= end.isoformat())]
+    by_key = df[df['key_mask'] == KEY_MASK].groupby(['date', 'status']).size()
+    devices = df.groupby(['date', 'key_mask'])['device_id'].nunique()
+    blocked = df[df['status'] == 'blocked'].groupby('ip_hash').size()
+    return by_key, devices, blocked
+
+
+def columnar_queries(start: date, end: date) -> tuple:
+    return (usage_store.accesses_by_key(KEY_MASK, start, end), usage_store.devices_per_key(start, end),
+            usage_store.blocked_by_ip(start, end, top=10 ** 6))
+
+
+def check(raw: tuple, columnar: tuple):
+    by_key, devices, blocked = raw
+    access = columnar[0].set_index('date')
+    for (day, status), n in by_key.items():
+        assert access.loc[day, status] == n, (day, status)
+    assert int(access['total'].sum()) == int(by_key.sum())
+    assert len(columnar[1]) == len(devices) and int(columnar[1]['devices'].sum()) == int(devices.sum())
+    assert dict(zip(columnar[2]['ip_hash'], columnar[2]['attempts'])) == blocked.to_dict()
+
+
+def timed(fn, *args, repeat: int = 1):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(*args)
+    return result, (time.perf_counter() - t0) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EigenFlow columnar usage log benchmark')
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--per-day', type=int, default=20000)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    try:
+        core.KEY_STATE_FILE = os.path.join(tmp, 'key_state.json')
+        core.USAGE_LOG_FILE = os.path.join(tmp, 'usage_log.jsonl')
+        usage_store.USAGE_DIR = os.path.join(tmp, 'usage')
+        core.reset_state_backend()
+        backend = core.get_state_backend()
+        make_log(core.USAGE_LOG_FILE, args.days, args.per_day)
+        start, end = date.today() - timedelta(days=args.days - 1), date.today()
+        since = datetime.now() - timedelta(hours=core.SHARE_CONFIG['time_window_hours'])
+        raw_size = os.path.getsize(core.USAGE_LOG_FILE)
+
+        shutil.copy(core.USAGE_LOG_FILE, os.path.join(tmp, 'raw.jsonl'))
+        raw, raw_ms = timed(raw_queries, os.path.join(tmp, 'raw.jsonl'), start, end)
+        _, raw_devices_ms = timed(backend.count_recent_devices, KEY_MASK, since, repeat=3)
+
+        result, compact_ms = timed(usage_store.compact, None, backend)
+        usage_store._partitions.clear()
+        columnar, cold_ms = timed(columnar_queries, start, end)
+        _, warm_ms = timed(columnar_queries, start, end, repeat=5)
+        check(raw, columnar)
+        _, devices_ms = timed(usage_store.count_recent_devices, KEY_MASK, since, backend, repeat=50)
+
+        print(f"{args.days} 天 × {args.per_day} 条：JSONL {raw_size / 2 ** 20:.1f} MB → "
+              f"{len(result['days'])} 个分区 {result['bytes'] / 2 ** 20:.1f} MB，压缩 {compact_ms:.0f} ms")
+        print(f"三项查询：原始 JSONL 解析 {raw_ms:.0f} ms  分区冷读 {cold_ms:.0f} ms  缓存 {warm_ms:.0f} ms（结果一致）")
+        print(f"24h 设备计数：原始日志扫描 {raw_devices_ms:.1f} ms → 分区 + 当日日志 {devices_ms:.2f} ms")
+    finally:
+        core.reset_state_backend()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
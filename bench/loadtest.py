@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 并发会话压测
+Concurrent-session load test
+
+【会话脚本】（模拟 16:00 新信号发布后的真实访问）
+├── land_support   打开首页（支持订阅）
+├── open_signal    切换到信号清单（锁定，显示 Key 输入框）
+├── enter_key      输入 Access Key 并确认（验证 + 风控 + 日志 + 重跑）
+├── view_signals   浏览信号清单
+├── open_chart     切换到行情视图
+└── switch_symbol  依次切换若干只股票
+
+【驱动方式】
+- apptest: 每个进程内用 streamlit AppTest 顺序执行会话（进程数 = 并发数）
+- ws:      通过 websocket 直连本地 Streamlit 服务（每个进程内 asyncio 并发）
+           未指定 --url 时自动启动 `streamlit run app_update.py`
+
+【输出】每个并发等级的吞吐、各步骤延迟 p50/p95/p99、服务端 RSS
+
+使用方法：
+    python bench/loadtest.py --mode apptest --sessions 4,8,16 --processes 4
+    python bench/loadtest.py --mode ws --sessions 50,200,500 --processes 4
+    python bench/loadtest.py --mode ws --url ws://127.0.0.1:8501 --server-pid 12345
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import resource
+import threading
+import subprocess
+import multiprocessing
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(BENCH_DIR)
+APP_FILE = os.path.join(APP_DIR, 'app_update.py')
+
+LOADTEST_CONFIG = {
+    'key': 'EF-26Q1-A9F4KZ2M',   # 默认测试 Key（无 secrets / keys.json 时有效）
+    'symbols_per_session': 3,     # 每个会话切换的股票数
+    'think_time_s': 0.0,          # 步骤间停顿
+    'step_timeout_s': 60,
+}
+
+
+# ==================== AppTest 驱动 ====================
+
+def run_session_apptest(cfg: dict) -> list:
+    """单个会话（AppTest），返回 [(步骤, 秒, 是否成功)]"""
+    from streamlit.testing.v1 import AppTest
+
+    records = []
+    at = AppTest.from_file(APP_FILE, default_timeout=cfg['step_timeout_s'])
+
+    def step(name, action):
+        t0 = time.perf_counter()
+        try:
+            action()
+            ok = not at.exception
+        except Exception:
+            ok = False
+        records.append((name, time.perf_counter() - t0, ok))
+        if cfg['think_time_s']:
+            time.sleep(cfg['think_time_s'])
+        return ok
+
+    def goto(tab):
+        at.query_params['tab'] = tab
+        at.run()
+
+    def enter_key():
+        at.text_input(key='access_key_input').input(cfg['key'])
+        next(b for b in at.button if b.label == '确认').click()
+        at.run()
+
+    step('land_support', lambda: goto('support'))
+    step('open_signal', lambda: goto('signal'))
+    if not step('enter_key', enter_key):
+        return records
+    step('view_signals', lambda: goto('signal'))
+    if not step('open_chart', lambda: goto('chart')) or not at.selectbox:
+        return records
+
+    options = at.selectbox(key='chart_select').options[:cfg['symbols_per_session']]
+    for option in options:
+        step('switch_symbol', lambda: at.selectbox(key='chart_select').set_value(option).run())
+    return records
+
+
+# ==================== Websocket 驱动 ====================
+
+async def _ws_rerun(ws, query_string: str, widget_states: list, widgets: dict, timeout: float) -> float:
+    """
+    发送一次 rerun 并等待脚本完成（跳过 st.rerun 导致的中间结果）
+
+    widgets: 收集到的控件 {key/label: (类型, id, options)}，跨步骤累积
+    """
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    msg = BackMsg()
+    msg.rerun_script.query_string = query_string
+    for state in widget_states:
+        msg.rerun_script.widget_states.widgets.append(state)
+
+    t0 = time.perf_counter()
+    await ws.send(msg.SerializeToString())
+
+    while True:
+        raw = await asyncio.wait_for(ws.recv(), timeout=timeout)
+        fwd = ForwardMsg()
+        fwd.ParseFromString(raw)
+        kind = fwd.WhichOneof('type')
+
+        if kind == 'delta' and fwd.delta.WhichOneof('type') == 'new_element':
+            element = fwd.delta.new_element
+            etype = element.WhichOneof('type')
+            if etype in ('text_input', 'button', 'selectbox'):
+                widget = getattr(element, etype)
+                options = list(getattr(widget, 'options', []))
+                widgets[widget.id.rsplit('-', 1)[-1]] = (etype, widget.id, options)
+                widgets[f"{etype}:{widget.label}"] = (etype, widget.id, options)
+
+        elif kind == 'script_finished':
+            if fwd.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                continue
+            return time.perf_counter() - t0
+
+
+def _widget_state(widget_id: str, **value):
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+    state = WidgetState(id=widget_id)
+    for field, v in value.items():
+        setattr(state, field, v)
+    return state
+
+
+async def run_session_ws(url: str, cfg: dict) -> list:
+    """单个会话（websocket），返回 [(步骤, 秒, 是否成功)]"""
+    import websockets
+
+    records = []
+    widgets = {}
+    timeout = cfg['step_timeout_s']
+
+    async with websockets.connect(f"{url}/_stcore/stream", subprotocols=['streamlit'],
+                                  max_size=None, open_timeout=timeout) as ws:
+
+        async def step(name, query, states=()):
+            try:
+                elapsed = await _ws_rerun(ws, query, list(states), widgets, timeout)
+                records.append((name, elapsed, True))
+                ok = True
+            except Exception:
+                records.append((name, timeout, False))
+                ok = False
+            if cfg['think_time_s']:
+                await asyncio.sleep(cfg['think_time_s'])
+            return ok
+
+        await step('land_support', 'tab=support')
+        await step('open_signal', 'tab=signal')
+
+        key_input = widgets.get('access_key_input')
+        confirm = widgets.get('button:确认')
+        if not key_input or not confirm:
+            records.append(('enter_key', timeout, False))
+            return records
+        if not await step('enter_key', 'tab=signal', [
+            _widget_state(key_input[1], string_value=cfg['key']),
+            _widget_state(confirm[1], trigger_value=True),
+        ]):
+            return records
+
+        await step('view_signals', 'tab=signal')
+        await step('open_chart', 'tab=chart')
+
+        select = widgets.get('chart_select')
+        if select:
+            for option in select[2][:cfg['symbols_per_session']]:
+                await step('switch_symbol', 'tab=chart', [_widget_state(select[1], string_value=option)])
+
+    return records
+
+
+# ==================== 进程与服务 ====================
+
+def _worker(args) -> dict:
+    """子进程：执行分配到的会话"""
+    mode, n_sessions, url, cfg = args
+    t0 = time.perf_counter()
+    if mode == 'apptest':
+        sessions = [run_session_apptest(cfg) for _ in range(n_sessions)]
+    else:
+        async def run_all():
+            return await asyncio.gather(*(run_session_ws(url, cfg) for _ in range(n_sessions)),
+                                        return_exceptions=True)
+        sessions = [s if isinstance(s, list) else [('connect', 0.0, False)] for s in asyncio.run(run_all())]
+    return {
+        'sessions': sessions,
+        'elapsed': time.perf_counter() - t0,
+        'maxrss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def rss_mb(pid: int) -> float:
+    """读取进程当前 RSS（Linux /proc）"""
+    try:
+        with open(f"/proc/{pid}/status", 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+class _RssSampler(threading.Thread):
+    """后台采样服务端 RSS 峰值"""
+
+    def __init__(self, pid: int, interval: float = 0.2):
+        super().__init__(daemon=True)
+        self.pid, self.interval = pid, interval
+        self.peak = 0.0
+        self._halt = threading.Event()
+
+    def run(self):
+        while not self._halt.is_set():
+            self.peak = max(self.peak, rss_mb(self.pid))
+            self._halt.wait(self.interval)
+
+    def stop(self) -> float:
+        self._halt.set()
+        self.join()
+        return self.peak
+
+
+def start_server(port: int) -> subprocess.Popen:
+    """启动本地 Streamlit 服务并等待端口就绪"""
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'streamlit', 'run', APP_FILE,
+         '--server.port', str(port), '--server.headless', 'true',
+         '--browser.gatherUsageStats', 'false'],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return proc
+        except OSError:
+            time.sleep(0.3)
+    proc.kill()
+    raise RuntimeError(f"Streamlit 服务启动失败（端口 {port}）")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+# ==================== 压测与报告 ====================
+
+def _percentiles(values: list) -> dict:
+    if not values:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+    values = sorted(values)
+
+    def pick(q):
+        return round(values[min(int(q * len(values)), len(values) - 1)] * 1000, 1)
+
+    return {'p50_ms': pick(0.50), 'p95_ms': pick(0.95), 'p99_ms': pick(0.99)}
+
+
+def run_level(n_sessions: int, mode: str, processes: int, url: str, server_pid: int, cfg: dict) -> dict:
+    """执行一个并发等级：n_sessions 个会话平均分配到 processes 个进程"""
+    processes = max(1, min(processes, n_sessions))
+    shares = [n_sessions // processes + (1 if i < n_sessions % processes else 0) for i in range(processes)]
+
+    sampler = _RssSampler(server_pid) if server_pid else None
+    rss_before = rss_mb(server_pid) if server_pid else None
+    if sampler:
+        sampler.start()
+
+    t0 = time.perf_counter()
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(processes) as pool:
+        results = pool.map(_worker, [(mode, n, url, cfg) for n in shares])
+    wall = time.perf_counter() - t0
+
+    sessions = [s for r in results for s in r['sessions']]
+    records = [rec for s in sessions for rec in s]
+    steps = {}
+    for name, seconds, ok in records:
+        steps.setdefault(name, []).append(seconds if ok else None)
+
+    completed = sum(1 for s in sessions if s and all(ok for _, _, ok in s))
+    report = {
+        'sessions': n_sessions,
+        'processes': processes,
+        'wall_s': round(wall, 2),
+        'sessions_per_s': round(completed / wall, 2),
+        'steps_per_s': round(sum(1 for r in records if r[2]) / wall, 2),
+        'completed': completed,
+        'failed_steps': sum(1 for r in records if not r[2]),
+        'steps': {name: dict(_percentiles([v for v in vals if v is not None]), count=len(vals))
+                  for name, vals in steps.items()},
+    }
+    if sampler:
+        report['server_rss_mb'] = {'before': round(rss_before, 1), 'peak': round(sampler.stop(), 1),
+                                   'after': round(rss_mb(server_pid), 1)}
+    else:
+        report['worker_maxrss_mb'] = round(max(r['maxrss_mb'] for r in results), 1)
+    return report
+
+
+def print_report(report: dict):
+    rss = report.get('server_rss_mb')
+    rss_text = (f"server RSS {rss['before']} → peak {rss['peak']} MB" if rss
+                else f"worker maxRSS {report['worker_maxrss_mb']} MB")
+    print(f"\n=== N={report['sessions']} ({report['processes']} 进程) ===")
+    print(f"完成 {report['completed']}/{report['sessions']}  失败步骤 {report['failed_steps']}  "
+          f"{report['sessions_per_s']} 会话/s  {report['steps_per_s']} 步/s  {rss_text}")
+    print(f"{'step':<16}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, s in report['steps'].items():
+        print(f"{name:<16}{s['count']:>8}{s['p50_ms'] or '-':>10}{s['p95_ms'] or '-':>10}{s['p99_ms'] or '-':>10}")
+
+
+def main(argv) -> int:
+    parser = argparse.ArgumentParser(description='EigenFlow 并发会话压测')
+    parser.add_argument('--mode', choices=['apptest', 'ws'], default='apptest')
+    parser.add_argument('--sessions', default='4,8,16', help='并发会话数，逗号分隔（逐级递增）')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--url', help='ws 模式：已运行的服务地址，如 ws://127.0.0.1:8501')
+    parser.add_argument('--server-pid', type=int, help='ws 模式：已运行服务的 PID（用于采样 RSS）')
+    parser.add_argument('--symbols', type=int, default=LOADTEST_CONFIG['symbols_per_session'])
+    parser.add_argument('--think', type=float, default=LOADTEST_CONFIG['think_time_s'], help='步骤间停顿（秒）')
+    parser.add_argument('--json', help='报告写入 JSON 文件')
+    args = parser.parse_args(argv)
+
+    cfg = dict(LOADTEST_CONFIG, symbols_per_session=args.symbols, think_time_s=args.think)
+    levels = [int(n) for n in args.sessions.split(',') if n.strip()]
+
+    if args.mode == 'ws':
+        try:
+            import websockets  # noqa: F401
+        except ImportError:
+            raise SystemExit("ws 模式需要 websockets：pip install websockets")
+
+    server = None
+    url, server_pid = args.url, args.server_pid
+    if args.mode == 'ws' and not url:
+        port = _free_port()
+        server = start_server(port)
+        url, server_pid = f"ws://127.0.0.1:{port}", server.pid
+
+    reports = []
+    try:
+        for n in levels:
+            report = run_level(n, args.mode, args.processes, url, server_pid, cfg)
+            print_report(report)
+            reports.append(report)
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=10)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'mode': args.mode, 'levels': reports}, f, ensure_ascii=False, indent=2)
+
+    return 0 if all(r['failed_steps'] == 0 for r in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
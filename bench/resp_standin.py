@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 本地 Redis 协议替身
+In-memory RESP server for testing the redis state backend without Redis
+
+【说明】
+├── 只实现 state_backend.RedisBackend 用到的命令（含管道与 MULTI / EXEC 事务）
+├── 单进程内存存储，所有连接共享，进程退出即清空
+└── 仅用于开发 / 压测，不做持久化与过期淘汰（EXPIRE 只应答）
+
+使用方法：
+    python bench/resp_standin.py --port 6390
+    EF_STATE_BACKEND=redis EF_REDIS_URL=redis://127.0.0.1:6390/0 streamlit run app_update.py
+"""
+
+import argparse
+import threading
+import socketserver
+
+
+class _Store:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.data = {}  # key -> dict / list / {member: score}
+
+    def _get(self, key, factory):
+        value = self.data.get(key)
+        if value is None:
+            value = self.data[key] = factory()
+        return value
+
+    # ---------- 命令（返回 Python 值，由 _encode_reply 编码） ----------
+
+    def cmd_ping(self, *args):
+        return ('+', 'PONG')
+
+    def cmd_select(self, db):
+        return ('+', 'OK')
+
+    def cmd_auth(self, *args):
+        return ('+', 'OK')
+
+    def cmd_flushdb(self):
+        self.data.clear()
+        return ('+', 'OK')
+
+    def cmd_del(self, *keys):
+        return sum(self.data.pop(k, None) is not None for k in keys)
+
+    def cmd_expire(self, key, seconds):
+        return int(key in self.data)
+
+    def cmd_hget(self, key, field):
+        return self.data.get(key, {}).get(field)
+
+    def cmd_hset(self, key, *pairs):
+        h = self._get(key, dict)
+        added = 0
+        for i in range(0, len(pairs), 2):
+            added += pairs[i] not in h
+            h[pairs[i]] = pairs[i + 1]
+        return added
+
+    def cmd_hsetnx(self, key, field, value):
+        h = self._get(key, dict)
+        if field in h:
+            return 0
+        h[field] = value
+        return 1
+
+    def cmd_hgetall(self, key):
+        return [x for kv in self.data.get(key, {}).items() for x in kv]
+
+    def cmd_rpush(self, key, *values):
+        lst = self._get(key, list)
+        lst.extend(values)
+        return len(lst)
+
+    def cmd_llen(self, key):
+        return len(self.data.get(key, []))
+
+    def cmd_ltrim(self, key, start, stop):
+        lst = self.data.get(key)
+        if lst is not None:
+            start, stop = int(start), int(stop)
+            n = len(lst)
+            start = max(start + n if start < 0 else start, 0)
+            stop = stop + n if stop < 0 else stop
+            lst[:] = lst[start:stop + 1]
+        return ('+', 'OK')
+
+    def cmd_zadd(self, key, *pairs):
+        z = self._get(key, dict)
+        added = 0
+        for i in range(0, len(pairs), 2):
+            added += pairs[i + 1] not in z
+            z[pairs[i + 1]] = float(pairs[i])
+        return added
+
+    @staticmethod
+    def _in_range(score, lo, hi):
+        def bound(text, is_lo):
+            exclusive = text.startswith('(')
+            value = float(text.lstrip('('))
+            if is_lo:
+                return score > value if exclusive else score >= value
+            return score < value if exclusive else score <= value
+        return bound(lo, True) and bound(hi, False)
+
+    def cmd_zcount(self, key, lo, hi):
+        return sum(self._in_range(s, lo, hi) for s in self.data.get(key, {}).values())
+
+    def cmd_zremrangebyscore(self, key, lo, hi):
+        z = self.data.get(key, {})
+        doomed = [m for m, s in z.items() if self._in_range(s, lo, hi)]
+        for m in doomed:
+            del z[m]
+        return len(doomed)
+
+    def _dispatch(self, args):
+        fn = getattr(self, 'cmd_' + args[0].lower(), None)
+        if fn is None:
+            return ('-', f"ERR unknown command '{args[0]}'")
+        try:
+            return fn(*args[1:])
+        except (TypeError, ValueError) as e:
+            return ('-', f"ERR {e}")
+
+    def execute(self, args):
+        with self.lock:
+            return self._dispatch(args)
+
+    def execute_transaction(self, commands: list) -> list:
+        """EXEC：排队的命令在同一把锁内依次执行"""
+        with self.lock:
+            return [self._dispatch(args) for args in commands]
+
+
+def _encode_reply(value) -> bytes:
+    if isinstance(value, tuple):
+        return f"{value[0]}{value[1]}\r\n".encode('utf-8')
+    if value is None:
+        return b'$-1\r\n'
+    if isinstance(value, int):
+        return b':%d\r\n' % value
+    if isinstance(value, list):
+        return b'*%d\r\n' % len(value) + b''.join(_encode_reply(v) for v in value)
+    data = str(value).encode('utf-8')
+    return b'$%d\r\n%s\r\n' % (len(data), data)
+
+
+def _make_handler(store: _Store):
+    class Handler(socketserver.StreamRequestHandler):
+        disable_nagle_algorithm = True
+
+        def read_command(self):
+            line = self.rfile.readline()
+            if not line:
+                return None
+            n = int(line[1:-2])
+            args = []
+            for _ in range(n):
+                length = int(self.rfile.readline()[1:-2])
+                args.append(self.rfile.read(length + 2)[:-2].decode('utf-8'))
+            return args
+
+        def handle(self):
+            queued = None   # MULTI 之后排队的命令
+            while True:
+                args = self.read_command()
+                if args is None:
+                    return
+                name = args[0].upper()
+                if name == 'MULTI':
+                    queued, reply = [], ('+', 'OK')
+                elif name == 'EXEC':
+                    reply = store.execute_transaction(queued) if queued is not None else ('-', 'ERR EXEC without MULTI')
+                    queued = None
+                elif name == 'DISCARD':
+                    queued, reply = None, ('+', 'OK')
+                elif queued is not None:
+                    queued.append(args)
+                    reply = ('+', 'QUEUED')
+                else:
+                    reply = store.execute(args)
+                self.wfile.write(_encode_reply(reply))
+
+    return Handler
+
+
+class RespStandin(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.store = _Store()
+        super().__init__((host, port), _make_handler(self.store))
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> 'RespStandin':
+        """在后台线程中运行"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description='In-memory RESP stand-in')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6390)
+    args = parser.parse_args()
+
+    server = RespStandin(args.host, args.port)
+    print(f"RESP stand-in listening on {server.url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 热点路径基准测试
+Benchmark suite for the app's hot paths
+
+【覆盖范围】
+├── validate_access_key     10 / 1k / 100k 个 Key
+├── check_share_anomaly     1k ~ 1M 行日志（--full 含 10M）
+├── load_signal_data        1 ~ 1000 个交易日历史（缓存命中）
+├── read_signal_frame       同上（冷解析）
+├── get_tradingview_symbol  全市场代码
+└── page_render             AppTest 完整页面渲染（每次新会话）
+
+【基线对比】
+- 基线保存在 bench/baseline.json（与机器相关，换机器后请重新 save）
+- compare 时任一用例比基线慢超过阈值（默认 25%）即退出码 1
+
+使用方法：
+    python bench/run_bench.py run     [--quick|--full] [-k 关键字] [--out 结果.json]
+    python bench/run_bench.py save    [--quick|--full] [-k 关键字]
+    python bench/run_bench.py compare [--quick|--full] [-k 关键字] [--threshold 0.25] [--results 结果.json]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import tempfile
+import argparse
+from datetime import datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, APP_DIR)
+
+BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_THRESHOLD = 0.25
+
+# 【用例规模配置】
+BENCH_SIZES = {
+    'validate_access_key': [10, 1_000, 100_000],
+    'check_share_anomaly': [1_000, 10_000, 100_000, 1_000_000],
+    'load_signal_data': [1, 10, 100, 1000],
+    'page_render': ['support', 'signal', 'chart', 'history'],
+}
+QUICK_SIZES = {
+    'check_share_anomaly': [1_000, 10_000, 100_000],
+}
+FULL_SIZES = {
+    'check_share_anomaly': [1_000, 10_000, 100_000, 1_000_000, 10_000_000],
+}
+
+BENCH_KEY = 'EF-26Q1-BENCH001'
+SIGNAL_COLUMNS = ['date', 'symbol', 'y_OTO', 'rk_ret_20', 'small', 'lowvol', 'lowturn',
+                  'rk_body', 'ret_1', 'MV', 'MS', 'BL', 'score', 'rank']
+
+
+# ==================== 计时 ====================
+
+def measure(fn, min_time: float = 0.2, max_repeat: int = 7) -> dict:
+    """
+    自适应计时：先确定单次循环次数（单轮 ≥ min_time 的 1/5），再重复取中位数
+
+    耗时很长的用例（单次 > min_time）只运行 3 次
+    """
+    t0 = time.perf_counter()
+    fn()
+    single = time.perf_counter() - t0
+
+    number = max(1, int(min_time / 5 / max(single, 1e-9)))
+    repeat = 3 if single > min_time else max_repeat
+
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) / number)
+    samples.sort()
+    return {
+        'median_s': samples[len(samples) // 2],
+        'min_s': samples[0],
+        'number': number,
+        'repeat': repeat,
+    }
+
+
+# ==================== 测试数据 ====================
+
+def universe_codes() -> list:
+    """A股全市场代码（按板块号段生成）"""
+    ranges = [
+        (600000, 601999), (603000, 603999), (605000, 605599), (688000, 688799),
+        (1, 999), (1200, 1399), (2001, 2999), (3000, 3099), (300001, 301599),
+        (830000, 839999), (870000, 873999),
+    ]
+    return [str(c).zfill(6) for lo, hi in ranges for c in range(lo, hi + 1)]
+
+
+def make_keys(n: int) -> list:
+    rng = random.Random(n)
+    keys = [f"EF-26Q1-{rng.randrange(16 ** 8):08X}" for _ in range(n - 1)]
+    return keys + [BENCH_KEY]
+
+
+def write_usage_log(path: str, n_lines: int, now: datetime):
+    """生成合成日志：5% 属于被测 Key，时间均匀分布在最近 48 小时"""
+    import core
+
+    rng = random.Random(n_lines)
+    bench_mask = core.mask_key(BENCH_KEY)
+    other_masks = [core.mask_key(k) for k in make_keys(500)[:-1]]
+    chunk = []
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(n_lines):
+            ts = now - timedelta(seconds=rng.randrange(48 * 3600))
+            mask = bench_mask if rng.random() < 0.05 else rng.choice(other_masks)
+            chunk.append(json.dumps({
+                'timestamp': ts.isoformat(),
+                'key_mask': mask,
+                'status': 'access',
+                'ip_hash': f"{rng.randrange(16 ** 16):016x}",
+                'ua_hash': f"{rng.randrange(16 ** 16):016x}",
+                'device_id': f"dev-{rng.randrange(4)}",
+                'page': 'signal',
+            }))
+            if len(chunk) >= 50_000:
+                f.write('\n'.join(chunk) + '\n')
+                chunk = []
+        if chunk:
+            f.write('\n'.join(chunk) + '\n')
+
+
+def write_signal_csv(path: str, n_days: int):
+    """生成合成信号历史：每日 10 行"""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(n_days)
+    dates = pd.bdate_range('2020-01-01', periods=n_days).strftime('%Y-%m-%d')
+    codes = np.array([int(c) for c in universe_codes()])
+    rows = n_days * 10
+    df = pd.DataFrame(rng.normal(size=(rows, len(SIGNAL_COLUMNS) - 3)), columns=SIGNAL_COLUMNS[2:-1])
+    df.insert(0, 'symbol', rng.choice(codes, size=rows))
+    df.insert(0, 'date', np.repeat(dates, 10))
+    df['rank'] = np.tile(np.arange(1, 11, dtype=float), n_days)
+    df.to_csv(path)
+
+
+# ==================== 用例 ====================
+
+def bench_validate_access_key(tmp: str, n_keys: int):
+    import core
+
+    with open(core.KEYS_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'keys': make_keys(n_keys)}, f)
+    core.save_key_state({BENCH_KEY: {'first_seen': datetime.now().strftime('%Y-%m-%d')}})
+    return measure(lambda: core.validate_access_key(BENCH_KEY))
+
+
+def bench_check_share_anomaly(tmp: str, n_lines: int):
+    import core
+
+    core.save_key_state({BENCH_KEY: {'first_seen': datetime.now().strftime('%Y-%m-%d')}})
+    write_usage_log(core.USAGE_LOG_FILE, n_lines, datetime.now())
+    result = measure(lambda: core.check_share_anomaly(BENCH_KEY), min_time=0.5)
+    os.remove(core.USAGE_LOG_FILE)
+    return result
+
+
+def bench_load_signal_data(tmp: str, n_days: int):
+    """页面热路径：按数据版本缓存的共享帧（版本检查 + 缓存命中）"""
+    import core
+
+    saved = core.SIGNAL_FILE
+    core.SIGNAL_FILE = os.path.join(tmp, 'trade_list_top10.csv')
+    try:
+        write_signal_csv(core.SIGNAL_FILE, n_days)
+        return measure(core.load_signal_data)
+    finally:
+        core.SIGNAL_FILE = saved
+
+
+def bench_read_signal_frame(tmp: str, n_days: int):
+    """冷加载：解析 + 压缩列类型（缓存未命中时的代价）"""
+    import core
+
+    path = os.path.join(tmp, 'trade_list_top10.csv')
+    write_signal_csv(path, n_days)
+    return measure(lambda: core.read_signal_frame(path))
+
+
+def bench_get_tradingview_symbol(tmp: str, _):
+    import core
+
+    codes = universe_codes()
+    result = measure(lambda: [core.get_tradingview_symbol(c) for c in codes])
+    result['items'] = len(codes)
+    return result
+
+
+def bench_page_render(tmp: str, tab: str):
+    from streamlit.testing.v1 import AppTest
+
+    app_file = os.path.join(APP_DIR, 'app_update.py')
+
+    def run():
+        at = AppTest.from_file(app_file, default_timeout=60)
+        at.query_params['tab'] = tab
+        if tab != 'support':
+            at.session_state['verified_key'] = BENCH_KEY
+            at.session_state['verified_key_mask'] = 'EF-26Q1-****H001'
+        at.run()
+
+    return measure(run, min_time=1.0, max_repeat=5)
+
+
+def iter_cases(sizes: dict):
+    for n in sizes['validate_access_key']:
+        yield f"validate_access_key[{n}]", bench_validate_access_key, n
+    for n in sizes['check_share_anomaly']:
+        yield f"check_share_anomaly[{n}]", bench_check_share_anomaly, n
+    for n in sizes['load_signal_data']:
+        yield f"load_signal_data[{n}d]", bench_load_signal_data, n
+    for n in sizes['load_signal_data']:
+        yield f"read_signal_frame[{n}d]", bench_read_signal_frame, n
+    yield "get_tradingview_symbol[universe]", bench_get_tradingview_symbol, None
+    for tab in sizes['page_render']:
+        yield f"page_render[{tab}]", bench_page_render, tab
+
+
+# ==================== 运行与对比 ====================
+
+def run_suite(sizes: dict, keyword: str = None) -> dict:
+    """
+    在临时目录中运行全部用例（Key/日志/信号文件均重定向，不影响真实数据）
+
+    状态存储固定为 file 后端：sqlite / redis 后端不使用上面的文件路径，会写入生产库
+    """
+    import core
+    import state_backend
+
+    saved = (core.APP_DIR, core.KEYS_FILE, core.KEY_STATE_FILE, core.USAGE_LOG_FILE)
+    saved_backend = state_backend.STATE_CONFIG['backend']
+    state_backend.STATE_CONFIG['backend'] = 'file'
+    tmp = tempfile.mkdtemp(prefix='ef_bench_')
+    core.APP_DIR = tmp
+    core.KEYS_FILE = os.path.join(tmp, 'keys.json')
+    core.KEY_STATE_FILE = os.path.join(tmp, 'key_state.json')
+    core.USAGE_LOG_FILE = os.path.join(tmp, 'usage_log.jsonl')
+    core.reset_state_backend()
+
+    results = {}
+    try:
+        for name, fn, arg in iter_cases(sizes):
+            if keyword and keyword not in name:
+                continue
+            # 页面渲染使用真实应用目录（AppTest 会重新导入模块）
+            if name.startswith('page_render'):
+                core.APP_DIR, core.KEYS_FILE, core.KEY_STATE_FILE, core.USAGE_LOG_FILE = saved
+                core.reset_state_backend()
+            results[name] = fn(tmp, arg)
+            print(f"{name:<40}{results[name]['median_s'] * 1000:>12.3f} ms", flush=True)
+    finally:
+        core.APP_DIR, core.KEYS_FILE, core.KEY_STATE_FILE, core.USAGE_LOG_FILE = saved
+        state_backend.STATE_CONFIG['backend'] = saved_backend
+        core.reset_state_backend()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'machine': f"{platform.node()} {platform.machine()} py{platform.python_version()}",
+        'results': results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """返回回归列表 [(用例, 基线秒, 当前秒, 变化比例)]"""
+    regressions = []
+    print(f"{'case':<40}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, cur in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            print(f"{name:<40}{'-':>12}{cur['median_s'] * 1000:>10.3f}ms{'new':>10}")
+            continue
+        change = cur['median_s'] / base['median_s'] - 1
+        flag = '  ❌' if change > threshold else ''
+        print(f"{name:<40}{base['median_s'] * 1000:>10.3f}ms{cur['median_s'] * 1000:>10.3f}ms{change:>+9.0%}{flag}")
+        if change > threshold:
+            regressions.append((name, base['median_s'], cur['median_s'], change))
+    return regressions
+
+
+def main(argv) -> int:
+    parser = argparse.ArgumentParser(description='EigenFlow 热点路径基准测试')
+    parser.add_argument('command', choices=['run', 'save', 'compare'])
+    parser.add_argument('--quick', action='store_true', help='跳过大规模日志用例')
+    parser.add_argument('--full', action='store_true', help='包含 10M 行日志用例')
+    parser.add_argument('-k', dest='keyword', help='只运行名称包含该关键字的用例')
+    parser.add_argument('--out', help='结果写入文件')
+    parser.add_argument('--results', help='compare 时使用已有结果文件，不重新运行')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='回归阈值（比例）')
+    args = parser.parse_args(argv)
+
+    sizes = dict(BENCH_SIZES)
+    sizes.update(QUICK_SIZES if args.quick else FULL_SIZES if args.full else {})
+
+    if args.command == 'compare' and args.results:
+        with open(args.results, 'r', encoding='utf-8') as f:
+            current = json.load(f)
+    else:
+        current = run_suite(sizes, args.keyword)
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+
+    if args.command == 'save':
+        baseline = {'results': {}}
+        if os.path.exists(BASELINE_FILE):
+            with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        baseline.update({k: v for k, v in current.items() if k != 'results'})
+        baseline['results'].update(current['results'])
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+        print(f"基线已更新：{BASELINE_FILE}（{len(current['results'])} 个用例）")
+
+    elif args.command == 'compare':
+        if not os.path.exists(BASELINE_FILE):
+            print("❌ 尚无基线，请先运行 save")
+            return 1
+        with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} 个用例回归超过 {args.threshold:.0%}")
+            return 1
+        print(f"✅ 无超过 {args.threshold:.0%} 的回归")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 内置K线渲染（TradingView 备用）
+Built-in candlestick renderer
+
+【设计】
+├── 服务端生成 SVG，不依赖任何外部脚本
+├── 数据来自本地行情存储 ohlc_store
+├── Top10 股票按数据版本预渲染到 data/charts/{version}/
+└── 请求时只读内存/磁盘缓存，不做计算
+
+使用方法：
+    python chart_render.py        # 预渲染当前数据版本的 Top10 图表
+"""
+
+import os
+import hashlib
+
+import numpy as np
+
+import ohlc_store
+import perf
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+SIGNAL_FILE = os.path.join(APP_DIR, 'trade_list_top10.csv')
+CHART_CACHE_DIR = os.path.join(APP_DIR, 'data', 'charts')
+
+CHART_CONFIG = {
+    'bars': 120,        # 显示最近 120 个交易日
+    'width': 640,
+    'height': 360,
+    'up_color': '#ef4444',     # A股习惯：红涨
+    'down_color': '#10b981',   # 绿跌
+}
+
+_svg_cache = {}  # (version, code) -> svg
+
+
+def data_version() -> str:
+    """数据版本 = 信号文件 + 行情存储（仅 stat）"""
+    try:
+        st = os.stat(SIGNAL_FILE)
+        sig = f"{st.st_size}:{st.st_mtime_ns}"
+    except OSError:
+        sig = 'none'
+    return hashlib.md5(f"{sig}|{ohlc_store.store_version()}".encode()).hexdigest()[:12]
+
+
+def render_candlestick_svg(bars, title: str = '', width: int = None, height: int = None) -> str:
+    """
+    渲染K线 SVG
+
+    bars: ohlc_store.OHLC_DTYPE 结构化数组
+    上方 75% 为K线，下方 25% 为成交量
+    """
+    width = width or CHART_CONFIG['width']
+    height = height or CHART_CONFIG['height']
+    up, down = CHART_CONFIG['up_color'], CHART_CONFIG['down_color']
+
+    n = len(bars)
+    pad_l, pad_r, pad_t, pad_b = 8, 56, 24, 18
+    plot_w = width - pad_l - pad_r
+    price_h = (height - pad_t - pad_b) * 0.75
+    vol_top = pad_t + price_h + 6
+    vol_h = height - pad_b - vol_top
+
+    o = bars['open'].astype('float64')
+    h = bars['high'].astype('float64')
+    l = bars['low'].astype('float64')
+    c = bars['close'].astype('float64')
+    v = bars['volume'].astype('float64')
+
+    lo, hi = float(l.min()), float(h.max())
+    span = (hi - lo) or max(hi * 0.01, 1e-6)
+    vmax = float(v.max()) or 1.0
+
+    step = plot_w / n
+    body_w = max(step * 0.7, 1.0)
+    x = pad_l + step * (np.arange(n) + 0.5)
+
+    def py(p):
+        return pad_t + (hi - p) / span * price_h
+
+    y_o, y_c, y_h, y_l = py(o), py(c), py(h), py(l)
+    vol_y = vol_top + vol_h * (1 - v / vmax)
+    is_up = c >= o
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+        f'width="100%" style="background:#fff;font-family:sans-serif;">',
+        f'<text x="{pad_l}" y="16" font-size="12" fill="#374151">{title}</text>',
+    ]
+
+    # 价格刻度
+    for frac in (0.0, 0.5, 1.0):
+        price = hi - span * frac
+        yy = pad_t + price_h * frac
+        parts.append(
+            f'<line x1="{pad_l}" y1="{yy:.1f}" x2="{pad_l + plot_w}" y2="{yy:.1f}" stroke="#f0f0f0"/>'
+            f'<text x="{pad_l + plot_w + 4}" y="{yy + 4:.1f}" font-size="10" fill="#9ca3af">{price:.2f}</text>'
+        )
+
+    for i in range(n):
+        color = up if is_up[i] else down
+        top = min(y_o[i], y_c[i])
+        body_h = max(abs(y_c[i] - y_o[i]), 1.0)
+        parts.append(
+            f'<line x1="{x[i]:.1f}" y1="{y_h[i]:.1f}" x2="{x[i]:.1f}" y2="{y_l[i]:.1f}" stroke="{color}"/>'
+            f'<rect x="{x[i] - body_w / 2:.1f}" y="{top:.1f}" width="{body_w:.1f}" height="{body_h:.1f}" fill="{color}"/>'
+            f'<rect x="{x[i] - body_w / 2:.1f}" y="{vol_y[i]:.1f}" width="{body_w:.1f}" '
+            f'height="{vol_top + vol_h - vol_y[i]:.1f}" fill="{color}" opacity="0.5"/>'
+        )
+
+    first, last = str(bars['date'][0]), str(bars['date'][-1])
+    parts.append(
+        f'<text x="{pad_l}" y="{height - 4}" font-size="10" fill="#9ca3af">{first[:4]}-{first[4:6]}-{first[6:]}</text>'
+        f'<text x="{pad_l + plot_w}" y="{height - 4}" font-size="10" fill="#9ca3af" text-anchor="end">'
+        f'{last[:4]}-{last[4:6]}-{last[6:]}</text>'
+    )
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+def _render_code(code: str):
+    bars = ohlc_store.read_bars(code, last_n=CHART_CONFIG['bars'])
+    if len(bars) == 0:
+        return None
+    return render_candlestick_svg(bars, title=f"{code} · 日K")
+
+
+def top10_codes() -> list:
+    """与行情视图一致的 Top10 股票代码"""
+    import pandas as pd
+
+    if not os.path.exists(SIGNAL_FILE):
+        return []
+    df = pd.read_csv(SIGNAL_FILE, usecols=['symbol'], nrows=10)
+    return [str(s).strip().zfill(6) for s in df['symbol']]
+
+
+def prerender_top10(codes: list = None, version: str = None) -> int:
+    """
+    按数据版本预渲染 Top10 图表到磁盘
+
+    已存在的版本目录直接跳过，返回新生成的图表数
+    """
+    version = version or data_version()
+    codes = top10_codes() if codes is None else codes
+    out_dir = os.path.join(CHART_CACHE_DIR, version)
+    os.makedirs(out_dir, exist_ok=True)
+
+    count = 0
+    for code in codes:
+        path = os.path.join(out_dir, f"{code}.svg")
+        if os.path.exists(path):
+            continue
+        svg = _render_code(code)
+        if svg is None:
+            continue
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(svg)
+        count += 1
+    return count
+
+
+def get_chart_svg(code, version: str = None):
+    """
+    获取K线 SVG（内存 → 预渲染文件 → 现场渲染）
+
+    本地无行情数据时返回 None
+    """
+    code = str(code).strip().zfill(6)
+    version = version or data_version()
+    cache_key = (version, code)
+    if _svg_cache and next(iter(_svg_cache))[0] != version:
+        _svg_cache.clear()  # 数据版本变化，丢弃旧图
+    perf.cache_event('chart_svg', cache_key in _svg_cache)
+    if cache_key in _svg_cache:
+        return _svg_cache[cache_key]
+
+    path = os.path.join(CHART_CACHE_DIR, version, f"{code}.svg")
+    svg = None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            svg = f.read()
+    except OSError:
+        svg = _render_code(code)
+
+    if svg is not None:
+        _svg_cache[cache_key] = svg
+    return svg
+
+
+if __name__ == "__main__":
+    version = data_version()
+    n = prerender_top10(version=version)
+    print(f"数据版本 {version}：新生成 {n} 张图表 → {os.path.join(CHART_CACHE_DIR, version)}")
@@ -0,0 +1,712 @@
+"""
+EigenFlow 核心逻辑
+Core: configuration, access keys, usage log, data loading
+
+【模块说明】
+├── 不调用 st.set_page_config，也不输出任何页面元素
+├── pandas / numpy 在用到时才导入（支持页不加载）
+└── 被 app_update 与各页面模块共用
+"""
+
+import os
+import uuid
+import json
+import hmac
+import time
+import queue
+import hashlib
+import threading
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from perf import timed
+
+# ==================== 配置 | Configuration ====================
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# ==================== 文件路径配置 ====================
+
+KEY_STATE_FILE = os.path.join(APP_DIR, 'key_state.json')
+USAGE_LOG_FILE = os.path.join(APP_DIR, 'usage_log.jsonl')
+KEYS_FILE = os.path.join(APP_DIR, 'keys.json')
+# key_sweeper 写出的到期 / 吊销集合（多副本部署时指向共享卷）
+KEY_LIFECYCLE_FILE = os.environ.get('EF_KEY_LIFECYCLE', os.path.join(APP_DIR, 'data', 'key_lifecycle.json'))
+
+# ==================== 风控配置 ====================
+
+# 【异常阈值配置位置】
+# - max_devices_per_key: 每个Key最多允许的设备数
+# - time_window_hours: 时间窗口（小时）
+# - device_threshold: 设备阈值，超过此值则标记异常
+SHARE_CONFIG = {
+    'max_devices_per_key': 2,      # 每个Key最多2个设备
+    'time_window_hours': 24,       # 24小时时间窗口
+    'device_threshold': 2,        # 超过2个不同设备标记异常
+}
+
+KEY_VALIDITY_DAYS = 30  # Key有效期（天）
+
+# 【有效期计数方式】calendar = 自然日；trading = 交易日（按 trading_calendar，北京时间）
+KEY_VALIDITY_UNIT = os.environ.get('EF_KEY_VALIDITY_UNIT', 'calendar')
+
+# ==================== Key 存储与验证 ====================
+
+def load_valid_keys():
+    """
+    加载有效 Key 列表
+    优先级：st.secrets > keys.json > 默认测试Key
+    
+    【生产环境建议】
+    - 使用 Streamlit Cloud secrets 存储真实Key
+    - 不要将真实Key写入代码或GitHub
+    """
+    # 优先从 secrets 加载
+    try:
+        if hasattr(st.secrets, 'access_keys'):
+            return st.secrets.access_keys.get('keys', [])
+    except:
+        pass
+    
+    # 其次从本地 keys.json 加载
+    if os.path.exists(KEYS_FILE):
+        try:
+            with open(KEYS_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                return data.get('keys', [])
+        except:
+            pass
+    
+    # 默认测试Key（仅供开发测试）
+    return [
+        "EF-26Q1-A9F4KZ2M",
+        "EF-26Q1-B3H8LP5N",
+        "EF-26Q1-C7J2MR9R",
+    ]
+
+
+def _normalize_scopes(scopes) -> dict:
+    return {str(k).strip().upper(): [v] if isinstance(v, str) else list(v) for k, v in dict(scopes).items()}
+
+
+def load_key_scopes() -> dict:
+    """
+    加载 Key 可访问的策略范围：Key → 策略 id 列表（strategy_registry 中的 id，'*' 为全部）
+    来源与 load_valid_keys 相同：st.secrets [access_keys.scopes] > keys.json "scopes"
+    
+    未列出的 Key 只能访问 entitlement = all 的策略
+    """
+    try:
+        if hasattr(st.secrets, 'access_keys'):
+            return _normalize_scopes(st.secrets.access_keys.get('scopes', {}))
+    except:
+        pass
+    
+    if os.path.exists(KEYS_FILE):
+        try:
+            with open(KEYS_FILE, 'r', encoding='utf-8') as f:
+                return _normalize_scopes(json.load(f).get('scopes', {}))
+        except:
+            pass
+    return {}
+
+
+def key_strategies(key: str) -> list:
+    """该 Key 解锁的策略 id（注册表顺序；不校验 Key 本身是否有效）"""
+    import strategy_registry
+
+    return strategy_registry.entitled_strategies(load_key_scopes().get(key.strip().upper()))
+
+
+@timed
+def validate_access_key(key: str) -> dict:
+    """
+    验证 Access Key 并返回详细状态
+    
+    【Key有效期逻辑】
+    - first_seen = 用户第一次成功输入该key的当日日期
+    - 到期日 = first_seen + 30天（KEY_VALIDITY_UNIT = trading 时为 30 个交易日）
+    - 超过30天则Key无效
+    - key_sweeper 判定为到期 / 已吊销的 Key 直接拒绝（哈希集合查找，不访问状态存储；
+      压缩后状态已删除，不会被当作首次使用重新激活）
+    """
+    key = key.strip().upper()
+    valid_keys = load_valid_keys()
+    
+    if key not in valid_keys:
+        return {'valid': False, 'key': mask_key(key)}
+    
+    lifecycle = load_key_lifecycle()
+    digest = key_digest(key)
+    if digest in lifecycle['revoked']:
+        return {'valid': False, 'key': mask_key(key), 'revoked': True}
+    if digest in lifecycle['expired']:
+        return {
+            'valid': False,
+            'key': mask_key(key),
+            'first_seen': lifecycle['expired'][digest],
+            'days_remaining': 0,
+            'days_unit': key_validity_unit_label(),
+            'expired': True
+        }
+    
+    now = datetime.now()
+    if KEY_VALIDITY_UNIT == 'trading':
+        import trading_calendar
+
+        now = trading_calendar.now_shanghai().replace(tzinfo=None)
+    today = now.strftime('%Y-%m-%d')
+    
+    # 尝试加载状态
+    try:
+        state = get_state_backend().get_key_state(key)
+    except:
+        state = None
+    
+    # 首次使用：记录 first_seen（多副本同时激活时以先写入者为准）
+    if state is None:
+        new_state = {
+            'first_seen': today,
+            'activated_at': now.isoformat(),
+        }
+        try:
+            state = get_state_backend().activate_key(key, new_state)
+        except:
+            state = new_state  # 云端只读文件系统，保存可能失败
+        
+        # 云端模式：如果无法保存状态，每次都视为首次使用
+        if state == new_state:
+            return {
+                'valid': True,
+                'key': mask_key(key),
+                'first_seen': today,
+                'days_remaining': KEY_VALIDITY_DAYS,
+                'days_unit': key_validity_unit_label(),
+                'expires_on': key_expiry_date(today),
+                'expired': False,
+                'is_first_use': True
+            }
+    
+    # 已存在状态，检查是否过期
+    first_seen = state.get('first_seen', today)
+    
+    try:
+        days_used = key_days_used(first_seen, now)
+    except:
+        days_used = 0
+    
+    if days_used >= KEY_VALIDITY_DAYS:
+        return {
+            'valid': False,
+            'key': mask_key(key),
+            'first_seen': first_seen,
+            'days_remaining': 0,
+            'days_unit': key_validity_unit_label(),
+            'expired': True
+        }
+    
+    return {
+        'valid': True,
+        'key': mask_key(key),
+        'first_seen': first_seen,
+        'days_remaining': KEY_VALIDITY_DAYS - days_used,
+        'days_unit': key_validity_unit_label(),
+        'expired': False,
+        'is_first_use': False
+    }
+
+
+def key_validity_unit_label() -> str:
+    return '个交易日' if KEY_VALIDITY_UNIT == 'trading' else '天'
+
+
+def key_days_used(first_seen: str, now: datetime) -> int:
+    """first_seen 至今已用的天数（自然日，或 (first_seen, 今日] 内的交易日数）"""
+    if KEY_VALIDITY_UNIT == 'trading':
+        import trading_calendar
+
+        return trading_calendar.get_calendar().trading_days_between(first_seen, now.date())
+    return (now - datetime.strptime(first_seen, '%Y-%m-%d')).days
+
+
+def key_expiry_date(first_seen: str) -> str:
+    """到期日（首次使用日 + 有效期；交易日模式下为其后第 KEY_VALIDITY_DAYS 个交易日）"""
+    if KEY_VALIDITY_UNIT == 'trading':
+        import trading_calendar
+
+        return trading_calendar.get_calendar().add_trading_days(first_seen, KEY_VALIDITY_DAYS).isoformat()
+    return (datetime.strptime(first_seen, '%Y-%m-%d') + timedelta(days=KEY_VALIDITY_DAYS)).strftime('%Y-%m-%d')
+
+
+def key_digest(key: str) -> str:
+    """Key 的 SHA-256（到期 / 吊销集合只保存摘要，不落盘明文）"""
+    return hashlib.sha256(key.strip().upper().encode()).hexdigest()
+
+
+_key_lifecycle = {}  # 文件版本 -> {'expired': {摘要: first_seen}, 'revoked': {摘要}}
+
+
+def load_key_lifecycle() -> dict:
+    """到期 / 吊销集合（key_sweeper 写出；文件变化后重新加载，缺失或损坏时为空）"""
+    try:
+        stat = os.stat(KEY_LIFECYCLE_FILE)
+        version = (KEY_LIFECYCLE_FILE, stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        return {'expired': {}, 'revoked': set()}
+    if version not in _key_lifecycle:
+        try:
+            with open(KEY_LIFECYCLE_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        _key_lifecycle.clear()
+        _key_lifecycle[version] = {
+            'expired': dict(data.get('expired', {})),
+            'revoked': set(data.get('revoked', [])),
+        }
+    return _key_lifecycle[version]
+
+
+def load_admin_key():
+    """
+    加载管理员 Key（隐藏的性能面板使用）
+    优先级：st.secrets [admin] key > 环境变量 EF_ADMIN_KEY
+    未配置时返回 None，管理面板不可用
+    """
+    try:
+        if hasattr(st.secrets, 'admin'):
+            return st.secrets.admin.get('key') or None
+    except:
+        pass
+    return os.environ.get('EF_ADMIN_KEY') or None
+
+
+# ==================== 推送令牌 ====================
+
+# 浏览器 EventSource 只能在 URL 中带凭证：传签名令牌（Key 摘要 + 到期时刻），不传明文 Key
+STREAM_TOKEN_TTL = 12 * 3600      # 令牌有效期（秒，仅限制建连 / 重连；连接期间按 Key 复核）
+STREAM_TOKEN_BUCKET = 3600        # 到期时刻取整（同一小时内页面重跑得到相同令牌，组件不重建）
+STREAM_SECRET_FILE = os.path.join(APP_DIR, 'data', 'stream_secret')
+
+_stream_secret = None
+
+
+def load_stream_secret() -> bytes:
+    """
+    推送令牌签名密钥（页面与 signal_api 须一致）
+    优先级：st.secrets [push] secret > 环境变量 EF_STREAM_SECRET > data/stream_secret（首次使用时随机生成）
+    """
+    global _stream_secret
+    if _stream_secret is not None:
+        return _stream_secret
+    secret = None
+    try:
+        if hasattr(st.secrets, 'push'):
+            secret = st.secrets.push.get('secret')
+    except:
+        pass
+    secret = secret or os.environ.get('EF_STREAM_SECRET')
+    if not secret:
+        try:
+            os.makedirs(os.path.dirname(STREAM_SECRET_FILE), exist_ok=True)
+            fd = os.open(STREAM_SECRET_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                f.write(os.urandom(32).hex())
+        except FileExistsError:
+            pass
+        with open(STREAM_SECRET_FILE, 'r', encoding='utf-8') as f:
+            secret = f.read().strip()
+    _stream_secret = secret.encode()
+    return _stream_secret
+
+
+def _sign_stream(body: str) -> str:
+    return hmac.new(load_stream_secret(), body.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def issue_stream_token(key: str) -> str:
+    """推送令牌：{Key 摘要前 32 位}.{到期 unix 秒}.{HMAC}"""
+    now = int(time.time())
+    expires = (now // STREAM_TOKEN_BUCKET + 1) * STREAM_TOKEN_BUCKET + STREAM_TOKEN_TTL
+    body = f"{key_digest(key)[:32]}.{expires}"
+    return f"{body}.{_sign_stream(body)}"
+
+
+def verify_stream_token(token: str):
+    """校验推送令牌，返回 Key 摘要前 32 位；签名不符或已过期返回 None"""
+    parts = (token or '').split('.')
+    if len(parts) != 3 or not parts[1].isdigit():
+        return None
+    body = f"{parts[0]}.{parts[1]}"
+    if not hmac.compare_digest(parts[2], _sign_stream(body)) or int(parts[1]) < time.time():
+        return None
+    return parts[0]
+
+
+def mask_key(key: str) -> str:
+    """掩码Key显示（防止完整泄露）"""
+    if len(key) >= 12:
+        return f"{key[:8]}{'****'}{key[-4:]}"
+    return key[:6] + '****'
+
+
+# ==================== Key 状态持久化 ====================
+
+# 存储后端见 state_backend.py（EF_STATE_BACKEND=file|sqlite|redis，默认本地文件）
+_state_backend = None
+_state_backend_lock = threading.Lock()
+
+
+def get_state_backend():
+    """共享状态存储（进程内单例）"""
+    global _state_backend
+    if _state_backend is None:
+        with _state_backend_lock:
+            if _state_backend is None:
+                import state_backend
+                _state_backend = state_backend.create_backend(KEY_STATE_FILE, USAGE_LOG_FILE)
+    return _state_backend
+
+
+def reset_state_backend():
+    """写完待处理日志并丢弃当前存储实例（修改文件路径或配置后调用）"""
+    global _state_backend
+    flush_usage_log()
+    with _state_backend_lock:
+        if _state_backend is not None:
+            _state_backend.close()
+        _state_backend = None
+
+
+def load_key_state() -> dict:
+    """加载Key状态（包含first_seen）"""
+    try:
+        return get_state_backend().load_key_state()
+    except:
+        return {}
+
+
+def save_key_state(state: dict):
+    """保存Key状态"""
+    try:
+        get_state_backend().save_key_state(state)
+    except Exception as e:
+        # 云端只读文件系统可能失败，忽略错误
+        pass
+
+
+# ==================== 设备指纹与日志 ====================
+
+def get_device_id():
+    """获取设备ID（session持久化）"""
+    if 'device_id' not in st.session_state:
+        st.session_state.device_id = str(uuid.uuid4())
+    return st.session_state.device_id
+
+
+def get_client_info():
+    """
+    获取客户端信息（用于风控）
+    
+    【日志记录字段】
+    - ip: IP地址（hash）
+    - ua_hash: User-Agent（hash）
+    - device_id: 设备标识（uuid）
+    """
+    ip = 'unknown'
+    try:
+        ip = st.context.headers.get('X-Forwarded-For', 'unknown').split(',')[0].strip()
+    except:
+        pass
+    
+    ua = 'unknown'
+    try:
+        ua = st.context.headers.get('User-Agent', 'unknown')
+    except:
+        pass
+    
+    return {
+        'ip': hashlib.md5(ip.encode()).hexdigest()[:16] if ip != 'unknown' else 'unknown',
+        'ua_hash': hashlib.md5(ua.encode()).hexdigest()[:16] if ua != 'unknown' else 'unknown',
+        'device_id': get_device_id()
+    }
+
+
+@timed
+def log_usage(key: str, status: str = 'access', client: dict = None, page: str = None):
+    """
+    记录使用日志
+
+    client / page: 非 Streamlit 调用方（signal_api）自带的客户端信息与来源；
+    为空时取当前会话
+    
+    【日志格式】
+    {
+        "timestamp": "2026-02-06T10:30:00",
+        "key_mask": "EF-26Q1-****KZ2M",
+        "status": "access|warning|blocked",
+        "ip_hash": "abc123...",
+        "ua_hash": "def456...",
+        "device_id": "uuid-string",
+        "page": "signals|chart|support|api"
+    }
+    """
+    now = datetime.now()
+    client = client or get_client_info()
+    
+    log_entry = {
+        'timestamp': now.isoformat(),
+        'key_mask': mask_key(key),
+        'status': status,
+        'ip_hash': client['ip'],
+        'ua_hash': client['ua_hash'],
+        'device_id': client['device_id'],
+        'page': page or st.session_state.get('current_tab', 'unknown')
+    }
+    
+    _ensure_log_writer()
+    _log_queue.put(log_entry)
+
+
+# ==================== 日志写入队列 ====================
+
+# 日志由后台线程批量写入状态存储，页面渲染不等待磁盘 / 网络
+LOG_BATCH_SIZE = 500
+
+_log_queue = queue.Queue()
+_log_writer = None
+_log_writer_lock = threading.Lock()
+
+
+def _log_writer_loop():
+    while True:
+        batch = [_log_queue.get()]
+        while len(batch) < LOG_BATCH_SIZE:
+            try:
+                batch.append(_log_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            get_state_backend().append_usage(batch)
+        except Exception:
+            # 云端只读文件系统 / 存储不可用时丢弃，不影响页面
+            pass
+        for _ in batch:
+            _log_queue.task_done()
+
+
+def _ensure_log_writer():
+    global _log_writer
+    if _log_writer is None:
+        with _log_writer_lock:
+            if _log_writer is None:
+                _log_writer = threading.Thread(target=_log_writer_loop, name='ef-usage-log', daemon=True)
+                _log_writer.start()
+
+
+def flush_usage_log():
+    """等待队列中的日志全部写入"""
+    if _log_writer is not None:
+        _log_queue.join()
+
+
+def pending_usage(key_mask: str, since: datetime, until: datetime = None) -> list:
+    """队列中尚未写入的日志（按掩码 / 时间过滤，不等待写入线程；key_mask 为 None 时不限 Key）"""
+    since_iso = since.isoformat()
+    until_iso = until.isoformat() if until else None
+    with _log_queue.mutex:
+        pending = list(_log_queue.queue)
+    return [e for e in pending
+            if (key_mask is None or e['key_mask'] == key_mask) and e['timestamp'] >= since_iso
+            and (until_iso is None or e['timestamp'] < until_iso)]
+
+
+def log_queue_depth() -> int:
+    """待写入的日志条数"""
+    return _log_queue.qsize()
+
+
+@timed
+def check_share_anomaly(key: str) -> dict:
+    """
+    检查共享异常
+    
+    【异常规则】
+    - 同一key在24小时内出现 >2 个不同device_id → 标记异常
+    - 检测到异常时返回警告信息，但不强制锁定
+    - 设备数由 usage_store 统计：已压缩的日读列式分区，当日读状态存储
+    - 尚未落盘的日志直接从写入队列合并，不等待其他会话的写入
+    """
+    import usage_store
+
+    backend = get_state_backend()
+    window_start = datetime.now() - timedelta(hours=SHARE_CONFIG['time_window_hours'])
+    
+    try:
+        if backend.get_key_state(key) is None:
+            return {'is_anomaly': False, 'warning_message': None, 'should_block': False}
+        # 日志只保存掩码，按掩码匹配同一key
+        key_mask = mask_key(key)
+        devices = usage_store.recent_devices(key_mask, window_start, backend)
+        devices.update(e['device_id'] for e in pending_usage(key_mask, window_start) if e['device_id'])
+        device_count = len(devices)
+    except:
+        return {'is_anomaly': False, 'warning_message': None, 'should_block': False}
+    
+    if device_count > SHARE_CONFIG['device_threshold']:
+        return {
+            'is_anomaly': True,
+            'warning_message': f"⚠️ 检测到异常使用行为：同一账号在 {SHARE_CONFIG['time_window_hours']} 小时内被 {device_count} 个设备使用。如需多设备使用，请联系作者。",
+            'should_block': False
+        }
+    
+    return {'is_anomaly': False, 'warning_message': None, 'should_block': False}
+
+
+# ==================== 工具函数 ====================
+
+def format_stock_code(code):
+    """格式化股票代码"""
+    return str(code).strip().zfill(6)
+
+
+# 【TradingView 交易所前缀】证券主数据交易所 -> 前缀（北交所无对应行情，沿用 SSE）
+TRADINGVIEW_EXCHANGES = {'SSE': 'SSE', 'SZSE': 'SZSE'}
+
+
+def get_tradingview_symbol(stock_code):
+    """获取TradingView股票代码（交易所取自证券主数据，未收录按代码前缀推断）"""
+    import security_master
+
+    code = format_stock_code(stock_code)
+    exchange = security_master.get_master().exchange_code(code)
+    return f"{TRADINGVIEW_EXCHANGES.get(exchange, 'SSE')}:{code}"
+
+
+SIGNAL_FILE = os.path.join(APP_DIR, 'trade_list_top10.csv')
+
+# 【紧凑列类型】代码 / 日期 / 名称为 category，因子 float32，排名 int16
+SIGNAL_CATEGORY_COLUMNS = ('date', 'symbol', 'name')
+SIGNAL_INT_COLUMNS = {'rank': 'int16'}
+
+
+def compact_signal_frame(df):
+    """压缩列类型（代码统一为 6 位字符串）"""
+    import pandas as pd
+
+    for col in df.columns:
+        if col == 'symbol':
+            df[col] = df[col].astype(str).str.strip().str.zfill(6).astype('category')
+        elif col in SIGNAL_CATEGORY_COLUMNS:
+            df[col] = df[col].astype('category')
+        elif col in SIGNAL_INT_COLUMNS and df[col].notna().all():
+            df[col] = df[col].astype(SIGNAL_INT_COLUMNS[col])
+        elif pd.api.types.is_float_dtype(df[col]):
+            df[col] = df[col].astype('float32')
+    return df
+
+
+def read_signal_frame(path: str = None, columns: dict = None, index_col=0):
+    """
+    解析信号 CSV 为紧凑 DataFrame（每次调用都读盘，页面请用 load_signal_data）
+
+    columns: 文件列名 → 标准列名（策略注册表的列映射）
+    """
+    import pandas as pd
+
+    path = path or SIGNAL_FILE
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    columns = columns or {}
+    dtype = {src: str for src, dst in columns.items() if dst == 'symbol'}
+    dtype.setdefault('symbol', str)
+    df = pd.read_csv(path, index_col=index_col, dtype=dtype)
+    if columns:
+        df = df.rename(columns=columns)
+    return compact_signal_frame(df)
+
+
+@timed
+def load_signal_data(strategy: str = None):
+    """
+    加载某个策略的信号数据（空为默认策略；pandas 按需导入，支持页不加载）
+
+    股票名称由证券主数据（security_master）一次向量化合并为 name 列
+
+    首次访问时解析，按数据版本缓存在 strategy_registry 的 LRU 中，所有会话共享同一个只读 DataFrame：
+    调用方只做切片 / 读取，不要原地修改列
+    """
+    import strategy_registry
+
+    return strategy_registry.load_frame(strategy)
+
+
+def signal_data_version(strategy: str = None) -> str:
+    """策略数据版本（信号文件与证券主数据的大小 + 修改时间，仅 stat）"""
+    import strategy_registry
+
+    return strategy_registry.get_strategy(strategy).version()
+
+
+def load_signal_history(strategy: str = None) -> dict:
+    """历史信号按日索引（每个数据版本构建一次，会话间共享）"""
+    import strategy_registry
+
+    return strategy_registry.load_history(strategy)
+
+
+def load_signal_day(date: str = None, strategy: str = None) -> tuple:
+    """
+    某个信号日的全部信号（按排名的行切片，不复制）
+
+    date 为空时由交易日历选出当前应展示的信号日（trading_calendar.pick_signal_date）；
+    返回 (信号日, DataFrame)，信号表无 date 列时信号日为 None、返回全表
+    """
+    import signal_history
+    import trading_calendar
+
+    index = load_signal_history(strategy)
+    if not index['dates']:
+        return None, index['frame']
+    if date not in index['pos']:
+        date = trading_calendar.pick_signal_date(index['dates'])
+    return date, signal_history.get_day(index, date)
+
+
+@st.cache_resource(show_spinner=False)
+def _load_signal_bootstrap(strategy: str, version: str) -> dict:
+    import signal_bootstrap
+    import strategy_registry
+
+    top_n = strategy_registry.get_strategy(strategy).top_n or signal_bootstrap.BOOTSTRAP_CONFIG['top_n']
+    return signal_bootstrap.bootstrap_summary(load_signal_data(strategy), top_n=top_n)
+
+
+def load_signal_bootstrap(strategy: str = None) -> dict:
+    """Top N 表现的区块自助置信区间（每个策略、数据版本计算一次，会话间共享）"""
+    import strategy_registry
+
+    strategy = strategy_registry.get_strategy(strategy).id
+    return _load_signal_bootstrap(strategy, signal_data_version(strategy))
+
+
+@st.cache_resource(show_spinner=False)
+def prerender_charts(version: str):
+    """每个数据版本只预渲染一次 Top10 K线"""
+    import chart_render
+
+    try:
+        chart_render.prerender_top10(version=version)
+    except Exception:
+        pass  # 云端只读文件系统，回退到现场渲染
+    return version
+
+
+def get_local_chart_svg(code: str):
+    """获取本地K线 SVG（已按数据版本预渲染）"""
+    import chart_render
+
+    version = prerender_charts(chart_render.data_version())
+    return chart_render.get_chart_svg(code, version=version)
+
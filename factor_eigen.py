@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 滚动协方差与特征分解
+Exponentially decayed factor / return covariance with incremental eigen updates
+
+【两个协方差】（衰减 λ = 0.5 ^ (1 / halflife)，Σ_t = λ Σ_{t-1} + (1 − λ) · 当日项，除以累计权重去偏）
+├── 因子协方差 K×K：当日项 = 打分因子（标准化 + 中性化后）的截面协方差（秩 ≤ K 的低秩增量）
+│   K = 7，特征分解直接对 K×K 做，代价可忽略
+└── 收益协方差 N×N：当日项 = r rᵀ（日收益率，均值按 0 处理，RiskMetrics 口径；停牌记 0）
+    不存 N×N 矩阵，只维护前 m = top_k + oversample 个特征对 U·diag(s)·Uᵀ，
+    每日秩 1 更新：在 [U, r⊥] 张成的 m+1 维子空间内做 (m+1)×(m+1) 特征分解后截断，O(N·m²)
+
+【输出】
+├── 因子：特征值、解释方差占比、特征向量（因子载荷）→ 可选对称正交化（Löwdin）后再打分
+└── 收益：前 top_k 特征值、解释方差占比（吸收比率，市场同涨同跌程度）、特征向量
+
+【状态】data/panel/eigen.npz（缺失或与矩阵行数不一致时从矩阵重建）
+├── f_cov / f_weight          因子协方差累计量与累计权重
+├── r_vecs / r_vals           收益协方差前 m 个特征对（未除权重）
+├── r_trace / r_weight        收益协方差的迹（总方差）与累计权重
+└── n_dates / halflife
+
+使用方法：
+    python factor_eigen.py report          # 打印因子与收益的特征结构
+    python factor_eigen.py rebuild         # 从矩阵重建状态
+    python factor_eigen.py verify          # 增量结果 vs 全量重算
+"""
+
+import os
+import time
+import argparse
+
+import numpy as np
+
+import factor_pipeline as fp
+import factor_neutralize
+from factor_pipeline import PANEL_DIR, FACTOR_COLUMNS
+
+EIGEN_FILE = 'eigen.npz'
+
+EIGEN_CONFIG = {
+    'halflife': 60,          # 衰减半衰期（交易日）
+    'top_k': 5,              # 对外输出的收益特征对个数
+    'oversample': 15,        # 额外保留的特征对（截断误差缓冲）
+    'min_names': 30,         # 当日有效股票数不足时不更新因子协方差
+    'orthogonalize': False,  # 打分前是否对因子做对称正交化
+}
+
+
+def decay(halflife: float = None) -> float:
+    return 0.5 ** (1.0 / (halflife or EIGEN_CONFIG['halflife']))
+
+
+# ==================== 因子协方差 ====================
+
+def cross_section_cov(factors: dict, names: tuple = FACTOR_COLUMNS) -> tuple:
+    """
+    逐日截面协方差（全部日期批量）
+
+    返回 (C float64[T, K, K], valid bool[T])；样本为全部因子有效的股票
+    """
+    cols = [np.asarray(factors[name], dtype=np.float64) for name in names]
+    mask = np.logical_and.reduce([np.isfinite(c) for c in cols])
+    n = mask.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for k, c in enumerate(cols):
+            c = np.where(mask, c, 0.0)
+            cols[k] = np.where(mask, c - c.sum(axis=1, keepdims=True) / n[:, None], 0.0)
+
+    K = len(names)
+    C = np.zeros((len(n), K, K))
+    for k in range(K):
+        for m in range(k, K):
+            C[:, k, m] = C[:, m, k] = (cols[k] * cols[m]).sum(axis=1)
+    valid = n >= max(EIGEN_CONFIG['min_names'], K + 1)
+    C[valid] /= (n[valid] - 1)[:, None, None]
+    return C, valid
+
+
+def ew_cov_series(C: np.ndarray, valid: np.ndarray, lam: float, cov0=None, weight0: float = 0.0) -> tuple:
+    """
+    衰减累计 Σ_t = λ Σ_{t-1} + (1 − λ) C_t（无效日跳过）
+
+    返回 (未除权重的 Σ [T, K, K], 累计权重 [T])
+    """
+    cov = np.zeros(C.shape[1:]) if cov0 is None else np.array(cov0, dtype=np.float64)
+    weight = float(weight0)
+    covs = np.empty_like(C)
+    weights = np.empty(len(C))
+    for t in range(len(C)):
+        if valid[t]:
+            cov = lam * cov + (1 - lam) * C[t]
+            weight = lam * weight + (1 - lam)
+        covs[t] = cov
+        weights[t] = weight
+    return covs, weights
+
+
+def orthogonalize(factors: dict, cov: np.ndarray, weight: np.ndarray, names: tuple = FACTOR_COLUMNS) -> dict:
+    """
+    对称正交化 F · Σ^(-1/2)（逐日，批量特征分解）
+
+    cov: 未除权重的 [T, K, K] 或 [K, K]；权重为 0 的日期原样保留
+    """
+    cov = np.asarray(cov, dtype=np.float64).reshape(-1, len(names), len(names))
+    weight = np.asarray(weight, dtype=np.float64).reshape(-1)
+    ready = weight > 0
+    sigma = np.where(ready[:, None, None], cov / np.where(ready, weight, 1.0)[:, None, None], np.eye(len(names)))
+
+    vals, vecs = np.linalg.eigh(sigma)
+    floor = np.maximum(vals[:, -1:], 1e-300) * 1e-10
+    inv_sqrt = np.einsum('tkj,tj,tlj->tkl', vecs, 1.0 / np.sqrt(np.maximum(vals, floor)), vecs)
+    inv_sqrt[~ready] = np.eye(len(names))
+
+    out = dict(factors)
+    for m, name in enumerate(names):
+        out[name] = sum(np.asarray(factors[k], dtype=np.float64) * inv_sqrt[:, i, m][:, None]
+                        for i, k in enumerate(names))
+    return out
+
+
+# ==================== 收益协方差（低秩） ====================
+
+def lowrank_update(vecs: np.ndarray, vals: np.ndarray, x: np.ndarray, lam: float, rank: int) -> tuple:
+    """
+    U·diag(s)·Uᵀ → λ·U·diag(s)·Uᵀ + (1 − λ)·x·xᵀ 的前 rank 个特征对
+
+    在 [U, x 的正交补方向] 上做 (m+1)×(m+1) 特征分解，不构造 N×N 矩阵
+    """
+    p = vecs.T @ x
+    r = x - vecs @ p
+    q = vecs.T @ r            # 二次正交化，抑制累计误差
+    r -= vecs @ q
+    p += q
+    rho = np.linalg.norm(r)
+
+    if rho > 1e-12 * max(np.linalg.norm(x), 1e-300):
+        basis = np.column_stack([vecs, r / rho])
+        z = np.append(p, rho)
+        d = np.append(vals, 0.0)
+    else:
+        basis, z, d = vecs, p, vals
+
+    small = lam * np.diag(d) + (1 - lam) * np.outer(z, z)
+    w, v = np.linalg.eigh(small)
+    order = np.argsort(w)[::-1][:rank]
+    return basis @ v[:, order], w[order]
+
+
+def daily_returns(panel: dict) -> np.ndarray:
+    """日收益率 float64[T, N]（首日与停牌为 0）"""
+    close = np.asarray(panel['close'], dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ret = close / fp.shift(close, 1) - 1
+    return np.where(np.isfinite(ret), ret, 0.0)
+
+
+def return_eigen_full(returns: np.ndarray, lam: float, k: int) -> dict:
+    """
+    全量重算参考：显式构造衰减加权 N×N 协方差并做完整特征分解
+
+    返回 {'vals', 'vecs', 'explained'}（已除累计权重）
+    """
+    T = len(returns)
+    w = (1 - lam) * lam ** np.arange(T - 1, -1, -1)
+    X = returns * np.sqrt(w)[:, None]
+    cov = X.T @ X
+    vals, vecs = np.linalg.eigh(cov)
+    vals, vecs = vals[::-1][:k], vecs[:, ::-1][:, :k]
+    weight = w.sum()
+    return {'vals': vals / weight, 'vecs': vecs, 'explained': vals / np.trace(cov)}
+
+
+# ==================== 状态 ====================
+
+def _factor_history(panel: dict) -> dict:
+    """全历史打分因子（标准化 + 中性化），用于重建"""
+    factors = fp.standardize_factors(fp.compute_raw_factors(panel))
+    return factor_neutralize.apply(factors, panel['dates'], panel['mcap'],
+                                   factor_neutralize.load_industry(panel['symbols']))
+
+
+def build_state(panel: dict, factors: dict = None) -> dict:
+    """
+    从矩阵重建状态
+
+    因子协方差整段批量；收益特征对逐日低秩更新（与每日增量为同一算法）
+    """
+    lam = decay()
+    rank = EIGEN_CONFIG['top_k'] + EIGEN_CONFIG['oversample']
+    T, N = panel['close'].shape
+
+    factors = factors if factors is not None else _factor_history(panel)
+    C, valid = cross_section_cov(factors)
+    covs, weights = ew_cov_series(C, valid, lam)
+
+    vecs, vals, trace, weight = np.zeros((N, 0)), np.zeros(0), 0.0, 0.0
+    for x in daily_returns(panel):
+        vecs, vals = lowrank_update(vecs, vals, x, lam, rank)
+        trace = lam * trace + (1 - lam) * float(x @ x)
+        weight = lam * weight + (1 - lam)
+
+    K = len(FACTOR_COLUMNS)
+    return {
+        'halflife': np.float64(EIGEN_CONFIG['halflife']),
+        'n_dates': np.int64(T),
+        'f_cov': covs[-1] if T else np.zeros((K, K)),
+        'f_weight': np.float64(weights[-1] if T else 0.0),
+        'r_vecs': vecs,
+        'r_vals': vals,
+        'r_trace': np.float64(trace),
+        'r_weight': np.float64(weight),
+    }
+
+
+def update_state(state: dict, factors: dict, returns: np.ndarray) -> dict:
+    """
+    加入一个交易日（返回新状态，不修改原状态）
+
+    factors: {因子: [1, N] 或 [N]}（标准化 + 中性化后）；returns: 当日收益率 [N]（NaN 记 0）
+    """
+    lam = decay(float(state['halflife']))
+    rank = EIGEN_CONFIG['top_k'] + EIGEN_CONFIG['oversample']
+    x = np.asarray(returns, dtype=np.float64)
+    x = np.where(np.isfinite(x), x, 0.0)
+
+    C, valid = cross_section_cov({name: np.asarray(factors[name]).reshape(1, -1) for name in FACTOR_COLUMNS})
+    covs, weights = ew_cov_series(C, valid, lam, state['f_cov'], float(state['f_weight']))
+    vecs, vals = lowrank_update(state['r_vecs'], state['r_vals'], x, lam, rank)
+
+    new_state = dict(state)
+    new_state.update({
+        'n_dates': np.int64(int(state['n_dates']) + 1),
+        'f_cov': covs[-1],
+        'f_weight': np.float64(weights[-1]),
+        'r_vecs': vecs,
+        'r_vals': vals,
+        'r_trace': np.float64(lam * float(state['r_trace']) + (1 - lam) * float(x @ x)),
+        'r_weight': np.float64(lam * float(state['r_weight']) + (1 - lam)),
+    })
+    return new_state
+
+
+def save_state(state: dict, panel_dir: str = PANEL_DIR):
+    path = os.path.join(panel_dir, EIGEN_FILE)
+    tmp = path + '.tmp.npz'
+    np.savez(tmp, **state)
+    os.replace(tmp, path)
+
+
+def load_state(panel: dict, panel_dir: str = PANEL_DIR) -> dict:
+    """读取状态；缺失、行数或半衰期不一致时从矩阵重建"""
+    try:
+        with np.load(os.path.join(panel_dir, EIGEN_FILE)) as data:
+            state = {k: data[k] for k in data.files}
+        if (int(state['n_dates']) == len(panel['dates'])
+                and float(state['halflife']) == EIGEN_CONFIG['halflife']
+                and state['r_vecs'].shape[0] == len(panel['symbols'])):
+            return state
+    except (OSError, KeyError, ValueError):
+        pass
+    return build_state(panel)
+
+
+def apply(factors: dict, state: dict) -> dict:
+    """单日调用点：按 EIGEN_CONFIG['orthogonalize'] 用状态中的因子协方差正交化"""
+    if not EIGEN_CONFIG['orthogonalize']:
+        return factors
+    return orthogonalize(factors, state['f_cov'], state['f_weight'])
+
+
+def apply_series(factors: dict) -> dict:
+    """全历史调用点：逐日使用截至当日的衰减协方差正交化"""
+    if not EIGEN_CONFIG['orthogonalize']:
+        return factors
+    C, valid = cross_section_cov(factors)
+    covs, weights = ew_cov_series(C, valid, decay())
+    return orthogonalize(factors, covs, weights)
+
+
+# ==================== 输出 ====================
+
+def _orient(vecs: np.ndarray) -> np.ndarray:
+    """特征向量符号约定：分量和为非负"""
+    return vecs * np.where(vecs.sum(axis=0) < 0, -1.0, 1.0)
+
+
+def summary(state: dict, top_k: int = None) -> dict:
+    """
+    特征结构摘要
+
+    返回 {'factor': {'vals', 'explained', 'loadings' [K, K]}, 'returns': {'vals', 'explained', 'vecs' [N, k]}}
+    """
+    top_k = top_k or EIGEN_CONFIG['top_k']
+    f_weight = float(state['f_weight'])
+    sigma = state['f_cov'] / f_weight if f_weight > 0 else np.zeros_like(state['f_cov'])
+    f_vals, f_vecs = np.linalg.eigh(sigma)
+    f_vals, f_vecs = f_vals[::-1], _orient(f_vecs[:, ::-1])
+
+    r_weight, r_trace = float(state['r_weight']), float(state['r_trace'])
+    r_vals = state['r_vals'][:top_k]
+    return {
+        'factor': {
+            'vals': f_vals,
+            'explained': f_vals / f_vals.sum() if f_vals.sum() > 0 else f_vals,
+            'loadings': f_vecs,
+        },
+        'returns': {
+            'vals': r_vals / r_weight if r_weight > 0 else r_vals,
+            'explained': r_vals / r_trace if r_trace > 0 else r_vals,
+            'vecs': _orient(state['r_vecs'][:, :top_k]),
+        },
+    }
+
+
+def verify(panel: dict) -> dict:
+    """
+    增量状态 vs 全量重算
+
+    返回 {'factor_max_abs_diff', 'return_val_rel_err', 'return_min_cos', 'incremental_s', 'full_s'}
+    """
+    lam = decay()
+    k = EIGEN_CONFIG['top_k']
+    factors = _factor_history(panel)
+    head = {'dates': panel['dates'][:-1], 'symbols': panel['symbols'],
+            **{field: panel[field][:-1] for field in fp.PANEL_FIELDS}}
+    state = build_state(head, {name: v[:-1] for name, v in factors.items()})
+
+    t0 = time.perf_counter()
+    state = update_state(state, {name: factors[name][-1] for name in FACTOR_COLUMNS}, daily_returns(panel)[-1])
+    incremental_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    full = return_eigen_full(daily_returns(panel), lam, k)
+    full_s = time.perf_counter() - t0
+    C, valid = cross_section_cov(factors)
+    covs, weights = ew_cov_series(C, valid, lam)
+
+    mine = summary(state, k)['returns']
+    cos = np.abs(np.sum(mine['vecs'] * full['vecs'], axis=0))
+    return {
+        'factor_max_abs_diff': float(np.max(np.abs(state['f_cov'] / float(state['f_weight'])
+                                                   - covs[-1] / weights[-1]))),
+        'return_val_rel_err': (np.abs(mine['vals'] - full['vals']) / full['vals']).tolist(),
+        'return_min_cos': float(cos.min()),
+        'incremental_s': incremental_s,
+        'full_s': full_s,
+    }
+
+
+def print_summary(info: dict, names: tuple = FACTOR_COLUMNS):
+    f, r = info['factor'], info['returns']
+    print("因子协方差特征结构（特征值 / 解释占比 / 载荷）")
+    print(f"{'':>6}{'val':>9}{'expl':>8}" + ''.join(f"{name:>11}" for name in names))
+    for i in range(len(f['vals'])):
+        print(f"{'PC' + str(i + 1):>6}{f['vals'][i]:>9.3f}{f['explained'][i]:>8.1%}"
+              + ''.join(f"{v:>11.3f}" for v in f['loadings'][:, i]))
+    print("收益协方差前几个特征值（日方差 / 解释占比）")
+    for i in range(len(r['vals'])):
+        print(f"{'PC' + str(i + 1):>6}{r['vals'][i]:>12.3e}{r['explained'][i]:>8.1%}")
+    print(f"吸收比率（前 {len(r['vals'])} 个合计）: {r['explained'].sum():.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EigenFlow rolling covariance / eigen monitor')
+    parser.add_argument('cmd', choices=['report', 'rebuild', 'verify'])
+    parser.add_argument('--panel', default=PANEL_DIR)
+    args = parser.parse_args()
+
+    panel = fp.load_panel(args.panel)
+    if args.cmd == 'rebuild':
+        t0 = time.perf_counter()
+        save_state(build_state(panel), args.panel)
+        print(f"特征状态已重建：{len(panel['dates'])} 日 × {len(panel['symbols'])} 只"
+              f"（{time.perf_counter() - t0:.2f}s）")
+    elif args.cmd == 'report':
+        print_summary(summary(load_state(panel, args.panel)))
+    else:
+        report = verify(panel)
+        print(f"因子协方差 max |Δ|: {report['factor_max_abs_diff']:.3e}")
+        print(f"收益特征值相对误差: {', '.join(f'{e:.2e}' for e in report['return_val_rel_err'])}")
+        print(f"收益特征向量最小 |cos|: {report['return_min_cos']:.6f}")
+        print(f"增量 {report['incremental_s'] * 1000:.1f} ms  全量 {report['full_s'] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
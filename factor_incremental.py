@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 因子增量更新
+Incremental one-day factor update with online rolling statistics
+
+【为什么】
+每晚只新增一个交易日，全量重算多年历史的滚动窗口浪费时间。
+这里为每只股票保存滚动状态，新增一天只做 O(股票数) 的计算。
+
+【滚动状态】data/panel/state.npz（窗口 W，按股票向量化）
+├── close_ring / ret_ring / turn_ring / vol_ring   最近 W 个值的环形缓冲（移出窗口的值）
+├── ret_mean / ret_m2 / ret_n                      日收益率滑动 Welford（均值、二阶矩、有效数）
+├── turn_sum / turn_n, vol_sum / vol_n             换手率、成交量滑动求和
+├── open_prev                                      前一交易日开盘价（回填 T-2 的 y_OTO）
+└── n_dates                                        状态对应的矩阵行数（与矩阵不一致时从矩阵重建）
+
+【流程】update <当日CSV>
+├── 读取当日截面（symbol, open, high, low, close, volume, turnover, mcap）
+├── 由状态算出当日原始因子 → 截面变换 → 中性化 →（可选正交化）→ 打分 → 前 N 追加到交易清单
+├── 回填 T-2 日入选股票的 y_OTO（T-1 日需等下一个开盘价）
+└── 矩阵追加一行，保存滚动状态与特征状态（factor_eigen，eigen.npz）
+
+verify: 在内存中执行增量更新，并与“追加后全量重算”的结果逐项对比
+
+使用方法：
+    python factor_incremental.py update <当日CSV> [--date 2026-02-09] [--out 文件]
+    python factor_incremental.py verify <当日CSV> [--date 2026-02-09]
+    python factor_incremental.py rebuild                # 从矩阵重建滚动状态
+"""
+
+import os
+import time
+import argparse
+
+import numpy as np
+
+import factor_pipeline as fp
+import factor_eigen
+import factor_neutralize
+from factor_pipeline import PANEL_DIR, PANEL_FIELDS, PIPELINE_CONFIG
+
+STATE_FILE = 'state.npz'
+
+# verify 容差（原始因子相对 / 绝对误差）
+VERIFY_TOLERANCE = 1e-9
+
+
+# ==================== 状态构建 ====================
+
+def build_state(panel: dict, window: int = None) -> dict:
+    """由矩阵最后 W(+1) 行构建滚动状态（向量化，一次性）"""
+    window = window or PIPELINE_CONFIG['window']
+    T, N = panel['close'].shape
+
+    def tail(field, n):
+        """最后 n 行（float32 → float64，与全量计算一致），不足时前补 NaN"""
+        out = np.full((n, N), np.nan)
+        k = min(n, T)
+        if k:
+            out[n - k:] = np.asarray(panel[field][T - k:], dtype=np.float64)
+        return out
+
+    closes = tail('close', window + 1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rets = closes[1:] / closes[:-1] - 1
+    turns = tail('turnover', window)
+    vols = tail('volume', window)
+
+    ret_valid = ~np.isnan(rets)
+    ret_n = ret_valid.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ret_mean = np.where(ret_n > 0, np.where(ret_valid, rets, 0.0).sum(axis=0) / ret_n, 0.0)
+    ret_m2 = np.where(ret_valid, (rets - ret_mean) ** 2, 0.0).sum(axis=0)
+
+    return {
+        'window': np.int64(window),
+        'n_dates': np.int64(T),
+        'last_date': np.int64(panel['dates'][-1] if T else 0),
+        'pos': np.int64(0),
+        'close_ring': closes[1:],
+        'ret_ring': rets,
+        'turn_ring': turns,
+        'vol_ring': vols,
+        'ret_mean': ret_mean,
+        'ret_m2': ret_m2,
+        'ret_n': ret_n.astype(np.int64),
+        'turn_sum': np.nansum(turns, axis=0),
+        'turn_n': (~np.isnan(turns)).sum(axis=0).astype(np.int64),
+        'vol_sum': np.nansum(vols, axis=0),
+        'vol_n': (~np.isnan(vols)).sum(axis=0).astype(np.int64),
+        'open_prev': tail('open', 1)[0],
+    }
+
+
+def save_state(state: dict, panel_dir: str = PANEL_DIR):
+    path = os.path.join(panel_dir, STATE_FILE)
+    tmp = path + '.tmp.npz'
+    np.savez(tmp, **state)
+    os.replace(tmp, path)
+
+
+def load_state(panel: dict, panel_dir: str = PANEL_DIR) -> dict:
+    """读取状态；缺失或与矩阵行数不一致时从矩阵重建"""
+    try:
+        with np.load(os.path.join(panel_dir, STATE_FILE)) as data:
+            state = {k: data[k] for k in data.files}
+        if int(state['n_dates']) == len(panel['dates']) and int(state['window']) == PIPELINE_CONFIG['window']:
+            return state
+    except (OSError, KeyError, ValueError):
+        pass
+    return build_state(panel)
+
+
+# ==================== 单日更新 ====================
+
+def _slide_sum(total, count, old, new):
+    """滑动求和：移出 old、加入 new（NaN 不计）"""
+    old_ok, new_ok = ~np.isnan(old), ~np.isnan(new)
+    total = total - np.where(old_ok, old, 0.0) + np.where(new_ok, new, 0.0)
+    count = count - old_ok + new_ok
+    total = np.where(count == 0, 0.0, total)  # 窗口清空时归零，避免误差累积
+    return total, count
+
+
+def _slide_welford(mean, m2, n, old, new):
+    """滑动窗口 Welford：先移出 old，再加入 new（NaN 不计）"""
+    mean, m2, n = mean.copy(), m2.copy(), n.copy()
+
+    rm = ~np.isnan(old)
+    n_after = n - rm
+    with np.errstate(invalid='ignore', divide='ignore'):
+        delta = old - mean
+        mean_rm = np.where(n_after > 0, mean - delta / n_after, 0.0)
+        m2_rm = np.where(n_after > 0, m2 - delta * (old - mean_rm), 0.0)
+    mean = np.where(rm, mean_rm, mean)
+    m2 = np.where(rm, m2_rm, m2)
+    n = n_after
+
+    add = ~np.isnan(new)
+    n_add = n + add
+    with np.errstate(invalid='ignore', divide='ignore'):
+        delta = new - mean
+        mean_add = mean + delta / n_add
+        m2_add = m2 + delta * (new - mean_add)
+    mean = np.where(add, mean_add, mean)
+    m2 = np.where(add, np.maximum(m2_add, 0.0), m2)
+    return mean, m2, n_add
+
+
+def update_state(state: dict, row: dict) -> tuple:
+    """
+    加入一个交易日，返回 (原始因子行, 新状态)
+
+    row: {字段: float64 数组[N]}（已按 float32 存储精度取整）
+    原始因子与 factor_pipeline.compute_raw_factors 的最后一行一致（y_OTO 为 NaN）
+    """
+    W = int(state['window'])
+    pos = int(state['pos'])
+    close, open_ = row['close'], row['open']
+
+    newest = (pos - 1) % W
+    prev_close = state['close_ring'][newest]
+    old_close = state['close_ring'][pos]      # close[t-W]
+    old_ret = state['ret_ring'][pos]
+    old_turn = state['turn_ring'][pos]
+    old_vol = state['vol_ring'][pos]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ret = close / prev_close - 1
+
+    ret_mean, ret_m2, ret_n = _slide_welford(state['ret_mean'], state['ret_m2'], state['ret_n'], old_ret, ret)
+    turn_sum, turn_n = _slide_sum(state['turn_sum'], state['turn_n'], old_turn, row['turnover'])
+    vol_sum, vol_n = _slide_sum(state['vol_sum'], state['vol_n'], old_vol, row['volume'])
+
+    new = dict(state)
+    for name, value in (('close_ring', close), ('ret_ring', ret),
+                        ('turn_ring', row['turnover']), ('vol_ring', row['volume'])):
+        ring = state[name].copy()
+        ring[pos] = value
+        new[name] = ring
+    new.update({
+        'pos': np.int64((pos + 1) % W),
+        'n_dates': np.int64(int(state['n_dates']) + 1),
+        'ret_mean': ret_mean, 'ret_m2': ret_m2, 'ret_n': ret_n,
+        'turn_sum': turn_sum, 'turn_n': turn_n,
+        'vol_sum': vol_sum, 'vol_n': vol_n,
+        'open_prev': open_,
+    })
+
+    full = lambda n: n == W  # noqa: E731  窗口内全部有效才输出
+    with np.errstate(invalid='ignore', divide='ignore'):
+        vol_mean = np.where(full(vol_n), vol_sum / W, np.nan)
+        raw = {
+            'rk_ret_20': close / old_close - 1,
+            'lowvol': np.where(full(ret_n), -np.sqrt(ret_m2 / (W - 1)), np.nan),
+            'lowturn': np.where(full(turn_n), -turn_sum / W, np.nan),
+            'rk_body': (close - open_) / open_,
+            'small': -np.log(row['mcap']),
+            'ret_1': ret,
+            'MV': np.log(row['volume'] / vol_mean),
+            'y_OTO': np.full(len(close), np.nan),
+        }
+    return raw, new
+
+
+def read_day_csv(path: str, symbols: list, date: str = None) -> tuple:
+    """
+    读取当日截面 CSV，按矩阵股票顺序对齐
+
+    返回 (日期 int, {字段: float64[N]}, 不在矩阵中的代码数)
+    矩阵中有但当日缺失的股票视为停牌（NaN）；新代码需全量 ingest 后才纳入
+    """
+    import pandas as pd
+
+    df = pd.read_csv(path, dtype={'symbol': str, 'code': str})
+    df.columns = [c.strip().lower() for c in df.columns]
+    code_col = 'symbol' if 'symbol' in df.columns else 'code'
+    codes = df[code_col].astype(str).str.strip().str.zfill(6)
+
+    if date is None:
+        date = str(df['date'].iloc[0])
+    date_int = int(str(date).replace('-', '')[:8])
+
+    index = {code: j for j, code in enumerate(symbols)}
+    cols = codes.map(index)
+    known = cols.notna().to_numpy()
+    cols = cols[known].astype(np.int64).to_numpy()
+
+    row = {}
+    for field in PANEL_FIELDS:
+        col = next((c for c in fp.FIELD_ALIASES.get(field, (field,)) if c in df.columns), None)
+        values = np.full(len(symbols), np.nan)
+        if col:
+            values[cols] = df[col].to_numpy(dtype=np.float64)[known]
+        # 与矩阵存储精度一致
+        row[field] = values.astype(np.float32).astype(np.float64)
+    return date_int, row, int((~known).sum())
+
+
+def _format_date(d: int) -> str:
+    s = str(int(d))
+    return f"{s[:4]}-{s[4:6]}-{s[6:]}"
+
+
+def trade_rows(panel: dict, date: int, raw: dict, mcap: np.ndarray, eigen: dict) -> tuple:
+    """
+    单日原始因子 → (标准化因子行, 得分行, 交易清单 DataFrame, 新特征状态)
+
+    eigen: factor_eigen 状态（截至前一交易日），加入当日因子与收益后用于可选的正交化
+    """
+    one = {name: values[None, :] for name, values in raw.items()}
+    factors = factor_neutralize.apply(fp.standardize_factors(one), np.array([date]), mcap[None, :],
+                                      factor_neutralize.load_industry(panel['symbols']))
+    eigen = factor_eigen.update_state(eigen, factors, raw['ret_1'])
+    factors = factor_eigen.apply(factors, eigen)
+    score = fp.score_factors(factors)
+    day_panel = {'dates': np.array([date], dtype=np.int32), 'symbols': panel['symbols']}
+    return factors, score, fp.build_trade_list(day_panel, factors, score), eigen
+
+
+def backfill_y_oto(trade_list, panel: dict, state: dict, row: dict):
+    """
+    回填 T-2 日入选股票的 y_OTO = open[T] / open[T-1] - 1
+
+    T-1 日的 y_OTO 仍需下一个交易日的开盘价
+    """
+    T = len(panel['dates'])
+    if T < 2 or trade_list.empty:
+        return trade_list
+
+    target = _format_date(panel['dates'][T - 2])
+    mask = (trade_list['date'].astype(str) == target).to_numpy()
+    if mask.any():
+        index = {code: j for j, code in enumerate(panel['symbols'])}
+        cols = trade_list.loc[mask, 'symbol'].astype(str).str.zfill(6).map(index).to_numpy(dtype=np.int64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            trade_list.loc[mask, 'y_OTO'] = row['open'][cols] / state['open_prev'][cols] - 1
+    return trade_list
+
+
+def update_day(day_csv: str, date: str = None, out: str = fp.DEFAULT_OUT,
+               panel_dir: str = PANEL_DIR, dry_run: bool = False) -> dict:
+    """
+    增量加入一个交易日
+
+    dry_run=True 时不写盘（verify 使用）
+    返回 {'date', 'row', 'raw', 'factors', 'score', 'rows', 'eigen', 'timings', 'skipped'}
+    """
+    import pandas as pd
+
+    timings = {}
+    with fp._stage(timings, 'load'):
+        panel = fp.load_panel(panel_dir)
+        state = load_state(panel, panel_dir)
+        eigen = factor_eigen.load_state(panel, panel_dir)
+        date_int, row, skipped = read_day_csv(day_csv, panel['symbols'], date)
+    if len(panel['dates']) and date_int <= int(panel['dates'][-1]):
+        raise ValueError(f"{date_int} 不晚于矩阵最后日期 {int(panel['dates'][-1])}")
+
+    with fp._stage(timings, 'update_state'):
+        raw, new_state = update_state(state, row)
+        new_state['last_date'] = np.int64(date_int)
+    with fp._stage(timings, 'trade_rows'):
+        factors, score, rows, new_eigen = trade_rows(panel, date_int, raw, row['mcap'], eigen)
+
+    if not dry_run:
+        with fp._stage(timings, 'write'):
+            if out and os.path.exists(out):
+                trade_list = pd.read_csv(out, index_col=0, dtype={'symbol': str})
+                trade_list = backfill_y_oto(trade_list, panel, state, row)
+                trade_list = pd.concat([trade_list, rows], ignore_index=True)
+            else:
+                trade_list = rows
+            if out:
+                trade_list.to_csv(out)
+            fp.append_panel_row(date_int, row, panel_dir)
+            save_state(new_state, panel_dir)
+            factor_eigen.save_state(new_eigen, panel_dir)
+
+    return {'date': date_int, 'row': row, 'raw': raw, 'factors': factors, 'score': score,
+            'rows': rows, 'eigen': new_eigen, 'timings': timings, 'skipped': skipped}
+
+
+# ==================== 校验 ====================
+
+def verify_day(day_csv: str, date: str = None, panel_dir: str = PANEL_DIR) -> dict:
+    """
+    增量结果 vs 追加后全量重算（均在内存中，不写盘）
+
+    返回 {'max_abs_diff': {因子: 误差}, 'ok': bool, 'same_top': bool, 'incremental_s', 'full_s'}
+    """
+    t0 = time.perf_counter()
+    result = update_day(day_csv, date, out=None, panel_dir=panel_dir, dry_run=True)
+    incremental_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    panel = fp.load_panel(panel_dir, mmap=False)
+    full_panel = {'dates': np.append(panel['dates'], result['date']).astype(np.int32),
+                  'symbols': panel['symbols']}
+    for field in PANEL_FIELDS:
+        full_panel[field] = np.vstack([panel[field], result['row'][field][None, :].astype(np.float32)])
+    raw_full = fp.compute_raw_factors(full_panel)
+    factors_full = factor_neutralize.apply(fp.standardize_factors({k: v[-1:] for k, v in raw_full.items()}),
+                                           full_panel['dates'][-1:], full_panel['mcap'][-1:],
+                                           factor_neutralize.load_industry(panel['symbols']))
+    if factor_eigen.EIGEN_CONFIG['orthogonalize']:
+        factors_full = factor_eigen.orthogonalize(factors_full, result['eigen']['f_cov'], result['eigen']['f_weight'])
+    score_full = fp.score_factors(factors_full)
+    rows_full = fp.build_trade_list({'dates': full_panel['dates'][-1:], 'symbols': panel['symbols']},
+                                    factors_full, score_full)
+    full_s = time.perf_counter() - t0
+
+    diffs = {}
+    ok = True
+    for name in fp.FACTOR_COLUMNS:
+        a, b = result['raw'][name], raw_full[name][-1]
+        both = np.isfinite(a) & np.isfinite(b)
+        diffs[name] = float(np.max(np.abs(a[both] - b[both]))) if both.any() else 0.0
+        ok &= bool(np.allclose(a, b, rtol=VERIFY_TOLERANCE, atol=VERIFY_TOLERANCE, equal_nan=True))
+
+    same_top = result['rows']['symbol'].tolist() == rows_full['symbol'].tolist()
+    return {'max_abs_diff': diffs, 'ok': bool(ok), 'same_top': same_top,
+            'incremental_s': incremental_s, 'full_s': full_s}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EigenFlow incremental factor update')
+    parser.add_argument('cmd', choices=['update', 'verify', 'rebuild'])
+    parser.add_argument('day_csv', nargs='?', help='当日截面 CSV')
+    parser.add_argument('--date', help='交易日（默认取 CSV 的 date 列）')
+    parser.add_argument('--out', default=fp.DEFAULT_OUT, help='交易清单路径')
+    args = parser.parse_args()
+
+    if args.cmd == 'rebuild':
+        panel = fp.load_panel()
+        save_state(build_state(panel))
+        print(f"滚动状态已重建：{len(panel['dates'])} 日 × {len(panel['symbols'])} 只")
+        return
+    if not args.day_csv:
+        parser.error('需要当日截面 CSV')
+
+    if args.cmd == 'update':
+        result = update_day(args.day_csv, args.date, out=args.out)
+        print(f"{_format_date(result['date'])}: 入选 {len(result['rows'])} 只，跳过新代码 {result['skipped']} 个")
+        for name, seconds in result['timings'].items():
+            print(f"  {name:<14}{seconds * 1000:>10.1f} ms")
+        print(f"→ {args.out}")
+    else:
+        report = verify_day(args.day_csv, args.date)
+        for name, diff in report['max_abs_diff'].items():
+            print(f"  {name:<12}{diff:>14.3e}")
+        print(f"原始因子一致: {report['ok']}  入选一致: {report['same_top']}")
+        print(f"增量 {report['incremental_s'] * 1000:.1f} ms  全量 {report['full_s'] * 1000:.1f} ms")
+        if not (report['ok'] and report['same_top']):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 因子截面中性化（市值 / 行业）
+Batched cross-sectional neutralization on size and industry dummies
+
+【模型】每个交易日 t、每个因子 y：
+    y = Σ_g a_g · 1[行业 = g] + b · log(总市值) + e        （OLS，取残差 e 作为中性化因子）
+
+【批量求解】（不逐日循环）
+├── 行业哑变量吸收截距：先在行业内去均值（Frisch–Waugh），哑变量不进入矩阵求逆
+├── 行业内求和：对 (日期, 行业) 做一次 bincount，全部日期一起完成
+├── 市值回归：T 个 K×K 正规方程（K = 连续暴露个数）用批量伪逆一次求解
+└── 各行只依赖本日数据，按日期分块计算（factor_parallel）与整表计算逐位一致
+
+【样本】暴露与全部待中性化因子均有效的股票；其余股票输出 NaN（其得分本就缺失）
+
+【设计矩阵缓存】DesignCache：按日期块保存 样本掩码 / 行业内去均值的暴露 / 正规方程伪逆 / 行业股票数
+├── 同一次计算的全部因子共用
+└── 同一进程内重复计算（权重搜索、增量更新）时，日期块、掩码与市值暴露均未变才复用
+
+【行业数据】data/industry.csv（symbol, industry）；缺失时取证券主数据（security_master）的行业，
+    两者都没有时全部股票视为同一行业（仅去截距与市值）
+"""
+
+import os
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+from factor_pipeline import APP_DIR, FACTOR_COLUMNS
+
+INDUSTRY_FILE = os.path.join(APP_DIR, 'data', 'industry.csv')
+
+NEUTRALIZE_CONFIG = {
+    'enabled': True,             # 打分前是否中性化
+    'factors': FACTOR_COLUMNS,   # 参与中性化的因子
+}
+
+UNKNOWN_INDUSTRY = '未知'
+
+
+# ==================== 暴露 ====================
+
+def load_industry(symbols: list, path: str = INDUSTRY_FILE) -> tuple:
+    """
+    读取行业分类，按 symbols 顺序编码
+
+    返回 (codes int32[N], 行业名列表)；industry.csv 缺失时取证券主数据的行业，仍未列出的股票归入“未知”
+    """
+    import pandas as pd
+
+    if path and os.path.exists(path):
+        df = pd.read_csv(path, dtype=str)
+        df.columns = [c.strip().lower() for c in df.columns]
+        mapping = dict(zip(df['symbol'].str.strip().str.zfill(6), df['industry'].str.strip()))
+        labels = [mapping.get(str(s).zfill(6)) or UNKNOWN_INDUSTRY for s in symbols]
+    else:
+        import security_master
+
+        labels = security_master.get_master().industry_of(symbols, UNKNOWN_INDUSTRY)
+        labels = [label or UNKNOWN_INDUSTRY for label in labels]
+
+    names, codes = np.unique(np.asarray(labels, dtype=object).astype(str), return_inverse=True)
+    return codes.astype(np.int32), names.tolist()
+
+
+def size_exposure(mcap: np.ndarray) -> np.ndarray:
+    """市值暴露 log(总市值)，float64[T, N]（非正值为 NaN）"""
+    mcap = np.asarray(mcap, dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(mcap > 0, np.log(mcap), np.nan)
+
+
+# ==================== 批量最小二乘 ====================
+
+def _group_index(T: int, codes: np.ndarray, n_groups: int) -> np.ndarray:
+    """(日期, 行业) 的扁平 bincount 下标，int64[T * N]"""
+    return (np.arange(T)[:, None] * n_groups + codes[None, :]).ravel()
+
+
+def _group_sums(values: np.ndarray, codes: np.ndarray, n_groups: int, index: np.ndarray = None) -> np.ndarray:
+    """每行按行业求和 → [T, G]（一次 bincount，逐行求和顺序固定）"""
+    T = values.shape[0]
+    if index is None:
+        index = _group_index(T, codes, n_groups)
+    return np.bincount(index, weights=values.ravel(), minlength=T * n_groups).reshape(T, n_groups)
+
+
+def _demean(values: np.ndarray, mask: np.ndarray, codes: np.ndarray, counts: np.ndarray,
+            index: np.ndarray = None) -> np.ndarray:
+    """样本内按行业去均值；样本外为 0"""
+    values = np.where(mask, values, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = _group_sums(values, codes, counts.shape[1], index) / np.maximum(counts, 1)
+    return np.where(mask, values - means[:, codes], 0.0)
+
+
+def build_designs(mask: np.ndarray, exposures: np.ndarray, codes: np.ndarray, n_groups: int) -> dict:
+    """
+    批量构建 T 个交易日的设计矩阵
+
+    mask: bool[T, N]；exposures: float64[T, N, K]
+    返回 {'mask', 'x' 行业内去均值暴露 [T, N, K], 'pinv' 正规方程伪逆 [T, K, K], 'counts' [T, G],
+          'index' 行业求和下标}
+    """
+    index = _group_index(mask.shape[0], codes, n_groups)
+    counts = _group_sums(mask.astype(np.float64), codes, n_groups, index)
+    K = exposures.shape[2]
+    x = np.stack([_demean(exposures[:, :, k], mask, codes, counts, index) for k in range(K)], axis=2)
+    gram = np.empty((mask.shape[0], K, K))
+    for k in range(K):
+        for m in range(k, K):
+            gram[:, k, m] = gram[:, m, k] = (x[:, :, k] * x[:, :, m]).sum(axis=1)
+    return {'mask': mask, 'x': x, 'pinv': np.linalg.pinv(gram), 'counts': counts, 'index': index}
+
+
+def residualize(y: np.ndarray, design: dict, codes: np.ndarray) -> np.ndarray:
+    """单个因子 [T, N] 对设计矩阵的 OLS 残差（样本外为 NaN）"""
+    mask, x, pinv = design['mask'], design['x'], design['pinv']
+    resid = _demean(y, mask, codes, design['counts'], design.get('index'))
+    xty = np.stack([(x[:, :, k] * resid).sum(axis=1) for k in range(x.shape[2])], axis=1)
+    beta = np.einsum('tkl,tl->tk', pinv, xty)
+    for k in range(x.shape[2]):
+        resid = resid - beta[:, k:k + 1] * x[:, :, k]
+    return np.where(mask, resid, np.nan)
+
+
+# ==================== 设计矩阵缓存 ====================
+
+class DesignCache:
+    """
+    按日期块缓存设计矩阵（绑定一组行业编码）
+
+    命中条件：日期块相同，且样本掩码与暴露的摘要相同；否则整块重建。
+    命中时直接返回缓存的批量数组，不再逐日拼接
+    """
+
+    def __init__(self, codes: np.ndarray, n_groups: int, max_blocks: int = 4):
+        self.codes = np.asarray(codes, dtype=np.int32)
+        self.n_groups = n_groups
+        self.max_blocks = max_blocks
+        self._blocks = OrderedDict()   # 日期摘要 -> (输入摘要, design)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return sum(len(design['mask']) for _, design in self._blocks.values())
+
+    def clear(self):
+        self._blocks.clear()
+
+    def get(self, dates: np.ndarray, mask: np.ndarray, exposures: np.ndarray) -> dict:
+        """返回与 dates 对齐的批量设计矩阵；日期块未缓存或掩码 / 暴露变化时重建"""
+        key = _digest(np.asarray(dates, dtype=np.int64))
+        stamp = _digest(mask, exposures)
+        entry = self._blocks.get(key)
+        if entry is not None and entry[0] == stamp:
+            self._blocks.move_to_end(key)
+            self.hits += len(dates)
+            return entry[1]
+
+        design = build_designs(mask, exposures, self.codes, self.n_groups)
+        self._blocks[key] = (stamp, design)
+        self._blocks.move_to_end(key)
+        while len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+        self.misses += len(dates)
+        return design
+
+
+def _digest(*arrays) -> bytes:
+    """数组内容摘要（形状 + 字节）"""
+    h = hashlib.blake2b(digest_size=16)
+    for a in arrays:
+        a = np.ascontiguousarray(a)
+        h.update(repr((a.dtype.str, a.shape)).encode())
+        h.update(a.data)
+    return h.digest()
+
+
+_caches = {}  # 行业编码摘要 -> DesignCache（进程内复用）
+
+
+def get_design_cache(codes: np.ndarray, n_groups: int) -> DesignCache:
+    key = (n_groups, np.asarray(codes, dtype=np.int32).tobytes())
+    if key not in _caches:
+        _caches.clear()
+        _caches[key] = DesignCache(codes, n_groups)
+    return _caches[key]
+
+
+# ==================== 入口 ====================
+
+def neutralize_factors(factors: dict, dates: np.ndarray, mcap: np.ndarray, industry: tuple,
+                       names: tuple = None, cache: DesignCache = None) -> dict:
+    """
+    对标准化因子做市值 + 行业中性化（返回新字典，未列出的因子原样保留）
+
+    industry: load_industry 的返回值 (codes, 行业名)
+    cache:    None 时使用进程内按行业编码共享的缓存
+    """
+    names = names or NEUTRALIZE_CONFIG['factors']
+    codes, groups = industry
+    if cache is None:
+        cache = get_design_cache(codes, len(groups))
+
+    size = size_exposure(mcap)
+    mask = np.isfinite(size)
+    for name in names:
+        mask &= np.isfinite(factors[name])
+    design = cache.get(np.asarray(dates), mask, size[:, :, None])
+
+    out = dict(factors)
+    for name in names:
+        out[name] = residualize(factors[name], design, cache.codes)
+    return out
+
+
+def apply(factors: dict, dates: np.ndarray, mcap: np.ndarray, industry: tuple) -> dict:
+    """流水线调用点：按 NEUTRALIZE_CONFIG['enabled'] 决定是否中性化"""
+    if not NEUTRALIZE_CONFIG['enabled']:
+        return factors
+    return neutralize_factors(factors, dates, mcap, industry)
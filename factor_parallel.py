@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 因子多进程分片计算
+Multi-process sharded factor computation over shared memory
+
+【分片方式】
+├── 输入矩阵与全部输出都放在 multiprocessing.shared_memory 中，
+│   子进程按名字映射同一块内存，任务参数只有分片区间（无 pickle 大数组）
+├── 阶段 1 时序因子：按股票分块（滚动窗口只沿时间轴，各列独立）
+└── 阶段 2 截面变换 + 中性化 + 打分：按日期分块（排名 / z-score / 截面回归只在同一行内）
+
+各分片调用与单进程完全相同的 factor_pipeline 函数，逐元素运算顺序不变，
+结果与单进程逐位一致（scaling_report 中 identical 列校验）。
+
+使用方法：
+    python factor_parallel.py [--max-procs 8]     # 在 data/panel 上报告 1~N 进程的加速比与效率
+"""
+
+import os
+import time
+import argparse
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import factor_pipeline as fp
+import factor_neutralize
+from factor_pipeline import PANEL_DIR, PANEL_FIELDS, FACTOR_COLUMNS
+
+RAW_NAMES = FACTOR_COLUMNS + ('y_OTO',)
+
+PARALLEL_CONFIG = {
+    'blocks_per_process': 4,   # 每个进程分到的任务块数（负载均衡）
+}
+
+
+# ==================== 共享内存 ====================
+
+def _create_shared(spec: dict) -> tuple:
+    """
+    按 {名字: (shape, dtype)} 创建共享数组
+
+    返回 (SharedMemory 列表, {名字: ndarray}, 描述 {名字: (shm 名, shape, dtype)})
+    """
+    shms, arrays, desc = [], {}, {}
+    for name, (shape, dtype) in spec.items():
+        nbytes = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        shms.append(shm)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        desc[name] = (shm.name, shape, np.dtype(dtype).str)
+    return shms, arrays, desc
+
+
+def _attach_shared(desc: dict) -> tuple:
+    """子进程按描述映射共享数组（不复制）"""
+    # 进程池子进程（fork / spawn）继承父进程的 resource_tracker，
+    # 映射时重复登记无副作用，由父进程 _release 统一 unlink
+    shms, arrays = [], {}
+    for name, (shm_name, shape, dtype) in desc.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        shms.append(shm)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    return shms, arrays
+
+
+def _release(shms: list):
+    for shm in shms:
+        try:
+            shm.close()
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# ==================== 子进程任务 ====================
+
+_worker = {}  # 子进程内：{'shms': [...], 'arrays': {...}, 'industry': (codes, 行业名)}
+
+
+def _init_worker(desc: dict, industry: tuple):
+    shms, arrays = _attach_shared(desc)
+    _worker['shms'] = shms
+    _worker['arrays'] = arrays
+    _worker['industry'] = industry
+
+
+def _timeseries_task(j0: int, j1: int):
+    """阶段 1：股票 [j0, j1) 的原始因子"""
+    arrays = _worker['arrays']
+    sub = {field: arrays[field][:, j0:j1] for field in PANEL_FIELDS}
+    raw = fp.compute_raw_factors(sub)
+    for name in RAW_NAMES:
+        arrays['raw_' + name][:, j0:j1] = raw[name]
+
+
+def _cross_section_task(t0: int, t1: int):
+    """阶段 2：日期 [t0, t1) 的截面变换与得分"""
+    arrays = _worker['arrays']
+    factors = fp.standardize_factors({name: arrays['raw_' + name][t0:t1] for name in RAW_NAMES})
+    factors = factor_neutralize.apply(factors, arrays['dates'][t0:t1], arrays['mcap'][t0:t1], _worker['industry'])
+    for name in RAW_NAMES:
+        arrays['f_' + name][t0:t1] = factors[name]
+    arrays['score'][t0:t1] = fp.score_factors(factors)
+
+
+def _blocks(n: int, k: int) -> list:
+    """把 [0, n) 切成 k 个近似等长区间"""
+    edges = np.linspace(0, n, max(min(k, n), 1) + 1).astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+# ==================== 计算入口 ====================
+
+def compute_serial(panel: dict) -> tuple:
+    """单进程参考路径：(标准化因子, 得分)"""
+    factors = fp.standardize_factors(fp.compute_raw_factors(panel))
+    factors = factor_neutralize.apply(factors, panel['dates'], panel['mcap'],
+                                      factor_neutralize.load_industry(panel['symbols']))
+    return factors, fp.score_factors(factors)
+
+
+def compute_parallel(panel: dict, processes: int = None, timings: dict = None) -> tuple:
+    """
+    多进程分片计算：(标准化因子, 得分)，与 compute_serial 逐位一致
+
+    timings: 传入字典时记录 setup / timeseries / cross_section / collect 各阶段秒数
+    """
+    processes = processes or os.cpu_count() or 1
+    timings = {} if timings is None else timings
+    T, N = panel['close'].shape
+    n_blocks = processes * PARALLEL_CONFIG['blocks_per_process']
+
+    spec = {field: ((T, N), np.float32) for field in PANEL_FIELDS}
+    spec['dates'] = ((T,), np.int32)
+    for name in RAW_NAMES:
+        spec['raw_' + name] = ((T, N), np.float64)
+        spec['f_' + name] = ((T, N), np.float64)
+    spec['score'] = ((T, N), np.float64)
+
+    t0 = time.perf_counter()
+    shms, arrays, desc = _create_shared(spec)
+    try:
+        for field in PANEL_FIELDS:
+            arrays[field][:] = panel[field]
+        arrays['dates'][:] = panel['dates']
+        industry = factor_neutralize.load_industry(panel['symbols'])
+
+        ctx = multiprocessing.get_context()
+        with ctx.Pool(processes, initializer=_init_worker, initargs=(desc, industry)) as pool:
+            timings['setup'] = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            pool.starmap(_timeseries_task, _blocks(N, n_blocks))
+            timings['timeseries'] = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            pool.starmap(_cross_section_task, _blocks(T, n_blocks))
+            timings['cross_section'] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        factors = {name: arrays['f_' + name].copy() for name in RAW_NAMES}
+        score = arrays['score'].copy()
+        timings['collect'] = time.perf_counter() - t0
+    finally:
+        _release(shms)
+    return factors, score
+
+
+def identical(a: tuple, b: tuple) -> bool:
+    """两组 (因子, 得分) 逐位相同（NaN 位置一致）"""
+    fa, sa = a
+    fb, sb = b
+    same = lambda x, y: x.shape == y.shape and np.array_equal(x.view(np.uint64), y.view(np.uint64))  # noqa: E731
+    return all(same(fa[name], fb[name]) for name in RAW_NAMES) and same(sa, sb)
+
+
+def scaling_report(panel: dict, max_procs: int = None) -> list:
+    """
+    1 ~ max_procs 进程的耗时、加速比与并行效率
+
+    baseline 为单进程串行路径；identical 为与其逐位比较的结果
+    """
+    max_procs = max_procs or os.cpu_count() or 1
+    t0 = time.perf_counter()
+    reference = compute_serial(panel)
+    serial_s = time.perf_counter() - t0
+
+    rows = [{'processes': 'serial', 'seconds': round(serial_s, 3), 'speedup': 1.0,
+             'efficiency': 1.0, 'identical': True}]
+    procs = sorted({1, *[p for p in (2, 4, 8, 16, 32, 64) if p < max_procs], max_procs})
+    for p in procs:
+        timings = {}
+        t0 = time.perf_counter()
+        result = compute_parallel(panel, p, timings)
+        seconds = time.perf_counter() - t0
+        rows.append({
+            'processes': p,
+            'seconds': round(seconds, 3),
+            'speedup': round(serial_s / seconds, 2),
+            'efficiency': round(serial_s / seconds / p, 2),
+            'identical': identical(result, reference),
+            'timings': {k: round(v, 3) for k, v in timings.items()},
+        })
+    return rows
+
+
+def print_report(rows: list, shape: tuple):
+    print(f"矩阵 {shape[0]} 日 × {shape[1]} 只，CPU {os.cpu_count()} 核")
+    print(f"{'processes':>10}{'seconds':>10}{'speedup':>10}{'efficiency':>12}{'identical':>11}")
+    for r in rows:
+        print(f"{r['processes']:>10}{r['seconds']:>10}{r['speedup']:>10}{r['efficiency']:>12}{str(r['identical']):>11}"
+              + (f"  {r['timings']}" if 'timings' in r else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EigenFlow sharded factor computation')
+    parser.add_argument('--max-procs', type=int, default=os.cpu_count())
+    parser.add_argument('--panel', default=PANEL_DIR)
+    args = parser.parse_args()
+
+    panel = fp.load_panel(args.panel, mmap=False)
+    print_report(scaling_report(panel, args.max_procs), panel['close'].shape)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 因子计算流水线
+Daily-bar ingestion and vectorized factor pipeline
+
+【流程】
+├── ingest:  每只股票一个日线 CSV → 稠密 日期×股票 矩阵（data/panel/{字段}.f32，缺失为 NaN）
+├── factors: 在整张矩阵上向量化计算滚动窗口与截面排名（不逐股票循环）
+├── neutralize: 对市值与行业哑变量做截面回归取残差（factor_neutralize.py，可关闭）
+├── orthogonalize: 可选，用衰减因子协方差做对称正交化（factor_eigen.py，默认关闭）
+├── score:   因子加权求和（FACTOR_WEIGHTS）
+└── trade list: 每个交易日取得分前 N → 与 trade_list_top10.csv 同格式
+
+【输入 CSV】data/bars/{code}.csv（列名不区分大小写）
+date, open, high, low, close, volume, turnover（换手率）, mcap（总市值）
+
+【因子定义】（窗口 W = PIPELINE_CONFIG['window']，默认 20）
+├── rk_ret_20  W 日收益率                      截面排名
+├── lowvol     −(W 日日收益率标准差)            截面排名
+├── lowturn    −(W 日平均换手率)                截面排名
+├── rk_body    当日实体 (close − open) / open   截面排名
+├── small      −log(总市值)                     截面排名
+├── ret_1      当日收益率                       截面 z-score
+├── MV         log(当日成交量 / W 日均量)       截面 z-score
+└── y_OTO      次日开盘 → 第三日开盘收益（标签，不参与打分）
+
+截面排名 = 百分位排名标准化为均值 0、标准差 1（取值约 ±1.73）
+每日增量更新（不重算历史）见 factor_incremental.py
+
+使用方法：
+    python factor_pipeline.py ingest <csv目录>      # 导入日线到 data/panel/
+    python factor_pipeline.py run [--out 文件] [--processes 8]   # 计算因子并生成交易清单
+    python factor_pipeline.py all <csv目录> [--out 文件]
+"""
+
+import os
+import json
+import time
+import argparse
+from contextlib import contextmanager
+
+import numpy as np
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+BARS_DIR = os.path.join(APP_DIR, 'data', 'bars')
+PANEL_DIR = os.path.join(APP_DIR, 'data', 'panel')
+DEFAULT_OUT = os.path.join(APP_DIR, 'data', 'trade_list_top10.csv')
+
+PANEL_FIELDS = ('open', 'high', 'low', 'close', 'volume', 'turnover', 'mcap')
+
+# 输入列别名
+FIELD_ALIASES = {
+    'turnover': ('turnover', 'turn', 'turnover_rate', 'turnover_ratio'),
+    'mcap': ('mcap', 'market_cap', 'total_mv', 'mktcap'),
+}
+
+PIPELINE_CONFIG = {
+    'window': 20,   # 滚动窗口（交易日）
+    'top_n': 10,    # 每日入选数
+}
+
+# 【打分权重】因子名 -> 权重
+FACTOR_WEIGHTS = {
+    'rk_ret_20': 1.0,
+    'small': 1.0,
+    'lowvol': 1.0,
+    'lowturn': 1.0,
+    'rk_body': 1.0,
+    'ret_1': 1.0,
+    'MV': 1.0,
+}
+
+FACTOR_COLUMNS = ('rk_ret_20', 'small', 'lowvol', 'lowturn', 'rk_body', 'ret_1', 'MV')
+
+
+# ==================== 计时 ====================
+
+@contextmanager
+def _stage(timings: dict, name: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - t0
+
+
+# ==================== 日线导入 ====================
+
+def read_daily_csv(path: str):
+    """读取单只股票日线 CSV，返回按日期排序的 (dates int32, {字段: float64 数组})"""
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    df.columns = [c.strip().lower() for c in df.columns]
+    # 与 ohlc_store.date_to_int 相同的规则，整列向量化
+    dates = df['date'].astype(str).str.replace('-', '').str[:8].astype(np.int32).to_numpy()
+    order = np.argsort(dates, kind='stable')
+
+    fields = {}
+    for field in PANEL_FIELDS:
+        col = next((c for c in FIELD_ALIASES.get(field, (field,)) if c in df.columns), None)
+        values = df[col].to_numpy(dtype=np.float64) if col else np.full(len(df), np.nan)
+        fields[field] = values[order]
+    return dates[order], fields
+
+
+def ingest_directory(src_dir: str) -> dict:
+    """
+    导入目录下全部 {code}.csv，构建稠密矩阵
+
+    【返回】panel 字典
+    ├── dates:   int32[T]（YYYYMMDD，全部股票日期并集，升序）
+    ├── symbols: list[N]（6 位代码）
+    └── 各字段:  float32[T, N]，该股票无数据的日期为 NaN
+    """
+    loaded = []
+    for name in sorted(os.listdir(src_dir)):
+        if name.endswith('.csv'):
+            dates, fields = read_daily_csv(os.path.join(src_dir, name))
+            loaded.append((name[:-4].strip().zfill(6), dates, fields))
+
+    all_dates = np.unique(np.concatenate([d for _, d, _ in loaded])) if loaded else np.zeros(0, np.int32)
+    panel = {
+        'dates': all_dates.astype(np.int32),
+        'symbols': [code for code, _, _ in loaded],
+    }
+    for field in PANEL_FIELDS:
+        panel[field] = np.full((len(all_dates), len(loaded)), np.nan, dtype=np.float32)
+
+    for j, (_, dates, fields) in enumerate(loaded):
+        rows = np.searchsorted(all_dates, dates)
+        for field in PANEL_FIELDS:
+            panel[field][rows, j] = fields[field]
+    return panel
+
+
+def _panel_files(panel_dir: str) -> dict:
+    files = {'meta': os.path.join(panel_dir, 'meta.json'), 'dates': os.path.join(panel_dir, 'dates.i4')}
+    for field in PANEL_FIELDS:
+        files[field] = os.path.join(panel_dir, f'{field}.f32')
+    return files
+
+
+def save_panel(panel: dict, panel_dir: str = PANEL_DIR):
+    """
+    写出矩阵（覆盖）
+
+    每个字段一个行主序 float32 文件，日期单独一个 int32 文件；
+    新交易日只需在末尾追加一行（append_panel_row）
+    """
+    os.makedirs(panel_dir, exist_ok=True)
+    files = _panel_files(panel_dir)
+    for field in PANEL_FIELDS:
+        np.ascontiguousarray(panel[field], dtype='<f4').tofile(files[field])
+    np.ascontiguousarray(panel['dates'], dtype='<i4').tofile(files['dates'])
+    with open(files['meta'], 'w', encoding='utf-8') as f:
+        json.dump({'symbols': list(panel['symbols']), 'fields': list(PANEL_FIELDS)}, f)
+
+
+def load_panel(panel_dir: str = PANEL_DIR, mmap: bool = True) -> dict:
+    """
+    读取矩阵（默认内存映射，只读）
+
+    行数以日期文件为准：追加中断时字段文件多出的半行会被忽略
+    """
+    files = _panel_files(panel_dir)
+    with open(files['meta'], 'r', encoding='utf-8') as f:
+        symbols = json.load(f)['symbols']
+    dates = np.fromfile(files['dates'], dtype='<i4')
+    shape = (len(dates), len(symbols))
+
+    panel = {'dates': dates, 'symbols': symbols}
+    for field in PANEL_FIELDS:
+        if shape[0] * shape[1] == 0:
+            panel[field] = np.zeros(shape, dtype=np.float32)
+        elif mmap:
+            panel[field] = np.memmap(files[field], dtype='<f4', mode='r', shape=shape)
+        else:
+            panel[field] = np.fromfile(files[field], dtype='<f4', count=shape[0] * shape[1]).reshape(shape)
+    return panel
+
+
+def append_panel_row(date: int, row: dict, panel_dir: str = PANEL_DIR):
+    """
+    追加一个交易日（O(股票数)）
+
+    row: {字段: float 数组[N]}，顺序与 meta.json 中的 symbols 一致；日期最后写入
+    """
+    files = _panel_files(panel_dir)
+    with open(files['meta'], 'r', encoding='utf-8') as f:
+        n_symbols = len(json.load(f)['symbols'])
+    n_dates = os.path.getsize(files['dates']) // 4
+
+    for field in PANEL_FIELDS:
+        with open(files[field], 'r+b') as f:
+            f.truncate(n_dates * n_symbols * 4)
+            f.seek(0, os.SEEK_END)
+            f.write(np.asarray(row[field], dtype='<f4').tobytes())
+    with open(files['dates'], 'ab') as f:
+        f.write(np.asarray([date], dtype='<i4').tobytes())
+
+
+# ==================== 向量化算子 ====================
+
+def shift(a: np.ndarray, k: int) -> np.ndarray:
+    """沿时间轴下移 k 行（k<0 上移），空出部分为 NaN"""
+    out = np.full(a.shape, np.nan, dtype=np.float64)
+    if k > 0:
+        out[k:] = a[:-k]
+    elif k < 0:
+        out[:k] = a[-k:]
+    else:
+        out[:] = a
+    return out
+
+
+def rolling_sums(a: np.ndarray, window: int):
+    """
+    滚动窗口内的 (和, 平方和)，窗口内有 NaN 时结果为 NaN
+
+    前缀和相减，O(T×N)，与窗口长度无关
+    """
+    valid = ~np.isnan(a)
+    filled = np.where(valid, a, 0.0).astype(np.float64)
+
+    def windowed(x):
+        c = np.cumsum(x, axis=0)
+        c[window:] = c[window:] - c[:-window]
+        return c
+
+    s = windowed(filled)
+    sq = windowed(filled * filled)
+    full = windowed(valid.astype(np.int64)) == window
+    s[~full] = np.nan
+    sq[~full] = np.nan
+    return s, sq
+
+
+def rolling_mean(a: np.ndarray, window: int) -> np.ndarray:
+    s, _ = rolling_sums(a, window)
+    return s / window
+
+
+def rolling_std(a: np.ndarray, window: int) -> np.ndarray:
+    """滚动样本标准差（ddof=1）"""
+    s, sq = rolling_sums(a, window)
+    var = (sq - s * s / window) / (window - 1)
+    return np.sqrt(np.maximum(var, 0.0))
+
+
+def cs_rank(a: np.ndarray) -> np.ndarray:
+    """截面百分位排名，标准化为均值 0、标准差 1（NaN 保持 NaN）"""
+    import pandas as pd
+
+    pct = pd.DataFrame(a).rank(axis=1, method='average').to_numpy()
+    n = np.sum(~np.isnan(a), axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        u = (pct - 0.5) / n
+    return (u - 0.5) * np.sqrt(12.0)
+
+
+def cs_zscore(a: np.ndarray) -> np.ndarray:
+    """截面 z-score（NaN 不参与）"""
+    valid = ~np.isnan(a)
+    n = valid.sum(axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(valid, a, 0.0).sum(axis=1, keepdims=True) / n
+        var = np.where(valid, (a - mean) ** 2, 0.0).sum(axis=1, keepdims=True) / (n - 1)
+        return (a - mean) / np.where(var > 0, np.sqrt(var), np.nan)
+
+
+# ==================== 因子 ====================
+
+def compute_raw_factors(panel: dict, window: int = None) -> dict:
+    """
+    原始（未排名）因子矩阵，float64[T, N]
+    """
+    window = window or PIPELINE_CONFIG['window']
+    open_ = np.asarray(panel['open'], dtype=np.float64)
+    close = np.asarray(panel['close'], dtype=np.float64)
+    volume = np.asarray(panel['volume'], dtype=np.float64)
+    turnover = np.asarray(panel['turnover'], dtype=np.float64)
+    mcap = np.asarray(panel['mcap'], dtype=np.float64)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ret = close / shift(close, 1) - 1
+        return {
+            'rk_ret_20': close / shift(close, window) - 1,
+            'lowvol': -rolling_std(ret, window),
+            'lowturn': -rolling_mean(turnover, window),
+            'rk_body': (close - open_) / open_,
+            'small': -np.log(mcap),
+            'ret_1': ret,
+            'MV': np.log(volume / rolling_mean(volume, window)),
+            'y_OTO': shift(open_, -2) / shift(open_, -1) - 1,
+        }
+
+
+# 截面变换：排名类 / z-score 类
+RANK_FACTORS = ('rk_ret_20', 'lowvol', 'lowturn', 'rk_body', 'small')
+ZSCORE_FACTORS = ('ret_1', 'MV')
+
+
+def standardize_factors(raw: dict) -> dict:
+    """对原始因子做截面变换（±inf 视为缺失，y_OTO 原样保留）"""
+    finite = {name: np.where(np.isfinite(raw[name]), raw[name], np.nan) for name in RANK_FACTORS + ZSCORE_FACTORS}
+    factors = {name: cs_rank(finite[name]) for name in RANK_FACTORS}
+    for name in ZSCORE_FACTORS:
+        factors[name] = cs_zscore(finite[name])
+    factors['y_OTO'] = raw['y_OTO']
+    return factors
+
+
+def score_factors(factors: dict, weights: dict = None) -> np.ndarray:
+    """加权得分；任一参与打分的因子缺失则为 NaN"""
+    weights = weights or FACTOR_WEIGHTS
+    score = np.zeros_like(next(iter(factors.values())))
+    for name, w in weights.items():
+        score = score + w * factors[name]
+    return score
+
+
+def build_trade_list(panel: dict, factors: dict, score: np.ndarray, top_n: int = None, last_n_days: int = None):
+    """每个交易日取得分前 top_n，输出与 trade_list_top10.csv 相同的列"""
+    import pandas as pd
+
+    top_n = top_n or PIPELINE_CONFIG['top_n']
+    T = len(panel['dates'])
+    start = max(T - last_n_days, 0) if last_n_days else 0
+
+    sub = np.where(np.isfinite(score[start:]), score[start:], -np.inf)
+    k = min(top_n, sub.shape[1])
+    top = np.argsort(-sub, axis=1, kind='stable')[:, :k]
+    rows = np.repeat(np.arange(start, T), k)
+    cols = top.ravel()
+    keep = np.isfinite(score[rows, cols])
+    rows, cols = rows[keep], cols[keep]
+
+    symbols = np.asarray(panel['symbols'])
+    dates = panel['dates'][rows].astype(str)
+    df = pd.DataFrame({
+        'date': [f"{d[:4]}-{d[4:6]}-{d[6:]}" for d in dates],
+        'symbol': symbols[cols],
+        'y_OTO': factors['y_OTO'][rows, cols],
+    })
+    for name in FACTOR_COLUMNS:
+        df[name] = factors[name][rows, cols]
+    df['score'] = score[rows, cols]
+    df['rank'] = df.groupby('date').cumcount().astype(float) + 1
+    return df
+
+
+# ==================== 流水线 ====================
+
+def run_pipeline(src_dir: str = None, out: str = DEFAULT_OUT, panel_dir: str = PANEL_DIR,
+                 processes: int = 1) -> dict:
+    """
+    运行流水线（src_dir 非空时先导入日线）
+
+    processes > 1 时因子与得分由 factor_parallel 多进程分片计算（结果逐位一致）
+
+    返回 {'trade_list': DataFrame, 'timings': {阶段: 秒}, 'shape': (T, N)}
+    """
+    timings = {}
+    if src_dir:
+        with _stage(timings, 'ingest'):
+            panel = ingest_directory(src_dir)
+        with _stage(timings, 'save_panel'):
+            save_panel(panel, panel_dir)
+    else:
+        with _stage(timings, 'load_panel'):
+            panel = load_panel(panel_dir)
+
+    import factor_eigen
+    import factor_neutralize
+
+    if processes > 1:
+        import factor_parallel
+
+        with _stage(timings, 'factors_parallel'):
+            factors, score = factor_parallel.compute_parallel(panel, processes)
+        if factor_eigen.EIGEN_CONFIG['orthogonalize']:
+            # 正交化依赖截至当日的历史协方差，不能按日期分块，在主进程完成
+            with _stage(timings, 'orthogonalize'):
+                factors = factor_eigen.apply_series(factors)
+                score = score_factors(factors)
+    else:
+        with _stage(timings, 'raw_factors'):
+            raw = compute_raw_factors(panel)
+        with _stage(timings, 'standardize'):
+            factors = standardize_factors(raw)
+        with _stage(timings, 'neutralize'):
+            factors = factor_neutralize.apply(factors, panel['dates'], panel['mcap'],
+                                              factor_neutralize.load_industry(panel['symbols']))
+        if factor_eigen.EIGEN_CONFIG['orthogonalize']:
+            with _stage(timings, 'orthogonalize'):
+                factors = factor_eigen.apply_series(factors)
+        with _stage(timings, 'score'):
+            score = score_factors(factors)
+    with _stage(timings, 'trade_list'):
+        trade_list = build_trade_list(panel, factors, score)
+
+    if out:
+        with _stage(timings, 'write'):
+            os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+            trade_list.to_csv(out)
+
+    return {'trade_list': trade_list, 'timings': timings, 'shape': panel['close'].shape}
+
+
+def _print_timings(result: dict):
+    T, N = result['shape']
+    print(f"矩阵 {T} 日 × {N} 只，交易清单 {len(result['trade_list'])} 行")
+    for name, seconds in result['timings'].items():
+        print(f"  {name:<14}{seconds * 1000:>10.1f} ms")
+    print(f"  {'total':<14}{sum(result['timings'].values()) * 1000:>10.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EigenFlow factor pipeline')
+    parser.add_argument('cmd', choices=['ingest', 'run', 'all'])
+    parser.add_argument('src', nargs='?', default=BARS_DIR, help='日线 CSV 目录')
+    parser.add_argument('--out', default=DEFAULT_OUT, help='交易清单输出路径')
+    parser.add_argument('--processes', type=int, default=1, help='因子计算进程数')
+    args = parser.parse_args()
+
+    if args.cmd == 'ingest':
+        t0 = time.perf_counter()
+        panel = ingest_directory(args.src)
+        save_panel(panel)
+        print(f"已导入 {len(panel['dates'])} 日 × {len(panel['symbols'])} 只 → {PANEL_DIR}"
+              f"（{time.perf_counter() - t0:.2f}s）")
+    else:
+        _print_timings(run_pipeline(args.src if args.cmd == 'all' else None, out=args.out,
+                                    processes=args.processes))
+        print(f"→ {args.out}")
+
+
+if __name__ == "__main__":
+    main()
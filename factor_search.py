@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 因子权重 walk-forward 搜索
+Parallel walk-forward search over factor weights
+
+【特征张量缓存】data/panel/features.f32 + y_oto.f32 + features.json
+├── features: float32[T, N, K]，K = FACTOR_COLUMNS（与打分相同：标准化 + 中性化 +（可选）正交化）
+├── y_oto:    float32[T, N]
+└── 矩阵内容摘要 / 行数 / 股票数 / 因子 / 中性化与正交化开关不一致时重建；搜索时以内存映射读取
+
+【批量评估】候选权重矩阵 W [C, K]（每行 L1 归一，第 0 行为当前 FACTOR_WEIGHTS）
+├── 一块日期 D：得分 S = W · Fᵀ → [D, C, N]（一次批量矩阵乘）
+├── 按值 partition 求每个 (日期, 候选) 第 top_n 大得分 → 入选掩码 × y_OTO 的批量矩阵乘 → 等权平均
+├── 得到 R [T, C]：每个候选每日的组合收益；因子缺失的股票不入选
+└── 日期分块在进程池中并行，子进程各自映射特征文件，只回传 R 的分块
+
+【walk-forward】训练窗 train_days → 间隔 embargo（y_OTO 覆盖其后两个交易日）→ 测试窗 test_days，
+按 test_days 滚动；训练窗内按 metric 选出最优候选，报告其样本外表现并与当前权重对比。
+R 只计算一次，各折只是切片。
+
+使用方法：
+    python factor_search.py [--candidates 2000] [--processes 8] [--train 250] [--test 60] [--out 文件]
+"""
+
+import os
+import json
+import hashlib
+import time
+import argparse
+import warnings
+
+import numpy as np
+
+import factor_pipeline as fp
+from factor_pipeline import PANEL_DIR, FACTOR_COLUMNS, FACTOR_WEIGHTS, PIPELINE_CONFIG
+
+FEATURE_FILE = 'features.f32'
+TARGET_FILE = 'y_oto.f32'
+FEATURE_META = 'features.json'
+
+SEARCH_CONFIG = {
+    'candidates': 2000,       # 候选权重个数（含当前权重）
+    'train_days': 250,        # 训练窗（交易日）
+    'test_days': 60,          # 测试窗 / 滚动步长
+    'embargo': 2,             # 训练窗与测试窗之间的间隔（y_OTO 的前视长度）
+    'metric': 'sharpe',       # 训练窗选优指标：sharpe / mean
+    'allow_short': False,     # 是否允许负权重
+    'chunk_mb': 256,          # 每块得分张量 [D, C, N] 的内存上限
+    'seed': 0,
+}
+
+
+# ==================== 特征张量缓存 ====================
+
+def _feature_files(panel_dir: str) -> dict:
+    return {
+        'features': os.path.join(panel_dir, FEATURE_FILE),
+        'target': os.path.join(panel_dir, TARGET_FILE),
+        'meta': os.path.join(panel_dir, FEATURE_META),
+    }
+
+
+def panel_digest(panel: dict) -> str:
+    """矩阵内容摘要（日期 / 代码 / 全部字段）：同日期重新导入修正后的日线也会使特征缓存失效"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(panel['dates'], dtype='<i4').data)
+    h.update(json.dumps(list(panel['symbols'])).encode())
+    for field in fp.PANEL_FIELDS:
+        h.update(np.ascontiguousarray(panel[field], dtype='<f4').data)
+    return h.hexdigest()
+
+
+def _feature_meta(panel: dict) -> dict:
+    import factor_eigen
+    import factor_neutralize
+
+    return {
+        'panel': panel_digest(panel),
+        'n_dates': int(len(panel['dates'])),
+        'last_date': int(panel['dates'][-1]) if len(panel['dates']) else 0,
+        'n_symbols': len(panel['symbols']),
+        'factors': list(FACTOR_COLUMNS),
+        'window': PIPELINE_CONFIG['window'],
+        'neutralize': bool(factor_neutralize.NEUTRALIZE_CONFIG['enabled']),
+        'orthogonalize': bool(factor_eigen.EIGEN_CONFIG['orthogonalize']),
+    }
+
+
+def build_features(panel: dict, panel_dir: str = PANEL_DIR, processes: int = 1) -> dict:
+    """计算打分因子并写出特征张量缓存，返回 meta"""
+    import factor_eigen
+    import factor_parallel
+
+    if processes > 1:
+        factors, _ = factor_parallel.compute_parallel(panel, processes)
+    else:
+        factors, _ = factor_parallel.compute_serial(panel)
+    factors = factor_eigen.apply_series(factors)
+
+    os.makedirs(panel_dir, exist_ok=True)
+    files = _feature_files(panel_dir)
+    T, N = panel['close'].shape
+    if T * N:
+        out = np.memmap(files['features'] + '.tmp', dtype='<f4', mode='w+', shape=(T, N, len(FACTOR_COLUMNS)))
+        for k, name in enumerate(FACTOR_COLUMNS):
+            out[:, :, k] = factors[name]
+        out.flush()
+        del out
+        os.replace(files['features'] + '.tmp', files['features'])
+    np.ascontiguousarray(factors['y_OTO'], dtype='<f4').tofile(files['target'])
+
+    meta = _feature_meta(panel)
+    with open(files['meta'], 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    return meta
+
+
+def load_features(panel: dict = None, panel_dir: str = PANEL_DIR, processes: int = 1) -> tuple:
+    """
+    读取特征张量（内存映射）；缺失或与矩阵 / 配置不一致时重建
+
+    返回 (features [T, N, K], y_oto [T, N], meta)
+    """
+    files = _feature_files(panel_dir)
+    panel = panel if panel is not None else fp.load_panel(panel_dir)
+    expected = _feature_meta(panel)
+    try:
+        with open(files['meta'], 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = None
+    if meta != expected:
+        meta = build_features(panel, panel_dir, processes)
+    return _map_features(files, meta) + (meta,)
+
+
+def _map_features(files: dict, meta: dict) -> tuple:
+    T, N, K = meta['n_dates'], meta['n_symbols'], len(meta['factors'])
+    if T * N == 0:
+        return np.zeros((T, N, K), np.float32), np.zeros((T, N), np.float32)
+    features = np.memmap(files['features'], dtype='<f4', mode='r', shape=(T, N, K))
+    target = np.memmap(files['target'], dtype='<f4', mode='r', shape=(T, N))
+    return features, target
+
+
+# ==================== 候选权重 ====================
+
+def candidate_weights(n: int, k: int = None, allow_short: bool = None, seed: int = None) -> np.ndarray:
+    """
+    候选权重 [n, K]，每行 L1 归一
+
+    第 0 行为当前 FACTOR_WEIGHTS；其余在单纯形上均匀采样（allow_short 时随机翻转符号）
+    """
+    k = k or len(FACTOR_COLUMNS)
+    allow_short = SEARCH_CONFIG['allow_short'] if allow_short is None else allow_short
+    rng = np.random.default_rng(SEARCH_CONFIG['seed'] if seed is None else seed)
+
+    weights = rng.dirichlet(np.ones(k), size=n)
+    if allow_short:
+        weights *= rng.choice([-1.0, 1.0], size=weights.shape)
+    weights[0] = [FACTOR_WEIGHTS.get(name, 0.0) for name in FACTOR_COLUMNS[:k]]
+    return weights / np.abs(weights).sum(axis=1, keepdims=True)
+
+
+# ==================== 批量评估 ====================
+
+_worker = {}  # 子进程内：{'features', 'target', 'weights', 'top_n', 'chunk'}
+
+
+def _init_worker(files: dict, meta: dict, weights: np.ndarray, top_n: int, chunk: int):
+    _worker['features'], _worker['target'] = _map_features(files, meta)
+    _worker['weights'] = np.asarray(weights, dtype=np.float32)
+    _worker['top_n'] = top_n
+    _worker['chunk'] = chunk
+
+
+def evaluate_block(features: np.ndarray, target: np.ndarray, weights: np.ndarray, top_n: int) -> np.ndarray:
+    """
+    一块日期上全部候选的前 top_n 等权收益
+
+    features [D, N, K]，target [D, N]，weights [C, K] → R [D, C]（无有效股票的日期为 NaN）
+    """
+    F = np.asarray(features, dtype=np.float32)
+    valid = np.isfinite(F).all(axis=2)
+    F = np.where(valid[:, :, None], F, 0.0).astype(np.float32)
+    y = np.where(valid, np.asarray(target, dtype=np.float32), np.nan)
+    penalty = np.where(valid, 0.0, -np.inf).astype(np.float32)
+
+    scores = np.matmul(np.asarray(weights, dtype=np.float32)[None], F.transpose(0, 2, 1))  # [D, C, N]
+    np.add(scores, penalty[:, None, :], out=scores)   # 因子缺失的股票不入选
+
+    # 第 top_n 大的得分作阈值（按值 partition，比 argpartition 取下标快约 3 倍），
+    # 入选掩码再与 [y, 有效] 做一次批量矩阵乘得到合计与个数
+    N = F.shape[1]
+    k = min(top_n, N)
+    if k == 0:
+        return np.full(scores.shape[:2], np.nan)
+    work = np.partition(scores, N - k, axis=2)
+    threshold = work[:, :, N - k:N - k + 1].copy()
+    picked = np.greater_equal(scores, threshold, out=work, casting='unsafe')   # 复用 partition 的缓冲区
+    has_y = np.isfinite(y)
+    stats = np.matmul(picked, np.stack([np.where(has_y, y, 0.0), has_y], axis=2).astype(np.float32))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(stats[:, :, 1] > 0, stats[:, :, 0].astype(np.float64) / stats[:, :, 1], np.nan)
+
+
+def _evaluate_task(t0: int, t1: int) -> tuple:
+    chunk = _worker['chunk']
+    out = [evaluate_block(_worker['features'][a:min(a + chunk, t1)], _worker['target'][a:min(a + chunk, t1)],
+                          _worker['weights'], _worker['top_n'])
+           for a in range(t0, t1, chunk)]
+    return t0, np.concatenate(out) if out else np.zeros((0, len(_worker['weights'])))
+
+
+def _chunk_dates(n_symbols: int, n_candidates: int) -> int:
+    per_date = max(n_symbols * n_candidates * 8, 1)   # 得分 + partition 副本（复用为入选掩码），float32
+    return max(SEARCH_CONFIG['chunk_mb'] * 2 ** 20 // per_date, 1)
+
+
+def evaluate_candidates(meta: dict, weights: np.ndarray, panel_dir: str = PANEL_DIR,
+                        processes: int = 1, top_n: int = None) -> np.ndarray:
+    """
+    全部日期 × 全部候选的每日组合收益 R [T, C]
+
+    processes > 1 时按日期分块在进程池中并行（与单进程结果相同）
+    """
+    import multiprocessing
+    from factor_parallel import _blocks
+
+    top_n = top_n or PIPELINE_CONFIG['top_n']
+    files = _feature_files(panel_dir)
+    T = meta['n_dates']
+    chunk = _chunk_dates(meta['n_symbols'], len(weights))
+    initargs = (files, meta, weights, top_n, chunk)
+
+    R = np.full((T, len(weights)), np.nan)
+    if processes > 1:
+        blocks = _blocks(T, processes * 4)
+        with multiprocessing.get_context().Pool(processes, initializer=_init_worker, initargs=initargs) as pool:
+            results = pool.starmap(_evaluate_task, blocks)
+    else:
+        _init_worker(*initargs)
+        results = [_evaluate_task(0, T)]
+        _worker.clear()
+    for t0, block in results:
+        R[t0:t0 + len(block)] = block
+    return R
+
+
+# ==================== walk-forward ====================
+
+def _metric(returns: np.ndarray) -> dict:
+    """按列统计：日均收益、年化夏普、胜率、有效天数"""
+    n = np.sum(np.isfinite(returns), axis=0)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        mean = np.nanmean(returns, axis=0)
+        std = np.nanstd(returns, axis=0, ddof=1)
+        hit = np.nanmean(np.where(np.isfinite(returns), returns > 0, np.nan), axis=0)
+    sharpe = np.where(std > 0, mean / np.where(std > 0, std, 1.0) * np.sqrt(252), np.nan)
+    return {'mean': mean, 'sharpe': sharpe, 'hit': hit, 'days': n}
+
+
+def make_folds(n_dates: int, train_days: int = None, test_days: int = None, embargo: int = None) -> list:
+    """滚动折：[(train_start, train_end, test_start, test_end)]（左闭右开）"""
+    train_days = train_days or SEARCH_CONFIG['train_days']
+    test_days = test_days or SEARCH_CONFIG['test_days']
+    embargo = SEARCH_CONFIG['embargo'] if embargo is None else embargo
+
+    folds = []
+    start = 0
+    while start + train_days + embargo < n_dates:
+        test_start = start + train_days + embargo
+        folds.append((start, start + train_days, test_start, min(test_start + test_days, n_dates)))
+        start += test_days
+    return folds
+
+
+def walk_forward(R: np.ndarray, weights: np.ndarray, dates: np.ndarray, folds: list, metric: str = None):
+    """
+    每折在训练窗内选最优候选，报告样本外表现（baseline = 第 0 行，当前权重）
+
+    返回 (每折 DataFrame, 拼接后的样本外汇总 dict)
+    """
+    import pandas as pd
+
+    metric = metric or SEARCH_CONFIG['metric']
+    rows, oos_best, oos_base = [], [], []
+    for i, (a, b, c, d) in enumerate(folds):
+        train = _metric(R[a:b])
+        score = np.where(np.isfinite(train[metric]), train[metric], -np.inf)
+        best = int(np.argmax(score))
+        test = _metric(R[c:d][:, [best, 0]])
+        oos_best.append(R[c:d, best])
+        oos_base.append(R[c:d, 0])
+        rows.append({
+            'fold': i + 1,
+            'train': f"{dates[a]}-{dates[b - 1]}",
+            'test': f"{dates[c]}-{dates[d - 1]}",
+            'best': best,
+            'train_' + metric: float(train[metric][best]),
+            'oos_mean_bp': float(test['mean'][0] * 1e4),
+            'oos_sharpe': float(test['sharpe'][0]),
+            'oos_hit': float(test['hit'][0]),
+            'base_mean_bp': float(test['mean'][1] * 1e4),
+            'base_sharpe': float(test['sharpe'][1]),
+            **{f"w_{name}": round(float(w), 4) for name, w in zip(FACTOR_COLUMNS, weights[best])},
+        })
+
+    summary = {}
+    if rows:
+        both = _metric(np.column_stack([np.concatenate(oos_best), np.concatenate(oos_base)]))
+        summary = {
+            'folds': len(rows),
+            'oos_days': int(both['days'][0]),
+            'oos_mean_bp': float(both['mean'][0] * 1e4),
+            'oos_sharpe': float(both['sharpe'][0]),
+            'base_mean_bp': float(both['mean'][1] * 1e4),
+            'base_sharpe': float(both['sharpe'][1]),
+        }
+    return pd.DataFrame(rows), summary
+
+
+def run_search(panel_dir: str = PANEL_DIR, n_candidates: int = None, processes: int = 1,
+               train_days: int = None, test_days: int = None) -> dict:
+    """
+    完整搜索：特征缓存 → 批量评估 → walk-forward
+
+    返回 {'folds': DataFrame, 'summary': dict, 'weights': [C, K], 'timings': {阶段: 秒}}
+    """
+    timings = {}
+    with fp._stage(timings, 'features'):
+        panel = fp.load_panel(panel_dir)
+        _, _, meta = load_features(panel, panel_dir, processes)
+    weights = candidate_weights(n_candidates or SEARCH_CONFIG['candidates'])
+    with fp._stage(timings, 'evaluate'):
+        R = evaluate_candidates(meta, weights, panel_dir, processes)
+    with fp._stage(timings, 'walk_forward'):
+        folds, summary = walk_forward(R, weights, np.asarray(panel['dates']),
+                                      make_folds(len(R), train_days, test_days))
+    return {'folds': folds, 'summary': summary, 'weights': weights, 'timings': timings,
+            'shape': (meta['n_dates'], meta['n_symbols'], len(weights))}
+
+
+def print_result(result: dict):
+    import pandas as pd
+
+    T, N, C = result['shape']
+    print(f"{T} 日 × {N} 只 × {C} 组候选权重")
+    for name, seconds in result['timings'].items():
+        print(f"  {name:<14}{seconds * 1000:>10.1f} ms")
+    if result['folds'].empty:
+        print("交易日不足以划分训练 / 测试窗")
+        return
+    with pd.option_context('display.width', 200, 'display.max_columns', 30):
+        print(result['folds'].round(3).to_string(index=False))
+    s = result['summary']
+    print(f"样本外 {s['folds']} 折 {s['oos_days']} 日：搜索权重 {s['oos_mean_bp']:.1f} bp/日 "
+          f"夏普 {s['oos_sharpe']:.2f}；当前权重 {s['base_mean_bp']:.1f} bp/日 夏普 {s['base_sharpe']:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EigenFlow walk-forward weight search')
+    parser.add_argument('--candidates', type=int, default=SEARCH_CONFIG['candidates'])
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--train', type=int, default=SEARCH_CONFIG['train_days'])
+    parser.add_argument('--test', type=int, default=SEARCH_CONFIG['test_days'])
+    parser.add_argument('--panel', default=PANEL_DIR)
+    parser.add_argument('--out', help='每折结果 CSV')
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    result = run_search(args.panel, args.candidates, args.processes, args.train, args.test)
+    print_result(result)
+    if args.out:
+        result['folds'].to_csv(args.out, index=False)
+        print(f"→ {args.out}")
+    print(f"总耗时 {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
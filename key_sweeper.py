@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+EigenFlow Key 生命周期批处理
+Batch key expiry sweep, lifecycle sets for the validator and state compaction
+
+【背景】validate_access_key 只在 Key 被使用时判断是否到期，到期 Key 的状态永远留在存储里；
+本任务定期（如每日收盘后 cron）一次性处理全部 Key
+
+【流程】
+├── 评估：读取全部 Key 状态，first_seen 转成 datetime64[D] 数组，一次向量化算出
+│   已用天数 / 剩余天数 / 到期日（规则与 core.validate_access_key 一致，含交易日模式）
+├── 生命周期集合：到期 Key 与吊销 Key 的 SHA-256 摘要写入 core.KEY_LIFECYCLE_FILE
+│   （临时文件 + 原子替换，与历史集合合并）；验证器按文件版本加载为哈希集合，命中直接拒绝
+├── 压缩：集合落盘之后再从状态存储删除到期 / 吊销 Key 的状态（文件重写 / SQLite DELETE + VACUUM /
+│   Redis HDEL），并删除早于 retention_days 的使用日志；顺序保证已删除状态的 Key 不会被重新激活
+└── 续期报告：剩余天数 ≤ renewal_days 的 Key（掩码、首次使用、到期日、剩余天数），可另存 CSV
+
+【续期】--renew KEY 把 Key 移出到期 / 吊销集合并清除其状态，下次使用时重新开始一个有效期
+
+使用方法：
+    python key_sweeper.py [--renewal-days 7] [--retention-days 90] [--report renewals.csv] [--dry-run]
+    python key_sweeper.py --revoke KEY [KEY ...]      # 吊销
+    python key_sweeper.py --renew KEY [KEY ...]       # 续期
+"""
+
+import os
+import json
+import time
+import argparse
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+SWEEP_CONFIG = {
+    'renewal_days': 7,        # 续期报告：剩余天数 ≤ 此值（单位同有效期）
+    'retention_days': 90,     # 使用日志保留天数（自然日），0 = 不清理
+    'drop_unknown': False,    # 是否删除已不在有效 Key 列表中的状态（Key 列表来源不可靠时勿开）
+}
+
+REPORT_COLUMNS = ('key', 'first_seen', 'expires_on', 'days_remaining')
+
+
+# ==================== 评估 ====================
+
+def key_today() -> date:
+    """与验证器一致的“今日”：自然日模式取本机日期，交易日模式取北京时间"""
+    from core import KEY_VALIDITY_UNIT
+
+    if KEY_VALIDITY_UNIT == 'trading':
+        import trading_calendar
+
+        return trading_calendar.now_shanghai().date()
+    return datetime.now().date()
+
+
+def evaluate_keys(states: dict, today: date = None) -> dict:
+    """
+    一次向量化计算全部 Key 的有效期
+
+    返回等长数组 {'keys', 'first_seen', 'days_used', 'days_remaining', 'expires_on', 'expired'}；
+    first_seen 缺失或无法解析（交易日模式下超出日历范围）的 Key 与验证器一样视为未到期，到期日为空
+    """
+    import pandas as pd
+    from core import KEY_VALIDITY_DAYS, KEY_VALIDITY_UNIT
+
+    today = today or key_today()
+    keys = np.array(list(states), dtype=object)
+    first_text = np.array([str(s.get('first_seen', '')) if isinstance(s, dict) else '' for s in states.values()],
+                          dtype=object)
+    first = pd.to_datetime(pd.Series(first_text, dtype=object), format='%Y-%m-%d', errors='coerce')
+    first = first.to_numpy(dtype='datetime64[D]')
+    known = ~np.isnat(first)
+
+    used = np.zeros(len(keys), dtype=np.int64)
+    expires = np.full(len(keys), np.datetime64('NaT'), dtype='datetime64[D]')
+    if KEY_VALIDITY_UNIT == 'trading':
+        import trading_calendar
+
+        cal = trading_calendar.get_calendar()
+        known &= (first >= np.datetime64(cal.start, 'D')) & (first <= np.datetime64(cal.end, 'D'))
+        ranks = cal.ranks(first[known]).astype(np.int64)
+        used[known] = int(cal.ranks([np.datetime64(today, 'D')])[0]) - ranks
+        expires[known] = cal.open_days_at(ranks - 1 + KEY_VALIDITY_DAYS)
+    else:
+        used[known] = (np.datetime64(today, 'D') - first[known]).astype(np.int64)
+        expires[known] = first[known] + np.timedelta64(KEY_VALIDITY_DAYS, 'D')
+
+    return {
+        'keys': keys,
+        'first_seen': np.where(known, first.astype(str), first_text),
+        'days_used': used,
+        'days_remaining': np.maximum(KEY_VALIDITY_DAYS - used, 0),
+        'expires_on': expires,
+        'expired': known & (used >= KEY_VALIDITY_DAYS),
+    }
+
+
+def renewal_report(evaluation: dict, renewal_days: int, exclude: np.ndarray = None):
+    """未到期且剩余天数 ≤ renewal_days 的 Key（掩码），按剩余天数升序"""
+    import pandas as pd
+    from core import mask_key
+
+    due = ~evaluation['expired'] & ~np.isnat(evaluation['expires_on'])
+    due &= evaluation['days_remaining'] <= renewal_days
+    if exclude is not None:
+        due &= ~exclude
+    report = pd.DataFrame({
+        'key': [mask_key(k) for k in evaluation['keys'][due]],
+        'first_seen': evaluation['first_seen'][due],
+        'expires_on': evaluation['expires_on'][due].astype(str),
+        'days_remaining': evaluation['days_remaining'][due],
+    }, columns=list(REPORT_COLUMNS))
+    return report.sort_values(['days_remaining', 'key'], kind='stable').reset_index(drop=True)
+
+
+# ==================== 生命周期集合 ====================
+
+def read_lifecycle(path: str = None) -> dict:
+    """当前集合 {'expired': {摘要: first_seen}, 'revoked': {摘要}}（每次读盘，验证器请用 core.load_key_lifecycle）"""
+    from core import KEY_LIFECYCLE_FILE
+
+    try:
+        with open(path or KEY_LIFECYCLE_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    return {'expired': dict(data.get('expired', {})), 'revoked': set(data.get('revoked', []))}
+
+
+def write_lifecycle(expired: dict, revoked: set, path: str = None):
+    """原子写入集合文件（验证器读取时不会看到半个文件）"""
+    from core import KEY_LIFECYCLE_FILE, KEY_VALIDITY_DAYS, KEY_VALIDITY_UNIT
+
+    path = path or KEY_LIFECYCLE_FILE
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    data = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'validity_days': KEY_VALIDITY_DAYS,
+        'unit': KEY_VALIDITY_UNIT,
+        'expired': dict(sorted(expired.items())),
+        'revoked': sorted(revoked),
+    }
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+
+# ==================== 批处理 ====================
+
+def sweep(renewal_days: int = None, retention_days: int = None, revoke: tuple = (), renew: tuple = (),
+          drop_unknown: bool = None, dry_run: bool = False, backend=None) -> dict:
+    """
+    评估 → 写生命周期集合 → 压缩状态存储 → 续期报告
+
+    dry_run 时只评估和出报告，不写文件也不改存储；存储读写失败直接抛出（批处理不吞错误）
+    """
+    import core
+
+    renewal_days = SWEEP_CONFIG['renewal_days'] if renewal_days is None else renewal_days
+    retention_days = SWEEP_CONFIG['retention_days'] if retention_days is None else retention_days
+    drop_unknown = SWEEP_CONFIG['drop_unknown'] if drop_unknown is None else drop_unknown
+    backend = backend or core.get_state_backend()
+
+    t0 = time.perf_counter()
+    states = backend.load_key_state()
+    evaluation = evaluate_keys(states)
+    seconds = time.perf_counter() - t0
+
+    lifecycle = read_lifecycle()
+    expired, revoked = lifecycle['expired'], lifecycle['revoked']
+    renew = {k.strip().upper() for k in renew}
+    for key, first_seen in zip(evaluation['keys'][evaluation['expired']],
+                               evaluation['first_seen'][evaluation['expired']]):
+        if key not in renew:
+            expired[core.key_digest(key)] = first_seen
+    revoked |= {core.key_digest(k) for k in revoke}
+    for key in renew:
+        expired.pop(core.key_digest(key), None)
+        revoked.discard(core.key_digest(key))
+
+    digests = np.array([core.key_digest(k) for k in evaluation['keys']], dtype=object)
+    is_revoked = np.isin(digests, list(revoked)) if revoked else np.zeros(len(digests), dtype=bool)
+    drop = set(evaluation['keys'][evaluation['expired'] | is_revoked]) | (renew & set(states))
+    if drop_unknown:
+        drop |= set(states) - set(core.load_valid_keys())
+
+    report = renewal_report(evaluation, renewal_days, exclude=is_revoked)
+    usage_removed = 0
+    if not dry_run:
+        write_lifecycle(expired, revoked)   # 先落盘集合，再删状态
+        backend.delete_keys(sorted(drop))
+        if retention_days > 0:
+            core.flush_usage_log()
+            usage_removed = backend.compact_usage(datetime.now() - timedelta(days=retention_days))
+
+    return {
+        'keys': len(states),
+        'expired': int(evaluation['expired'].sum()),
+        'revoked': int(is_revoked.sum()),
+        'dropped': len(drop),
+        'usage_removed': usage_removed,
+        'lifecycle_expired': len(expired),
+        'lifecycle_revoked': len(revoked),
+        'renewals': report,
+        'renewal_days': renewal_days,
+        'evaluate_seconds': seconds,
+        'dry_run': dry_run,
+    }
+
+
+def print_result(result: dict):
+    from core import key_validity_unit_label
+
+    unit = key_validity_unit_label()
+    action = '（演练，未写入）' if result['dry_run'] else ''
+    print(f"Key 状态 {result['keys']} 条：到期 {result['expired']}，吊销 {result['revoked']}，"
+          f"评估耗时 {result['evaluate_seconds'] * 1000:.1f} ms{action}")
+    print(f"删除状态 {result['dropped']} 条，清理使用日志 {result['usage_removed']} 条；"
+          f"集合内到期 {result['lifecycle_expired']} / 吊销 {result['lifecycle_revoked']}")
+    report = result['renewals']
+    print(f"{result['renewal_days']} {unit}内到期：{len(report)} 个")
+    for row in report.itertuples(index=False):
+        print(f"  {row.key:<18}首次使用 {row.first_seen}  到期 {row.expires_on}  剩余 {row.days_remaining} {unit}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EigenFlow key lifecycle sweep')
+    parser.add_argument('--renewal-days', type=int, default=SWEEP_CONFIG['renewal_days'])
+    parser.add_argument('--retention-days', type=int, default=SWEEP_CONFIG['retention_days'],
+                        help='使用日志保留天数，0 = 不清理')
+    parser.add_argument('--revoke', nargs='+', default=[], metavar='KEY')
+    parser.add_argument('--renew', nargs='+', default=[], metavar='KEY')
+    parser.add_argument('--drop-unknown', action='store_true', help='删除不在有效 Key 列表中的状态')
+    parser.add_argument('--report', help='续期报告另存为 CSV')
+    parser.add_argument('--dry-run', action='store_true')
+    args = parser.parse_args()
+
+    result = sweep(args.renewal_days, args.retention_days, args.revoke, args.renew,
+                   args.drop_unknown or None, args.dry_run)
+    print_result(result)
+    if args.report:
+        result['renewals'].to_csv(args.report, index=False, encoding='utf-8-sig')
+        print(f"续期报告已保存：{args.report}")
+
+
+if __name__ == "__main__":
+    main()
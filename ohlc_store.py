@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 本地日线行情存储
+Local daily OHLCV store
+
+【存储格式】
+├── 每个股票一个定长二进制文件：data/ohlc/{code}.bin
+├── 记录结构：date(int32, YYYYMMDD) + open/high/low/close(float32) + volume(float64)
+├── 读取：np.memmap 内存映射，只读、零拷贝
+├── 写入：按日期递增追加（旧日期自动跳过）
+└── 版本：每次写入刷新 data/ohlc/VERSION，读版本只 stat 这一个文件
+
+使用方法：
+    python ohlc_store.py import <csv目录>     # 导入 {code}.csv（date,open,high,low,close,volume）
+    python ohlc_store.py info [code]          # 查看存储概况
+"""
+
+import os
+import sys
+import time
+import hashlib
+
+import numpy as np
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+OHLC_DIR = os.path.join(APP_DIR, 'data', 'ohlc')
+VERSION_FILE = os.path.join(OHLC_DIR, 'VERSION')
+
+OHLC_DTYPE = np.dtype([
+    ('date', '<i4'),
+    ('open', '<f4'),
+    ('high', '<f4'),
+    ('low', '<f4'),
+    ('close', '<f4'),
+    ('volume', '<f8'),
+])
+
+_EMPTY = np.zeros(0, dtype=OHLC_DTYPE)
+
+
+def symbol_path(code) -> str:
+    """股票代码 → 存储文件路径"""
+    return os.path.join(OHLC_DIR, f"{str(code).strip().zfill(6)}.bin")
+
+
+def date_to_int(value) -> int:
+    """'2026-01-20' / 20260120 / datetime → 20260120"""
+    if hasattr(value, 'strftime'):
+        return int(value.strftime('%Y%m%d'))
+    return int(str(value).replace('-', '')[:8])
+
+
+def read_bars(code, last_n: int = None) -> np.ndarray:
+    """
+    读取单只股票日线（内存映射，只读）
+
+    返回结构化数组（OHLC_DTYPE），无数据时返回空数组
+    """
+    path = symbol_path(code)
+    try:
+        # 只映射完整记录：追加写入进行中时文件末尾可能有半条记录
+        n = os.path.getsize(path) // OHLC_DTYPE.itemsize
+        if n == 0:
+            return _EMPTY
+        bars = np.memmap(path, dtype=OHLC_DTYPE, mode='r', shape=(n,))
+    except (OSError, ValueError):
+        return _EMPTY
+
+    if last_n is not None:
+        return bars[-last_n:]
+    return bars
+
+
+def append_bars(code, bars) -> int:
+    """
+    追加日线（仅追加比已有最后日期更新的记录）
+
+    bars: 结构化数组，或 (date, open, high, low, close, volume) 元组列表
+    返回实际写入的条数
+    """
+    new = np.asarray(bars, dtype=OHLC_DTYPE) if not isinstance(bars, np.ndarray) else bars.astype(OHLC_DTYPE)
+    if len(new) == 0:
+        return 0
+
+    new = np.sort(new, order='date')
+    # 去除同日重复，保留最后一条
+    keep = np.append(new['date'][1:] != new['date'][:-1], True)
+    new = new[keep]
+
+    existing = read_bars(code, last_n=1)
+    if len(existing):
+        new = new[new['date'] > existing['date'][-1]]
+    if len(new) == 0:
+        return 0
+
+    os.makedirs(OHLC_DIR, exist_ok=True)
+    with open(symbol_path(code), 'ab') as f:
+        f.write(new.tobytes())
+    _touch_version()
+    return len(new)
+
+
+def _touch_version():
+    """刷新版本清单（写入方调用）"""
+    tmp = f"{VERSION_FILE}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        f.write(str(time.time_ns()))
+    os.replace(tmp, VERSION_FILE)
+
+
+def list_symbols() -> list:
+    """列出已存储的股票代码"""
+    if not os.path.isdir(OHLC_DIR):
+        return []
+    return sorted(name[:-4] for name in os.listdir(OHLC_DIR) if name.endswith('.bin'))
+
+
+def store_version() -> str:
+    """
+    存储版本号（VERSION 清单的大小 + 修改时间）
+
+    只 stat 一个文件，可在每次请求中调用；
+    清单缺失（旧存储或手工拷入文件）时退回 scan_version()
+    """
+    try:
+        st = os.stat(VERSION_FILE)
+    except OSError:
+        return scan_version()
+    return f"{st.st_size:x}{st.st_mtime_ns:x}"[-12:]
+
+
+def scan_version() -> str:
+    """逐文件计算版本（文件名 + 大小 + 修改时间），仅供 CLI / 清单缺失时使用"""
+    h = hashlib.md5()
+    if os.path.isdir(OHLC_DIR):
+        for entry in sorted(os.scandir(OHLC_DIR), key=lambda e: e.name):
+            if entry.name.endswith('.bin'):
+                st = entry.stat()
+                h.update(f"{entry.name}:{st.st_size}:{st.st_mtime_ns};".encode())
+    return h.hexdigest()[:12]
+
+
+def import_csv(code, csv_path: str) -> int:
+    """从 CSV 导入单只股票日线（date,open,high,low,close,volume）"""
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    df.columns = [c.strip().lower() for c in df.columns]
+    bars = np.zeros(len(df), dtype=OHLC_DTYPE)
+    bars['date'] = [date_to_int(d) for d in df['date']]
+    for col in ('open', 'high', 'low', 'close'):
+        bars[col] = df[col].to_numpy(dtype='float32')
+    bars['volume'] = df['volume'].to_numpy(dtype='float64') if 'volume' in df.columns else 0.0
+    return append_bars(code, bars)
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else 'info'
+
+    if cmd == 'import' and len(sys.argv) > 2:
+        src_dir = sys.argv[2]
+        total = 0
+        for name in sorted(os.listdir(src_dir)):
+            if name.endswith('.csv'):
+                n = import_csv(name[:-4], os.path.join(src_dir, name))
+                total += n
+                print(f"{name[:-4]}: +{n}")
+        if not os.path.exists(VERSION_FILE) and list_symbols():
+            _touch_version()
+        print(f"已导入 {total} 条日线，存储版本 {store_version()}")
+    elif cmd == 'info':
+        codes = sys.argv[2:] or list_symbols()
+        for code in codes:
+            bars = read_bars(code)
+            if len(bars):
+                print(f"{code}: {len(bars)} 条  {bars['date'][0]} ~ {bars['date'][-1]}")
+            else:
+                print(f"{code}: 无数据")
+        print(f"存储版本 {store_version()}")
+    else:
+        print(__doc__)
@@ -0,0 +1,143 @@
+"""
+EigenFlow 管理面板（隐藏页，?tab=admin）
+Admin performance panel
+"""
+
+import hmac
+from datetime import date, timedelta
+
+import streamlit as st
+
+import perf
+import usage_store
+import strategy_registry
+from perf import timed
+from core import SHARE_CONFIG, load_admin_key, log_queue_depth, get_state_backend, mask_key
+
+
+@timed
+def render_admin_login(admin_key: str) -> bool:
+    """管理员 Key 验证，通过后记录在 session_state"""
+    if st.session_state.get('admin_verified'):
+        return True
+
+    entered = st.text_input("Admin Key", type="password", key="admin_key_input")
+    if entered and hmac.compare_digest(entered.strip(), admin_key):
+        st.session_state.admin_verified = True
+        st.rerun()
+    elif entered:
+        st.error("❌ 无效的 Admin Key")
+    return False
+
+
+@timed
+def page_admin():
+    """
+    【管理面板】
+    - 各函数耗时 p50 / p95 / p99
+    - 进程内缓存命中率
+    - 日志写入队列深度、状态存储类型
+    - 内存：进程 RSS、共享数据、各会话独占部分
+    - 策略数据集缓存：已载入的策略、占用与淘汰次数
+    - 使用统计：按 Key 访问、多设备 Key、blocked 来源（usage_store 列式分区）
+    """
+    admin_key = load_admin_key()
+    if not admin_key:
+        st.info("管理面板未启用（未配置 admin key）")
+        return
+
+    if not render_admin_login(admin_key):
+        return
+
+    st.markdown('<div class="section-title">⏱️ 运行状态</div>', unsafe_allow_html=True)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("性能埋点", "已开启" if perf.PERF_ENABLED else "未开启")
+    col2.metric("日志队列深度", log_queue_depth())
+    col3.metric("状态存储", get_state_backend().name)
+
+    if not perf.PERF_ENABLED:
+        st.caption("设置环境变量 EF_PERF=1 并重启应用后开始采集。")
+
+    st.markdown('<div class="section-title">📈 函数耗时（毫秒）</div>', unsafe_allow_html=True)
+    timings = perf.timing_summary()
+    if timings:
+        st.dataframe(timings, use_container_width=True, hide_index=True)
+    else:
+        st.caption("暂无数据")
+
+    st.markdown('<div class="section-title">🗃️ 缓存命中率</div>', unsafe_allow_html=True)
+    caches = perf.cache_summary()
+    if caches:
+        st.dataframe(caches, use_container_width=True, hide_index=True)
+    else:
+        st.caption("暂无数据")
+
+    st.markdown('<div class="section-title">🧠 内存</div>', unsafe_allow_html=True)
+    memory = perf.memory_summary()
+    sessions = memory['sessions']
+    col1, col2, col3 = st.columns(3)
+    col1.metric("进程 RSS (MB)", memory['process_rss_mb'])
+    col2.metric("活跃会话", len(sessions))
+    col3.metric("平均每会话 (KB)", round(sum(r['kb'] for r in sessions) / len(sessions), 1) if sessions else '-')
+    if memory['shared']:
+        st.dataframe(memory['shared'], use_container_width=True, hide_index=True)
+    if sessions:
+        st.dataframe(sessions, use_container_width=True, hide_index=True)
+
+    if st.button("重置统计", key="admin_perf_reset"):
+        perf.reset()
+        st.rerun()
+
+    render_strategy_cache()
+    render_usage_stats()
+
+
+@timed
+def render_strategy_cache():
+    """策略数据集 LRU（strategy_registry，所有会话共享）"""
+    st.markdown('<div class="section-title">🧩 策略数据集</div>', unsafe_allow_html=True)
+    summary = strategy_registry.cache_summary()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("注册策略 / 已载入", f"{len(strategy_registry.list_strategies())} / {len(summary['entries'])}")
+    col2.metric("占用 / 上限 (MB)", f"{summary['mb']} / {summary['limit_mb']:.0f}")
+    col3.metric("淘汰次数", summary['evictions'])
+    if summary['entries']:
+        st.dataframe(summary['entries'], use_container_width=True, hide_index=True)
+
+
+@timed
+def render_usage_stats():
+    """使用日志统计（已压缩的日读列式分区，当日读原始日志）"""
+    st.markdown('<div class="section-title">📊 使用统计</div>', unsafe_allow_html=True)
+    summary = usage_store.usage_summary()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("列式分区", summary['partitions'])
+    col2.metric("分区大小 (KB)", round(summary['bytes'] / 1024, 1))
+    col3.metric("最近分区", summary['last'] or '-')
+
+    days = st.number_input("统计天数", min_value=1, max_value=90, value=7, key="admin_usage_days")
+    end = date.today()
+    start = end - timedelta(days=int(days) - 1)
+
+    key = st.text_input("按 Key 查询（完整 Key 或掩码）", key="admin_usage_key").strip().upper()
+    if key:
+        key_mask = key if '****' in key else mask_key(key)
+        st.dataframe(usage_store.accesses_by_key(key_mask, start, end), use_container_width=True, hide_index=True)
+
+    st.caption(f"单日设备数 > {SHARE_CONFIG['device_threshold']} 的 Key")
+    shared = usage_store.devices_per_key(start, end, min_devices=SHARE_CONFIG['device_threshold'] + 1)
+    if len(shared):
+        st.dataframe(shared, use_container_width=True, hide_index=True)
+    else:
+        st.caption("暂无数据")
+
+    st.caption("blocked 次数最多的来源（ip_hash）")
+    blocked = usage_store.blocked_by_ip(start, end)
+    if len(blocked):
+        st.dataframe(blocked, use_container_width=True, hide_index=True)
+    else:
+        st.caption("暂无数据")
+
+    if st.button("压缩已结束的日志", key="admin_usage_compact"):
+        result = usage_store.compact()
+        st.success(f"已压缩 {len(result['days'])} 天，{result['rows']} 行")
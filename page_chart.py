@@ -0,0 +1,126 @@
+"""
+EigenFlow 行情视图页
+Chart page
+"""
+
+import streamlit as st
+
+from core import (
+    validate_access_key,
+    load_signal_day,
+    get_tradingview_symbol,
+    get_local_chart_svg,
+)
+from perf import timed
+from widgets import render_tradingview_chart, render_local_chart, render_strategy_picker, render_watermark
+
+
+@timed
+def page_chart(key_verified: bool = False):
+    """
+    【行情视图页】
+    - TradingView 合规嵌入
+    - 图表下方标注免责声明
+    - 需要 Key 验证
+    """
+    st.markdown("""
+    <div class="date-label" style="font-size:1em; font-weight:600; color:#374151;">
+        📈 行情视图
+    </div>
+    """, unsafe_allow_html=True)
+
+    # 未验证 Key 时显示锁定状态
+    if not key_verified:
+        st.markdown("""
+        <div class="locked-prompt">
+            <div class="locked-prompt-icon">🔒</div>
+            <div class="locked-prompt-title">行情视图需订阅后解锁</div>
+            <div class="locked-prompt-text">
+                请输入 Access Key 验证身份
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+        # Key 验证入口
+        st.markdown("""
+        <div class="input-group">
+            <div class="input-label">🔐 输入 Access Key 解锁</div>
+        """, unsafe_allow_html=True)
+
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            chart_key = st.text_input(
+                "Access Key",
+                type="password",
+                placeholder="EF-26Q1-XXXXXXXX",
+                label_visibility="collapsed",
+                key="chart_key_input"
+            )
+        with col2:
+            chart_confirm = st.button("解锁", use_container_width=True, type="primary")
+
+        st.markdown("</div>", unsafe_allow_html=True)
+
+        # 验证逻辑
+        if chart_confirm and chart_key:
+            result = validate_access_key(chart_key)
+            if result['valid']:
+                st.session_state.verified_key = chart_key
+                st.session_state.verified_key_mask = result['key']
+                st.success("✅ 验证成功！")
+                st.rerun()
+            else:
+                if result.get('expired'):
+                    st.error(f"❌ Key 已到期")
+                else:
+                    st.error("❌ 无效的 Access Key")
+
+        # 快捷入口
+        if st.button("→ 获取 Access Key", type="secondary", use_container_width=True):
+            st.session_state.target_tab = 2
+            st.rerun()
+
+        render_watermark(mode="trial")
+        return
+
+    # 已验证 Key，加载图表（与信号清单页同一策略、同一信号日）
+    strategy_id = render_strategy_picker(st.session_state.get('verified_key'))
+    if strategy_id is None:
+        st.warning("该 Access Key 未开通任何策略，如有疑问请联系作者")
+        return
+    _, df = load_signal_day(strategy=strategy_id)
+
+    if df.empty:
+        st.warning("暂无信号数据")
+        return
+
+    if 'symbol' not in df.columns:
+        st.error("数据格式错误：缺少 symbol 列")
+        return
+
+    # 共享信号帧的切片（不复制；代码已统一为 6 位）
+    df_top10 = df.head(10)
+    codes = df_top10['symbol'].astype(str).tolist()
+    names = df_top10['name'].astype(str).tolist() if 'name' in df_top10.columns else codes
+
+    # 股票选择器
+    stock_options = [f"{code} · {name}" if name and name != code else code for code, name in zip(codes, names)]
+
+    if not stock_options:
+        st.warning("无法生成股票选项")
+        return
+
+    selected = st.selectbox("选择股票", options=stock_options, index=0, label_visibility="visible", key="chart_select")
+    fast_mode = st.toggle("⚡ 极速模式（本地K线）", key="chart_fast_mode")
+
+    if selected:
+        selected_code = selected.split(" · ")[0]
+        if fast_mode:
+            render_local_chart(selected_code)
+        else:
+            symbol = get_tradingview_symbol(selected_code)
+            render_tradingview_chart(symbol, fallback_svg=get_local_chart_svg(selected_code))
+
+    # 水印
+    key_mask = st.session_state.get('verified_key_mask', None)
+    render_watermark(key_mask)
@@ -0,0 +1,153 @@
+"""
+EigenFlow 历史信号页
+Signal history browser
+"""
+
+import streamlit as st
+
+from core import load_signal_history, load_signal_bootstrap, format_stock_code
+from perf import timed
+from signal_history import get_day, get_exits
+from strategy_registry import get_strategy
+from widgets import render_strategy_picker, render_watermark
+
+HISTORY_PAGE_SIZE = 5  # 每页信号卡片数
+
+
+def _shift_date(dates: list, step: int):
+    """前一日 / 后一日按钮回调"""
+    i = dates.index(st.session_state.history_date) + step
+    if 0 <= i < len(dates):
+        st.session_state.history_date = dates[i]
+        st.session_state.history_page = 0
+
+
+def _reset_page():
+    """切换日期后回到第一页"""
+    st.session_state.history_page = 0
+
+
+def _shift_page(step: int, page_count: int):
+    """翻页按钮回调"""
+    page = st.session_state.get('history_page', 0) + step
+    st.session_state.history_page = min(max(page, 0), page_count - 1)
+
+
+@timed
+def render_history_card(row):
+    """渲染历史信号卡片（带新进标记）"""
+    code = format_stock_code(row.get('symbol', ''))
+    name = row.get('name', '')
+    rank = int(row.get('rank', 0))
+    score = row.get('score', 0)
+    badge = '<span class="signal-badge-entry">新进</span>' if row.get('is_entry') else ''
+
+    st.markdown(f"""
+    <div class="signal-card signal-other">
+        <div class="label">模型输出结果 #{rank} {badge}</div>
+        <div class="stock-code">{code} <span class="stock-name">{name}</span></div>
+        <div class="signal-score" style="margin-top:4px;">因子得分：{score:.2f}</div>
+    </div>
+    """, unsafe_allow_html=True)
+
+
+@timed
+def render_performance(result: dict, top_n: int = 10):
+    """Top N 等权表现：点估计 + 区块自助置信区间"""
+    stats = result['stats']
+    if not stats:
+        return
+
+    st.markdown(f'<div class="section-title">📊 历史表现（Top{top_n} 等权，{result["level"]:.0%} 置信区间）</div>',
+                unsafe_allow_html=True)
+    col1, col2, col3 = st.columns(3)
+    for col, name, label, fmt in ((col1, 'mean', '日均收益', '{:.2%}'), (col2, 'sharpe', '年化夏普', '{:.2f}'),
+                                  (col3, 'hit_rate', '胜率', '{:.1%}')):
+        s = stats[name]
+        col.metric(label, fmt.format(s['point']))
+        col.caption(f"[{fmt.format(s['low'])}, {fmt.format(s['high'])}]")
+    st.caption(f"{result['start']} ~ {result['end']} 共 {result['n_days']} 个交易日；"
+               f"平稳区块自助法 {result['paths']} 条路径，平均区块 {result['block']:.1f} 日")
+
+
+@timed
+def page_history(key_mask: str):
+    """
+    【历史信号页】
+    - 按交易日浏览所选策略（Key 范围内）的全部历史
+    - 索引按数据版本构建一次，翻日只切片当日行
+    - 卡片分页渲染；标注新进与移出
+    - 页尾附 Top N 表现的区块自助置信区间（按策略、数据版本计算一次）
+    """
+    strategy_id = render_strategy_picker(st.session_state.get('verified_key'))
+    if strategy_id is None:
+        st.warning("该 Access Key 未开通任何策略，如有疑问请联系作者")
+        return
+
+    index = load_signal_history(strategy_id)
+    dates = index['dates']
+    if not dates:
+        st.error("❌ 暂无历史信号数据")
+        return
+
+    if st.session_state.get('history_date') not in index['pos']:
+        st.session_state.history_date = dates[-1]
+        st.session_state.history_page = 0
+
+    # ========== 日期导航 ==========
+    col_prev, col_date, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        st.button("← 前一日", use_container_width=True, on_click=_shift_date, args=(dates, -1),
+                  disabled=st.session_state.history_date == dates[0], key="history_prev")
+    with col_date:
+        st.selectbox("交易日", options=dates[::-1], key="history_date",
+                     label_visibility="collapsed", on_change=_reset_page)
+    with col_next:
+        st.button("后一日 →", use_container_width=True, on_click=_shift_date, args=(dates, 1),
+                  disabled=st.session_state.history_date == dates[-1], key="history_next")
+
+    date = st.session_state.history_date
+    day = get_day(index, date)
+    exits = get_exits(index, date)
+
+    entries = int(day['is_entry'].sum())
+    st.markdown(f"""
+    <div class="date-label">📅 {date} · 共 {len(day)} 只 · 新进 {entries} · 移出 {len(exits)}</div>
+    """, unsafe_allow_html=True)
+
+    # ========== 分页渲染 ==========
+    page_count = max((len(day) + HISTORY_PAGE_SIZE - 1) // HISTORY_PAGE_SIZE, 1)
+    page = min(st.session_state.get('history_page', 0), page_count - 1)
+    start = page * HISTORY_PAGE_SIZE
+
+    for _, row in day.iloc[start:start + HISTORY_PAGE_SIZE].iterrows():
+        render_history_card(row)
+
+    if page_count > 1:
+        col_a, col_b, col_c = st.columns([1, 2, 1])
+        with col_a:
+            st.button("上一页", use_container_width=True, on_click=_shift_page, args=(-1, page_count),
+                      disabled=page == 0, key="history_page_prev")
+        with col_b:
+            st.caption(f"第 {page + 1} / {page_count} 页")
+        with col_c:
+            st.button("下一页", use_container_width=True, on_click=_shift_page, args=(1, page_count),
+                      disabled=page == page_count - 1, key="history_page_next")
+
+    # ========== 移出列表 ==========
+    if len(exits):
+        codes = '、'.join(format_stock_code(s) for s in exits['symbol'])
+        st.markdown('<div class="section-title">📤 较前一交易日移出</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="disclaimer-bar"><span class="signal-badge-exit">移出</span> {codes}</div>',
+                    unsafe_allow_html=True)
+
+    render_performance(load_signal_bootstrap(strategy_id), get_strategy(strategy_id).top_n or 10)
+
+    st.markdown("---")
+    st.markdown("""
+    <div class="disclaimer-bar">
+        历史信号仅用于研究回顾，历史表现不代表未来结果。
+    </div>
+    """, unsafe_allow_html=True)
+
+    render_watermark(key_mask)
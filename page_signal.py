@@ -0,0 +1,65 @@
+"""
+EigenFlow 信号清单页
+Signal list page
+"""
+
+import os
+
+import streamlit as st
+
+from core import load_signal_day
+from perf import timed
+from snapshot import SNAPSHOT_ENABLED, build_signal_page_html, get_snapshot
+from strategy_registry import get_strategy
+from trading_calendar import signal_session
+from widgets import render_access_key_display, render_signal_push, render_strategy_picker, render_watermark
+
+
+@timed
+def page_signal_list(key_mask: str):
+    """
+    【信号清单页】
+    - 严格展示 Rank 1~N（N 为所选策略的 top_n，默认 10）
+    - Key 解锁多个策略时顶部可切换（strategy_registry，只列出 Key 范围内的策略）
+    - 按交易日历（北京时间）决定展示“今日信号”还是“下一个交易日”及对应信号日
+    - 配置 EF_API_URL 时订阅 signal_api 推送，新信号发布后提示刷新
+    - 分区：精选(#1)、银牌(#2-3)、其他(#4-10)
+    - 底部添加时效性提示
+    - 主体来自按数据版本预渲染的快照，只注入日期、Access Key 与水印
+    """
+    strategy_id = render_strategy_picker(st.session_state.get('verified_key'))
+    if strategy_id is None:
+        st.warning("该 Access Key 未开通任何策略，如有疑问请联系作者")
+        return
+    strategy = get_strategy(strategy_id)
+    if not strategy.exists():
+        st.error(f"❌ 数据文件不存在，请上传 {os.path.basename(strategy.path)}")
+        return
+
+    session = signal_session()
+
+    try:
+        signal_date, day = load_signal_day(strategy=strategy_id)
+        if SNAPSHOT_ENABLED:
+            body_html = get_snapshot(signal_date, strategy_id)
+        else:
+            body_html = build_signal_page_html(day, strategy.top_n)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return
+
+    # 日期标签（随时间变化，不进快照）；信号尚未更新到应有信号日时注明实际信号日
+    date_label = f"{session['label']} · {session['session']}"
+    if signal_date and signal_date != session['signal_date'].isoformat():
+        date_label += f" · 信号日 {signal_date}"
+
+    st.markdown(f"""
+    <div class="date-label">📅 {date_label}</div>
+    """, unsafe_allow_html=True)
+
+    render_signal_push(st.session_state.get('verified_key'))
+    render_access_key_display(key_mask)
+
+    st.markdown(body_html, unsafe_allow_html=True)
+
+    render_watermark(key_mask)
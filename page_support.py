@@ -0,0 +1,86 @@
+"""
+EigenFlow 支持订阅页
+Support / subscription page (landing page, no data access)
+"""
+
+import streamlit as st
+
+from perf import timed
+from widgets import render_static_image
+
+
+@timed
+def render_support_page():
+    """渲染支持订阅页面 - 合规+转化设计"""
+    st.markdown("""
+    <div class="info-card">
+        <div class="info-card-title">📊 研究访问授权说明</div>
+        <div class="info-card-text">
+            <p>EigenFlow 提供量化研究内容访问授权服务。</p>
+            <p style="margin-top:10px;"><strong>订阅用户可获得：</strong></p>
+            <ul style="margin:8px 0; padding-left:16px;">
+                <li>每日量化模型输出结果</li>
+                <li>市场行为观察样本</li>
+                <li>行情辅助分析视图</li>
+            </ul>
+            <p style="margin-top:10px; color:#9ca3af; font-size:0.85em;">
+                订阅内容为研究资料访问授权，不构成证券投资建议或交易指令。
+            </p>
+        </div>
+    </div>
+    
+    <div class="info-card">
+        <div class="info-card-title">💰 研究访问授权费用</div>
+        <div class="info-card-text">
+            <div class="price-row">
+                <span class="price-label">月度授权</span>
+                <span class="price-value">299 元</span>
+            </div>
+            <div class="price-row">
+                <span class="price-label">季度授权</span>
+                <span class="price-value highlight">799 元 <span class="price-tag">推荐</span></span>
+            </div>
+            <p style="margin-top:12px; font-size:0.75em; color:#888;">仅限个人研究使用</p>
+        </div>
+    </div>
+    
+    <div class="info-card">
+        <div class="info-card-title">📧 获取 Access Key</div>
+        <div class="info-card-text">
+            <ul style="margin:8px 0; padding-left:16px;">
+                <li>微信：扫描下方二维码联系</li>
+                <li>Email：research.eigenflow@gmail.com</li>
+            </ul>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    # 二维码
+    col_qr1, col_qr2 = st.columns(2)
+
+    with col_qr1:
+
+        st.markdown("### 💬 微信咨询")
+        render_static_image('wechat_qr')
+        st.caption("扫码咨询详情")
+
+    with col_qr2:
+        st.markdown("### 💳 支付宝付款")
+        render_static_image('alipay_qr')
+        st.caption("付款备注：邮箱或微信号")
+        st.caption("付款后联系开通，获取Access Key解锁模型输出")
+    st.markdown("---")
+    
+    # ========== 法务与语言威慑 ==========
+    st.markdown("""
+    <div class="info-card">
+        <div class="info-card-title">⚖️ 使用声明</div>
+        <div class="info-card-text">
+            <ul style="margin:8px 0; padding-left:16px;">
+                <li><strong>使用范围：</strong>本内容仅供个人研究与学习使用，禁止转售、二次分发或任何形式的公开传播。</li>
+                <li><strong>二次收费禁止：</strong>严禁任何形式的二次收费、转售或商业化使用。</li>
+                <li><strong>违约后果：</strong>如发现违规行为，访问授权可能被立即终止，恕不另行通知。</li>
+            </ul>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
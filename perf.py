@@ -0,0 +1,233 @@
+"""
+EigenFlow 性能埋点
+Lightweight hot-path timing
+
+【设计】
+├── @timed 装饰关键函数；未开启时原样返回函数本身，零额外开销
+├── 每个函数一个对数分桶直方图（相邻桶 ×1.25，误差 ≤ 12.5%），内存固定
+├── cache_event 记录进程内缓存命中 / 未命中
+├── 进程内聚合，所有会话共享，重启清零
+└── 内存统计：进程 RSS、共享数据、各会话 session_state（共享对象不重复计入）
+
+开启方式：环境变量 EF_PERF=1（需在应用启动前设置）
+"""
+
+import os
+import sys
+import time
+import bisect
+import weakref
+import functools
+import threading
+
+PERF_ENABLED = os.environ.get('EF_PERF', '0') == '1'
+
+# 1µs ~ 100s 对数分桶
+_BOUNDS = [1e-6 * 1.25 ** i for i in range(84)]
+
+_lock = threading.Lock()
+_histograms = {}   # name -> {'counts': [...], 'calls': int, 'total': float, 'max': float}
+_cache_stats = {}  # name -> [hits, misses]
+_shared = {}       # name -> weakref 共享只读对象（内存统计用）
+
+
+def record(name: str, seconds: float):
+    """记录一次耗时"""
+    idx = bisect.bisect_left(_BOUNDS, seconds)
+    with _lock:
+        h = _histograms.get(name)
+        if h is None:
+            h = _histograms[name] = {'counts': [0] * (len(_BOUNDS) + 1), 'calls': 0, 'total': 0.0, 'max': 0.0}
+        h['counts'][idx] += 1
+        h['calls'] += 1
+        h['total'] += seconds
+        if seconds > h['max']:
+            h['max'] = seconds
+
+
+def timed(fn=None, *, name: str = None):
+    """
+    计时装饰器
+
+    未开启时直接返回原函数（不包装），开启后记录到直方图
+    """
+    if fn is None:
+        return functools.partial(timed, name=name)
+    if not PERF_ENABLED:
+        return fn
+
+    label = name or fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            record(label, time.perf_counter() - t0)
+
+    return wrapper
+
+
+def cache_event(name: str, hit: bool):
+    """记录缓存命中（未开启时不记录）"""
+    if not PERF_ENABLED:
+        return
+    with _lock:
+        stats = _cache_stats.setdefault(name, [0, 0])
+        stats[0 if hit else 1] += 1
+
+
+def _quantile(counts: list, calls: int, q: float) -> float:
+    target = q * calls
+    running = 0
+    for i, c in enumerate(counts):
+        running += c
+        if running >= target:
+            return _BOUNDS[min(i, len(_BOUNDS) - 1)]
+    return _BOUNDS[-1]
+
+
+def timing_summary() -> list:
+    """每个函数的调用次数与 p50/p95/p99（毫秒），按总耗时降序"""
+    with _lock:
+        items = [(name, dict(h, counts=list(h['counts']))) for name, h in _histograms.items()]
+
+    rows = []
+    for name, h in items:
+        # 分桶上界可能超过实际最大值，截断到 max
+        q = {p: min(_quantile(h['counts'], h['calls'], p), h['max']) for p in (0.50, 0.95, 0.99)}
+        rows.append({
+            'function': name,
+            'calls': h['calls'],
+            'p50_ms': round(q[0.50] * 1000, 3),
+            'p95_ms': round(q[0.95] * 1000, 3),
+            'p99_ms': round(q[0.99] * 1000, 3),
+            'max_ms': round(h['max'] * 1000, 3),
+            'total_s': round(h['total'], 3),
+        })
+    rows.sort(key=lambda r: r['total_s'], reverse=True)
+    return rows
+
+
+def cache_summary() -> list:
+    """各缓存的命中率"""
+    with _lock:
+        items = [(name, list(stats)) for name, stats in _cache_stats.items()]
+    return [
+        {'cache': name, 'hits': hits, 'misses': misses,
+         'hit_rate': f"{hits / (hits + misses):.1%}" if hits + misses else '-'}
+        for name, (hits, misses) in sorted(items)
+    ]
+
+
+def reset():
+    """清空统计"""
+    with _lock:
+        _histograms.clear()
+        _cache_stats.clear()
+
+
+# ==================== 内存统计 ====================
+
+def register_shared(name: str, obj):
+    """登记会话间共享的只读对象（按数据版本重建时覆盖旧登记）"""
+    try:
+        ref = weakref.ref(obj)
+    except TypeError:
+        ref = lambda: obj  # dict 等不支持弱引用
+    with _lock:
+        _shared[name] = ref
+
+
+def sizeof(obj, _seen: set = None) -> int:
+    """
+    对象深度内存（字节）
+
+    DataFrame / Series 按 memory_usage(deep=True)，ndarray 按 nbytes，
+    容器递归；_seen 中的对象（共享数据）不计入
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if hasattr(obj, 'memory_usage') and hasattr(obj, 'dtypes'):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, 'sum') else usage)
+    if hasattr(obj, 'nbytes') and hasattr(obj, 'dtype'):
+        return int(obj.nbytes)
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(sizeof(k, seen) + sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(sizeof(v, seen) for v in obj)
+    return size
+
+
+def process_rss_mb() -> float:
+    """当前进程 RSS（Linux 读 /proc，其他平台取峰值）"""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / (1024 if sys.platform == 'darwin' else 1)
+    except ImportError:
+        return 0.0
+
+
+def _shared_objects() -> dict:
+    with _lock:
+        refs = dict(_shared)
+    return {name: obj for name, obj in ((n, r()) for n, r in refs.items()) if obj is not None}
+
+
+def _active_session_states() -> dict:
+    """session_id -> session_state 字典（依赖 Streamlit 运行时内部接口，不可用时为空）"""
+    try:
+        from streamlit.runtime import Runtime
+
+        sessions = Runtime.instance()._session_mgr.list_active_sessions()
+        return {info.session.id: dict(info.session.session_state.filtered_state) for info in sessions}
+    except Exception:
+        return {}
+
+
+def memory_summary() -> dict:
+    """
+    内存报告
+
+    【返回】
+    ├── process_rss_mb:  进程 RSS
+    ├── shared:          [{name, mb}] 共享数据（所有会话共用一份）
+    └── sessions:        [{session, keys, kb}] 各会话独占部分（引用的共享对象不计）
+    """
+    shared = _shared_objects()
+    shared_ids = set()
+    shared_rows = []
+    for name, obj in sorted(shared.items()):
+        seen = set()
+        shared_rows.append({'name': name, 'mb': round(sizeof(obj, seen) / 2 ** 20, 3)})
+        shared_ids |= seen
+
+    session_rows = []
+    for session_id, state in _active_session_states().items():
+        session_rows.append({
+            'session': session_id[:8],
+            'keys': len(state),
+            'kb': round(sizeof(state, set(shared_ids)) / 1024, 1),
+        })
+    session_rows.sort(key=lambda r: r['kb'], reverse=True)
+
+    return {
+        'process_rss_mb': round(process_rss_mb(), 1),
+        'shared': shared_rows,
+        'sessions': session_rows,
+    }
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+EigenFlow A 股组合模拟
+A-share-realistic portfolio simulator for published signal lists
+
+【为什么】y_OTO 假设信号次日开盘一定买到、第三日开盘一定卖出且无成本，
+实际订阅者会遇到涨停买不进、跌停卖不出、停牌和交易费用。
+
+【交易规则】信号日 T（收盘后发布）
+├── 买入：T+1 开盘价；停牌 → 不成交；开盘价 ≥ 涨停价 → 买不进
+├── 卖出：T+1 规则下最早 T+2，取之后第一个“未停牌且开盘价 > 跌停价”的交易日开盘卖出
+│   连续 max_hold_days 日卖不出 → 按最后一日收盘价估值平仓（stuck）
+├── 涨跌停价 = 前收盘（停牌取最近收盘）× (1 ± 幅度)，四舍五入到分
+│   ├── 主板（60/00）             ±10%
+│   ├── 创业板（300/301/302）     ±20%（2020-08-24 之前 ±10%）
+│   ├── 科创板（688/689）         ±20%
+│   └── 北交所（8/43/92 开头）    ±30%
+│   （ST ±5% 与新股上市首日不限价暂不区分）
+└── 费用：佣金（双边，含每笔最低额）+ 过户费（双边）+ 印花税（卖出，2023-08-28 起 0.05%，之前 0.1%）+ 滑点
+
+【组合】每个信号日等分为 top_n 份，未成交的份额为现金（收益 0）；
+批次收益 = 该日全部份额的平均净收益，净值按信号日顺序复利。
+（卖不出而延后平仓的仓位，收益计入其信号日批次，不占用后续批次资金——近似）
+
+【向量化】全部规则在 日期×股票 矩阵上一次算出（可买 / 可卖 / 下一可卖日），
+每条信号只做下标查找，信号数从 top10 到全市场候选都是线性开销。
+
+【行情来源】data/panel（factor_pipeline）优先；不覆盖信号股票时改用 data/ohlc（ohlc_store）
+
+使用方法：
+    python portfolio_sim.py [交易清单 CSV，默认 trade_list_top10.csv] [--panel 目录]
+"""
+
+import os
+import time
+import argparse
+
+import numpy as np
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SIGNALS = os.path.join(APP_DIR, 'trade_list_top10.csv')
+
+# 【涨跌停幅度】板块 -> 幅度
+LIMIT_BANDS = {
+    'main': 0.10,
+    'chinext': 0.20,
+    'star': 0.20,
+    'bse': 0.30,
+}
+CHINEXT_REFORM_DATE = 20200824   # 创业板注册制：此前 ±10%
+
+# 【印花税】(起始日期, 卖出税率)，按日期升序
+STAMP_DUTY = (
+    (0, 0.001),
+    (20230828, 0.0005),
+)
+
+SIM_CONFIG = {
+    'top_n': 10,              # 每日份数（信号不足时空余份额为现金）
+    'capital': 1_000_000,     # 初始资金（用于每笔最低佣金）
+    'commission': 0.00025,    # 佣金费率（双边）
+    'min_commission': 5.0,    # 每笔最低佣金（元）
+    'transfer_fee': 0.00001,  # 过户费（双边）
+    'slippage': 0.0,          # 单边滑点（相对开盘价）
+    'max_hold_days': 20,      # 连续卖不出的最长天数
+    'price_tol': 0.001,       # 判断开盘价触及涨跌停的容差（元）
+}
+
+
+# ==================== 板块与涨跌停 ====================
+
+def board_of(symbols) -> np.ndarray:
+    """股票代码 → 板块名数组（main / chinext / star / bse；证券主数据优先，未收录按代码前缀）"""
+    import security_master
+
+    return security_master.get_master().board_of(symbols)
+
+
+def limit_bands(symbols, dates: np.ndarray) -> np.ndarray:
+    """涨跌停幅度 float64[T, N]（创业板按日期切换）"""
+    board = board_of(symbols)
+    band = np.array([LIMIT_BANDS[b] for b in board], dtype=np.float64)
+    bands = np.broadcast_to(band, (len(dates), len(band))).copy()
+    before = np.asarray(dates)[:, None] < CHINEXT_REFORM_DATE
+    bands[before & (board == 'chinext')[None, :]] = LIMIT_BANDS['main']
+    return bands
+
+
+def round_price(x: np.ndarray) -> np.ndarray:
+    """四舍五入到分"""
+    return np.floor(x * 100 + 0.5) / 100
+
+
+def stamp_duty(dates: np.ndarray) -> np.ndarray:
+    starts = np.array([d for d, _ in STAMP_DUTY])
+    rates = np.array([r for _, r in STAMP_DUTY])
+    return rates[np.searchsorted(starts, np.asarray(dates), side='right') - 1]
+
+
+def _ffill_rows(a: np.ndarray) -> np.ndarray:
+    """沿日期方向前向填充 NaN"""
+    idx = np.where(np.isfinite(a), np.arange(len(a))[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return a[idx, np.arange(a.shape[1])[None, :]]
+
+
+def tradability(prices: dict) -> dict:
+    """
+    日期×股票 的可交易矩阵
+
+    返回 {'can_buy', 'can_sell', 'suspended', 'limit_up',
+          'next_sell' int[T, N]（≥ t 的首个可卖日，无则 T）, 'last_close'（停牌日取最近收盘）}
+    """
+    open_ = prices['open']
+    T, N = open_.shape
+    tol = SIM_CONFIG['price_tol']
+
+    last_close = _ffill_rows(prices['close']) if T else prices['close']
+    prev_close = np.full((T, N), np.nan)
+    prev_close[1:] = last_close[:-1]
+    bands = limit_bands(prices['symbols'], prices['dates'])
+    up = round_price(prev_close * (1 + bands))
+    down = round_price(prev_close * (1 - bands))
+
+    suspended = ~np.isfinite(open_)
+    if 'volume' in prices:
+        suspended |= ~(prices['volume'] > 0)
+    with np.errstate(invalid='ignore'):
+        limit_up = ~suspended & (open_ >= up - tol)
+        limit_down = ~suspended & (open_ <= down + tol)
+    can_sell = ~suspended & ~limit_down
+
+    next_sell = np.where(can_sell, np.arange(T)[:, None], T)
+    next_sell = np.minimum.accumulate(next_sell[::-1], axis=0)[::-1]
+    return {'can_buy': ~suspended & ~limit_up, 'can_sell': can_sell, 'suspended': suspended,
+            'limit_up': limit_up, 'next_sell': next_sell, 'last_close': last_close}
+
+
+# ==================== 行情 ====================
+
+def _prices_from_panel(panel: dict) -> dict:
+    return {
+        'dates': np.asarray(panel['dates']),
+        'symbols': [str(s).zfill(6) for s in panel['symbols']],
+        'open': np.asarray(panel['open'], dtype=np.float64),
+        'close': np.asarray(panel['close'], dtype=np.float64),
+        'volume': np.asarray(panel['volume'], dtype=np.float64),
+    }
+
+
+def prices_from_ohlc_store(symbols: list) -> dict:
+    """由 ohlc_store 的逐股文件拼成稠密矩阵（仅信号涉及的股票）"""
+    import ohlc_store
+
+    symbols = sorted({str(s).zfill(6) for s in symbols})
+    bars = [ohlc_store.read_bars(code) for code in symbols]
+    dates = np.unique(np.concatenate([b['date'] for b in bars])) if bars else np.zeros(0, np.int32)
+    prices = {'dates': dates, 'symbols': symbols}
+    for field in ('open', 'close', 'volume'):
+        prices[field] = np.full((len(dates), len(symbols)), np.nan)
+    for j, b in enumerate(bars):
+        rows = np.searchsorted(dates, b['date'])
+        for field in ('open', 'close', 'volume'):
+            prices[field][rows, j] = b[field]
+    return prices
+
+
+def load_prices(symbols: list, panel_dir: str = None) -> dict:
+    """行情矩阵：因子矩阵覆盖全部信号股票时直接使用，否则读 ohlc_store"""
+    import factor_pipeline as fp
+
+    panel_dir = panel_dir or fp.PANEL_DIR
+    try:
+        panel = fp.load_panel(panel_dir)
+        if {str(s).zfill(6) for s in symbols} <= set(panel['symbols']):
+            return _prices_from_panel(panel)
+    except (OSError, ValueError, KeyError):
+        pass
+    return prices_from_ohlc_store(symbols)
+
+
+# ==================== 模拟 ====================
+
+def simulate_trades(signals, prices: dict, state: dict = None):
+    """
+    逐条信号的成交结果（向量化）
+
+    signals: DataFrame(date, symbol[, y_OTO])
+    返回 DataFrame：原列 + board, status, buy_date, sell_date, hold_days, buy_price, sell_price, gross, net
+    status: filled / stuck / limit_up / suspended / pending（行情尚未走完）/ no_data
+    """
+    import pandas as pd
+
+    state = state or tradability(prices)
+    cfg = SIM_CONFIG
+    dates = np.asarray(prices['dates'])
+    T = len(dates)
+    open_ = prices['open']
+
+    out = signals.reset_index(drop=True).copy()
+    # 先去重再转换：全市场候选列表里日期 / 代码高度重复
+    date_codes, date_values = pd.factorize(out['date'])
+    sig_dates = pd.Index(date_values).astype(str).str.replace('-', '').str[:8].astype(np.int64).to_numpy()[date_codes]
+    col_of = {code: j for j, code in enumerate(prices['symbols'])}
+    sym_codes, sym_values = pd.factorize(out['symbol'])
+    j = pd.Index(sym_values).astype(str).str.zfill(6).map(col_of).fillna(-1).to_numpy(dtype=np.int64)[sym_codes]
+    t = np.searchsorted(dates, sig_dates)
+    known = (j >= 0) & (t < T) & (dates[np.minimum(t, T - 1)] == sig_dates if T else False)
+
+    n = len(out)
+    status = np.full(n, 'no_data', dtype=object)
+    if T == 0:
+        out['board'] = board_of(sym_values)[sym_codes]
+        out['status'] = status
+        for col in ('buy_date', 'sell_date', 'hold_days'):
+            out[col] = 0
+        for col in ('buy_price', 'sell_price', 'gross', 'net'):
+            out[col] = np.nan
+        return out
+    buy_t = np.where(known, t + 1, T)
+    jj = np.maximum(j, 0)
+    has_buy = known & (buy_t < T)
+    status[known & ~has_buy] = 'pending'
+
+    bt = np.minimum(buy_t, T - 1)
+    suspended = has_buy & state['suspended'][bt, jj]
+    limit_up = has_buy & ~suspended & state['limit_up'][bt, jj]
+    bought = has_buy & ~suspended & ~limit_up
+    status[suspended] = 'suspended'
+    status[limit_up] = 'limit_up'
+
+    first = np.minimum(buy_t + 1, T - 1)
+    sell_t = np.where(bought & (buy_t + 1 < T), state['next_sell'][first, jj], T)
+    stuck = bought & (sell_t - buy_t > cfg['max_hold_days'])
+    sell_t = np.where(stuck, buy_t + cfg['max_hold_days'], sell_t)
+    pending = bought & (sell_t >= T)
+    filled = bought & ~pending
+    status[bought & ~stuck & ~pending] = 'filled'
+    status[stuck & ~pending] = 'stuck'
+    status[pending] = 'pending'
+
+    st = np.minimum(sell_t, T - 1)
+    buy_price = np.where(bought, open_[bt, jj], np.nan) * (1 + cfg['slippage'])
+    exit_price = np.where(stuck, state['last_close'][st, jj], open_[st, jj])
+    sell_price = np.where(filled, exit_price, np.nan) * (1 - cfg['slippage'])
+
+    notional = cfg['capital'] / cfg['top_n']
+    commission = max(cfg['commission'], cfg['min_commission'] / notional)
+    buy_cost = commission + cfg['transfer_fee']
+    sell_cost = commission + cfg['transfer_fee'] + stamp_duty(dates[st])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        gross = sell_price / buy_price - 1
+        net = sell_price * (1 - sell_cost) / (buy_price * (1 + buy_cost)) - 1
+
+    out['board'] = board_of(sym_values)[sym_codes]
+    out['status'] = status
+    out['buy_date'] = np.where(bought, dates[bt], 0)
+    out['sell_date'] = np.where(filled, dates[st], 0)
+    out['hold_days'] = np.where(filled, sell_t - buy_t, 0)
+    out['buy_price'] = buy_price
+    out['sell_price'] = sell_price
+    out['gross'] = gross
+    out['net'] = net
+    return out
+
+
+def portfolio(trades, top_n: int = None):
+    """
+    按信号日汇总：每日等分 top_n 份，未成交份额收益 0
+
+    返回 DataFrame(date, signals, filled, raw, ret, nav)；行情未走完的信号日不计入，无行情的信号不计入
+    """
+    top_n = top_n or SIM_CONFIG['top_n']
+    pending_dates = trades.loc[trades['status'] == 'pending', 'date'].unique()
+    df = trades[~trades['date'].isin(pending_dates) & (trades['status'] != 'no_data')]
+    if 'y_OTO' not in df.columns:
+        df = df.assign(y_OTO=np.nan)
+    executed = df['status'].isin(['filled', 'stuck'])
+
+    daily = df.assign(
+        net_filled=np.where(executed, df['net'], 0.0),
+        is_filled=executed.astype(int),
+    ).groupby('date', sort=True).agg(
+        signals=('symbol', 'size'),
+        filled=('is_filled', 'sum'),
+        raw=('y_OTO', 'mean'),
+        net_sum=('net_filled', 'sum'),
+    )
+    daily['ret'] = daily['net_sum'] / np.maximum(daily['signals'], top_n)
+    daily['nav'] = (1 + daily['ret']).cumprod()
+    return daily.drop(columns='net_sum').reset_index()
+
+
+def summarize(trades, daily) -> dict:
+    """整体统计：成交率、受阻原因、原始 vs 模拟收益"""
+    counts = trades['status'].value_counts().to_dict()
+    executed = trades['status'].isin(['filled', 'stuck'])
+    n_days = len(daily)
+    ret = daily['ret'].to_numpy() if n_days else np.zeros(0)
+    raw = daily['raw'].to_numpy() if n_days else np.zeros(0)
+    return {
+        'signals': int(len(trades)),
+        'days': n_days,
+        'status': {k: int(v) for k, v in counts.items()},
+        'fill_rate': float(executed.sum() / max((trades['status'] != 'pending').sum(), 1)),
+        'delayed_sells': int((trades['hold_days'] > 1).sum()),
+        'raw_mean_bp': float(np.nanmean(raw) * 1e4) if n_days else float('nan'),
+        'sim_mean_bp': float(np.mean(ret) * 1e4) if n_days else float('nan'),
+        'capture': float(np.mean(ret) / np.nanmean(raw)) if n_days and np.nanmean(raw) else float('nan'),
+        'total_return': float(daily['nav'].iloc[-1] - 1) if n_days else 0.0,
+        'sharpe': float(np.mean(ret) / np.std(ret, ddof=1) * np.sqrt(252)) if n_days > 1 and np.std(ret) > 0
+        else float('nan'),
+    }
+
+
+def run(signals_path: str = DEFAULT_SIGNALS, panel_dir: str = None) -> dict:
+    """读取交易清单 → 行情 → 模拟；返回 {'trades', 'daily', 'summary', 'timings'}"""
+    import pandas as pd
+    import factor_pipeline as fp
+
+    timings = {}
+    with fp._stage(timings, 'load'):
+        signals = pd.read_csv(signals_path, index_col=0, dtype={'symbol': str})
+        prices = load_prices(signals['symbol'].unique().tolist(), panel_dir)
+    with fp._stage(timings, 'tradability'):
+        state = tradability(prices)
+    with fp._stage(timings, 'trades'):
+        trades = simulate_trades(signals, prices, state)
+    with fp._stage(timings, 'portfolio'):
+        daily = portfolio(trades)
+    return {'trades': trades, 'daily': daily, 'summary': summarize(trades, daily), 'timings': timings}
+
+
+def print_summary(summary: dict):
+    print(f"信号 {summary['signals']} 条，完整交易日 {summary['days']}")
+    print(f"  状态: {summary['status']}")
+    print(f"  成交率 {summary['fill_rate']:.1%}，延后卖出 {summary['delayed_sells']} 笔")
+    print(f"  原始 y_OTO {summary['raw_mean_bp']:.1f} bp/日 → 模拟净收益 {summary['sim_mean_bp']:.1f} bp/日"
+          f"（捕获 {summary['capture']:.0%}）")
+    print(f"  累计 {summary['total_return']:+.2%}，年化夏普 {summary['sharpe']:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EigenFlow A-share portfolio simulator')
+    parser.add_argument('signals', nargs='?', default=DEFAULT_SIGNALS, help='交易清单 CSV')
+    parser.add_argument('--panel', help='因子矩阵目录（默认 data/panel）')
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    result = run(args.signals, args.panel)
+    print_summary(result['summary'])
+    for name, seconds in result['timings'].items():
+        print(f"  {name:<14}{seconds * 1000:>10.1f} ms")
+    print(f"总耗时 {time.perf_counter() - t0:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 证券主数据
+Local security master with compact array-backed code lookup
+
+【数据文件】data/securities.csv（UTF-8）
+    code,name,exchange,board,list_date,industry
+    600000,浦发银行,SSE,main,19991110,银行
+├── exchange: SSE / SZSE / BSE；board: main / chinext / star / bse（与 portfolio_sim.LIMIT_BANDS 一致）
+├── exchange / board 留空时按代码前缀推断；list_date 为 YYYYMMDD（可空）
+├── 文件缺失时主数据为空：交易所 / 板块仍可按前缀推断，名称不可用
+└── 生成：python security_master.py build（需 akshare，拉取沪深京 A 股代码 + 名称）
+          python security_master.py build <列表.csv>（任意含 code/symbol 与 name 列的导出文件）
+
+【内存结构】SecurityMaster（每个文件版本加载一次，进程内共享）
+├── 列式数组：code int32 / name object / exchange、board、industry 为 int8/int16 编码 + 标签表 / list_date int32
+├── 直接寻址表：6 位代码（0 ~ 999999）→ 行号，int16（行数 < 32768 时）约 2 MB，单次查找 O(1)
+├── 单只查找：int(code) 直接寻址（lookup / exchange_code），交易所按代码缓存
+└── 批量查找：代码数组一次 fancy index；分类列只查类别再按编码展开
+
+【使用方】
+├── core.load_signal_data：信号表一次向量化合并 name（页面卡片 / 选股下拉 / 快照）
+├── core.get_tradingview_symbol：交易所前缀（exchange_code 标量接口）
+├── portfolio_sim.board_of：涨跌停板块
+└── factor_neutralize.load_industry：data/industry.csv 缺失时取主数据行业
+
+使用方法：
+    python security_master.py [代码 ...]     # 概况；给出代码时打印对应记录
+    python security_master.py build [列表.csv]   # 生成 data/securities.csv
+"""
+
+import os
+import sys
+
+import numpy as np
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+SECURITY_FILE = os.path.join(APP_DIR, 'data', 'securities.csv')
+
+SECURITY_COLUMNS = ('code', 'name', 'exchange', 'board', 'list_date', 'industry')
+JOIN_COLUMNS = ('name',)   # 默认并入信号表的列
+
+# 【代码前缀规则】主数据缺失或留空时使用，按顺序匹配
+EXCHANGE_PREFIXES = (
+    ('BSE', ('8', '43', '92')),
+    ('SSE', ('6', '9')),
+    ('SZSE', ('0', '2', '3')),
+)
+BOARD_PREFIXES = (
+    ('chinext', ('300', '301', '302')),
+    ('star', ('688', '689')),
+    ('bse', ('8', '43', '92')),
+)
+DEFAULT_EXCHANGE = 'SSE'
+DEFAULT_BOARD = 'main'
+
+_CODE_SPACE = 1_000_000
+
+
+# ==================== 前缀规则 ====================
+
+def _zfill(codes) -> np.ndarray:
+    codes = np.asarray(codes).astype(str)
+    return np.char.zfill(np.char.strip(codes), 6) if len(codes) else codes
+
+
+def _by_prefix(codes, rules: tuple, default: str) -> np.ndarray:
+    codes = _zfill(codes)
+    out = np.full(len(codes), default, dtype=object)
+    if len(codes) == 0:
+        return out
+    assigned = np.zeros(len(codes), dtype=bool)
+    for label, prefixes in rules:
+        hit = np.logical_or.reduce([np.char.startswith(codes, p) for p in prefixes]) & ~assigned
+        out[hit] = label
+        assigned |= hit
+    return out
+
+
+def _prefix_label(code: str, rules: tuple, default: str) -> str:
+    """单个 6 位代码的前缀规则（标量版 _by_prefix）"""
+    for label, prefixes in rules:
+        if code.startswith(prefixes):
+            return label
+    return default
+
+
+def exchange_by_prefix(codes) -> np.ndarray:
+    """代码 → 交易所（SSE / SZSE / BSE）"""
+    return _by_prefix(codes, EXCHANGE_PREFIXES, DEFAULT_EXCHANGE)
+
+
+def board_by_prefix(codes) -> np.ndarray:
+    """代码 → 板块（main / chinext / star / bse）"""
+    return _by_prefix(codes, BOARD_PREFIXES, DEFAULT_BOARD)
+
+
+def code_to_int(codes) -> np.ndarray:
+    """代码 → int64（非 6 位数字代码为 -1）"""
+    import pandas as pd
+
+    values = pd.to_numeric(pd.Series(np.asarray(codes).astype(str)).str.strip(), errors='coerce')
+    values = values.where((values >= 0) & (values < _CODE_SPACE))
+    return values.fillna(-1).to_numpy(dtype=np.int64)
+
+
+def _code_key(code) -> int:
+    """单个代码 → 直接寻址下标（非 6 位数字代码为 -1）；常见的 str / int 不经过 pandas"""
+    try:
+        key = int(code) if isinstance(code, (int, np.integer)) else int(str(code).strip())
+    except ValueError:
+        return int(code_to_int([code])[0])
+    return key if 0 <= key < _CODE_SPACE else -1
+
+
+# ==================== 主数据 ====================
+
+def _encode(values: np.ndarray) -> tuple:
+    """字符串列 → (紧凑编码, 标签表)；空值编码为 -1"""
+    values = np.asarray(values, dtype=object)
+    present = np.array([isinstance(v, str) and v != '' for v in values], dtype=bool)
+    labels, codes = np.unique(values[present].astype(str), return_inverse=True)
+    dtype = np.int8 if len(labels) < 2 ** 7 else np.int16 if len(labels) < 2 ** 15 else np.int32
+    out = np.full(len(values), -1, dtype=dtype)
+    out[present] = codes
+    return out, labels.tolist()
+
+
+class SecurityMaster:
+    """
+    列式证券主数据
+
+    lookup(code) 返回单条记录；index / name_of / exchange_of / board_of / join 均为批量接口
+    """
+
+    def __init__(self, df=None):
+        import pandas as pd
+
+        df = pd.DataFrame(columns=list(SECURITY_COLUMNS)) if df is None else df
+        df = df.reindex(columns=list(SECURITY_COLUMNS))
+        code = code_to_int(df['code'])
+        keep = code >= 0
+        # 重复代码保留最后一行
+        _, last = np.unique(code[keep][::-1], return_index=True)
+        rows = np.flatnonzero(keep)[::-1][last]
+        df = df.iloc[np.sort(rows)]
+
+        self.code = code_to_int(df['code']).astype(np.int32)
+        self.name = np.asarray(df['name'].fillna('').astype(str).str.strip(), dtype=object)
+        labels = _zfill(self.code)
+        exchange = df['exchange'].fillna('').astype(str).str.strip().str.upper().to_numpy(dtype=object)
+        board = df['board'].fillna('').astype(str).str.strip().str.lower().to_numpy(dtype=object)
+        exchange = np.where(exchange == '', exchange_by_prefix(labels), exchange)
+        board = np.where(board == '', board_by_prefix(labels), board)
+        self.exchange, self.exchanges = _encode(exchange)
+        self.board, self.boards = _encode(board)
+        self.industry, self.industries = _encode(df['industry'].where(df['industry'].notna(), '')
+                                                 .astype(str).str.strip().to_numpy(dtype=object))
+        list_date = pd.to_numeric(df['list_date'], errors='coerce')
+        self.list_date = list_date.fillna(0).to_numpy(dtype=np.int32)
+
+        slot_dtype = np.int16 if len(self.code) < 2 ** 15 else np.int32
+        self._slot = np.full(_CODE_SPACE, -1, dtype=slot_dtype)
+        self._slot[self.code] = np.arange(len(self.code), dtype=slot_dtype)
+        self._exchange_cache = {}   # 代码下标 -> 交易所（exchange_code）
+
+    def __len__(self):
+        return len(self.code)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.code, self.exchange, self.board, self.industry, self.list_date, self._slot)
+        return sum(a.nbytes for a in arrays) + sum(len(n.encode()) + 50 for n in self.name)
+
+    # ---------- 查找 ----------
+
+    def index(self, codes) -> np.ndarray:
+        """代码数组 → 行号数组（未收录为 -1）"""
+        key = code_to_int(codes)
+        out = np.full(len(key), -1, dtype=np.int64)
+        valid = key >= 0
+        out[valid] = self._slot[key[valid]]
+        return out
+
+    def lookup(self, code):
+        """单只股票的记录 dict；未收录返回 None"""
+        key = _code_key(code)
+        i = int(self._slot[key]) if key >= 0 else -1
+        if i < 0:
+            return None
+        return {
+            'code': f"{self.code[i]:06d}",
+            'name': self.name[i],
+            'exchange': self.exchanges[self.exchange[i]] if self.exchange[i] >= 0 else '',
+            'board': self.boards[self.board[i]] if self.board[i] >= 0 else '',
+            'list_date': int(self.list_date[i]) or None,
+            'industry': self.industries[self.industry[i]] if self.industry[i] >= 0 else '',
+        }
+
+    def exchange_code(self, code) -> str:
+        """单只股票的交易所：主数据优先，未收录按前缀推断（按代码缓存）"""
+        key = _code_key(code)
+        exchange = self._exchange_cache.get(key) if key >= 0 else None
+        if exchange is None:
+            i = int(self._slot[key]) if key >= 0 else -1
+            exchange = self.exchanges[self.exchange[i]] if i >= 0 and self.exchange[i] >= 0 else ''
+            if key >= 0:
+                exchange = exchange or _prefix_label(f"{key:06d}", EXCHANGE_PREFIXES, DEFAULT_EXCHANGE)
+                self._exchange_cache[key] = exchange
+            else:
+                exchange = exchange_by_prefix([code])[0]
+        return exchange
+
+    def _column(self, column: str, idx: np.ndarray, default='') -> np.ndarray:
+        """按行号取一列（解码分类列），未收录行取 default"""
+        found = idx >= 0
+        rows = idx[found]
+        if column == 'list_date':
+            out = np.zeros(len(idx), dtype=np.int32)
+            out[found] = self.list_date[rows]
+            return out
+
+        out = np.full(len(idx), default, dtype=object)
+        if column == 'name':
+            out[found] = self.name[rows]
+        else:
+            codes = getattr(self, column)[rows]
+            labels = np.asarray(getattr(self, {'exchange': 'exchanges', 'board': 'boards',
+                                                'industry': 'industries'}[column]) + [default], dtype=object)
+            out[found] = labels[codes]   # 编码 -1 → 末尾的 default
+        return out
+
+    def name_of(self, codes, default: str = '') -> np.ndarray:
+        return self._column('name', self.index(codes), default)
+
+    def exchange_of(self, codes) -> np.ndarray:
+        """交易所：主数据优先，未收录按前缀推断"""
+        found = self._column('exchange', self.index(codes))
+        return np.where(found == '', exchange_by_prefix(codes), found)
+
+    def board_of(self, codes) -> np.ndarray:
+        """板块：主数据优先，未收录按前缀推断"""
+        found = self._column('board', self.index(codes))
+        return np.where(found == '', board_by_prefix(codes), found)
+
+    def industry_of(self, codes, default: str = '') -> np.ndarray:
+        return self._column('industry', self.index(codes), default)
+
+    # ---------- 合并 ----------
+
+    def join(self, df, on: str = 'symbol', columns: tuple = JOIN_COLUMNS):
+        """
+        把主数据列并入 DataFrame（返回新表）
+
+        category 代码列只对类别查找一次再按编码展开；已有同名列时只补空值；
+        主数据为空时原样返回
+        """
+        import pandas as pd
+
+        if not len(self) or df.empty or on not in df.columns:
+            return df
+
+        keys = df[on]
+        if isinstance(keys.dtype, pd.CategoricalDtype):
+            cat_idx = np.append(self.index(keys.cat.categories), -1)
+            idx = cat_idx[keys.cat.codes.to_numpy()]   # 缺失编码 -1 → 末尾的 -1
+        else:
+            idx = self.index(keys)
+
+        out = df.copy(deep=False)
+        for column in columns:
+            values = self._column(column, idx)
+            if column in out.columns:
+                existing = out[column].astype(object)
+                missing = existing.isna() | (existing == '')
+                values = existing.where(~missing, pd.Series(values, index=out.index)).to_numpy()
+            out[column] = values if column == 'list_date' else pd.Categorical(values)
+        return out
+
+
+# ==================== 加载 ====================
+
+_masters = {}  # (路径, 文件版本) -> SecurityMaster
+
+
+def file_version(path: str = None) -> str:
+    try:
+        stat = os.stat(path or SECURITY_FILE)
+        return f"{stat.st_size}-{stat.st_mtime_ns}"
+    except OSError:
+        return 'none'
+
+
+def read_master(path: str = None) -> SecurityMaster:
+    """解析主数据文件（每次调用都读盘，请用 get_master）"""
+    import pandas as pd
+
+    path = path or SECURITY_FILE
+    if not os.path.exists(path):
+        return SecurityMaster()
+    df = pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[''])
+    df.columns = [c.strip().lower() for c in df.columns]
+    if 'code' not in df.columns and 'symbol' in df.columns:
+        df = df.rename(columns={'symbol': 'code'})
+    return SecurityMaster(df)
+
+
+def get_master(path: str = None) -> SecurityMaster:
+    """进程内共享的主数据（文件变化后自动重新加载）"""
+    path = path or SECURITY_FILE
+    key = (path, file_version(path))
+    if key not in _masters:
+        _masters.clear()
+        _masters[key] = read_master(path)
+    return _masters[key]
+
+
+# ==================== 生成 ====================
+
+def fetch_listing():
+    """沪深京 A 股代码 + 名称（akshare）"""
+    try:
+        import akshare as ak
+    except ImportError:
+        raise SystemExit("需要 akshare：pip install akshare（或使用 build <列表.csv>）")
+    return ak.stock_info_a_code_name()
+
+
+def build_master_file(listing, path: str = None) -> int:
+    """
+    由代码列表生成主数据文件，返回行数
+
+    listing: 含 code（或 symbol）与 name 列的 DataFrame；其余 SECURITY_COLUMNS 列可选
+    （exchange / board 留空，加载时按前缀推断）
+    """
+    path = path or SECURITY_FILE
+    df = listing.copy()
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    if 'code' not in df.columns and 'symbol' in df.columns:
+        df = df.rename(columns={'symbol': 'code'})
+    df = df.reindex(columns=list(SECURITY_COLUMNS))
+    key = code_to_int(df['code'])
+    df = df[key >= 0].copy()
+    df['code'] = _zfill(key[key >= 0])
+    df = df.drop_duplicates('code', keep='last').sort_values('code')
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    df.to_csv(tmp, index=False, encoding='utf-8')
+    os.replace(tmp, path)
+    return len(df)
+
+
+def main():
+    if sys.argv[1:2] == ['build']:
+        import pandas as pd
+
+        listing = pd.read_csv(sys.argv[2], dtype=str) if len(sys.argv) > 2 else fetch_listing()
+        n = build_master_file(listing)
+        print(f"已生成 {SECURITY_FILE}：{n} 只")
+        return
+
+    master = get_master()
+    state = SECURITY_FILE if os.path.exists(SECURITY_FILE) else f"{SECURITY_FILE}（不存在）"
+    print(f"主数据 {state}：{len(master)} 只，行业 {len(master.industries)} 个，"
+          f"约 {master.nbytes / 2 ** 20:.1f} MB")
+    for code in sys.argv[1:]:
+        record = master.lookup(code)
+        if record is None:
+            print(f"  {str(code).zfill(6)}  未收录（{exchange_by_prefix([code])[0]} / {board_by_prefix([code])[0]}）")
+        else:
+            print(f"  {record}")
+
+
+if __name__ == "__main__":
+    main()
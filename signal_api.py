@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 信号 API（ASGI）
+Lightweight JSON/CSV signal API with ETag caching, alongside the Streamlit UI
+
+【为什么】程序化拉取 Top10 时抓取 Streamlit 页面，每次请求都要建立一个完整的 websocket 会话；
+这里用一个无框架依赖的 ASGI 应用直接提供数据，与 Streamlit 共用 Key 存储与信号数据。
+
+【接口】（除 /healthz 外均需 Access Key：Authorization: Bearer <key> / X-Access-Key / ?key=；
+        /api/v1/stream 不接受 ?key=，改用 ?token=<推送令牌>）
+├── GET /api/v1/signals                 当前信号日（与页面相同，按交易日历选出）
+├── GET /api/v1/signals/<YYYY-MM-DD>    指定信号日
+│   格式：后缀 .json / .csv，或 ?format=json|csv，或 Accept: text/csv；默认 JSON
+├── GET /api/v1/dates                   全部信号日
+│   signals / dates 可加 ?strategy=<id> 选择策略（strategy_registry，默认策略省略）；
+│   不在 Key 范围内的策略返回 403，未知策略 404
+├── GET /api/v1/strategies              该 Key 可访问的策略
+├── GET /api/v1/stream                  新信号推送（Server-Sent Events，默认策略）
+└── GET /healthz                        存活检查
+
+【缓存】
+├── 载荷：每个策略一个 PayloadStore，按 (信号日, 格式) 序列化一次，
+│   该策略数据版本（core.signal_data_version）变化时整体作废
+├── ETag：载荷内容哈希（与副本无关）；If-None-Match 命中返回 304，无响应体
+└── Key 校验：结果（含可访问的策略）按 Key 缓存 auth_ttl 秒，期间轮询不访问状态存储，也只记一条使用日志
+
+【推送】替代 16:00 前后反复刷新页面
+├── 每个进程一个监视协程：每 push_poll 秒检查一次当前信号日的载荷（数据版本 + 交易日历），变化后发布
+├── Broadcaster 只保留最新一条预编码的 SSE 帧；所有连接等待同一个 asyncio.Event，
+│   发布时一次唤醒，慢连接直接跳到最新一条，不积压队列
+├── 事件：event: signals / id: 载荷 ETag / data: 与 /api/v1/signals 相同的 JSON
+│   连接时先推送当前一条（Last-Event-ID 与之相同则跳过），之后只推送变化；空闲时每 heartbeat 秒发注释行保活
+├── 每次推送 / 保活前复核 Key（按 auth_ttl 缓存）：到期或被吊销时发送 event: expired 并关闭连接
+└── EventSource 无法自定义请求头：页面签发短期推送令牌（core.issue_stream_token，Key 摘要 + 到期时刻 + HMAC），
+    浏览器端用 ?token= 传令牌，页面 HTML 与 URL 中不出现明文 Key；响应允许跨域（页面内提醒组件）
+
+使用方法：
+    python signal_api.py [--host 0.0.0.0] [--port 8600] [--workers 1]
+    curl -H "Authorization: Bearer EF-XXXX-XXXXXXXX" http://127.0.0.1:8600/api/v1/signals.csv
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import argparse
+from urllib.parse import parse_qs
+
+import core
+import signal_history
+import strategy_registry
+import trading_calendar
+
+API_CONFIG = {
+    'host': os.environ.get('EF_API_HOST', '0.0.0.0'),
+    'port': int(os.environ.get('EF_API_PORT', '8600')),
+    'max_age': 60,               # Cache-Control max-age（秒）
+    'auth_ttl': 60,              # Key 校验结果缓存（秒）
+    'auth_cache_size': 10000,    # 超过后整体清空
+    'columns': ('date', 'rank', 'symbol', 'name', 'score'),
+    'push_poll': 2.0,            # 数据版本检查间隔（秒）
+    'heartbeat': 20.0,           # SSE 保活间隔（秒）
+    'retry_ms': 5000,            # 客户端断线重连间隔
+    'max_subscribers': 10000,    # 单进程推送连接上限
+}
+
+CONTENT_TYPES = {
+    'json': 'application/json; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+logger = logging.getLogger(__name__)
+
+_SIGNALS_PATH = re.compile(r'^/api/v1/signals(?:/(\d{4}-\d{2}-\d{2}))?(?:\.(json|csv))?/?$')
+
+
+# ==================== 载荷 ====================
+
+class PayloadStore:
+    """
+    按数据版本缓存某个策略序列化后的载荷
+
+    get 返回 (body bytes, etag, 信号日)；信号日不存在返回 None。
+    “最新”与页面一致，由交易日历选出（trading_calendar.pick_signal_date），
+    缓存按选出的信号日存放，16:00 切换时无需数据版本变化即可生效
+    """
+
+    def __init__(self, strategy: str = None):
+        self.strategy = strategy
+        self.version = None
+        self._dates = None    # 本数据版本的全部信号日（首次 get 时载入）
+        self._payloads = {}   # (信号日, 格式) -> (body, etag, 信号日)
+
+    def __len__(self):
+        return len(self._payloads)
+
+    def _check_version(self) -> str:
+        version = core.signal_data_version(self.strategy)
+        if version != self.version:
+            self._payloads = {}
+            self._dates = None
+            self.version = version
+        return version
+
+    def cached(self, date: str, fmt: str):
+        """只查缓存（事件循环内调用，不做任何解析）"""
+        self._check_version()
+        if date is None:
+            if self._dates is None:
+                return None
+            date = trading_calendar.pick_signal_date(self._dates)
+        return self._payloads.get((date, fmt))
+
+    def get(self, date: str, fmt: str):
+        self._check_version()
+        if self._dates is None:
+            self._dates = self.dates()
+        date = date or trading_calendar.pick_signal_date(self._dates)
+        if date is None:
+            return None
+        key = (date, fmt)
+        if key not in self._payloads:
+            self._payloads[key] = build_payload(date, fmt, self.strategy)
+        return self._payloads[key]
+
+    def dates(self) -> list:
+        return core.load_signal_history(self.strategy)['dates']
+
+
+def build_payload(date: str, fmt: str, strategy: str = None):
+    """序列化策略的一个信号日（date 为空时按交易日历选出，与页面一致）；不存在返回 None"""
+    index = core.load_signal_history(strategy)
+    dates = index['dates']
+    if not dates:
+        return None
+    date = date or trading_calendar.pick_signal_date(dates)
+    if date not in index['pos']:
+        return None
+
+    day = signal_history.get_day(index, date)
+    columns = [c for c in API_CONFIG['columns'] if c in day.columns]
+    frame = day[columns].astype({c: str for c in ('date', 'symbol', 'name') if c in columns})
+    if 'score' in frame.columns:
+        frame['score'] = frame['score'].astype('float64').round(6)
+    if 'rank' in frame.columns:
+        frame['rank'] = frame['rank'].astype('int64')
+
+    if fmt == 'csv':
+        body = frame.to_csv(index=False).encode('utf-8')
+    else:
+        body = json.dumps({'date': date, 'count': len(frame), 'signals': frame.to_dict('records')},
+                          ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+    return body, etag, date
+
+
+_stores = {}  # 策略 id -> PayloadStore
+
+
+def get_store(strategy: str = None) -> PayloadStore:
+    """策略的载荷缓存（空为默认策略；未知策略抛出 KeyError）"""
+    strategy = strategy_registry.get_strategy(strategy).id
+    if strategy not in _stores:
+        _stores[strategy] = PayloadStore(strategy)
+    return _stores[strategy]
+
+
+_store = get_store()
+
+
+# ==================== 鉴权 ====================
+
+_auth_cache = {}  # key -> (过期时刻 monotonic, 是否有效, 可访问的策略)
+_token_keys = {'expires': 0.0, 'keys': {}}  # 推送令牌中的 Key 摘要 -> Key（按 auth_ttl 刷新）
+
+
+def _client(scope: dict, headers: dict) -> dict:
+    """与 core.get_client_info 相同的哈希字段"""
+    ip = headers.get('x-forwarded-for', '').split(',')[0].strip() or (scope.get('client') or ('unknown',))[0]
+    ua = headers.get('user-agent', 'unknown')
+    return {
+        'ip': hashlib.md5(ip.encode()).hexdigest()[:16] if ip != 'unknown' else 'unknown',
+        'ua_hash': hashlib.md5(ua.encode()).hexdigest()[:16] if ua != 'unknown' else 'unknown',
+        'device_id': 'api',
+    }
+
+
+def request_key(headers: dict, query: dict, stream: bool = False) -> str:
+    """请求中的 Key；stream=True 时 URL 中只接受推送令牌，由 key_for_token 换回 Key"""
+    auth = headers.get('authorization', '')
+    if auth.lower().startswith('bearer '):
+        return auth[7:].strip()
+    if headers.get('x-access-key'):
+        return headers['x-access-key']
+    if stream:
+        return key_for_token((query.get('token') or [''])[0])
+    return (query.get('key') or [''])[0]
+
+
+def key_for_token(token: str) -> str:
+    """推送令牌 -> Key（签名不符、已过期或 Key 已不在列表中时返回空串）"""
+    digest = core.verify_stream_token(token)
+    if digest is None:
+        return ''
+    if _token_keys['expires'] <= time.monotonic() or digest not in _token_keys['keys']:
+        _token_keys['keys'] = {core.key_digest(k)[:32]: k.strip().upper() for k in core.load_valid_keys()}
+        _token_keys['expires'] = time.monotonic() + API_CONFIG['auth_ttl']
+    return _token_keys['keys'].get(digest, '')
+
+
+def is_authorized(key: str, cached_only: bool = False):
+    """
+    校验 Access Key（与页面同一套 Key 存储与有效期规则）
+
+    cached_only=True 时只查缓存，未命中返回 None（由调用方放到线程中完成完整校验）
+    """
+    entry = _auth_cache.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+    if cached_only:
+        return None
+
+    valid = bool(key) and core.validate_access_key(key)['valid']
+    strategies = frozenset(core.key_strategies(key)) if valid else frozenset()
+    if len(_auth_cache) >= API_CONFIG['auth_cache_size']:
+        _auth_cache.clear()
+    _auth_cache[key] = (time.monotonic() + API_CONFIG['auth_ttl'], valid, strategies)
+    return valid
+
+
+def authorized_strategies(key: str) -> frozenset:
+    """is_authorized 之后调用：该 Key 可访问的策略 id（随校验结果一起缓存）"""
+    entry = _auth_cache.get(key)
+    return entry[2] if entry is not None else frozenset()
+
+
+# ==================== 推送 ====================
+
+class Broadcaster:
+    """
+    进程内新信号广播（绑定当前事件循环）
+
+    只保留最新一条消息；订阅者按序号判断是否有新消息
+    """
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.seq = 0
+        self.event_id = None
+        self.frame = None          # 预编码的 SSE 帧
+        self.subscribers = 0
+        self.watcher = None
+        self._changed = asyncio.Event()
+
+    def publish(self, event_id: str, frame: bytes):
+        self.seq += 1
+        self.event_id, self.frame = event_id, frame
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def pending(self, seq: int):
+        """seq 之后尚无新消息时返回可等待的 Event，否则 None"""
+        return self._changed if self.seq == seq else None
+
+
+def sse_frame(event: str, data: bytes, event_id: str) -> bytes:
+    return f"id: {event_id}\nevent: {event}\ndata: ".encode('utf-8') + data + b'\n\n'
+
+
+async def _watch(broadcaster: Broadcaster):
+    """
+    当前应展示的信号日载荷变化时发布（数据版本变化，或交易日历在 16:00 切换到新信号日）
+
+    每轮只查缓存（stat + 日历选日），未命中才到线程中序列化；载荷内容未变则不推送。
+    单轮出错（信号文件写到一半、注册表错误等）只记日志，下一轮继续
+    """
+    while True:
+        try:
+            payload = _store.cached(None, 'json')
+            if payload is None:
+                payload = await asyncio.to_thread(_store.get, None, 'json')
+            if payload is not None and payload[1] != broadcaster.event_id:
+                body, etag, _ = payload
+                broadcaster.publish(etag, sse_frame('signals', body, etag))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("signal push watcher: poll failed, retrying in %.1fs", API_CONFIG['push_poll'])
+        await asyncio.sleep(API_CONFIG['push_poll'])
+
+
+_broadcaster = None
+
+
+def get_broadcaster() -> Broadcaster:
+    """当前事件循环的广播器（首次调用时启动监视协程；监视协程意外退出时重新启动）"""
+    global _broadcaster
+    if _broadcaster is None or _broadcaster.loop is not asyncio.get_running_loop():
+        _broadcaster = Broadcaster()
+    if _broadcaster.watcher is None or _broadcaster.watcher.done():
+        _broadcaster.watcher = asyncio.ensure_future(_watch(_broadcaster))
+    return _broadcaster
+
+
+async def _disconnected(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def _still_authorized(key: str, strategy: str) -> bool:
+    """推送连接的周期性复核（结果按 auth_ttl 缓存，同一 Key 的连接共用一次校验）"""
+    valid = is_authorized(key, cached_only=True)
+    if valid is None:
+        valid = await asyncio.to_thread(is_authorized, key)
+    return bool(valid) and strategy in authorized_strategies(key)
+
+
+async def _serve_stream(scope: dict, receive, send, headers: dict, key: str):
+    broadcaster = get_broadcaster()
+    if broadcaster.subscribers >= API_CONFIG['max_subscribers']:
+        await _json_error(send, 503, 'too many subscribers')
+        return
+
+    await send({'type': 'http.response.start', 'status': 200, 'headers': [
+        (b'content-type', b'text/event-stream; charset=utf-8'),
+        (b'cache-control', b'no-cache'),
+        (b'x-accel-buffering', b'no'),
+        (b'access-control-allow-origin', b'*'),
+    ]})
+    await send({'type': 'http.response.body', 'body': f"retry: {API_CONFIG['retry_ms']}\n\n".encode(),
+                'more_body': True})
+
+    # 已有消息且客户端没见过 → 先补发当前一条
+    seq = 0 if headers.get('last-event-id') != broadcaster.event_id else broadcaster.seq
+    gone = asyncio.ensure_future(_disconnected(receive))
+    broadcaster.subscribers += 1
+    try:
+        while True:
+            changed = broadcaster.pending(seq)
+            if changed is not None:
+                waiter = asyncio.ensure_future(changed.wait())
+                done, _ = await asyncio.wait({waiter, gone}, timeout=API_CONFIG['heartbeat'],
+                                             return_when=asyncio.FIRST_COMPLETED)
+                waiter.cancel()
+                if gone in done:
+                    return
+            # Key 到期 / 被吊销后不再推送
+            if not await _still_authorized(key, _store.strategy):
+                await send({'type': 'http.response.body', 'body': b'event: expired\ndata: {}\n\n',
+                            'more_body': False})
+                return
+            if broadcaster.seq != seq:
+                seq, frame = broadcaster.seq, broadcaster.frame
+            else:
+                frame = b': ping\n\n'
+            await send({'type': 'http.response.body', 'body': frame, 'more_body': True})
+    finally:
+        broadcaster.subscribers -= 1
+        gone.cancel()
+
+
+# ==================== ASGI ====================
+
+def etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match 比较（弱比较，支持列表与 *）"""
+    if not header:
+        return False
+    if header.strip() == '*':
+        return True
+    return any(tag.strip().removeprefix('W/') == etag for tag in header.split(','))
+
+
+async def _respond(send, status: int, body: bytes = b'', headers: list = (), head: bool = False):
+    headers = [(k.encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+    headers.append((b'content-length', str(len(body)).encode()))
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': b'' if head else body})
+
+
+async def _json_error(send, status: int, message: str, head: bool = False):
+    body = json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+    await _respond(send, status, body, [('content-type', CONTENT_TYPES['json'])], head)
+
+
+def _format(suffix: str, query: dict, headers: dict) -> str:
+    fmt = suffix or (query.get('format') or [''])[0].lower()
+    if not fmt and 'text/csv' in headers.get('accept', ''):
+        fmt = 'csv'
+    return fmt if fmt in CONTENT_TYPES else 'json'
+
+
+async def _authorize(scope: dict, headers: dict, query: dict) -> tuple:
+    """返回 (Key, 可访问的策略 id 集合)；Key 无效时集合为 None"""
+    stream = scope['path'].rstrip('/') == '/api/v1/stream'
+    if stream and 'token' in query:
+        key = await asyncio.to_thread(request_key, headers, query, True)
+    else:
+        key = request_key(headers, query, stream)
+    key = key.strip().upper()
+    valid = is_authorized(key, cached_only=True)
+    if valid is None:
+        valid = await asyncio.to_thread(is_authorized, key)
+        if key:
+            core.log_usage(key, 'access' if valid else 'blocked', client=_client(scope, headers), page='api')
+    return key, (authorized_strategies(key) if valid else None)
+
+
+async def _serve_http(scope: dict, receive, send):
+    method = scope['method']
+    head = method == 'HEAD'
+    if method not in ('GET', 'HEAD'):
+        await _json_error(send, 405, 'method not allowed', head)
+        return
+
+    path = scope['path']
+    if path == '/healthz':
+        await _respond(send, 200, b'ok', [('content-type', 'text/plain')], head)
+        return
+
+    headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope['headers']}
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+
+    match = _SIGNALS_PATH.match(path)
+    route = path.rstrip('/')
+    if not match and route not in ('/api/v1/dates', '/api/v1/stream', '/api/v1/strategies'):
+        await _json_error(send, 404, 'not found', head)
+        return
+    key, allowed = await _authorize(scope, headers, query)
+    if allowed is None:
+        await _json_error(send, 401, 'invalid or expired access key', head)
+        return
+
+    if route == '/api/v1/strategies':
+        strategies = [{'id': s.id, 'name': s.name, 'top_n': s.top_n}
+                      for s in strategy_registry.list_strategies() if s.id in allowed]
+        body = json.dumps({'default': strategy_registry.default_strategy_id(), 'strategies': strategies},
+                          ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        await _respond(send, 200, body, [('content-type', CONTENT_TYPES['json'])], head)
+        return
+
+    strategy = (query.get('strategy') or [None])[0] if route != '/api/v1/stream' else None
+    try:
+        store = get_store(strategy)
+    except KeyError:
+        await _json_error(send, 404, f'unknown strategy {strategy}', head)
+        return
+    if store.strategy not in allowed:
+        await _json_error(send, 403, f'strategy {store.strategy} is not included in this access key', head)
+        return
+
+    if route == '/api/v1/stream':
+        if head:
+            await _respond(send, 200, b'', [('content-type', 'text/event-stream; charset=utf-8')], head)
+        else:
+            await _serve_stream(scope, receive, send, headers, key)
+        return
+    if not match:
+        dates = await asyncio.to_thread(store.dates)
+        body = json.dumps({'dates': dates}, separators=(',', ':')).encode('utf-8')
+        await _respond(send, 200, body, [('content-type', CONTENT_TYPES['json'])], head)
+        return
+
+    date, fmt = match.group(1), _format(match.group(2), query, headers)
+    payload = store.cached(date, fmt)
+    if payload is None:
+        payload = await asyncio.to_thread(store.get, date, fmt)
+    if payload is None:
+        await _json_error(send, 404, f'no signals for {date}' if date else 'no signals', head)
+        return
+
+    body, etag, signal_date = payload
+    common = [('etag', etag), ('cache-control', f"private, max-age={API_CONFIG['max_age']}"),
+              ('x-signal-date', signal_date), ('x-strategy', store.strategy)]
+    if etag_matches(headers.get('if-none-match', ''), etag):
+        await _respond(send, 304, b'', common, head=True)
+        return
+    await _respond(send, 200, body, [('content-type', CONTENT_TYPES[fmt])] + common, head)
+
+
+async def app(scope, receive, send):
+    """ASGI 入口"""
+    if scope['type'] == 'http':
+        await _serve_http(scope, receive, send)
+    elif scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                get_broadcaster()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if _broadcaster is not None:
+                    _broadcaster.watcher.cancel()
+                core.flush_usage_log()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EigenFlow signal API')
+    parser.add_argument('--host', default=API_CONFIG['host'])
+    parser.add_argument('--port', type=int, default=API_CONFIG['port'])
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("需要 uvicorn：pip install uvicorn")
+    uvicorn.run('signal_api:app', host=args.host, port=args.port, workers=args.workers,
+                log_level='warning', access_log=False)
+
+
+if __name__ == "__main__":
+    main()
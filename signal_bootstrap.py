@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 信号表现置信区间（区块自助法）
+Stationary block bootstrap confidence bands for top-N signal performance
+
+【统计量】由 trade_list_top10.csv 得到每日 Top N 等权收益序列 r（y_OTO 的日内均值）
+├── mean:     日均收益
+├── sharpe:   年化夏普 mean / std · √252
+└── hit_rate: 胜率（日收益 > 0 的天数占比）
+
+【重抽样】平稳区块自助法（Politis–Romano）：区块长度服从均值为 L 的几何分布、循环取数，
+保留收益的短期自相关；L 默认 n^(1/3)
+├── 向量化：一个分块内数千条路径一次生成索引矩阵 [paths, n] 并一次求统计量
+├── 分块：每块行数由 chunk_mb 限定，峰值内存与总路径数无关
+├── 并行：各分块种子由 SeedSequence 按块号派生，进程池并行与单进程结果逐位一致
+└── 置信区间：各统计量路径分布的分位数（百分位法）
+
+【缓存】core.load_signal_bootstrap 按策略、信号数据版本计算一次（Top N 取策略的 top_n），会话间共享
+
+使用方法：
+    python signal_bootstrap.py [--paths 10000] [--block 0] [--processes 0] [--file trade_list_top10.csv]
+"""
+
+import os
+import time
+import argparse
+import multiprocessing
+
+import numpy as np
+
+BOOTSTRAP_CONFIG = {
+    'paths': 10000,                  # 自助路径数
+    'block': 0,                      # 平均区块长度（交易日），0 = n^(1/3)
+    'level': 0.95,                   # 置信水平
+    'chunk_mb': 64,                  # 单个分块的内存上限
+    'seed': 0,
+    'processes': 0,                  # 0 = 路径×天数超过 parallel_cells 时用全部核心
+    'parallel_cells': 50_000_000,    # 自动并行的规模门槛（低于此值进程启动开销不划算）
+    'annualize': 252,
+    'top_n': 10,
+    'min_days': 5,                   # 少于该天数不计算
+}
+
+STAT_NAMES = ('mean', 'sharpe', 'hit_rate')
+
+_BYTES_PER_CELL = 40  # 每个 (路径, 日) 单元的临时数组：均匀数 / 起点 / 索引 / 取值 / 区块位置
+
+
+# ==================== 收益序列 ====================
+
+def daily_returns(df, top_n: int = None):
+    """每日 Top N 等权收益（按日期升序的 pd.Series；收益尚未实现的日期不计入）"""
+    import pandas as pd
+
+    top_n = top_n or BOOTSTRAP_CONFIG['top_n']
+    if df is None or df.empty or 'y_OTO' not in df.columns:
+        return pd.Series(dtype=np.float64)
+    frame = df[['date', 'rank', 'y_OTO']] if 'rank' in df.columns else df[['date', 'y_OTO']]
+    if 'rank' in frame.columns:
+        frame = frame[frame['rank'] <= top_n]
+    frame = frame.dropna(subset=['y_OTO'])
+    return frame.groupby('date', sort=True)['y_OTO'].mean().astype(np.float64)
+
+
+def path_stats(values: np.ndarray, annualize: int = None) -> dict:
+    """按行计算统计量：values [paths, n] → 每个统计量 [paths]"""
+    annualize = annualize or BOOTSTRAP_CONFIG['annualize']
+    mean = values.mean(axis=1)
+    std = values.std(axis=1, ddof=1) if values.shape[1] > 1 else np.zeros(len(values))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(annualize), np.nan)
+    return {'mean': mean, 'sharpe': sharpe, 'hit_rate': (values > 0).mean(axis=1)}
+
+
+def default_block(n: int) -> float:
+    return max(float(n) ** (1 / 3), 1.0)
+
+
+# ==================== 重抽样 ====================
+
+def resample_indices(rng: np.random.Generator, rows: int, n: int, block: float) -> np.ndarray:
+    """
+    平稳区块自助法的索引矩阵 [rows, n]
+
+    每个位置以概率 1/block 开新区块（首位必开），新区块起点均匀抽取；
+    区块内索引 = 起点 + 距区块开头的偏移（循环取模）
+    """
+    steps = np.arange(n)
+    fresh = rng.random((rows, n)) < 1.0 / block
+    fresh[:, 0] = True
+    starts = rng.integers(0, n, size=(rows, n))
+    head = np.maximum.accumulate(np.where(fresh, steps, 0), axis=1)
+    return (np.take_along_axis(starts, head, axis=1) + steps - head) % n
+
+
+def chunk_rows(n: int, chunk_mb: int = None) -> int:
+    chunk_mb = chunk_mb or BOOTSTRAP_CONFIG['chunk_mb']
+    return max(int(chunk_mb * 2 ** 20 // (_BYTES_PER_CELL * max(n, 1))), 1)
+
+
+def _bootstrap_chunk(returns: np.ndarray, seed, rows: int, block: float, annualize: int) -> dict:
+    rng = np.random.default_rng(seed)
+    idx = resample_indices(rng, rows, len(returns), block)
+    return path_stats(returns[idx], annualize)
+
+
+_worker = {}
+
+
+def _init_worker(returns: np.ndarray, block: float, annualize: int):
+    _worker.update(returns=returns, block=block, annualize=annualize)
+
+
+def _chunk_task(task: tuple) -> dict:
+    seed, rows = task
+    return _bootstrap_chunk(_worker['returns'], seed, rows, _worker['block'], _worker['annualize'])
+
+
+def bootstrap_paths(returns: np.ndarray, n_paths: int = None, block: float = None,
+                    processes: int = None, seed: int = None, chunk_mb: int = None) -> dict:
+    """
+    生成 n_paths 条自助路径的统计量分布 {统计量: [n_paths]}
+
+    processes: 1 = 当前进程；>1 = 进程池；0/None = 按 BOOTSTRAP_CONFIG 自动选择
+    """
+    cfg = BOOTSTRAP_CONFIG
+    returns = np.ascontiguousarray(returns, dtype=np.float64)
+    n = len(returns)
+    n_paths = n_paths or cfg['paths']
+    block = block or cfg['block'] or default_block(n)
+    seed = cfg['seed'] if seed is None else seed
+    processes = processes if processes is not None else cfg['processes']
+    if not processes:
+        processes = (os.cpu_count() or 1) if n_paths * n >= cfg['parallel_cells'] else 1
+
+    rows = chunk_rows(n, chunk_mb)
+    sizes = [min(rows, n_paths - start) for start in range(0, n_paths, rows)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = list(zip(seeds, sizes))
+
+    if processes > 1 and len(tasks) > 1:
+        # spawn：调用方可能是多线程的 Streamlit 服务进程，fork 有死锁风险
+        ctx = multiprocessing.get_context('spawn')
+        with ctx.Pool(min(processes, len(tasks)), initializer=_init_worker,
+                      initargs=(returns, block, cfg['annualize'])) as pool:
+            parts = pool.map(_chunk_task, tasks)
+    else:
+        parts = [_bootstrap_chunk(returns, s, r, block, cfg['annualize']) for s, r in tasks]
+
+    return {name: np.concatenate([p[name] for p in parts]) for name in STAT_NAMES}
+
+
+# ==================== 入口 ====================
+
+def bootstrap_summary(df, n_paths: int = None, processes: int = None, block: float = None,
+                      top_n: int = None) -> dict:
+    """
+    信号表现的点估计与置信区间（top_n 为空时取 BOOTSTRAP_CONFIG['top_n']）
+
+    返回 {'n_days', 'start', 'end', 'paths', 'block', 'level', 'seconds',
+          'stats': {统计量: {'point', 'low', 'high'}}}；天数不足时 stats 为空
+    """
+    cfg = BOOTSTRAP_CONFIG
+    series = daily_returns(df, top_n)
+    n = len(series)
+    result = {
+        'n_days': n,
+        'start': str(series.index[0]) if n else None,
+        'end': str(series.index[-1]) if n else None,
+        'paths': 0, 'block': 0.0, 'level': cfg['level'], 'seconds': 0.0, 'stats': {},
+    }
+    if n < cfg['min_days']:
+        return result
+
+    t0 = time.perf_counter()
+    returns = series.to_numpy()
+    block = block or cfg['block'] or default_block(n)
+    paths = bootstrap_paths(returns, n_paths, block, processes)
+    point = path_stats(returns[None, :])
+
+    tail = (1 - cfg['level']) / 2
+    for name in STAT_NAMES:
+        low, high = np.nanquantile(paths[name], [tail, 1 - tail])
+        result['stats'][name] = {'point': float(point[name][0]), 'low': float(low), 'high': float(high)}
+    result.update(paths=len(paths['mean']), block=float(block), seconds=time.perf_counter() - t0)
+    return result
+
+
+def print_summary(result: dict):
+    if not result['stats']:
+        print(f"有效交易日 {result['n_days']} 天，不足 {BOOTSTRAP_CONFIG['min_days']} 天，未计算")
+        return
+    print(f"区间 {result['start']} ~ {result['end']}，{result['n_days']} 个交易日；"
+          f"{result['paths']} 条路径，平均区块 {result['block']:.1f} 日，耗时 {result['seconds']:.2f}s")
+    labels = {'mean': '日均收益', 'sharpe': '年化夏普', 'hit_rate': '胜率'}
+    level = f"{result['level']:.0%}"
+    for name in STAT_NAMES:
+        s = result['stats'][name]
+        if name == 'sharpe':
+            print(f"  {labels[name]}  {s['point']:8.2f}   {level} CI [{s['low']:.2f}, {s['high']:.2f}]")
+        else:
+            print(f"  {labels[name]}  {s['point']:8.2%}   {level} CI [{s['low']:.2%}, {s['high']:.2%}]")
+
+
+def main():
+    from core import SIGNAL_FILE, read_signal_frame
+
+    parser = argparse.ArgumentParser(description='EigenFlow signal bootstrap confidence bands')
+    parser.add_argument('--paths', type=int, default=BOOTSTRAP_CONFIG['paths'])
+    parser.add_argument('--block', type=float, default=BOOTSTRAP_CONFIG['block'], help='平均区块长度，0 = 自动')
+    parser.add_argument('--processes', type=int, default=BOOTSTRAP_CONFIG['processes'], help='0 = 自动')
+    parser.add_argument('--file', default=SIGNAL_FILE)
+    args = parser.parse_args()
+
+    print_summary(bootstrap_summary(read_signal_frame(args.file), args.paths, args.processes, args.block))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+EigenFlow 历史信号索引
+Per-date index over trade_list_top10.csv
+
+【索引结构】
+├── frame:   按 (date, rank) 排序后的完整历史（只解析一次）
+├── dates:   交易日列表（升序）
+├── offsets: 每个交易日在 frame 中的起止行号，按日取数 O(当日行数)
+└── 进出标记：一次向量化计算全历史
+    - is_entry:  当日新进（前一交易日不在榜）
+    - exit_next: 下一交易日移出
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def build_history_index(df: pd.DataFrame) -> dict:
+    """由完整信号表构建按日索引"""
+    if df.empty or 'date' not in df.columns or 'symbol' not in df.columns:
+        return {'frame': df, 'dates': [], 'offsets': np.zeros(1, dtype=np.int64), 'pos': {}}
+
+    sort_cols = ['date', 'rank'] if 'rank' in df.columns else ['date']
+    frame = df.sort_values(sort_cols, kind='stable').reset_index(drop=True)
+    if not isinstance(frame['symbol'].dtype, pd.CategoricalDtype):
+        frame['symbol'] = frame['symbol'].astype(str).str.strip().str.zfill(6).astype('category')
+
+    date_codes, dates = pd.factorize(frame['date'], sort=True)
+    counts = np.bincount(date_codes, minlength=len(dates))
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    # 进出标记：(日序号, 代码) 编码为单个整数后做集合判断
+    symbols = frame['symbol'].cat
+    sym = pd.to_numeric(symbols.categories, errors='coerce').fillna(-1).to_numpy(dtype=np.int64)[symbols.codes]
+    base = np.int64(10_000_000)
+    keys = date_codes.astype(np.int64) * base + sym
+    prev_keys = (date_codes.astype(np.int64) - 1) * base + sym
+    next_keys = (date_codes.astype(np.int64) + 1) * base + sym
+
+    frame['is_entry'] = ~np.isin(prev_keys, keys) & (date_codes > 0)
+    frame['exit_next'] = ~np.isin(next_keys, keys) & (date_codes < len(dates) - 1)
+
+    return {
+        'frame': frame,
+        'dates': [str(d) for d in dates],
+        'offsets': offsets,
+        'pos': {str(d): i for i, d in enumerate(dates)},
+    }
+
+
+def get_day(index: dict, date: str) -> pd.DataFrame:
+    """取某个交易日的信号（行切片，不复制）"""
+    i = index['pos'].get(date)
+    if i is None:
+        return index['frame'].iloc[0:0]
+    return index['frame'].iloc[index['offsets'][i]:index['offsets'][i + 1]]
+
+
+def get_exits(index: dict, date: str) -> pd.DataFrame:
+    """取某个交易日相对前一交易日移出的股票"""
+    i = index['pos'].get(date)
+    if not i:
+        return index['frame'].iloc[0:0]
+    prev = index['frame'].iloc[index['offsets'][i - 1]:index['offsets'][i]]
+    return prev[prev['exit_next']]
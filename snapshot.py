@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 信号页静态快照
+Pre-rendered signal page per data version
+
+【发布流程】
+├── 数据版本 = 策略信号文件 + data/securities.csv 内容哈希 + 策略配置（与部署方式、文件时间无关）
+├── 发布：渲染信号页主体 HTML → data/snapshots/{version}_{信号日}.html（信号日由交易日历选出）
+├── 服务：进程内存缓存快照（每个策略只保留当前数据版本），所有会话共享
+└── 每个会话只注入个人部分：日期标签、Access Key 掩码、水印
+
+使用方法：
+    python snapshot.py [策略 id ...]     # 发布各策略当前数据版本的快照（默认全部策略）
+"""
+
+import os
+import sys
+import hashlib
+
+import perf
+import security_master
+import strategy_registry
+from core import APP_DIR, load_signal_day, format_stock_code
+from widgets import signal_card_html
+
+SNAPSHOT_DIR = os.path.join(APP_DIR, 'data', 'snapshots')
+
+# 设置 EF_SIGNAL_SNAPSHOT=0 可关闭快照（每次会话现场渲染，用于对比测试）
+SNAPSHOT_ENABLED = os.environ.get('EF_SIGNAL_SNAPSHOT', '1') != '0'
+
+_content_versions = {}  # 策略 id -> (stat 签名, 内容哈希)
+_snapshots = {}         # (策略 id, 数据版本, 信号日) -> HTML
+
+
+def snapshot_version(strategy: str = None) -> str:
+    """策略信号文件 + 证券主数据（股票名称）+ 策略配置的内容哈希（同一 stat 签名只读一次文件）"""
+    strategy = strategy_registry.get_strategy(strategy)
+    try:
+        stat = os.stat(strategy.path)
+    except OSError:
+        return 'none'
+
+    sig = (strategy.path, stat.st_size, stat.st_mtime_ns, security_master.file_version(),
+           strategy.top_n, tuple(sorted(strategy.columns.items())))
+    cached = _content_versions.get(strategy.id)
+    if cached is None or cached[0] != sig:
+        digest = hashlib.sha1(repr(sig[4:]).encode())
+        for path in (strategy.path, security_master.SECURITY_FILE):
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+        cached = _content_versions[strategy.id] = (sig, digest.hexdigest()[:12])
+    return cached[1]
+
+
+def _compact(html: str) -> str:
+    """去掉缩进与空行，保证整段作为一个 HTML 块渲染"""
+    return '\n'.join(line.strip() for line in html.splitlines() if line.strip())
+
+
+def build_signal_page_html(df, top_n: int = None) -> str:
+    """
+    渲染信号页主体（与用户无关的部分）
+
+    df: 单个信号日的行（按排名，core.load_signal_day）
+    top_n: 展示名次上限（策略的 top_n，默认 10）
+
+    数据不可用时抛出 ValueError（消息直接展示给用户）
+    """
+    if df.empty:
+        raise ValueError("无法加载信号数据")
+    if 'symbol' not in df.columns:
+        raise ValueError("数据格式错误：缺少 symbol 列")
+
+    top_n = top_n or 10
+    df_top10 = df.head(top_n)
+    codes = df_top10['symbol'].map(format_stock_code)
+    stock_names = (df_top10['name'] if 'name' in df_top10.columns else codes).tolist()
+
+    parts = []
+
+    # Featured - Rank #1
+    if len(df_top10) >= 1:
+        parts.append(signal_card_html('featured', 1, df_top10.iloc[0], stock_names[0]))
+
+    # Silver - Rank #2-3
+    if len(df_top10) >= 3:
+        parts.append('<div class="section-title">🥈 模型输出结果 #2-3</div>')
+        for i in range(1, 3):
+            parts.append(signal_card_html('silver', i + 1, df_top10.iloc[i], stock_names[i]))
+
+    # Other - Rank #4-N
+    if len(df_top10) >= 4:
+        parts.append(f'<div class="section-title">🥉 模型输出结果 #4-{top_n}</div>')
+        for i in range(3, min(top_n, len(df_top10))):
+            parts.append(signal_card_html('other', i + 1, df_top10.iloc[i], stock_names[i]))
+
+    parts.append('<hr>')
+
+    # ========== 时效性提示 ==========
+    parts.append("""
+    <div class="disclaimer-bar">
+        信号具有时效性，仅在研究窗口期内具有参考意义。
+    </div>
+    """)
+
+    # ========== 底部法律声明 ==========
+    parts.append("""
+    <div class="footer-legal">
+        <div class="footer-title">使用声明</div>
+        <div class="footer-content">
+            本本平台展示的市场状态或模型结果来源于历史数据与统计方法，不代表未来市场走势，仅供研究参考，不作为任何投资决策依据。<br>
+            模型结果可能存在失效风险、参数偏差或市场环境变化带来的不确定性，用户应基于自身风险承受能力独立决策并自行承担投资风险。<br>
+            本平台内容仅供个人研究与学习使用，禁止二次传播、转售或公开发布。<br>
+            严禁任何形式的商业化使用或二次收费。<br>
+            如发现违规行为，平台有权终止访问授权并保留追责权利。
+        </div>
+    </div>
+    """)
+
+    return _compact(''.join(parts))
+
+
+def snapshot_path(version: str, date: str = None) -> str:
+    return os.path.join(SNAPSHOT_DIR, f"{version}_{date}.html")
+
+
+def _remember(strategy: str, version: str, date: str, html: str):
+    """每个策略只保留当前数据版本的快照"""
+    for key in [k for k in _snapshots if k[0] == strategy and k[1] != version]:
+        del _snapshots[key]
+    _snapshots[(strategy, version, date)] = html
+
+
+def publish_snapshot(date: str = None, strategy: str = None) -> str:
+    """渲染并写出策略当前数据版本、当前应展示信号日的快照，返回文件路径"""
+    strategy = strategy_registry.get_strategy(strategy)
+    version = snapshot_version(strategy.id)
+    date, day = load_signal_day(date, strategy.id)
+    html = build_signal_page_html(day, strategy.top_n)
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    path = snapshot_path(version, date)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(html)
+    _remember(strategy.id, version, date, html)
+    return path
+
+
+def get_snapshot(date: str = None, strategy: str = None) -> str:
+    """
+    获取策略当前数据版本、某个信号日的信号页快照
+
+    内存 → 已发布文件 → 现场渲染一次（之后常驻内存）
+    """
+    strategy = strategy_registry.get_strategy(strategy)
+    version = snapshot_version(strategy.id)
+    html = _snapshots.get((strategy.id, version, date))
+    perf.cache_event('signal_snapshot', html is not None)
+    if html is not None:
+        return html
+
+    try:
+        with open(snapshot_path(version, date), 'r', encoding='utf-8') as f:
+            html = f.read()
+    except OSError:
+        html = build_signal_page_html(load_signal_day(date, strategy.id)[1], strategy.top_n)
+
+    _remember(strategy.id, version, date, html)
+    return html
+
+
+if __name__ == "__main__":
+    for strategy_id in sys.argv[1:] or [s.id for s in strategy_registry.list_strategies()]:
+        path = publish_snapshot(strategy=strategy_id)
+        print(f"{strategy_id} 数据版本 {snapshot_version(strategy_id)}：快照已发布 → {path}")
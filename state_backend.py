@@ -0,0 +1,613 @@
+"""
+EigenFlow 共享状态存储
+Shared state backend: key state, usage events, device counters
+
+【为什么需要】
+多副本部署时 key_state.json / usage_log.jsonl 各自只看到一半数据，
+first_seen（30 天有效期）与共享风控都会出错，需要所有副本共用一份状态。
+
+【实现】
+├── file    本地 JSON / JSONL 文件（默认，单实例，与原行为一致；读改写与追加持有 .lock 文件锁，
+│           与 key_sweeper / usage_store 等定时任务进程互斥）
+├── sqlite  本地 SQLite（WAL，每线程一个连接；同机多进程 / 共享卷多副本）
+└── redis   Redis 协议（连接池 + 管道批量写；多机多副本，可用任何兼容服务）
+
+【统一接口】
+├── load_key_state() / save_key_state(state)   全量读写（兼容旧接口）
+├── get_key_state(key)                          单个 Key 状态，不存在返回 None
+├── activate_key(key, state)                    原子“首次激活”，返回最终生效的状态
+├── append_usage(entries)                       批量写入使用日志（后台线程调用）
+├── recent_devices(key_mask, since)             时间窗口内的不同设备 ID 集合（count_recent_devices 为其个数）
+├── read_usage(since, until)                    [since, until) 内的原始日志（usage_store 列式压缩读取）
+├── delete_keys(keys)                           删除 Key 状态（key_sweeper 压缩）
+└── compact_usage(before)                       删除早于 before 的使用日志，返回删除条数
+
+选择方式：环境变量 EF_STATE_BACKEND=file|sqlite|redis
+- EF_STATE_SQLITE: SQLite 文件路径（默认 data/state.db）
+- EF_REDIS_URL:    redis://[:password@]host:port/db（默认 redis://127.0.0.1:6379/0）
+"""
+
+import os
+import json
+import queue
+import socket
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:   # Windows：只有进程内锁
+    fcntl = None
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+STATE_CONFIG = {
+    'backend': os.environ.get('EF_STATE_BACKEND', 'file'),
+    'sqlite_path': os.environ.get('EF_STATE_SQLITE', os.path.join(APP_DIR, 'data', 'state.db')),
+    'redis_url': os.environ.get('EF_REDIS_URL', 'redis://127.0.0.1:6379/0'),
+    'redis_pool_size': 8,           # 每个进程最多连接数
+    'redis_timeout_s': 5,
+    'redis_prefix': 'ef:',
+    'usage_log_max': 1_000_000,     # Redis 中保留的最近日志条数
+    'device_ttl_s': 7 * 24 * 3600,  # 设备计数保留时间（需大于风控时间窗口）
+}
+
+
+class StateBackendError(Exception):
+    """状态存储访问失败"""
+
+
+class StateBackend:
+    """状态存储接口（各实现见下）"""
+
+    name = 'base'
+
+    def load_key_state(self) -> dict:
+        raise NotImplementedError
+
+    def save_key_state(self, state: dict):
+        raise NotImplementedError
+
+    def get_key_state(self, key: str):
+        raise NotImplementedError
+
+    def activate_key(self, key: str, state: dict) -> dict:
+        raise NotImplementedError
+
+    def append_usage(self, entries: list):
+        raise NotImplementedError
+
+    def recent_devices(self, key_mask: str, since: datetime) -> set:
+        raise NotImplementedError
+
+    def count_recent_devices(self, key_mask: str, since: datetime) -> int:
+        return len(self.recent_devices(key_mask, since))
+
+    def read_usage(self, since: datetime = None, until: datetime = None) -> list:
+        raise NotImplementedError
+
+    def delete_keys(self, keys: list):
+        raise NotImplementedError
+
+    def compact_usage(self, before: datetime) -> int:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+# ==================== 本地文件 ====================
+
+@contextmanager
+def _file_lock(path: str, thread_lock: threading.Lock):
+    """进程内锁 + 旁路锁文件 {path}.lock 上的 flock（跨进程互斥）"""
+    with thread_lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+class FileBackend(StateBackend):
+    """
+    key_state.json + usage_log.jsonl（单实例）
+
+    Key 状态整文件写临时文件后原子替换，读方不会读到半个文件；
+    读改写（激活 / 删除）与日志追加 / 压缩分别持有两个文件锁，定时任务进程不会覆盖应用进程的写入
+    """
+
+    name = 'file'
+
+    def __init__(self, key_state_file: str, usage_log_file: str):
+        self.key_state_file = key_state_file
+        self.usage_log_file = usage_log_file
+        self._key_lock = threading.Lock()
+        self._usage_lock = threading.Lock()
+
+    def _read_key_state(self) -> dict:
+        """读改写用：文件损坏时报错，不以空状态覆盖"""
+        if not os.path.exists(self.key_state_file):
+            return {}
+        try:
+            with open(self.key_state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise StateBackendError(f"读取 {self.key_state_file} 失败：{e}") from e
+
+    def _write_key_state(self, state: dict):
+        tmp = f"{self.key_state_file}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.key_state_file)
+
+    def load_key_state(self) -> dict:
+        try:
+            return self._read_key_state()
+        except StateBackendError:
+            return {}
+
+    def save_key_state(self, state: dict):
+        with _file_lock(self.key_state_file, self._key_lock):
+            self._write_key_state(state)
+
+    def get_key_state(self, key: str):
+        return self.load_key_state().get(key)
+
+    def activate_key(self, key: str, state: dict) -> dict:
+        with _file_lock(self.key_state_file, self._key_lock):
+            all_state = self._read_key_state()
+            if key not in all_state:
+                all_state[key] = state
+                self._write_key_state(all_state)
+            return all_state[key]
+
+    def append_usage(self, entries: list):
+        lines = ''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in entries)
+        with _file_lock(self.usage_log_file, self._usage_lock), \
+                open(self.usage_log_file, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+    def recent_devices(self, key_mask: str, since: datetime) -> set:
+        if not os.path.exists(self.usage_log_file):
+            return set()
+
+        since_iso = since.isoformat()
+        needle = json.dumps(key_mask, ensure_ascii=False)
+        devices = set()
+        with open(self.usage_log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if needle not in line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get('key_mask') == key_mask and entry.get('timestamp', '') >= since_iso \
+                        and entry.get('device_id'):
+                    devices.add(entry['device_id'])
+        return devices
+
+    def read_usage(self, since: datetime = None, until: datetime = None) -> list:
+        if not os.path.exists(self.usage_log_file):
+            return []
+        since_iso = since.isoformat() if since else ''
+        until_iso = until.isoformat() if until else None
+        entries = []
+        with open(self.usage_log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                ts = entry.get('timestamp', '')
+                if ts >= since_iso and (until_iso is None or ts < until_iso):
+                    entries.append(entry)
+        return entries
+
+    def delete_keys(self, keys: list):
+        with _file_lock(self.key_state_file, self._key_lock):
+            all_state = self._read_key_state()
+            removed = [key for key in keys if all_state.pop(key, None) is not None]
+            if removed:
+                self._write_key_state(all_state)
+
+    def compact_usage(self, before: datetime) -> int:
+        """重写日志文件，只保留 before 之后的行（临时文件 + 原子替换，期间追加方等待文件锁）"""
+        if not os.path.exists(self.usage_log_file):
+            return 0
+        before_iso = before.isoformat()
+        removed = 0
+        tmp = self.usage_log_file + '.tmp'
+        with _file_lock(self.usage_log_file, self._usage_lock):
+            with open(self.usage_log_file, 'r', encoding='utf-8') as src, open(tmp, 'w', encoding='utf-8') as dst:
+                for line in src:
+                    try:
+                        keep = json.loads(line).get('timestamp', '') >= before_iso
+                    except ValueError:
+                        keep = False
+                    if keep:
+                        dst.write(line)
+                    else:
+                        removed += 1
+            os.replace(tmp, self.usage_log_file)
+        return removed
+
+
+# ==================== SQLite ====================
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS key_state (
+    key   TEXT PRIMARY KEY,
+    state TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS usage_log (
+    timestamp TEXT NOT NULL,
+    key_mask  TEXT NOT NULL,
+    status    TEXT,
+    ip_hash   TEXT,
+    ua_hash   TEXT,
+    device_id TEXT,
+    page      TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_usage_mask_time ON usage_log (key_mask, timestamp);
+"""
+
+_USAGE_COLUMNS = ('timestamp', 'key_mask', 'status', 'ip_hash', 'ua_hash', 'device_id', 'page')
+
+
+class SQLiteBackend(StateBackend):
+    """SQLite（WAL 模式，每个线程复用一个连接）"""
+
+    name = 'sqlite'
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._conns = []
+        self._conns_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn().executescript(_SQLITE_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def load_key_state(self) -> dict:
+        rows = self._conn().execute('SELECT key, state FROM key_state').fetchall()
+        return {key: json.loads(state) for key, state in rows}
+
+    def save_key_state(self, state: dict):
+        """全量替换（同一事务内清空后写入）"""
+        with self._conn() as conn:
+            conn.execute('DELETE FROM key_state')
+            conn.executemany(
+                'INSERT OR REPLACE INTO key_state (key, state) VALUES (?, ?)',
+                [(key, json.dumps(value, ensure_ascii=False)) for key, value in state.items()],
+            )
+
+    def get_key_state(self, key: str):
+        row = self._conn().execute('SELECT state FROM key_state WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def activate_key(self, key: str, state: dict) -> dict:
+        with self._conn() as conn:
+            conn.execute('INSERT OR IGNORE INTO key_state (key, state) VALUES (?, ?)',
+                         (key, json.dumps(state, ensure_ascii=False)))
+            row = conn.execute('SELECT state FROM key_state WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0])
+
+    def append_usage(self, entries: list):
+        with self._conn() as conn:
+            conn.executemany(
+                f"INSERT INTO usage_log ({', '.join(_USAGE_COLUMNS)}) VALUES ({', '.join('?' * len(_USAGE_COLUMNS))})",
+                [tuple(e.get(c) for c in _USAGE_COLUMNS) for e in entries],
+            )
+
+    def recent_devices(self, key_mask: str, since: datetime) -> set:
+        rows = self._conn().execute(
+            'SELECT DISTINCT device_id FROM usage_log '
+            'WHERE key_mask = ? AND timestamp >= ? AND device_id IS NOT NULL',
+            (key_mask, since.isoformat()),
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def read_usage(self, since: datetime = None, until: datetime = None) -> list:
+        rows = self._conn().execute(
+            f"SELECT {', '.join(_USAGE_COLUMNS)} FROM usage_log WHERE timestamp >= ? AND timestamp < ? "
+            'ORDER BY timestamp',
+            (since.isoformat() if since else '', until.isoformat() if until else '\uffff'),
+        ).fetchall()
+        return [dict(zip(_USAGE_COLUMNS, row)) for row in rows]
+
+    def delete_keys(self, keys: list):
+        with self._conn() as conn:
+            conn.executemany('DELETE FROM key_state WHERE key = ?', [(key,) for key in keys])
+
+    def compact_usage(self, before: datetime) -> int:
+        conn = self._conn()
+        with conn:
+            removed = conn.execute('DELETE FROM usage_log WHERE timestamp < ?', (before.isoformat(),)).rowcount
+        if removed:
+            conn.execute('VACUUM')
+        return removed
+
+    def close(self):
+        with self._conns_lock:
+            for conn in self._conns:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._conns.clear()
+        self._local = threading.local()
+
+
+# ==================== Redis 协议 ====================
+
+class _RespConnection:
+    """单个 RESP 连接（只实现本模块用到的请求 / 应答类型）"""
+
+    def __init__(self, host: str, port: int, db: int, password: str, timeout: float):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile('rb')
+        if password:
+            self.pipeline([('AUTH', password)])
+        if db:
+            self.pipeline([('SELECT', db)])
+
+    @staticmethod
+    def _encode(command) -> bytes:
+        parts = [b'*%d\r\n' % len(command)]
+        for arg in command:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode('utf-8')
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(parts)
+
+    def _read_reply(self):
+        line = self.reader.readline()
+        if not line:
+            raise StateBackendError('connection closed')
+        kind, body = line[:1], line[1:-2]
+        if kind == b'+':
+            return body.decode('utf-8')
+        if kind == b'-':
+            return StateBackendError(body.decode('utf-8'))
+        if kind == b':':
+            return int(body)
+        if kind == b'$':
+            length = int(body)
+            if length < 0:
+                return None
+            data = self.reader.read(length + 2)
+            return data[:-2].decode('utf-8')
+        if kind == b'*':
+            length = int(body)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise StateBackendError(f'unexpected reply: {line!r}')
+
+    def pipeline(self, commands: list) -> list:
+        """一次发送多条命令，按顺序读回全部应答；任一命令出错则抛出"""
+        self.sock.sendall(b''.join(self._encode(c) for c in commands))
+        replies = [self._read_reply() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, StateBackendError):
+                raise reply
+        return replies
+
+    def close(self):
+        try:
+            self.reader.close()
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class RedisPool:
+    """
+    Redis 连接池
+
+    - 空闲连接后进先出复用，最多 size 个并发连接，用尽时等待
+    - 出错的连接直接丢弃，下次按需重建
+    """
+
+    def __init__(self, url: str, size: int = 8, timeout: float = 5):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or '127.0.0.1'
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.password = parsed.password
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def pipeline(self, commands: list) -> list:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise StateBackendError('connection pool exhausted')
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = _RespConnection(self.host, self.port, self.db, self.password, self.timeout)
+            try:
+                replies = conn.pipeline(commands)
+            except Exception:
+                conn.close()
+                raise
+            self._idle.put(conn)
+            return replies
+        finally:
+            self._slots.release()
+
+    def execute(self, *command):
+        return self.pipeline([command])[0]
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class RedisBackend(StateBackend):
+    """
+    Redis 协议存储
+
+    【数据结构】
+    ├── {prefix}key_state         HASH  key -> JSON 状态（HSETNX 保证首次激活唯一）
+    ├── {prefix}usage_log         LIST  JSON 日志（保留最近 usage_log_max 条）
+    └── {prefix}devices:{mask}    ZSET  device_id -> 最近出现时间戳
+    """
+
+    name = 'redis'
+
+    def __init__(self, url: str, pool_size: int = 8, timeout: float = 5, prefix: str = 'ef:'):
+        self.pool = RedisPool(url, size=pool_size, timeout=timeout)
+        self.prefix = prefix
+
+    def _devices_key(self, key_mask: str) -> str:
+        return f"{self.prefix}devices:{key_mask}"
+
+    def load_key_state(self) -> dict:
+        flat = self.pool.execute('HGETALL', self.prefix + 'key_state') or []
+        return {flat[i]: json.loads(flat[i + 1]) for i in range(0, len(flat), 2)}
+
+    def save_key_state(self, state: dict):
+        """全量替换（MULTI / EXEC 内先 DEL 再 HSET）"""
+        name = self.prefix + 'key_state'
+        commands = [('MULTI',), ('DEL', name)]
+        if state:
+            hset = ['HSET', name]
+            for key, value in state.items():
+                hset += [key, json.dumps(value, ensure_ascii=False)]
+            commands.append(tuple(hset))
+        commands.append(('EXEC',))
+        self.pool.pipeline(commands)
+
+    def get_key_state(self, key: str):
+        raw = self.pool.execute('HGET', self.prefix + 'key_state', key)
+        return json.loads(raw) if raw is not None else None
+
+    def activate_key(self, key: str, state: dict) -> dict:
+        _, raw = self.pool.pipeline([
+            ('HSETNX', self.prefix + 'key_state', key, json.dumps(state, ensure_ascii=False)),
+            ('HGET', self.prefix + 'key_state', key),
+        ])
+        return json.loads(raw)
+
+    def append_usage(self, entries: list):
+        if not entries:
+            return
+        log_key = self.prefix + 'usage_log'
+        commands = [
+            ['RPUSH', log_key] + [json.dumps(e, ensure_ascii=False) for e in entries],
+            ('LTRIM', log_key, -STATE_CONFIG['usage_log_max'], -1),
+        ]
+
+        devices = {}  # mask -> {device_id: 时间戳}
+        for e in entries:
+            if e.get('device_id') and e.get('key_mask'):
+                try:
+                    ts = datetime.fromisoformat(e['timestamp']).timestamp()
+                except (KeyError, ValueError):
+                    continue
+                devices.setdefault(e['key_mask'], {})[e['device_id']] = ts
+        for mask, seen in devices.items():
+            command = ['ZADD', self._devices_key(mask)]
+            for device_id, ts in seen.items():
+                command += [ts, device_id]
+            commands.append(command)
+            commands.append(('EXPIRE', self._devices_key(mask), STATE_CONFIG['device_ttl_s']))
+
+        self.pool.pipeline(commands)
+
+    def recent_devices(self, key_mask: str, since: datetime) -> set:
+        since_ts = since.timestamp()
+        _, devices = self.pool.pipeline([
+            ('ZREMRANGEBYSCORE', self._devices_key(key_mask), '-inf', f'({since_ts - STATE_CONFIG["device_ttl_s"]}'),
+            ('ZRANGEBYSCORE', self._devices_key(key_mask), since_ts, '+inf'),
+        ])
+        return set(devices or [])
+
+    def count_recent_devices(self, key_mask: str, since: datetime) -> int:
+        since_ts = since.timestamp()
+        _, count = self.pool.pipeline([
+            ('ZREMRANGEBYSCORE', self._devices_key(key_mask), '-inf', f'({since_ts - STATE_CONFIG["device_ttl_s"]}'),
+            ('ZCOUNT', self._devices_key(key_mask), since_ts, '+inf'),
+        ])
+        return count
+
+    def read_usage(self, since: datetime = None, until: datetime = None) -> list:
+        since_iso = since.isoformat() if since else ''
+        until_iso = until.isoformat() if until else None
+        entries = []
+        for item in self.pool.execute('LRANGE', self.prefix + 'usage_log', 0, -1) or []:
+            try:
+                entry = json.loads(item)
+            except ValueError:
+                continue
+            ts = entry.get('timestamp', '')
+            if ts >= since_iso and (until_iso is None or ts < until_iso):
+                entries.append(entry)
+        return entries
+
+    def delete_keys(self, keys: list):
+        if keys:
+            self.pool.execute('HDEL', self.prefix + 'key_state', *keys)
+
+    def compact_usage(self, before: datetime) -> int:
+        """日志按写入顺序追加：二分查找第一条不早于 before 的位置后 LTRIM（O(log n) 次往返）"""
+        log_key = self.prefix + 'usage_log'
+        before_iso = before.isoformat()
+        lo, hi = 0, self.pool.execute('LLEN', log_key)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            try:
+                ts = json.loads(self.pool.execute('LINDEX', log_key, mid)).get('timestamp', '')
+            except (TypeError, ValueError):
+                ts = ''
+            if ts < before_iso:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo:
+            self.pool.execute('LTRIM', log_key, lo, -1)
+        return lo
+
+    def close(self):
+        self.pool.close()
+
+
+# ==================== 工厂 ====================
+
+def create_backend(key_state_file: str, usage_log_file: str, backend: str = None) -> StateBackend:
+    """按配置创建存储实例（file 后端使用传入的文件路径）"""
+    backend = backend or STATE_CONFIG['backend']
+    if backend == 'sqlite':
+        return SQLiteBackend(STATE_CONFIG['sqlite_path'])
+    if backend == 'redis':
+        return RedisBackend(STATE_CONFIG['redis_url'], pool_size=STATE_CONFIG['redis_pool_size'],
+                            timeout=STATE_CONFIG['redis_timeout_s'], prefix=STATE_CONFIG['redis_prefix'])
+    if backend != 'file':
+        raise ValueError(f"未知的状态存储：{backend}（可选 file / sqlite / redis）")
+    return FileBackend(key_state_file, usage_log_file)
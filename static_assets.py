@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 静态资源管线
+Static asset pipeline (QR codes and brand images)
+
+【处理流程】
+├── 原图按显示尺寸 ×2（高清屏）缩放，仅执行一次
+├── 输出 PNG（调色板压缩）+ WebP，文件名带内容哈希：wechat_qr.1a2b3c4d.webp
+├── 写入 static/，由 Streamlit 静态服务（server.enableStaticServing）提供
+└── 进程内存常驻，重跑页面不再读盘
+
+使用方法：
+    python static_assets.py       # 重新生成 static/ 与 manifest.json
+"""
+
+import os
+import io
+import json
+import hashlib
+
+import perf
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(APP_DIR, 'static')
+MANIFEST_FILE = os.path.join(STATIC_DIR, 'manifest.json')
+STATIC_URL_PREFIX = 'app/static/'
+
+# 【资源配置】name -> (源文件, 显示宽度 px)
+ASSET_SOURCES = {
+    'wechat_qr': ('wechat_qr.png', 180),
+    'alipay_qr': ('alipay_qr.png', 180),
+}
+
+ASSET_CONFIG = {
+    'scale': 2,              # 高清屏倍率
+    'png_colors': 256,       # PNG 调色板颜色数
+    'webp_quality': 85,
+}
+
+_assets = {}  # name -> {'png': bytes, 'webp': bytes, 'png_url': str, 'webp_url': str, ...}
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()[:8]
+
+
+def _encode(src_path: str, display_width: int) -> dict:
+    """缩放并编码单张图片，返回 PNG / WebP 字节"""
+    from PIL import Image
+
+    with Image.open(src_path) as img:
+        img = img.convert('RGB')
+        target_w = min(display_width * ASSET_CONFIG['scale'], img.width)
+        target_h = round(img.height * target_w / img.width)
+        img = img.resize((target_w, target_h), Image.LANCZOS)
+
+        png_buf = io.BytesIO()
+        img.quantize(colors=ASSET_CONFIG['png_colors']).save(png_buf, format='PNG', optimize=True)
+
+        webp_buf = io.BytesIO()
+        img.save(webp_buf, format='WEBP', quality=ASSET_CONFIG['webp_quality'], method=6)
+
+    return {
+        'png': png_buf.getvalue(),
+        'webp': webp_buf.getvalue(),
+        'width': target_w,
+        'height': target_h,
+    }
+
+
+def _source_stamp(src_path: str) -> str:
+    """源图内容哈希，用于判断 manifest 是否过期（每进程每资源只算一次）"""
+    with open(src_path, 'rb') as f:
+        return _content_hash(f.read())
+
+
+def build_assets() -> dict:
+    """
+    生成全部静态资源到 static/，并写出 manifest.json
+
+    旧哈希版本的文件会被清理
+    """
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    manifest = {}
+
+    for name, (src, display_width) in ASSET_SOURCES.items():
+        src_path = os.path.join(APP_DIR, src)
+        encoded = _encode(src_path, display_width)
+        entry = {'display_width': display_width, 'width': encoded['width'], 'height': encoded['height'],
+                 'source': _source_stamp(src_path)}
+
+        for ext in ('png', 'webp'):
+            data = encoded[ext]
+            filename = f"{name}.{_content_hash(data)}.{ext}"
+            with open(os.path.join(STATIC_DIR, filename), 'wb') as f:
+                f.write(data)
+            entry[ext] = filename
+
+        keep = {entry['png'], entry['webp']}
+        for old in os.listdir(STATIC_DIR):
+            if old.startswith(name + '.') and old not in keep:
+                os.remove(os.path.join(STATIC_DIR, old))
+
+        manifest[name] = entry
+
+    with open(MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    _assets.clear()
+    return manifest
+
+
+def _load_asset(name: str) -> dict:
+    """从 manifest 加载；缺失或源图更新时在内存中重新编码（不写盘）"""
+    src, display_width = ASSET_SOURCES[name]
+    src_path = os.path.join(APP_DIR, src)
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            entry = json.load(f)[name]
+        if entry.get('source') != _source_stamp(src_path):
+            raise KeyError('source')
+        asset = {'display_width': entry['display_width'], 'width': entry['width'], 'height': entry['height']}
+        for ext in ('png', 'webp'):
+            with open(os.path.join(STATIC_DIR, entry[ext]), 'rb') as f:
+                asset[ext] = f.read()
+            asset[f'{ext}_url'] = STATIC_URL_PREFIX + entry[ext]
+        return asset
+    except (OSError, KeyError, ValueError):
+        pass
+
+    encoded = _encode(src_path, display_width)
+    encoded['display_width'] = display_width
+    encoded['png_url'] = encoded['webp_url'] = None
+    return encoded
+
+
+def get_asset(name: str) -> dict:
+    """获取资源（进程内缓存）"""
+    perf.cache_event('static_assets', name in _assets)
+    if name not in _assets:
+        _assets[name] = _load_asset(name)
+    return _assets[name]
+
+
+if __name__ == "__main__":
+    manifest = build_assets()
+    for name, entry in manifest.items():
+        src = os.path.join(APP_DIR, ASSET_SOURCES[name][0])
+        png_size = os.path.getsize(os.path.join(STATIC_DIR, entry['png']))
+        webp_size = os.path.getsize(os.path.join(STATIC_DIR, entry['webp']))
+        print(f"{name}: {os.path.getsize(src) // 1024}KB → png {png_size // 1024}KB / webp {webp_size // 1024}KB "
+              f"({entry['width']}×{entry['height']})")
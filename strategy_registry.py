@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 策略注册表
+Multi-strategy signal registry with lazy loading and a memory-bounded LRU
+
+【注册表】data/strategies.json（EF_STRATEGY_FILE；缺失时只有默认策略 top10 = core.SIGNAL_FILE）
+    {
+      "default": "top10",
+      "strategies": [
+        {"id": "top10", "name": "全市场 Top10", "path": "trade_list_top10.csv", "top_n": 10},
+        {"id": "csi500_top20", "name": "中证500 Top20", "path": "data/strategies/csi500_top20.csv",
+         "top_n": 20, "entitlement": "scoped", "columns": {"code": "symbol", "trade_date": "date"}}
+      ]
+    }
+├── path:         信号 CSV（相对应用目录；默认策略省略时为 core.SIGNAL_FILE）
+├── top_n:        每日展示的名次上限（有 rank 列时按 rank 过滤）
+├── columns:      文件列名 → 标准列名（symbol / date / rank / score / name / y_OTO ...），index_col 默认 0
+└── entitlement:  all = 所有有效 Key 可用（未单独配置范围的 Key）；scoped = 仅 Key 范围中列出的 Key 可用
+    Key 范围见 core.load_key_scopes（secrets [access_keys.scopes] / keys.json "scopes"）
+
+【数据集缓存】DatasetCache（进程内，所有会话共享）
+├── 懒加载：注册表只登记策略，首次访问某个策略时才解析其文件（同一数据集并发访问只解析一次）
+├── 键：(策略 id, 数据版本)；文件变化后旧版本随新版本载入而丢弃
+├── 条目：信号表 + 按日历史索引（首次需要时构建），大小按 perf.sizeof 计
+└── 淘汰：总大小超过 cache_mb 时按最近最少使用淘汰（最近访问的一个总是保留）
+
+使用方法：
+    python strategy_registry.py          # 列出策略、数据文件状态与缓存预算
+"""
+
+import os
+import json
+import threading
+from collections import OrderedDict
+
+import perf
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+STRATEGY_FILE = os.environ.get('EF_STRATEGY_FILE', os.path.join(APP_DIR, 'data', 'strategies.json'))
+
+STRATEGY_CONFIG = {
+    'cache_mb': float(os.environ.get('EF_STRATEGY_CACHE_MB', '256')),   # 数据集缓存上限
+    'default': 'top10',
+}
+
+DEFAULT_STRATEGIES = (
+    {'id': 'top10', 'name': '精选 Top10', 'path': None, 'top_n': 10, 'entitlement': 'all'},
+)
+
+ENTITLEMENTS = ('all', 'scoped')
+REQUIRED_COLUMNS = ('symbol',)
+
+
+# ==================== 策略 ====================
+
+class Strategy:
+    """单个策略：数据文件、列映射、名次上限与授权方式（只登记，不读数据）"""
+
+    def __init__(self, spec: dict):
+        self.id = str(spec['id']).strip()
+        self.name = spec.get('name') or self.id
+        self.description = spec.get('description', '')
+        self._path = spec.get('path')
+        self.top_n = int(spec['top_n']) if spec.get('top_n') else None
+        self.columns = dict(spec.get('columns') or {})
+        self.index_col = spec.get('index_col', 0)
+        self.entitlement = spec.get('entitlement', 'all')
+        if self.entitlement not in ENTITLEMENTS:
+            raise ValueError(f"策略 {self.id} 的 entitlement 必须是 {' / '.join(ENTITLEMENTS)}")
+
+    def __repr__(self):
+        return f"Strategy({self.id!r}, top_n={self.top_n}, entitlement={self.entitlement!r})"
+
+    @property
+    def path(self) -> str:
+        if not self._path:
+            from core import SIGNAL_FILE
+
+            return SIGNAL_FILE
+        return self._path if os.path.isabs(self._path) else os.path.join(APP_DIR, self._path)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def file_version(self) -> str:
+        try:
+            stat = os.stat(self.path)
+            return f"{stat.st_size}-{stat.st_mtime_ns}"
+        except OSError:
+            return 'none'
+
+    def version(self) -> str:
+        """数据版本（信号文件与证券主数据的大小 + 修改时间，仅 stat）"""
+        import security_master
+
+        return f"{self.file_version()}/{security_master.file_version()}"
+
+    def read(self):
+        """解析信号文件：列映射 → 紧凑列类型 → 按 top_n 过滤 → 合并股票名称（每次调用都读盘）"""
+        import security_master
+        from core import read_signal_frame
+
+        df = read_signal_frame(self.path, columns=self.columns, index_col=self.index_col)
+        if df.empty:
+            return df
+        missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+        if missing:
+            raise ValueError(f"策略 {self.id} 数据格式错误：缺少 {', '.join(missing)} 列")
+        if self.top_n and 'rank' in df.columns:
+            df = df[df['rank'] <= self.top_n]
+        master = security_master.get_master()
+        perf.register_shared('security_master', master)
+        return master.join(df)
+
+
+# ==================== 注册表 ====================
+
+_registries = {}  # (路径, 文件版本) -> {'default': id, 'strategies': OrderedDict[id -> Strategy]}
+
+
+def read_registry(path: str = None) -> dict:
+    """解析注册表文件（缺失时为内置默认策略；每次调用都读盘，请用 get_registry）"""
+    path = path or STRATEGY_FILE
+    data = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    if isinstance(data, list):
+        data = {'strategies': data}
+
+    strategies = OrderedDict()
+    for spec in data.get('strategies') or DEFAULT_STRATEGIES:
+        strategy = Strategy(spec)
+        if strategy.id in strategies:
+            raise ValueError(f"策略 id 重复：{strategy.id}")
+        strategies[strategy.id] = strategy
+    default = data.get('default') or STRATEGY_CONFIG['default']
+    if default not in strategies:
+        default = next(iter(strategies))
+    return {'default': default, 'strategies': strategies}
+
+
+def get_registry(path: str = None) -> dict:
+    """进程内共享的注册表（文件变化后自动重新加载）"""
+    path = path or STRATEGY_FILE
+    try:
+        stat = os.stat(path)
+        version = f"{stat.st_size}-{stat.st_mtime_ns}"
+    except OSError:
+        version = 'none'
+    key = (path, version)
+    if key not in _registries:
+        _registries.clear()
+        _registries[key] = read_registry(path)
+    return _registries[key]
+
+
+def list_strategies() -> list:
+    """全部策略（注册表顺序）"""
+    return list(get_registry()['strategies'].values())
+
+
+def default_strategy_id() -> str:
+    return get_registry()['default']
+
+
+def get_strategy(strategy_id: str = None) -> Strategy:
+    """按 id 取策略（空为默认策略）；不存在时抛出 KeyError"""
+    registry = get_registry()
+    strategy_id = strategy_id or registry['default']
+    try:
+        return registry['strategies'][strategy_id]
+    except KeyError:
+        raise KeyError(f"未知策略：{strategy_id}") from None
+
+
+def entitled_strategies(scope=None) -> list:
+    """
+    Key 范围 → 可访问的策略 id（注册表顺序）
+
+    scope 为 None（Key 未单独配置）时为 entitlement = all 的策略；
+    否则为范围中列出的策略，'*' 表示全部
+    """
+    strategies = list_strategies()
+    if scope is None:
+        return [s.id for s in strategies if s.entitlement == 'all']
+    scope = set(scope)
+    return [s.id for s in strategies if '*' in scope or s.id in scope]
+
+
+# ==================== 数据集缓存 ====================
+
+class DatasetCache:
+    """
+    按内存上限淘汰的 LRU（线程安全，所有会话共享）
+
+    get 返回条目 {'frame': 信号表, 'history': 按日索引（懒构建）, 'nbytes': 大小}
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._entries = OrderedDict()   # (策略 id, 数据版本) -> 条目
+        self._lock = threading.Lock()
+        self._loading = {}              # (策略 id, 数据版本) -> Lock，同一数据集只解析一次
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(e['nbytes'] for e in self._entries.values())
+
+    def _lookup(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def get(self, strategy: Strategy) -> dict:
+        key = (strategy.id, strategy.version())
+        entry = self._lookup(key)
+        perf.cache_event('strategy_dataset', entry is not None)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            load_lock = self._loading.setdefault(key, threading.Lock())
+        with load_lock:
+            entry = self._lookup(key)
+            if entry is None:
+                entry = {'frame': strategy.read()}
+                self._store(key, entry)
+        with self._lock:
+            self._loading.pop(key, None)
+        return entry
+
+    def history(self, strategy: Strategy) -> dict:
+        """按日历史索引（首次需要时构建并重新计入大小）"""
+        import signal_history
+
+        entry = self.get(strategy)
+        if 'history' not in entry:
+            entry['history'] = signal_history.build_history_index(entry['frame'])
+            self._store((strategy.id, strategy.version()), entry)
+        return entry['history']
+
+    def _store(self, key: tuple, entry: dict):
+        entry['nbytes'] = perf.sizeof({'frame': entry['frame'], 'history': entry.get('history')})
+        with self._lock:
+            for old in [k for k in self._entries if k[0] == key[0] and k != key]:
+                del self._entries[old]   # 同一策略的旧数据版本
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            total = sum(e['nbytes'] for e in self._entries.values())
+            while total > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                total -= evicted['nbytes']
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def summary(self) -> list:
+        """[{strategy, version, mb, history}]，按最近使用在前（管理面板）"""
+        with self._lock:
+            items = list(self._entries.items())
+        return [{'strategy': sid, 'version': version, 'mb': round(e['nbytes'] / 2 ** 20, 3),
+                 'history': 'history' in e} for (sid, version), e in reversed(items)]
+
+
+_cache = DatasetCache(int(STRATEGY_CONFIG['cache_mb'] * 2 ** 20))
+perf.register_shared('strategy_datasets', _cache._entries)
+
+
+def load_frame(strategy_id: str = None):
+    """策略信号表（懒加载，会话间共享；调用方只读）"""
+    return _cache.get(get_strategy(strategy_id))['frame']
+
+
+def load_history(strategy_id: str = None) -> dict:
+    """策略按日历史索引（懒加载，会话间共享）"""
+    return _cache.history(get_strategy(strategy_id))
+
+
+def cache_summary() -> dict:
+    return {'entries': _cache.summary(), 'mb': round(_cache.nbytes / 2 ** 20, 3),
+            'limit_mb': STRATEGY_CONFIG['cache_mb'], 'evictions': _cache.evictions}
+
+
+def main():
+    registry = get_registry()
+    source = STRATEGY_FILE if os.path.exists(STRATEGY_FILE) else '内置默认'
+    print(f"注册表（{source}）：{len(registry['strategies'])} 个策略，默认 {registry['default']}，"
+          f"缓存上限 {STRATEGY_CONFIG['cache_mb']:.0f} MB")
+    for strategy in registry['strategies'].values():
+        state = '存在' if strategy.exists() else '缺失'
+        print(f"  {strategy.id:<16}{strategy.name:<16}top_n={strategy.top_n or '-':<4}"
+              f"{strategy.entitlement:<8}{os.path.relpath(strategy.path, APP_DIR)}（{state}）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,521 @@
+"""
+EigenFlow 全局样式
+Global CSS, defined once at import time
+"""
+
+APP_CSS = """
+<style>
+/* 基础设置 */
+.block-container {
+    max-width: 680px !important;
+    padding-top: 0.5rem !important;
+    padding-bottom: 4rem !important;
+}
+
+/* 品牌头部 */
+.brand-header {
+    text-align: center;
+    padding: 16px 0 12px;
+    margin-bottom: 8px;
+}
+
+.brand-logo {
+    font-size: 1.8em;
+    font-weight: 700;
+    color: #1a1a1a;
+    letter-spacing: -0.5px;
+}
+
+.brand-tagline {
+    font-size: 0.85em;
+    color: #888;
+    margin-top: 4px;
+    letter-spacing: 1px;
+}
+
+/* 合规横幅 */
+.compliance-banner {
+    background: #f5f5f5;
+    color: #666;
+    font-size: 12px;
+    text-align: center;
+    padding: 10px 16px;
+    border-radius: 8px;
+    margin: 0 0 16px 0;
+    line-height: 1.6;
+}
+
+/* ========== 纯横向导航栏 ========== */
+.nav-wrapper {
+    display: flex;
+    justify-content: center;
+    margin: 20px 0 24px;
+}
+
+.nav-container {
+    display: inline-flex;
+    gap: 4px;
+    padding: 4px;
+    background: #e5e7eb;
+    border-radius: 10px;
+}
+
+/* 导航按钮 */
+.nav-btn {
+    display: flex;
+    align-items: center;
+    gap: 6px;
+    padding: 14px 28px;
+    border-radius: 8px;
+    font-size: 0.95em;
+    font-weight: 600;
+    color: #374151;
+    cursor: pointer;
+    transition: all 0.2s ease;
+    border: none;
+    background: transparent;
+    outline: none;
+    user-select: none;
+}
+
+.nav-btn:hover {
+    color: #111827;
+    background: rgba(255,255,255,0.8);
+    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+}
+
+.nav-btn.active {
+    color: #fff;
+    background: #4f46e5;
+    box-shadow: 0 2px 6px rgba(79, 70, 229, 0.3);
+}
+
+.nav-icon {
+    font-size: 1.2em;
+}
+
+/* 免责声明条 */
+.disclaimer-bar {
+    background: #f8fafc;
+    border-radius: 6px;
+    padding: 10px 14px;
+    margin-top: 8px;
+    font-size: 12px;
+    color: #6b7280;
+    text-align: center;
+    line-height: 1.6;
+
+    white-space: normal;
+    word-break: break-word;
+}
+
+
+/* 锁定屏幕 */
+.lock-screen {
+    background: linear-gradient(135deg, #fff 0%, #f9fafb 100%);
+    border: 2px solid #fbbf24;
+    border-radius: 16px;
+    padding: 32px 24px;
+    margin: 24px 0;
+    text-align: center;
+}
+
+.lock-icon {
+    font-size: 2.5em;
+    margin-bottom: 16px;
+}
+
+.lock-title {
+    font-size: 1.25em;
+    font-weight: 700;
+    color: #1a1a1a;
+    margin-bottom: 12px;
+}
+
+.lock-desc {
+    font-size: 0.88em;
+    color: #6b7280;
+    line-height: 1.7;
+    margin-bottom: 20px;
+}
+
+/* 信号卡片 */
+.signal-card {
+    padding: 18px;
+    border-radius: 12px;
+    margin: 10px 0;
+    text-align: center;
+}
+
+/* Rank #1 - 金色 */
+.signal-featured {
+    background: linear-gradient(135deg, #fffbeb, #fef3c7);
+    border: 2px solid #C9A227;
+}
+
+.signal-featured .label {
+    color: #92400e;
+    font-size: 0.7em;
+    font-weight: 600;
+    letter-spacing: 1px;
+    margin-bottom: 8px;
+}
+
+/* Silver */
+.signal-silver {
+    background: linear-gradient(135deg, #f9fafb, #f3f4f6);
+    border: 1px solid #d1d5db;
+}
+
+.signal-silver .label {
+    color: #6b7280;
+    font-size: 0.65em;
+    font-weight: 600;
+    text-transform: uppercase;
+    letter-spacing: 1px;
+    margin-bottom: 6px;
+}
+
+/* Other */
+.signal-other {
+    background: #fff;
+    border: 1px solid #e5e7eb;
+}
+
+.signal-other .label {
+    color: #9ca3af;
+    font-size: 0.6em;
+    font-weight: 500;
+    margin-bottom: 4px;
+}
+
+.stock-code {
+    font-size: 1.1em;
+    font-weight: 600;
+    color: #1a1a1a;
+}
+
+.stock-name {
+    color: #4b5563;
+    margin-left: 8px;
+}
+
+.signal-score {
+    font-size: 0.9em;
+    color: #6b7280;
+}
+
+/* 历史信号进出标记 */
+.signal-badge-entry,
+.signal-badge-exit {
+    display: inline-block;
+    font-size: 0.9em;
+    font-weight: 600;
+    padding: 1px 6px;
+    border-radius: 6px;
+    margin-left: 4px;
+}
+
+.signal-badge-entry {
+    color: #b91c1c;
+    background: #fee2e2;
+}
+
+.signal-badge-exit {
+    color: #047857;
+    background: #d1fae5;
+}
+
+/* 分区标题 */
+.section-title {
+    font-size: 0.75em;
+    font-weight: 600;
+    color: #666;
+    margin: 24px 0 12px;
+    padding-left: 12px;
+    border-left: 3px solid #C9A227;
+}
+
+/* 日期标签 */
+.date-label {
+    text-align: center;
+    margin: 12px 0 20px;
+    color: #6b7280;
+    font-size: 0.78em;
+}
+
+/* 水印 */
+.watermark {
+    position: fixed;
+    bottom: 6px;
+    left: 0;
+    right: 0;
+    text-align: center;
+    font-size: 0.58em;
+    color: #d1d5db;
+    padding: 8px;
+    background: linear-gradient(to top, rgba(255,255,255,0.95), transparent);
+    z-index: 100;
+}
+
+/* 底部法律声明 */
+.footer-legal {
+    background: #f8f9fa;
+    border-radius: 8px;
+    padding: 16px;
+    margin: 24px 0 16px 0;
+    text-align: left;
+    border: 1px solid #e5e7eb;
+}
+
+.footer-title {
+    font-size: 0.75em;
+    font-weight: 600;
+    color: #666;
+    margin-bottom: 8px;
+}
+
+.footer-content {
+    font-size: 0.65em;
+    color: #888;
+    line-height: 1.8;
+}
+
+/* TradingView */
+.tv-container {
+    width: 100%;
+    min-height: 420px;
+    margin-bottom: 8px;
+}
+
+
+.tv-disclaimer {
+    font-size: 8px;
+    color: #64748B;
+    line-height: 1.6;
+    margin-top: 10px;
+    padding: 8px 10px;
+
+    /* 关键：避免被裁剪 */
+    white-space: normal;
+    word-break: break-word;
+
+    /* 如果被父容器裁掉 */
+    overflow: visible;
+}
+
+
+/* 卡片样式 */
+.info-card {
+    background: #fff;
+    border: 1px solid #e5e7eb;
+    border-radius: 12px;
+    padding: 18px;
+    margin: 14px 0;
+}
+
+.info-card-title {
+    font-size: 0.95em;
+    font-weight: 600;
+    color: #1a1a1a;
+    margin-bottom: 10px;
+}
+
+.info-card-text {
+    font-size: 0.8em;
+    color: #6b7280;
+    line-height: 1.7;
+}
+
+/* 二维码区域 */
+.qr-area {
+    background: #f8f9fa;
+    border-radius: 12px;
+    padding: 14px;
+    text-align: center;
+    margin: 12px 0;
+}
+
+.qr-label {
+    font-size: 0.78em;
+    color: #6b7280;
+    margin-top: 8px;
+}
+
+/* 价格样式 */
+.price-row {
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    padding: 12px 0;
+    border-bottom: 1px solid #f0f0f0;
+}
+
+.price-row:last-child {
+    border-bottom: none;
+}
+
+.price-label {
+    font-size: 0.9em;
+    color: #666;
+}
+
+.price-value {
+    font-size: 1.1em;
+    font-weight: 600;
+    color: #333;
+}
+
+.price-value.highlight {
+    color: #C9A227;
+    font-size: 1.2em;
+}
+
+.price-tag {
+    font-size: 0.6em;
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    color: white;
+    padding: 2px 8px;
+    border-radius: 10px;
+    margin-left: 6px;
+}
+
+/* Access Key 显示 */
+.access-key-display {
+    background: linear-gradient(135deg, #fffbeb 0%, #fef3c7 100%);
+    border: 2px solid #C9A227;
+    border-radius: 12px;
+    padding: 20px;
+    margin: 16px 0;
+    text-align: center;
+}
+
+.ak-label {
+    font-size: 0.7em;
+    color: #92400e;
+    margin-bottom: 8px;
+    letter-spacing: 1px;
+}
+
+.ak-value {
+    font-size: 1.3em;
+    font-weight: 700;
+    color: #C9A227;
+    margin-bottom: 12px;
+    font-family: 'SF Mono', Monaco, monospace;
+    letter-spacing: 1px;
+}
+
+.ak-warning {
+    font-size: 0.65em;
+    color: #888;
+    line-height: 1.6;
+}
+
+/* 输入框组 */
+.input-group {
+    background: linear-gradient(135deg, #fafafa, #f0f0f0);
+    border: 1px solid #e5e7eb;
+    border-radius: 12px;
+    padding: 18px;
+    margin: 16px 0;
+}
+
+.input-label {
+    font-size: 0.9em;
+    font-weight: 600;
+    color: #374151;
+    margin-bottom: 12px;
+    text-align: center;
+}
+
+/* 隐藏元素 */
+#MainMenu {visibility: hidden;}
+footer {visibility: hidden;}
+header {visibility: hidden;}
+
+/* 隐藏触发按钮 */
+button[id^="trigger_"] {
+    visibility: hidden !important;
+    position: absolute !important;
+    width: 1px !important;
+    height:  auto;
+    padding: 0 !important;
+    margin: -1px !important;
+    overflow: hidden !important;
+    clip: rect(0, 0, 0, 0) !important;
+    border: 0 !important;
+}
+
+/* 权限提示 */
+.locked-prompt {
+    background: linear-gradient(135deg, #fef3c7, #fffbeb);
+    border: 1px solid #fcd34d;
+    border-radius: 12px;
+    padding: 20px;
+    margin: 20px 0;
+    text-align: center;
+}
+
+.locked-prompt-icon {
+    font-size: 2em;
+    margin-bottom: 12px;
+}
+
+.locked-prompt-title {
+    font-size: 1.1em;
+    font-weight: 600;
+    color: #92400e;
+    margin-bottom: 8px;
+}
+
+.locked-prompt-text {
+    font-size: 0.85em;
+    color: #78350f;
+    line-height: 1.6;
+}
+</style>
+"""
+
+NAV_CSS = """
+<style>
+.nav-container {
+    display: flex;
+    gap: 0;
+    background: white;
+    border-radius: 12px;
+    padding: 8px;
+    box-shadow: 0 2px 8px rgba(0,0,0,0.08);
+    margin: 16px 0;
+}
+
+.nav-link {
+    flex: 1;
+    text-align: center;
+    padding: 16px 12px;
+    border-radius: 10px;
+    text-decoration: none !important;
+    color: #6b7280;
+    font-weight: 500;
+    font-size: 14px;
+    transition: all 0.3s;
+    border: 2px solid transparent;
+}
+
+.nav-link:hover {
+    background: #f3f4f6;
+    color: #374151;
+}
+
+.nav-link.active {
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    color: white !important;
+}
+
+.nav-icon {
+    font-size: 20px;
+    display: block;
+    margin-bottom: 4px;
+}
+</style>
+"""
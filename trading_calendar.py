@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+EigenFlow A 股交易日历
+Cached SSE/SZSE trading calendar with O(1) next/previous trading-day lookup
+
+【交易日】周一至周五，且不在休市表中
+├── 休市表：内置 HOLIDAYS（交易所公告的工作日休市日）+ 可选 data/holidays.txt 补充
+│   （每行一个日期 YYYY-MM-DD，# 开头为注释；新一年的安排公布后追加即可，无需改代码）
+└── 休市表覆盖年份（2023 起）之外只排除周末（近似），CLI 会提示覆盖范围
+
+【预计算数组】以 2000-01-01 为 0 的日序号，覆盖到 max(休市表末年, 今年) + 2 年末
+├── is_open[d]:   是否交易日
+├── rank[d]:      截至 d（含）的交易日个数（cumsum）
+└── open_days[i]: 第 i 个交易日的日序号
+    下一 / 上一交易日、前后第 n 个交易日、区间交易日数都是数组下标，O(1)；
+    ranks / open_days_at 为批量版本（key_sweeper 一次计算全部 Key）
+
+【时区】北京时间 UTC+8（中国不实行夏令时，固定偏移即可，不依赖 tzdata）
+
+【信号时段】收盘后 publish_hour（16 点）发布当日信号，用于下一个交易日：
+├── 交易日 publish_hour 前：展示“今日信号”，信号日 = 上一交易日
+└── 其余时间（收盘后 / 周末 / 节假日）：展示“下一个交易日”，信号日 = 最近一个已收盘交易日
+
+使用方法：
+    python trading_calendar.py [日期 ...]     # 覆盖范围、当前信号时段；给出日期时打印前后交易日
+"""
+
+import os
+import sys
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+HOLIDAY_FILE = os.path.join(APP_DIR, 'data', 'holidays.txt')
+
+SHANGHAI = timezone(timedelta(hours=8), 'Asia/Shanghai')
+
+CALENDAR_CONFIG = {
+    'publish_hour': 16,   # 信号发布时间（北京时间，小时）
+    'start': date(2000, 1, 1),
+    'extra_years': 2,     # 覆盖到 max(休市表末年, 今年) 之后的年数
+}
+
+# 【内置休市表】沪深交易所工作日休市日（周末本就不交易，不列出）
+HOLIDAYS = (
+    # 2023
+    '2023-01-02', '2023-01-23', '2023-01-24', '2023-01-25', '2023-01-26', '2023-01-27',
+    '2023-04-05', '2023-05-01', '2023-05-02', '2023-05-03', '2023-06-22', '2023-06-23',
+    '2023-09-29', '2023-10-02', '2023-10-03', '2023-10-04', '2023-10-05', '2023-10-06',
+    # 2024
+    '2024-01-01', '2024-02-09', '2024-02-12', '2024-02-13', '2024-02-14', '2024-02-15',
+    '2024-02-16', '2024-04-04', '2024-04-05', '2024-05-01', '2024-05-02', '2024-05-03',
+    '2024-06-10', '2024-09-16', '2024-09-17', '2024-10-01', '2024-10-02', '2024-10-03',
+    '2024-10-04', '2024-10-07',
+    # 2025
+    '2025-01-01', '2025-01-28', '2025-01-29', '2025-01-30', '2025-01-31', '2025-02-03',
+    '2025-02-04', '2025-04-04', '2025-05-01', '2025-05-02', '2025-05-05', '2025-06-02',
+    '2025-10-01', '2025-10-02', '2025-10-03', '2025-10-06', '2025-10-07', '2025-10-08',
+    # 2026
+    '2026-01-01', '2026-01-02', '2026-02-16', '2026-02-17', '2026-02-18', '2026-02-19',
+    '2026-02-20', '2026-02-23', '2026-04-06', '2026-05-01', '2026-05-04', '2026-05-05',
+    '2026-06-19', '2026-09-25', '2026-10-01', '2026-10-02', '2026-10-05', '2026-10-06',
+    '2026-10-07',
+)
+
+
+# ==================== 日期转换 ====================
+
+def to_date(value) -> date:
+    """date / datetime / 'YYYY-MM-DD' / 'YYYYMMDD' / int YYYYMMDD → date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, (int, np.integer)):
+        value = str(int(value))
+    text = str(value).strip()
+    return datetime.strptime(text, '%Y%m%d' if len(text) == 8 and text.isdigit() else '%Y-%m-%d').date()
+
+
+def now_shanghai() -> datetime:
+    """当前北京时间"""
+    return datetime.now(SHANGHAI)
+
+
+def read_holidays(path: str = None) -> list:
+    """内置休市表 + 补充文件（去重，升序）"""
+    days = {to_date(d) for d in HOLIDAYS}
+    path = path or HOLIDAY_FILE
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if line:
+                    days.add(to_date(line))
+    return sorted(days)
+
+
+# ==================== 日历 ====================
+
+class TradingCalendar:
+    """
+    预计算交易日历（只读）
+
+    所有查询接受 to_date 支持的任意日期格式，返回 datetime.date
+    """
+
+    def __init__(self, holidays: list, end_year: int = None):
+        self.start = CALENDAR_CONFIG['start']
+        self.holiday_end = max(holidays) if holidays else self.start
+        end_year = end_year or max(self.holiday_end.year, date.today().year) + CALENDAR_CONFIG['extra_years']
+        self.end = date(end_year, 12, 31)
+
+        base = self.start.toordinal()
+        n = self.end.toordinal() - base + 1
+        weekday = (np.arange(n) + self.start.weekday()) % 7
+        self.is_open = weekday < 5
+        offsets = np.array([d.toordinal() - base for d in holidays if self.start <= d <= self.end], dtype=np.int64)
+        self.is_open[offsets] = False
+        self.rank = np.cumsum(self.is_open, dtype=np.int32)
+        self.open_days = np.flatnonzero(self.is_open).astype(np.int32)
+        self._base = base
+
+    def _offset(self, value) -> int:
+        d = to_date(value)
+        i = d.toordinal() - self._base
+        if not 0 <= i < len(self.is_open):
+            raise ValueError(f"日期 {d} 超出交易日历范围 {self.start} ~ {self.end}")
+        return i
+
+    def _day(self, i: int) -> date:
+        if not 0 <= i < len(self.open_days):
+            raise ValueError(f"超出交易日历范围 {self.start} ~ {self.end}")
+        return date.fromordinal(self._base + int(self.open_days[i]))
+
+    def is_trading_day(self, value) -> bool:
+        return bool(self.is_open[self._offset(value)])
+
+    def next_trading_day(self, value) -> date:
+        """严格晚于该日的第一个交易日"""
+        return self._day(int(self.rank[self._offset(value)]))
+
+    def previous_trading_day(self, value) -> date:
+        """严格早于该日的最后一个交易日"""
+        i = self._offset(value)
+        return self._day(int(self.rank[i]) - int(self.is_open[i]) - 1)
+
+    def add_trading_days(self, value, n: int) -> date:
+        """
+        前后第 n 个交易日（n > 0 向后，n < 0 向前，n = 0 为当日或其后第一个交易日）
+        """
+        i = self._offset(value)
+        k = int(self.rank[i]) - 1   # 不晚于该日的最后一个交易日的序号
+        if n == 0:
+            return self._day(k if self.is_open[i] else k + 1)
+        if n < 0 and not self.is_open[i]:
+            k += 1
+        return self._day(k + n)
+
+    def trading_days_between(self, start, end) -> int:
+        """(start, end] 内的交易日个数（end 早于 start 时为负）"""
+        return int(self.rank[self._offset(end)]) - int(self.rank[self._offset(start)])
+
+    def ranks(self, days) -> np.ndarray:
+        """批量：datetime64[D] 数组 → 截至各日（含）的交易日个数（与 rank 相同含义）"""
+        offsets = (np.asarray(days, dtype='datetime64[D]') - np.datetime64(self.start, 'D')).astype(np.int64)
+        if len(offsets) and (offsets.min() < 0 or offsets.max() >= len(self.rank)):
+            raise ValueError(f"日期超出交易日历范围 {self.start} ~ {self.end}")
+        return self.rank[offsets]
+
+    def open_days_at(self, index) -> np.ndarray:
+        """批量：交易日序号（0 起）→ datetime64[D]；超出范围的序号截断到最后一个交易日"""
+        index = np.clip(np.asarray(index, dtype=np.int64), 0, len(self.open_days) - 1)
+        return np.datetime64(self.start, 'D') + self.open_days[index].astype('timedelta64[D]')
+
+    def trading_days(self, start, end) -> list:
+        """[start, end] 内的全部交易日"""
+        i, j = self._offset(start), self._offset(end)
+        lo = int(self.rank[i]) - int(self.is_open[i])
+        return [date.fromordinal(self._base + int(d)) for d in self.open_days[lo:int(self.rank[j])]]
+
+
+_calendars = {}  # 补充文件版本 -> TradingCalendar（进程内复用）
+
+
+def get_calendar(path: str = None) -> TradingCalendar:
+    """进程内共享的交易日历（补充文件变化或跨年后自动重建）"""
+    path = path or HOLIDAY_FILE
+    try:
+        stat = os.stat(path)
+        version = f"{stat.st_size}-{stat.st_mtime_ns}"
+    except OSError:
+        version = 'none'
+    key = (path, version, date.today().year)
+    if key not in _calendars:
+        _calendars.clear()
+        _calendars[key] = TradingCalendar(read_holidays(path))
+    return _calendars[key]
+
+
+# ==================== 信号时段 ====================
+
+def signal_session(now: datetime = None) -> dict:
+    """
+    当前应展示的信号时段
+
+    返回 {'label': '今日信号' / '下一个交易日', 'session': 信号适用的交易日,
+          'signal_date': 应展示的信号日（该交易日的前一交易日）}
+    """
+    now = now or now_shanghai()
+    if now.tzinfo is not None:
+        now = now.astimezone(SHANGHAI)
+    cal = get_calendar()
+    today = now.date()
+
+    if cal.is_trading_day(today) and now.hour < CALENDAR_CONFIG['publish_hour']:
+        session, label = today, '今日信号'
+    else:
+        session, label = cal.next_trading_day(today), '下一个交易日'
+    return {'label': label, 'session': session, 'signal_date': cal.previous_trading_day(session)}
+
+
+def pick_signal_date(dates: list, now: datetime = None):
+    """
+    从已有信号日中选出应展示的一天：不晚于 signal_session 的信号日的最近一天
+
+    dates: 升序的 'YYYY-MM-DD' 列表；都晚于目标时返回最早一天，空列表返回 None
+    """
+    if not len(dates):
+        return None
+    target = signal_session(now)['signal_date'].isoformat()
+    i = int(np.searchsorted(np.asarray(dates, dtype=str), target, side='right'))
+    return dates[max(i - 1, 0)]
+
+
+def main():
+    cal = get_calendar()
+    extra = HOLIDAY_FILE if os.path.exists(HOLIDAY_FILE) else '无'
+    print(f"日历 {cal.start} ~ {cal.end}，休市表覆盖至 {cal.holiday_end}（补充文件：{extra}），"
+          f"共 {len(cal.open_days)} 个交易日")
+    session = signal_session()
+    print(f"北京时间 {now_shanghai():%Y-%m-%d %H:%M}：{session['label']} {session['session']}，"
+          f"信号日 {session['signal_date']}")
+    for value in sys.argv[1:]:
+        d = to_date(value)
+        print(f"  {d}  {'交易日' if cal.is_trading_day(d) else '休市'}  "
+              f"上一交易日 {cal.previous_trading_day(d)}  下一交易日 {cal.next_trading_day(d)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+EigenFlow 使用日志列式存储
+Daily columnar compaction of usage logs with a small query layer
+
+【分段】原始日志（状态存储中的 usage_log）按自然日分段：
+├── 已结束的日（早于 now - settle_minutes 的日期）：compact 转成列式分区 data/usage/{YYYY-MM-DD}.npz，
+│   随后从原始日志删除（同日已有分区时合并去重，重复执行 / 中途失败后重跑都安全）
+└── 当日（未结束）：仍在原始日志，查询时临时编码成同样的列式结构
+
+【分区格式】np.savez（不压缩、无 pickle），行按 (key_mask, 时间) 排序
+├── ts:                  int64，当日 0 点起的微秒数
+├── {列} / {列}_dict:    key_mask / status / ip_hash / ua_hash / device_id / page 字典编码
+│                        （编码 int8/16/32 + 升序标签表，标签表以 UTF-8 字节保存，缺失值编码为 ''）
+└── 单个 Key 的行是连续区间：标签表二分得到编码，再在 key_mask 列二分得到区间，不扫描其他行
+
+【查询】
+├── accesses_by_key(key_mask, start, end)     每日 access / warning / blocked 次数
+├── devices_per_key(start, end)               每日每个 Key 的不同设备数
+├── blocked_by_ip(start, end)                 按 ip_hash 汇总 blocked 次数
+└── recent_devices(key_mask, since)           时间窗口内的设备集合（core.check_share_anomaly）
+    分区进程内缓存（已结束的日不再变化）；管理面板与风控检查共用
+
+使用方法：
+    python usage_store.py compact                   # 压缩已结束的日（建议每日 0 点后 cron）
+    python usage_store.py info                      # 分区概况
+    python usage_store.py key <掩码> [天数]          # 某 Key 最近 N 天（默认 7）的访问
+    python usage_store.py devices [天数]            # 最近 N 天多设备 Key
+    python usage_store.py blocked [天数]            # 最近 N 天 blocked 最多的 ip_hash
+"""
+
+import os
+import sys
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+USAGE_DIR = os.environ.get('EF_USAGE_DIR', os.path.join(APP_DIR, 'data', 'usage'))
+
+USAGE_CONFIG = {
+    'settle_minutes': 10,      # 0 点后多久视为前一日已结束（等待各副本写完日志）
+    'cache_partitions': 64,    # 进程内缓存的分区数
+}
+
+DICT_COLUMNS = ('key_mask', 'status', 'ip_hash', 'ua_hash', 'device_id', 'page')
+STATUSES = ('access', 'warning', 'blocked')
+
+
+# ==================== 列式分段 ====================
+
+def _encode(values) -> tuple:
+    """字符串列 → (编码, 升序标签表)"""
+    labels, codes = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    dtype = np.int8 if len(labels) < 2 ** 7 else np.int16 if len(labels) < 2 ** 15 else np.int32
+    return codes.astype(dtype), labels
+
+
+class Segment:
+    """
+    一日的列式日志（分区文件或当日原始日志编码而来）
+
+    code / rows_of 为二分查找；decode 按行号取标签
+    """
+
+    def __init__(self, day: str, arrays: dict):
+        self.day = day
+        self.ts = arrays['ts']
+        self.codes = {c: arrays[c] for c in DICT_COLUMNS}
+        self.labels = {c: arrays[f'{c}_dict'] for c in DICT_COLUMNS}
+
+    @classmethod
+    def from_frame(cls, day: str, df) -> 'Segment':
+        """原始日志 DataFrame（timestamp + DICT_COLUMNS）→ 分段（按 key_mask、时间排序）"""
+        import pandas as pd
+
+        df = df.reindex(columns=['timestamp', *DICT_COLUMNS])
+        ts = pd.to_datetime(df['timestamp'], format='ISO8601')
+        micros = ((ts - pd.Timestamp(day)) // pd.Timedelta(microseconds=1)).to_numpy(dtype=np.int64)
+        arrays = {}
+        for column in DICT_COLUMNS:
+            arrays[column], arrays[f'{column}_dict'] = _encode(df[column].fillna('').astype(str).to_numpy())
+        order = np.lexsort((micros, arrays['key_mask']))
+        arrays['ts'] = micros[order]
+        for column in DICT_COLUMNS:
+            arrays[column] = arrays[column][order]
+        return cls(day, arrays)
+
+    def __len__(self):
+        return len(self.ts)
+
+    @property
+    def nbytes(self) -> int:
+        return self.ts.nbytes + sum(self.codes[c].nbytes + self.labels[c].nbytes for c in DICT_COLUMNS)
+
+    def arrays(self) -> dict:
+        out = {'ts': self.ts}
+        for column in DICT_COLUMNS:
+            out[column], out[f'{column}_dict'] = self.codes[column], self.labels[column]
+        return out
+
+    def code(self, column: str, value: str) -> int:
+        """标签 → 编码（不存在为 -1）"""
+        labels = self.labels[column]
+        i = int(np.searchsorted(labels, value))
+        return i if i < len(labels) and labels[i] == value else -1
+
+    def rows_of(self, key_mask: str) -> slice:
+        """某 Key 的行区间（key_mask 列已排序）"""
+        k = self.code('key_mask', key_mask)
+        if k < 0:
+            return slice(0, 0)
+        keys = self.codes['key_mask']
+        return slice(int(np.searchsorted(keys, k, 'left')), int(np.searchsorted(keys, k, 'right')))
+
+    def decode(self, column: str, rows=slice(None)) -> np.ndarray:
+        return self.labels[column][self.codes[column][rows]]
+
+    def timestamps(self, rows=slice(None)) -> np.ndarray:
+        return np.datetime64(self.day, 'us') + self.ts[rows].astype('timedelta64[us]')
+
+    def to_frame(self):
+        """还原成原始日志 DataFrame（合并同日新日志时使用）"""
+        import pandas as pd
+
+        data = {'timestamp': pd.Series(self.timestamps()).dt.strftime('%Y-%m-%dT%H:%M:%S.%f')}
+        data.update({c: self.decode(c) for c in DICT_COLUMNS})
+        return pd.DataFrame(data)
+
+
+# ==================== 分区文件 ====================
+
+_partitions = {}  # (路径, 文件版本) -> Segment
+
+
+def partition_path(day: str) -> str:
+    return os.path.join(USAGE_DIR, f"{day}.npz")
+
+
+def list_partitions() -> list:
+    """已压缩的日期（升序 'YYYY-MM-DD'）"""
+    if not os.path.isdir(USAGE_DIR):
+        return []
+    return sorted(name[:-4] for name in os.listdir(USAGE_DIR) if name.endswith('.npz') and len(name) == 14)
+
+
+def load_partition(day: str):
+    """读取分区（进程内缓存，文件变化后重新加载）；不存在返回 None"""
+    path = partition_path(day)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if key not in _partitions:
+        if len(_partitions) >= USAGE_CONFIG['cache_partitions']:
+            _partitions.clear()
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+        for column in DICT_COLUMNS:
+            arrays[f'{column}_dict'] = np.char.decode(arrays[f'{column}_dict'], 'utf-8')
+        _partitions[key] = Segment(day, arrays)
+    return _partitions[key]
+
+
+def write_partition(segment: Segment):
+    """临时文件 + 原子替换"""
+    os.makedirs(USAGE_DIR, exist_ok=True)
+    path = partition_path(segment.day)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    arrays = segment.arrays()
+    for column in DICT_COLUMNS:
+        arrays[f'{column}_dict'] = np.char.encode(arrays[f'{column}_dict'], 'utf-8')
+    with open(tmp, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+
+def _day_start(day) -> datetime:
+    return datetime.combine(date.fromisoformat(str(day)), time.min)
+
+
+def _days(start, end) -> list:
+    start, end = date.fromisoformat(str(start)), date.fromisoformat(str(end))
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+
+def _raw_frame(entries: list):
+    import pandas as pd
+
+    df = pd.DataFrame(entries, columns=['timestamp', *DICT_COLUMNS])
+    df = df[df['timestamp'].notna()]
+    df['day'] = df['timestamp'].astype(str).str[:10]
+    return df
+
+
+# ==================== 压缩 ====================
+
+def compact(now: datetime = None, backend=None) -> dict:
+    """
+    把已结束的日从原始日志转成分区，再从原始日志删除
+
+    返回 {'days': [压缩的日期], 'rows': 行数, 'raw_removed': 删除的原始日志条数, 'bytes': 分区大小}
+    """
+    import core
+    import pandas as pd
+
+    now = now or datetime.now()
+    cutoff = _day_start((now - timedelta(minutes=USAGE_CONFIG['settle_minutes'])).date())
+    if backend is None:
+        core.flush_usage_log()
+        backend = core.get_state_backend()
+
+    df = _raw_frame(backend.read_usage(until=cutoff))
+    days, rows, size = [], 0, 0
+    for day, group in df.groupby('day', sort=True):
+        group = group.drop(columns='day')
+        # 时间统一成微秒格式，与分区还原出的文本一致，合并时才能去重
+        group['timestamp'] = pd.to_datetime(group['timestamp'], format='ISO8601').dt.strftime('%Y-%m-%dT%H:%M:%S.%f')
+        existing = load_partition(day)
+        if existing is not None:
+            group = pd.concat([existing.to_frame(), group], ignore_index=True)
+        segment = Segment.from_frame(day, group.fillna('').drop_duplicates())
+        write_partition(segment)
+        days.append(day)
+        rows += len(segment)
+        size += os.path.getsize(partition_path(day))
+
+    raw_removed = backend.compact_usage(cutoff) if days else 0
+    return {'days': days, 'rows': rows, 'raw_removed': raw_removed, 'bytes': size}
+
+
+# ==================== 查询 ====================
+
+def segments(start, end, backend=None) -> list:
+    """[start, end] 内每日一个 Segment：已压缩的读分区，其余从原始日志临时编码"""
+    days = _days(start, end)
+    out, missing = {}, []
+    for day in days:
+        segment = load_partition(day)
+        if segment is None:
+            missing.append(day)
+        else:
+            out[day] = segment
+
+    if missing:
+        since = _day_start(missing[0])
+        until = _day_start(missing[-1]) + timedelta(days=1)
+        pending = []
+        if backend is None:
+            import core
+
+            # 尚未落盘的日志直接从写入队列合并，不等待写入线程
+            backend = core.get_state_backend()
+            pending = core.pending_usage(None, since, until)
+        df = _raw_frame(backend.read_usage(since=since, until=until) + pending)
+        df = df[df['day'].isin(missing)]
+        for day, group in df.groupby('day', sort=True):
+            out[day] = Segment.from_frame(day, group.drop(columns='day'))
+    return [out[day] for day in days if day in out]
+
+
+def accesses_by_key(key_mask: str, start, end, backend=None):
+    """某 Key 每日各状态次数：DataFrame[date, access, warning, blocked, total]（区间内每日一行）"""
+    import pandas as pd
+
+    found = {}
+    for segment in segments(start, end, backend):
+        rows = segment.rows_of(key_mask)
+        codes = segment.codes['status'][rows]
+        counts = np.bincount(codes.astype(np.int64), minlength=len(segment.labels['status']))
+        found[segment.day] = dict(zip(segment.labels['status'], counts.tolist()))
+
+    records = []
+    for day in _days(start, end):
+        counts = found.get(day, {})
+        record = {'date': day, **{s: int(counts.get(s, 0)) for s in STATUSES}}
+        record['total'] = int(sum(counts.values()))
+        records.append(record)
+    return pd.DataFrame(records, columns=['date', *STATUSES, 'total'])
+
+
+def devices_per_key(start, end, key_mask: str = None, min_devices: int = 1, backend=None):
+    """每日每个 Key 的不同设备数：DataFrame[date, key_mask, devices]（按设备数降序）"""
+    import pandas as pd
+
+    frames = []
+    for segment in segments(start, end, backend):
+        rows = segment.rows_of(key_mask) if key_mask else slice(None)
+        keys = segment.codes['key_mask'][rows].astype(np.int64)
+        devices = segment.codes['device_id'][rows].astype(np.int64)
+        present = segment.labels['device_id'][devices] != ''
+        n_devices = len(segment.labels['device_id'])
+        pairs = np.unique(keys[present] * n_devices + devices[present])
+        counts = np.bincount(pairs // n_devices, minlength=len(segment.labels['key_mask']))
+        hit = np.flatnonzero(counts >= max(min_devices, 1))
+        frames.append(pd.DataFrame({'date': segment.day, 'key_mask': segment.labels['key_mask'][hit],
+                                    'devices': counts[hit]}))
+
+    if not frames:
+        return pd.DataFrame(columns=['date', 'key_mask', 'devices'])
+    out = pd.concat(frames, ignore_index=True)
+    return out.sort_values(['devices', 'date'], ascending=[False, False], kind='stable').reset_index(drop=True)
+
+
+def blocked_by_ip(start, end, top: int = 20, backend=None):
+    """blocked 次数最多的 ip_hash：DataFrame[ip_hash, attempts, keys, last_seen]"""
+    import pandas as pd
+
+    frames = []
+    for segment in segments(start, end, backend):
+        blocked = segment.code('status', 'blocked')
+        if blocked < 0:
+            continue
+        rows = np.flatnonzero(segment.codes['status'] == blocked)
+        frames.append(pd.DataFrame({
+            'ip_hash': segment.decode('ip_hash', rows),
+            'key_mask': segment.decode('key_mask', rows),
+            'timestamp': segment.timestamps(rows),
+        }))
+
+    if not frames:
+        return pd.DataFrame(columns=['ip_hash', 'attempts', 'keys', 'last_seen'])
+    df = pd.concat(frames, ignore_index=True)
+    out = df.groupby('ip_hash', sort=False).agg(attempts=('key_mask', 'size'), keys=('key_mask', 'nunique'),
+                                                last_seen=('timestamp', 'max'))
+    out = out.sort_values(['attempts', 'last_seen'], ascending=False).head(top).reset_index()
+    out['last_seen'] = out['last_seen'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    return out
+
+
+def recent_devices(key_mask: str, since: datetime, backend=None) -> set:
+    """
+    since 之后使用过该 Key 的设备集合
+
+    已压缩的日读分区（只取该 Key 的行区间），未压缩部分交给状态存储（文件扫描 / SQLite 索引 / Redis ZSET）
+    """
+    if backend is None:
+        import core
+
+        backend = core.get_state_backend()
+    devices = set(backend.recent_devices(key_mask, since))
+    since_us = np.datetime64(since, 'us')
+    for day in _days(since.date(), date.today()):
+        segment = load_partition(day)
+        if segment is None:
+            continue
+        rows = segment.rows_of(key_mask)
+        ids = segment.decode('device_id', rows)[segment.timestamps(rows) >= since_us]
+        devices.update(ids[ids != ''].tolist())
+    return devices
+
+
+def count_recent_devices(key_mask: str, since: datetime, backend=None) -> int:
+    return len(recent_devices(key_mask, since, backend))
+
+
+def usage_summary() -> dict:
+    """分区概况（管理面板）"""
+    days = list_partitions()
+    size = sum(os.path.getsize(partition_path(d)) for d in days)
+    return {'partitions': len(days), 'first': days[0] if days else None, 'last': days[-1] if days else None,
+            'bytes': size}
+
+
+def main():
+    import pandas as pd
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else 'info'
+    pd.set_option('display.width', 160)
+
+    def last_days(arg_index: int) -> tuple:
+        n = int(sys.argv[arg_index]) if len(sys.argv) > arg_index else 7
+        return date.today() - timedelta(days=n - 1), date.today()
+
+    if cmd == 'compact':
+        result = compact()
+        print(f"压缩 {len(result['days'])} 天（{', '.join(result['days']) or '无'}），{result['rows']} 行，"
+              f"分区 {result['bytes'] / 1024:.0f} KB；原始日志删除 {result['raw_removed']} 条")
+    elif cmd == 'info':
+        summary = usage_summary()
+        print(f"{USAGE_DIR}：{summary['partitions']} 个分区 {summary['first'] or '-'} ~ {summary['last'] or '-'}，"
+              f"{summary['bytes'] / 1024:.0f} KB")
+    elif cmd == 'key' and len(sys.argv) > 2:
+        print(accesses_by_key(sys.argv[2], *last_days(3)).to_string(index=False))
+    elif cmd == 'devices':
+        from core import SHARE_CONFIG
+
+        df = devices_per_key(*last_days(2), min_devices=SHARE_CONFIG['device_threshold'] + 1)
+        print(df.to_string(index=False) if len(df) else '无多设备 Key')
+    elif cmd == 'blocked':
+        df = blocked_by_ip(*last_days(2))
+        print(df.to_string(index=False) if len(df) else '无 blocked 记录')
+    else:
+        print(__doc__)
+
+
+if __name__ == "__main__":
+    main()
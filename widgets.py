@@ -0,0 +1,591 @@
+"""
+EigenFlow 共享页面组件
+Shared UI components: brand, navigation, signal cards, charts, watermark
+"""
+
+import os
+import json
+from datetime import datetime
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+from core import (
+    KEY_VALIDITY_DAYS,
+    validate_access_key,
+    key_expiry_date,
+    key_strategies,
+    issue_stream_token,
+    check_share_anomaly,
+    log_usage,
+    format_stock_code,
+    get_tradingview_symbol,
+    get_local_chart_svg,
+)
+from perf import timed
+
+
+# ==================== 页面组件 | 品牌与导航 ====================
+
+@timed
+def render_brand_header():
+    """渲染 EigenFlow 品牌头部 - 机构级专业设计"""
+    st.markdown("""
+    <div class="brand-header">
+        <div class="brand-logo">📊 EigenFlow</div>
+        <div class="brand-tagline">Quantitative Research Platform</div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # ===== 合规横幅 =====
+    ##         EigenFlow 为量化研究展示平台，内容仅用于市场行为研究与数据观察，
+    ##    不构成证券投资建议或任何交易指令。
+    st.markdown('''
+    <div class="compliance-banner">
+        EigenFlow 是一个基于量化模型的市场研究与数据分析平台，致力于提供系统化的风险状态和市场信号参考，帮助用户理解市场结构与风险变化。
+        本平台内容仅用于研究与信息参考，不构成任何投资建议或个股推荐。
+    </div>
+    ''', unsafe_allow_html=True)
+
+
+@timed
+def render_disclaimer():
+    """渲染精简免责声明"""          # 本平台仅供学术研究，不构成投资建议，不诱导交易行为
+    st.markdown("""
+    <div class="disclaimer-bar">
+        EigenFlow 平台内容仅用于量化研究与市场信息参考，不构成任何投资建议或买卖依据。</br>
+        金融市场存在风险，历史表现不代表未来结果，用户据此决策风险自担。
+    </div>
+    """, unsafe_allow_html=True)
+
+
+@timed
+def render_nav_tabs():
+    """
+    横向导航栏 - 使用 st.radio 控制状态
+    最可靠的方法，兼容所有环境
+    """
+    tabs = [
+        (0, "📊", "信号清单"),
+        (1, "📈", "行情视图"),
+        (2, "☕", "支持订阅")
+    ]
+    
+    # 获取当前 tab
+    current_tab = st.session_state.get('target_tab', 0)
+    url_tab = st.query_params.get("tab", None)
+    if url_tab is not None:
+        current_tab = int(url_tab)
+        st.session_state.target_tab = current_tab
+    
+    # tab 标签
+    tab_labels = [f"{icon} {name}" for _, icon, name in tabs]
+    
+    # ===== 先放最彻底的隐藏 CSS =====
+    st.markdown('''
+    <style>
+    /* ===== 彻底隐藏所有 radio 按钮 ===== */
+    /* 隐藏整个 radio 区域 */
+    .stRadio {
+        display: none !important;
+    }
+    /* 隐藏我们手动添加的 radio input */
+    .nav-radio-inputs,
+    .nav-radio-inputs input {
+        display: none !important;
+        visibility: hidden !important;
+        opacity: 0 !important;
+        position: absolute !important;
+        width: 0 !important;
+        height: 0 !important;
+        overflow: hidden !important;
+    }
+    /*标签的 for 隐藏 属性关联 */
+    label[for^="nav_radio_"] {
+        cursor: pointer;
+    }
+    </style>
+    
+    <div class="nav-radio-inputs" style="display:none;">
+    ''', unsafe_allow_html=True)
+    
+    # 渲染大按钮导航（放在隐藏容器前面）
+    st.markdown('''
+    <div class="nav-wrapper">
+        <div class="nav-container">
+    ''', unsafe_allow_html=True)
+    
+    for idx, icon, name in tabs:
+        active_class = 'active' if current_tab == idx else ''
+        st.markdown(
+            f'''<label class="nav-btn {active_class}" for="nav_radio_{idx}">
+                <span class="nav-icon">{icon}</span>{name}
+            </label>''',
+            unsafe_allow_html=True
+        )
+    
+    st.markdown('</div></div>', unsafe_allow_html=True)
+    
+    # 渲染隐藏的 radio 按钮
+    radio_html = '<div class="nav-radio-inputs">'
+    for idx, _, _ in tabs:
+        checked = 'checked' if current_tab == idx else ''
+        radio_html += f'<input type="radio" name="nav_radio" id="nav_radio_{idx}" value="{idx}" {checked}>'
+    radio_html += '</div>'
+    st.markdown(radio_html, unsafe_allow_html=True)
+    
+    # ===== 大按钮样式 =====
+    st.markdown('''
+    <style>
+    /* ===== 大按钮样式 ===== */
+    .nav-wrapper {
+        display: flex;
+        justify-content: center;
+        margin: 24px 0;
+    }
+    
+    .nav-container {
+        display: inline-flex;
+        gap: 8px;
+        padding: 6px;
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        border-radius: 16px;
+        box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
+    }
+    
+    /* 大按钮 */
+    .nav-btn {
+        display: inline-flex;
+        align-items: center;
+        gap: 8px;
+        padding: 16px 32px;
+        border-radius: 12px;
+        font-size: 1.05em;
+        font-weight: 600;
+        color: rgba(255, 255, 255, 0.85);
+        cursor: pointer;
+        transition: all 0.3s ease;
+        border: none;
+        background: transparent;
+        user-select: none;
+        margin: 2px;
+    }
+    
+    .nav-btn:hover {
+        background: rgba(255, 255, 255, 0.2);
+        color: white;
+        transform: translateY(-2px);
+        box-shadow: 0 4px 12px rgba(0,0,0,0.2);
+    }
+    
+    /* 选中状态 - 白底紫字 */
+    .nav-btn.active {
+        background: white;
+        color: #667eea;
+        box-shadow: 0 4px 12px rgba(0, 0, 0, 0.15);
+    }
+    
+    .nav-icon {
+        font-size: 1.2em;
+    }
+    
+    /* 响应式：小屏幕 */
+    @media (max-width: 600px) {
+        .nav-btn {
+            padding: 12px 16px;
+            font-size: 0.9em;
+        }
+    }
+    </style>
+    ''', unsafe_allow_html=True)
+    
+    # 关闭隐藏容器
+    st.markdown('</div>', unsafe_allow_html=True)
+    
+    # 关键：使用 st.radio 同步状态
+    selected = st.radio(
+        "导航",
+        options=tab_labels,
+        index=current_tab,
+        key="nav_radio_sync",
+        label_visibility="collapsed"
+    )
+    
+    # 根据选择更新 tab
+    selected_idx = tab_labels.index(selected) if selected in tab_labels else 0
+    if selected_idx != current_tab:
+        st.session_state.target_tab = selected_idx
+        st.query_params["tab"] = str(selected_idx)
+        st.rerun()
+    
+    # 根据选择更新 tab
+    selected_idx = tab_labels.index(selected) if selected in tab_labels else 0
+    if selected_idx != current_tab:
+        st.session_state.target_tab = selected_idx
+        st.query_params["tab"] = str(selected_idx)
+        st.rerun()
+
+
+def handle_tab_switch():
+    """处理 tab 切换 - 从 session_state 或 URL 读取"""
+    # 优先从 session_state 读取
+    if 'target_tab' in st.session_state:
+        return st.session_state.target_tab
+    
+    # 其次从 URL query_params 读取
+    tab = st.query_params.get("tab", "0")
+    st.session_state.target_tab = int(tab)
+    return st.session_state.target_tab
+
+
+def switch_tab(tab_idx):
+    """切换 tab"""
+    st.session_state.target_tab = tab_idx
+    st.query_params["tab"] = str(tab_idx)
+    st.rerun()
+
+
+# ==================== 信号页面组件 ====================
+
+@timed
+def render_access_input():
+    """渲染 Access Key 输入框，返回 (key, masked_key) 或 (None, None)"""
+    st.markdown("""
+    <div class="input-group">
+        <div class="input-label">🔐 输入访问密钥</div>
+    """, unsafe_allow_html=True)
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        access_key = st.text_input(
+            "Access Key",
+            type="password",
+            placeholder="EF-26Q1-XXXXXXXX",
+            label_visibility="collapsed",
+            key="access_key_input"
+        )
+    with col2:
+        confirm_btn = st.button("确认", use_container_width=True, type="primary")
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    if confirm_btn and access_key:
+        result = validate_access_key(access_key)
+
+        if not result['valid']:
+            if result.get('expired'):
+                st.error(f"❌ Key 已到期（首次使用：{result['first_seen']}，"
+                         f"有效期{KEY_VALIDITY_DAYS}{result.get('days_unit', '天')}）")
+            elif result.get('revoked'):
+                st.error("❌ 该 Key 已停用，如有疑问请联系作者")
+            else:
+                st.error("❌ 无效的 Access Key")
+            log_usage(access_key, 'blocked')
+            return None, None
+
+        if result.get('is_first_use'):
+            # 兼容云端模式（first_seen 可能不存在）
+            first_seen = result.get('first_seen', datetime.now().strftime('%Y-%m-%d'))
+            st.success(f"✅ Key 已激活！有效期至 {result.get('expires_on') or key_expiry_date(first_seen)}")
+        else:
+            st.info(f"剩余有效期：{result['days_remaining']} {result.get('days_unit', '天')}")
+
+        # 检查共享异常
+        anomaly = check_share_anomaly(access_key)
+        if anomaly['is_anomaly']:
+            st.warning(anomaly['warning_message'])
+            log_usage(access_key, 'warning')
+
+        log_usage(access_key, 'access')
+
+        # 保存验证状态
+        st.session_state.verified_key = access_key
+        st.session_state.verified_key_mask = result['key']
+
+        return access_key, result['key']
+
+    return None, None
+
+
+@timed
+def render_lock_screen():
+    """渲染锁定屏幕"""
+    st.markdown("""
+    <div class="lock-screen">
+        <div class="lock-icon">🔐</div>
+        <div class="lock-title">核心信号已锁定</div>
+        <div class="lock-desc">
+            本页面展示 EigenFlow 量化研究核心信号<br>
+            包括 Rank 1-10 精选股票与评分<br><br>
+            <strong style="color:#f59e0b;">请切换至「支持订阅」页面获取 Access Key</strong>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+
+SIGNAL_CARD_STYLES = {
+    'featured': ('🏆', 8),
+    'silver': ('🥈', 6),
+    'other': ('🥉', 4),
+}
+
+
+def signal_card_html(tier: str, rank: int, row, name: str) -> str:
+    """信号卡片 HTML（featured / silver / other），供页面渲染与快照共用"""
+    icon, margin = SIGNAL_CARD_STYLES[tier]
+    code = format_stock_code(str(row.get('symbol', '')))
+    score = row.get('score', 0)
+
+    return f"""
+    <div class="signal-card signal-{tier}">
+        <div class="label">{icon} 模型输出结果 #{rank}</div>
+        <div class="stock-code">{code} <span class="stock-name">{name}</span></div>
+        <div class="signal-score" style="margin-top:{margin}px;">因子得分：{score:.2f}</div>
+    </div>
+    """
+
+
+@timed
+def render_signal_featured(row, name: str, rank: int = 1):
+    """渲染模型输出结果 (#1)"""
+    st.markdown(signal_card_html('featured', rank, row, name), unsafe_allow_html=True)
+
+
+@timed
+def render_signal_silver(rank: int, row, name: str):
+    """渲染模型输出结果 (#2-3)"""
+    st.markdown(signal_card_html('silver', rank, row, name), unsafe_allow_html=True)
+
+
+@timed
+def render_signal_other(rank: int, row, name: str):
+    """渲染模型输出结果 (#4-10)"""
+    st.markdown(signal_card_html('other', rank, row, name), unsafe_allow_html=True)
+
+
+# 【新信号推送】signal_api 的公网地址（如 https://api.example.com）；为空时不渲染提醒组件
+PUSH_API_URL = os.environ.get('EF_API_URL', '').rstrip('/')
+
+
+@timed
+def render_strategy_picker(access_key: str):
+    """
+    策略选择（只列出该 Key 解锁的策略；只有一个时不显示）
+
+    选中的策略保存在 session_state.strategy，信号清单 / 行情 / 历史页共用；
+    Key 未解锁任何策略时返回 None
+    """
+    import strategy_registry
+
+    allowed = key_strategies(access_key) if access_key else []
+    if not allowed:
+        return None
+    if st.session_state.get('strategy') not in allowed:
+        st.session_state.strategy = allowed[0]
+    if len(allowed) == 1:
+        return allowed[0]
+
+    # 选择另存一份：单选框的状态在不渲染它的页面（支持订阅）会被清理
+    names = {s.id: s.name for s in strategy_registry.list_strategies()}
+    if st.session_state.get('strategy_picker', allowed[0]) not in allowed:
+        del st.session_state['strategy_picker']   # 换了 Key，旧选择不在范围内
+    st.session_state.strategy = st.radio(
+        "策略", allowed, index=allowed.index(st.session_state.strategy),
+        format_func=lambda sid: names.get(sid, sid), horizontal=True,
+        key="strategy_picker", label_visibility="collapsed",
+    )
+    return st.session_state.strategy
+
+
+@timed
+def render_signal_push(access_key: str):
+    """
+    新信号提醒（订阅 signal_api 的 /api/v1/stream）
+
+    浏览器直接连接推送服务，页面加载后信号日变化时提示刷新，不再需要反复刷新页面等待
+    URL 中只带短期推送令牌（core.issue_stream_token），不写入明文 Key
+    """
+    if not PUSH_API_URL or not access_key:
+        return
+    url = json.dumps(f"{PUSH_API_URL}/api/v1/stream?token={issue_stream_token(access_key)}")
+    components.html(f"""
+    <div id="ef-push" style="font-size:13px;color:#6b7280;padding:6px 10px;border-radius:6px;background:#f9fafb;">
+        🔔 新信号发布后将在此提醒
+    </div>
+    <script>
+    const box = document.getElementById("ef-push");
+    let seen = null;
+    const source = new EventSource({url});
+    source.addEventListener("expired", () => {{
+        source.close();
+        box.textContent = "🔔 Key 已失效，新信号提醒已停止";
+    }});
+    source.addEventListener("signals", (e) => {{
+        const date = JSON.parse(e.data).date;
+        if (seen === null) {{ seen = date; return; }}
+        if (date !== seen) {{
+            box.style.cssText += "color:#92400e;background:#fef3c7;font-weight:600;";
+            box.textContent = "🔔 新信号已发布（信号日 " + date + "），刷新页面查看";
+        }}
+    }});
+    </script>
+    """, height=44)
+
+
+# ==================== TradingView 组件 ====================
+
+@timed
+def render_tradingview_chart(symbol: str, height: int = 400, fallback_svg: str = None):
+    """
+    渲染 TradingView 图表（合规嵌入）
+
+    【备用图表】
+    - fallback_svg: 本地预渲染K线，tv.js 加载失败时自动显示
+    - 无本地数据时显示网络提示
+    """
+    fallback = fallback_svg or '<div class="tv-disclaimer">外部图表服务暂不可用，请更换网络环境后重试。</div>'
+    tv_html = f"""
+    <div class="tv-container">
+        <div id="tradingview_widget" style="height:{height}px;"></div>
+        <div id="local_chart_fallback" style="display:none;">{fallback}</div>
+    </div>
+    <script type="text/javascript" src="https://s3.tradingview.com/tv.js"></script>
+    <script type="text/javascript">
+    if (typeof TradingView === "undefined") {{
+        document.getElementById("tradingview_widget").style.display = "none";
+        document.getElementById("local_chart_fallback").style.display = "block";
+    }} else new TradingView.widget({{
+        "width": "100%",
+        "height": {height},
+        "symbol": "{symbol}",
+        "interval": "D",
+        "timezone": "Asia/Shanghai",
+        "theme": "light",
+        "style": "1",
+        "locale": "zh_CN",
+        "toolbar_bg": "#f1f3f6",
+        "enable_publishing": false,
+        "allow_symbol_change": true,
+        "container_id": "tradingview_widget"
+    }});
+    </script>
+
+    
+    <div class="tv-disclaimer">
+        本页面行情图表由第三方数据服务提供，仅用于市场数据展示与可视化分析参考。<br>
+        图表内容不构成任何买卖建议、价格预测或投资判断。<br>
+        部分图表服务可能受网络环境或地区访问影响，如加载异常，请更换网络环境后重试。<br>
+        TradingView 为 TradingView, Inc. 的注册商标。本平台与 TradingView, Inc. 不存在合作、授权或隶属关系。<br>
+    </div>
+
+    """
+    components.html(tv_html, height=height + 130)
+
+
+# 行情图表由第三方提供，仅作为市场数据可视化参考。<br>
+#  EigenFlow 不提供任何买卖建议或价格判断。<br>
+#  TradingView® 为 TradingView, Inc. 的注册商标。<br>
+#  本平台与 TradingView, Inc. 无合作、授权或隶属关系。<br>
+
+@timed
+def render_local_chart(code: str, height: int = 400):
+    """渲染本地K线（极速模式 / TradingView 备用）"""
+    svg = get_local_chart_svg(code)
+    if svg is None:
+        st.info("本地暂无该股票行情数据，请关闭极速模式使用外部图表。")
+        return
+    components.html(f"""
+    <div class="tv-container">{svg}</div>
+    <div class="tv-disclaimer">
+        极速模式：本地日K线，按数据版本预生成，仅用于市场数据展示与可视化分析参考，不构成任何买卖建议。
+    </div>
+    """, height=height + 60)
+
+
+@timed
+def render_trial_chart():
+    """渲染试用版图表"""
+    st.markdown("""
+    <div class="info-card">
+        <div class="info-card-title">🔓 TradingView 试用</div>
+        <div class="info-card-text">
+            输入任意股票代码，查看实时行情图表。
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+    trial_symbol = st.text_input(
+        "输入股票代码",
+        placeholder="600519, 000001, 300624",
+        max_chars=6,
+        label_visibility="visible",
+        key="trial_symbol"
+    )
+
+    if trial_symbol:
+        trial_symbol = trial_symbol.strip().zfill(6)
+        if len(trial_symbol) == 6 and trial_symbol.isdigit():
+            tv_symbol = get_tradingview_symbol(trial_symbol)
+            render_tradingview_chart(tv_symbol)
+
+
+# ==================== 静态资源组件 ====================
+
+@timed
+def render_static_image(name: str):
+    """
+    渲染预处理后的静态图片（二维码等）
+
+    - 已开启静态服务：<picture> 引用带内容哈希的 WebP/PNG，浏览器按 ETag 缓存
+    - 未开启：使用内存中的预缩放 PNG
+    """
+    import static_assets
+
+    asset = static_assets.get_asset(name)
+    width = asset['display_width']
+
+    if asset['png_url'] and st.get_option('server.enableStaticServing'):
+        st.markdown(f'''
+        <picture>
+            <source srcset="{asset['webp_url']}" type="image/webp">
+            <img src="{asset['png_url']}" width="{width}" loading="lazy" alt="{name}">
+        </picture>
+        ''', unsafe_allow_html=True)
+    else:
+        st.image(asset['png'], width=width)
+
+
+# ==================== 水印组件 ====================
+
+@timed
+def render_watermark(key_mask: str = None, mode: str = "licensed"):
+    """
+    渲染水印（截图威慑）
+    
+    【水印格式】
+    - 授权模式：授权码：EF-26Q1-****KZ2M｜仅限个人研究使用
+    - 试用模式：试用模式 | 仅供演示
+    """
+    if mode == "trial":
+        text = "试用模式 | 仅供演示"
+    elif key_mask:
+        text = f"授权码：{key_mask}｜仅限个人研究使用"
+    else:
+        text = "EigenFlow Research"
+
+    st.markdown(f'<div class="watermark">{text}</div>', unsafe_allow_html=True)
+
+
+@timed
+def render_access_key_display(key_mask: str):
+    """渲染Access Key显示（金色+防转售警告）"""
+    st.markdown(f'''
+    <div class="access-key-display">
+        <div class="ak-label">Access Key</div>
+        <div class="ak-value">{key_mask}</div>
+        <div class="ak-warning">
+            仅限个人研究使用。禁止共享、传播或用于商业用途。<br>
+            如检测到异常访问行为，平台有权终止授权。
+        </div>
+    </div>
+    ''', unsafe_allow_html=True)